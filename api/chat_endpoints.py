@@ -1,17 +1,54 @@
-from collections import defaultdict
+from __future__ import annotations
+import json
+import logging
+import time
+from collections.abc import AsyncIterator
+from typing import TYPE_CHECKING, Any
 from uuid import UUID
-from anthropic.types import MessageParam
 from fastapi import APIRouter, HTTPException
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
 from api.models import ChatMessage
-from llm.chat import get_response_for_message, get_response_for_messages
+from llm.agent import AgentReply, TextDelta, TokenUsage, ToolStarted
+from llm.chat import context_policy, get_response_for_context, get_response_for_message, prepare_context, stream_response_for_context
+from llm.chat_store import create_chat_store
+from llm.context import ChatContext
+
+if TYPE_CHECKING:
+    from anthropic.types import MessageParam
 
 router = APIRouter(prefix="/chat")
-chats: dict[UUID, list[MessageParam]] = defaultdict(list)
+chats = create_chat_store()
+
+logger = logging.getLogger(__name__)
+
+def server_sent_event(event: str, data: dict[str, Any]) -> str:
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+async def load_context(chat_id: UUID, question: MessageParam) -> ChatContext:
+    # The SQLite chat store blocks, it runs in the threadpool
+    history = await run_in_threadpool(chats.load, str(chat_id))
+    summary = await run_in_threadpool(chats.load_summary, str(chat_id))
+    return await prepare_context([*history, question], summary)
+
+def save_exchange(chat_id: UUID, context: ChatContext, question: MessageParam, texts: list[str], usage: TokenUsage) -> None:
+    """
+    Stores the question and answers, folds dropped messages into the stored summary.
+    Called only after a successful response, a failed request leaves the thread unchanged.
+    """
+    if context.dropped and context_policy.summarize and context.summary:
+        chats.compact(str(chat_id), context.summary, context.dropped)
+    answers: list[MessageParam] = [{ "content": text, "role": "assistant" } for text in texts]
+    chats.append(str(chat_id), [question, *answers])
+    logger.info(
+        "Chat %s: %d messages (~%d tokens) sent, %d dropped, %s",
+        chat_id, len(context.messages), context.estimated_tokens, context.dropped, usage.summary()
+    )
 
 @router.post("")
-def chat(message: ChatMessage) -> list[str]:
+async def chat(message: ChatMessage) -> list[str]:
     try:
-        messages = get_response_for_message(message.text)
+        messages = await get_response_for_message(message.text)
         return messages
 
     except Exception as ex:
@@ -19,15 +56,57 @@ def chat(message: ChatMessage) -> list[str]:
         raise HTTPException(500, "Something went wrong")
 
 @router.post("/{chat_id}")
-def send_to_chat(chat_id: UUID, message: ChatMessage) -> list[str]:
+async def send_to_chat(chat_id: UUID, message: ChatMessage) -> list[str]:
     try:
-        thread = chats[chat_id]
-        thread.append({ "content": message.text, "role": "user" })
-        response = get_response_for_messages(thread)
-        for text in response:
-            thread.append({ "content": text, "role": "assistant" })
-        return response
+        question: MessageParam = { "content": message.text, "role": "user" }
+        context = await load_context(chat_id, question)
+        reply = await get_response_for_context(context)
+        await run_in_threadpool(save_exchange, chat_id, context, question, reply.texts, reply.usage)
+        return reply.texts
 
     except Exception as ex:
         print(ex)
         raise HTTPException(500, "Something went wrong")
+
+@router.post("/{chat_id}/stream")
+async def stream_to_chat(chat_id: UUID, message: ChatMessage) -> StreamingResponse:
+    """
+    Answers as server-sent events: text deltas as the model writes them (text),
+    tools as they are called (tool), then the full answer with timings and tokens (done) or an error (error)
+    """
+    question: MessageParam = { "content": message.text, "role": "user" }
+
+    async def events() -> AsyncIterator[str]:
+        started = time.perf_counter()
+        first_token_ms: float | None = None
+        try:
+            context = await load_context(chat_id, question)
+            async for event in stream_response_for_context(context):
+                match event:
+                    case TextDelta(text=text, block=block):
+                        if first_token_ms is None:
+                            first_token_ms = (time.perf_counter() - started) * 1000
+                            logger.info("Chat %s: first token after %.0f ms", chat_id, first_token_ms)
+                        yield server_sent_event("text", { "text": text, "block": block })
+                    case ToolStarted(name=name):
+                        yield server_sent_event("tool", { "name": name })
+                    case AgentReply(texts=texts, usage=usage):
+                        await run_in_threadpool(save_exchange, chat_id, context, question, texts, usage)
+                        total_ms = round((time.perf_counter() - started) * 1000, 1)
+                        first_ms = round(first_token_ms, 1) if first_token_ms is not None else None
+                        yield server_sent_event("done", {
+                            "texts": texts,
+                            "firstTokenMs": first_ms,
+                            "totalMs": total_ms,
+                            "sentTokens": usage.sent_tokens,
+                            "cachedTokens": usage.cache_read_input_tokens,
+                            "outputTokens": usage.output_tokens,
+                        })
+
+        except Exception as ex:
+            print(ex)
+            yield server_sent_event("error", { "detail": "Something went wrong" })
+
+    # Proxies must pass events through as they come
+    headers = { "Cache-Control": "no-cache", "X-Accel-Buffering": "no" }
+    return StreamingResponse(events(), media_type="text/event-stream", headers=headers)
@@ -0,0 +1,179 @@
+"""
+Command execution for thin CLI clients.
+
+This module lets `magic8 --connect` run CLI commands in the API process,
+so the server is the only process writing to the database and commands
+are answered from its warm query cache. Commands run through the same
+handlers and execute_handler as in the CLI. Completions and auto-suggest
+come from a completion index kept by the server, which follows writes made
+by CLI commands, REST endpoints and MCP tools.
+
+Only clients of the same user on this machine are served: a request must
+come from the loopback interface, name a loopback host in its Host header,
+which turns away pages of other sites resolved to 127.0.0.1, and carry the
+token the server keeps in a file of the user (see cli/cli_token.py).
+`import` and `export` are not run, their paths would be resolved on the
+server instead of the client.
+
+Output of list commands is streamed as NDJSON records while the following
+pages are read: the status, the lines in chunks of STREAM_LINES_PER_CHUNK,
+and the SQL statements which read them, which the X-SQL-* headers sent
+before the output can not count.
+"""
+
+import json
+import secrets
+from collections.abc import Iterator
+from dataclasses import dataclass
+from functools import cache
+from itertools import islice
+from ipaddress import ip_address
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi.responses import StreamingResponse
+from prompt_toolkit.auto_suggest import AutoSuggest
+from prompt_toolkit.buffer import Buffer
+from prompt_toolkit.completion import CompleteEvent, Completer
+from prompt_toolkit.document import Document
+from api.models import CliCommandModel, CliCompletionModel, CliCompletionsModel, CliResultModel
+from cli.abstractions import CommandHandler, Result
+from cli.api_client import STREAM_MEDIA_TYPE
+from cli.backend import create_handlers
+from cli.batch import run_command
+from cli.cli_token import TOKEN_HEADER, ensure_token
+from cli.completion import build_auto_suggest, build_completer
+from cli.completion_index import CompletionIndex
+from data.database import get_database_engine
+from data.instrumentation import SqlStats, sql_stats
+from data.row_changes import add_row_listener
+
+MAX_COMPLETIONS = 200
+
+# Lines of streamed output sent together, one page of a list command by default
+STREAM_LINES_PER_CHUNK = 50
+
+# Commands reading or writing files by path, run only by a local CLI
+FILE_COMMANDS = ("import", "export")
+
+
+def _is_loopback(host: str) -> bool:
+    try:
+        return ip_address(host).is_loopback
+    except ValueError:
+        return host == "localhost"
+
+
+def _host_name(host_header: str) -> str:
+    """
+    Host of a Host header without the port, IPv6 addresses without the brackets
+    """
+    if host_header.startswith("["):
+        return host_header[1:].partition("]")[0]
+    return host_header.partition(":")[0]
+
+
+@cache
+def get_cli_token() -> str:
+    return ensure_token()
+
+
+def require_local_client(request: Request, token: str = Depends(get_cli_token)) -> None:
+    peer = request.client.host if request.client else ""
+    host = _host_name(request.headers.get("host", ""))
+    if not _is_loopback(peer) or not _is_loopback(host):
+        raise HTTPException(403, "CLI commands are accepted only from this machine")
+    if not secrets.compare_digest(request.headers.get(TOKEN_HEADER, ""), token):
+        raise HTTPException(403, f"CLI commands need the token of the server in the {TOKEN_HEADER} header")
+
+
+router = APIRouter(prefix="/cli", dependencies=[Depends(require_local_client)])
+
+
+@dataclass
+class CliCompletion:
+    index: CompletionIndex
+    completer: Completer
+    auto_suggest: AutoSuggest
+
+
+@cache
+def get_handlers() -> dict[str, CommandHandler]:
+    return create_handlers(get_database_engine())
+
+
+@cache
+def get_completion() -> CliCompletion:
+    # Built with the first completion request, most API processes never serve one
+    from data.async_database import async_database_engine
+
+    index = CompletionIndex(get_database_engine())
+    index.attach()
+    # REST endpoints and MCP tools write through the async engine
+    add_row_listener(async_database_engine.sync_engine, index.rows_written)
+    commands = ["hello", *get_handlers(), "close", "exit", "history-clear"]
+    return CliCompletion(index, build_completer(index, commands), build_auto_suggest(index, commands))
+
+
+# GET /cli/commands # names of the commands served
+@router.get("/commands")
+def get_commands(handlers: dict[str, CommandHandler] = Depends(get_handlers)) -> list[str]:
+    return list(handlers)
+
+
+def streamed_output(status: Result, lines: Iterator[str]) -> Iterator[str]:
+    """
+    NDJSON records of streamed command output: {"status"}, {"lines"} per chunk, then {"sqlCount", "sqlTime"}
+    """
+    yield json.dumps({"status": status.name}) + "\n"
+    stats = SqlStats()
+    while True:
+        with sql_stats(stats):
+            chunk = list(islice(lines, STREAM_LINES_PER_CHUNK))
+        if not chunk:
+            break
+        yield json.dumps({"lines": chunk}) + "\n"
+    yield json.dumps({"sqlCount": stats.statements, "sqlTime": round(stats.seconds * 1000, 1)}) + "\n"
+
+
+# POST /cli/commands # runs a command, the result is what the CLI would print, output of list commands is streamed
+@router.post("/commands", response_model=CliResultModel)
+def execute_command(
+    command: CliCommandModel,
+    handlers: dict[str, CommandHandler] = Depends(get_handlers)
+) -> CliResultModel | StreamingResponse:
+    name = command.command.strip().lower()
+    if name in FILE_COMMANDS:
+        return CliResultModel(
+            status=Result.WARNING.name,
+            message=f"'{name}' opens files of this machine by path, run it without --connect"
+        )
+
+    status, message = run_command(handlers, name, command.args)
+    if isinstance(message, str):
+        return CliResultModel(status=status.name, message=message)
+    return StreamingResponse(streamed_output(status, message), media_type=STREAM_MEDIA_TYPE)
+
+
+# GET /cli/completions?text={text}&cursor={cursor} # completions and the auto-suggestion for the prompt text
+@router.get("/completions")
+def get_completions(
+    text: str = "",
+    cursor: int | None = Query(None, ge=0),
+    completion: CliCompletion = Depends(get_completion)
+) -> CliCompletionsModel:
+    # Re-reads only the rows written since the last request
+    completion.index.refresh()
+
+    document = Document(text, min(cursor, len(text)) if cursor is not None else None)
+    completions = []
+    for found in completion.completer.get_completions(document, CompleteEvent()):
+        completions.append(CliCompletionModel(
+            text=found.text,
+            startPosition=found.start_position,
+            display=found.display_text,
+            meta=found.display_meta_text,
+        ))
+        if len(completions) >= MAX_COMPLETIONS:
+            break
+
+    suggestion = completion.auto_suggest.get_suggestion(Buffer(document=document), document)
+    return CliCompletionsModel(completions=completions, suggestion=suggestion.text if suggestion else None)
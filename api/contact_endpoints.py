@@ -1,4 +1,7 @@
-from fastapi import APIRouter, HTTPException
+import io
+from typing import Literal
+from fastapi import APIRouter, HTTPException, Query, Response, UploadFile
+from fastapi.responses import StreamingResponse
 from data.contact_commands import ContactCommands, CreateContact, UpdateContact
 from data.note_commands import NoteCommands, CreateNote
 from data.phone_commands import PhoneCommands, CreatePhone, UpdatePhone
@@ -8,6 +11,9 @@ from data.note_queries import NoteQueries
 from data.phone_queries import PhoneQueries
 from data.email_queries import EmailQueries
 from data.email_commands import EmailCommands, CreateEmail, UpdateEmail
+from data.contact_formats import export_extensions, export_media_types, read_contacts, write_contacts
+from data.export_queries import ExportQueries
+from data.import_commands import ImportCommands
 from data.exceptions import (
     ContactAlreadyExists,
     ContactNotFound,
@@ -17,29 +23,54 @@ from data.exceptions import (
     EmailNotFound,
     EmailAlreadyExists
 )
-from data.database import database_engine
-from api.models import ContactModel, NoteModel, PhoneModel, EmailModel
+from data.database import get_database_engine
+from data.pagination import next_page_after
+from api.handlers import handler
+from api.models import ContactModel, ImportReportModel, NoteModel, PhoneModel, EmailModel
 import api.mappers as mappers
 
 router = APIRouter(prefix="/contacts")
 
 
-# GET /contacts?tag={tag} # all contacts, and all contacts by tag
+# GET /contacts?tag={tag}&limit={limit}&after={contact_id} # all contacts, and all contacts by tag
+# With limit the response is a single page, cursor of the next page is sent in X-Next-After header
 @router.get("")
-def get_contacts(tag: str | None = None) -> list[ContactModel]:
-    queries = ContactQueries(database_engine)
+async def get_contacts(
+    response: Response,
+    tag: str | None = None,
+    limit: int | None = Query(None, ge=1, le=1000),
+    after: int | None = None
+) -> list[ContactModel]:
+    queries = handler(ContactQueries)
     if tag is not None:
-        contacts = queries.get_contacts_by_tag(tag)
+        contacts = await queries.run(ContactQueries.get_contacts_by_tag, tag, limit, after)
     else:
-        contacts = queries.get_contacts()
+        contacts = await queries.run(ContactQueries.get_contacts, limit, after)
+
+    next_after = next_page_after([contact.contact_id for contact in contacts], limit)
+    if next_after is not None:
+        response.headers["X-Next-After"] = str(next_after)
+
     return list(map(mappers.map_contact, contacts))
 
 
+# GET /contacts/export?format={ndjson|csv|vcard} # whole address book as a file, streamed while read
+# Blocking in both modes: Starlette iterates the generator of the export in the threadpool
+@router.get("/export", response_class=StreamingResponse)
+def export_contacts(format: Literal["ndjson", "csv", "vcard"] = "ndjson") -> StreamingResponse:
+    queries = ExportQueries(get_database_engine())
+    return StreamingResponse(
+        write_contacts(queries.iter_contact_records(), format, queries.get_max_notes_per_contact),
+        media_type=export_media_types[format],
+        headers={"Content-Disposition": f"attachment; filename=contacts.{export_extensions[format]}"}
+    )
+
+
 # GET /contacts/{contact_id} # get contact by ID
 @router.get("/{contact_id}")
-def get_contact(contact_id: int) -> ContactModel:
-    queries = ContactQueries(database_engine)
-    contact = queries.get_contact_by_id(contact_id)
+async def get_contact(contact_id: int) -> ContactModel:
+    queries = handler(ContactQueries)
+    contact = await queries.run(ContactQueries.get_contact_by_id, contact_id)
     if not contact:
         raise HTTPException(404, {"message": "Contact not found"})
     return mappers.map_contact(contact)
@@ -47,21 +78,21 @@ def get_contact(contact_id: int) -> ContactModel:
 
 # GET /contacts/{contact_id}/notes?tag={tag} # get contact notes, and by tag
 @router.get("/{contact_id}/notes")
-def get_contact_notes(contact_id: int, tag: str | None = None) -> list[NoteModel]:
-    queries = NoteQueries(database_engine)
+async def get_contact_notes(contact_id: int, tag: str | None = None) -> list[NoteModel]:
+    queries = handler(NoteQueries)
     if tag is not None:
-        notes = queries.get_notes_for_contact_by_tag(contact_id, tag)
+        notes = await queries.run(NoteQueries.get_notes_for_contact_by_tag, contact_id, tag)
     else:
-        notes = queries.get_notes_for_contact(contact_id)
+        notes = await queries.run(NoteQueries.get_notes_for_contact, contact_id)
     return list(map(mappers.map_note, notes))
 
 
 # POST /contacts -> Create a new contact
 @router.post("")
-def add_contact(command: CreateContact) -> ContactModel:
+async def add_contact(command: CreateContact) -> ContactModel:
     try:
-        commands = ContactCommands(database_engine)
-        contact = commands.add_contact(command)
+        commands = handler(ContactCommands)
+        contact = await commands.run(ContactCommands.add_contact, command)
         return mappers.map_contact(contact)
     except ContactAlreadyExists:
         raise HTTPException(400, {"message": "Contact already exists"})
@@ -69,12 +100,22 @@ def add_contact(command: CreateContact) -> ContactModel:
         raise HTTPException(400, {"message": "Phone already exists"})
 
 
+# POST /contacts/import?format={csv|vcard} -> import contacts from an uploaded CSV or vCard file
+# Without format it is detected from the file name or content, the upload is parsed in the threadpool
+@router.post("/import")
+def import_contacts(file: UploadFile, format: Literal["csv", "vcard"] | None = None) -> ImportReportModel:
+    lines = io.TextIOWrapper(file.file, encoding="utf-8-sig", errors="replace", newline="")
+    commands = ImportCommands(get_database_engine())
+    report = commands.import_contacts(read_contacts(lines, format, file.filename))
+    return mappers.map_import_report(report)
+
+
 # POST /contacts/{contact_id}/notes -> create a not for a contact
 @router.post("/{contact_id}/notes")
-def add_note_to_contact(contact_id: int, command: CreateNote):
+async def add_note_to_contact(contact_id: int, command: CreateNote):
     try:
-        commands = NoteCommands(database_engine)
-        note = commands.add_note_for_contact(contact_id, command)
+        commands = handler(NoteCommands)
+        note = await commands.run(NoteCommands.add_note_for_contact, contact_id, command)
         return mappers.map_note(note)
     except ContactNotFound:
         raise HTTPException(404, {"message": "Contact not found."})
@@ -82,10 +123,10 @@ def add_note_to_contact(contact_id: int, command: CreateNote):
 
 # POST /contacts/{contact_id}/tags-> add a tag for a contact
 @router.post("/{contact_id}/tags")
-def add_tag_to_contact(contact_id: int, command: AddTag):
+async def add_tag_to_contact(contact_id: int, command: AddTag):
     try:
-        commands = ContactCommands(database_engine)
-        contact = commands.add_tag_to_contact(contact_id, command)
+        commands = handler(ContactCommands)
+        contact = await commands.run(ContactCommands.add_tag_to_contact, contact_id, command)
         return mappers.map_contact(contact)
     except ContactNotFound:
         raise HTTPException(404, {"message": "Contact not found."})
@@ -93,10 +134,10 @@ def add_tag_to_contact(contact_id: int, command: AddTag):
 
 # PUT /contacts/{contact_id} -> Update a contact
 @router.put("/{contact_id}")
-def update_contact(contact_id: int, command: UpdateContact) -> ContactModel:
+async def update_contact(contact_id: int, command: UpdateContact) -> ContactModel:
     try:
-        commands = ContactCommands(database_engine)
-        contact = commands.update_contact(contact_id, command)
+        commands = handler(ContactCommands)
+        contact = await commands.run(ContactCommands.update_contact, contact_id, command)
         return mappers.map_contact(contact)
     except ContactNotFound:
         raise HTTPException(404, {"message": "Contact not found."})
@@ -104,10 +145,10 @@ def update_contact(contact_id: int, command: UpdateContact) -> ContactModel:
 
 # DELETE /contacts/{contact_id} -> Delete a contact
 @router.delete("/{contact_id}")
-def delete_contact(contact_id: int) -> dict[str, str]:
+async def delete_contact(contact_id: int) -> dict[str, str]:
     try:
-        commands = ContactCommands(database_engine)
-        commands.delete_contact(contact_id)
+        commands = handler(ContactCommands)
+        await commands.run(ContactCommands.delete_contact, contact_id)
         return {"message": "Contact successfully deleted."}
     except ContactNotFound:
         raise HTTPException(404, {"message": "Contact not found"})
@@ -115,10 +156,10 @@ def delete_contact(contact_id: int) -> dict[str, str]:
 
 # DELETE /contacts/{contact_id}/tags -> delete tag from contact
 @router.delete("/{contact_id}/tags")
-def delete_tag_from_contact(contact_id: int, command: RemoveTag) -> dict[str, str]:
+async def delete_tag_from_contact(contact_id: int, command: RemoveTag) -> dict[str, str]:
     try:
-        commands = ContactCommands(database_engine)
-        commands.remove_tag_from_contact(contact_id, command)
+        commands = handler(ContactCommands)
+        await commands.run(ContactCommands.remove_tag_from_contact, contact_id, command)
         return {"message": "Tag successfully deleted."}
     except ContactNotFound:
         raise HTTPException(404, {"message": "Contact not found"})
@@ -130,23 +171,23 @@ def delete_tag_from_contact(contact_id: int, command: RemoveTag) -> dict[str, st
 
 # GET /contacts/{contact_id}/phones ->  get phones by contact ID
 @router.get("/{contact_id}/phones")
-def get_phones_for_contact(contact_id: int) -> list[PhoneModel]:
-    contact_queries = ContactQueries(database_engine)
-    contact = contact_queries.get_contact_by_id(contact_id)
+async def get_phones_for_contact(contact_id: int) -> list[PhoneModel]:
+    contact_queries = handler(ContactQueries)
+    contact = await contact_queries.run(ContactQueries.get_contact_by_id, contact_id)
 
     if contact is None:
         raise HTTPException(404, {"message": "Contact not found"})
 
-    queries = PhoneQueries(database_engine)
-    phones = queries.get_contact_phones(contact_id)
+    queries = handler(PhoneQueries)
+    phones = await queries.run(PhoneQueries.get_contact_phones, contact_id)
     return list(map(mappers.map_phone, phones))
 
 # POST /contacts/{contact_id}/phones -> create a phone for contact
 @router.post("/{contact_id}/phones")
-def create_phone(contact_id: int, command: CreatePhone):
+async def create_phone(contact_id: int, command: CreatePhone):
     try:
-        commands = PhoneCommands(database_engine)
-        phone = commands.add_phone_for_contact(contact_id, command)
+        commands = handler(PhoneCommands)
+        phone = await commands.run(PhoneCommands.add_phone_for_contact, contact_id, command)
         return mappers.map_phone(phone)
     except ContactNotFound:
         raise HTTPException(404, {"message": "Contact not found."})
@@ -155,16 +196,16 @@ def create_phone(contact_id: int, command: CreatePhone):
 
 # PUT /contacts/{contact_id}/phones/{phone_id} -> update a phone for contact
 @router.put("/{contact_id}/phones/{phone_id}")
-def update_phone(contact_id: int, phone_id: int,  command: UpdatePhone):
-    contact_queries = ContactQueries(database_engine)
-    contact = contact_queries.get_contact_by_id(contact_id)
+async def update_phone(contact_id: int, phone_id: int,  command: UpdatePhone):
+    contact_queries = handler(ContactQueries)
+    contact = await contact_queries.run(ContactQueries.get_contact_by_id, contact_id)
 
     if contact is None:
         raise HTTPException(404, {"message": "Contact not found"})
 
     try:
-        commands = PhoneCommands(database_engine)
-        phone = commands.update_phone(phone_id, command)
+        commands = handler(PhoneCommands)
+        phone = await commands.run(PhoneCommands.update_phone, phone_id, command)
         return mappers.map_phone(phone)
     except PhoneNotFound:
         raise HTTPException(404, {"message": "Phone not found."})
@@ -174,16 +215,16 @@ def update_phone(contact_id: int, phone_id: int,  command: UpdatePhone):
 
 # DELETE /contacts/{contact_id}/phones/{phone_id} -> Delete a phone
 @router.delete("/{contact_id}/phones/{phone_id}")
-def delete_phone(contact_id: int, phone_id: int) -> dict[str, str]:
-    contact_queries = ContactQueries(database_engine)
-    contact = contact_queries.get_contact_by_id(contact_id)
+async def delete_phone(contact_id: int, phone_id: int) -> dict[str, str]:
+    contact_queries = handler(ContactQueries)
+    contact = await contact_queries.run(ContactQueries.get_contact_by_id, contact_id)
 
     if contact is None:
         raise HTTPException(404, {"message": "Contact not found"})
 
     try:
-        commands = PhoneCommands(database_engine)
-        commands.delete_phone(phone_id)
+        commands = handler(PhoneCommands)
+        await commands.run(PhoneCommands.delete_phone, phone_id)
         return {"message": "Phone successfully deleted."}
     except PhoneNotFound:
         raise HTTPException(404, {"message": "Phone not found"})
@@ -194,23 +235,23 @@ def delete_phone(contact_id: int, phone_id: int) -> dict[str, str]:
 
 # GET /contacts/{contact_id}/emails ->  get emails by contact ID
 @router.get("/{contact_id}/emails")
-def get_emails_for_contact(contact_id: int) -> list[EmailModel]:
-    contact_queries = ContactQueries(database_engine)
-    contact = contact_queries.get_contact_by_id(contact_id)
+async def get_emails_for_contact(contact_id: int) -> list[EmailModel]:
+    contact_queries = handler(ContactQueries)
+    contact = await contact_queries.run(ContactQueries.get_contact_by_id, contact_id)
 
     if contact is None:
         raise HTTPException(404, {"message": "Contact not found"})
 
-    queries = EmailQueries(database_engine)
-    emails = queries.get_contact_emails(contact_id)
+    queries = handler(EmailQueries)
+    emails = await queries.run(EmailQueries.get_contact_emails, contact_id)
     return list(map(mappers.map_email, emails))
 
 # POST /contacts/{contact_id}/emails -> create an email for contact
 @router.post("/{contact_id}/emails")
-def create_email(contact_id: int, command: CreateEmail) -> EmailModel:
+async def create_email(contact_id: int, command: CreateEmail) -> EmailModel:
     try:
-        commands = EmailCommands(database_engine)
-        email = commands.add_email_for_contact(contact_id, command)
+        commands = handler(EmailCommands)
+        email = await commands.run(EmailCommands.add_email_for_contact, contact_id, command)
         return mappers.map_email(email)
     except ContactNotFound:
         raise HTTPException(404, {"message": "Contact not found."})
@@ -219,16 +260,16 @@ def create_email(contact_id: int, command: CreateEmail) -> EmailModel:
 
 # PUT /contacts/{contact_id}/emails/{email_id} -> update an email for contact
 @router.put("/{contact_id}/emails/{email_id}")
-def update_email(contact_id: int, email_id: int,  command: UpdateEmail) -> EmailModel:
-    contact_queries = ContactQueries(database_engine)
-    contact = contact_queries.get_contact_by_id(contact_id)
+async def update_email(contact_id: int, email_id: int,  command: UpdateEmail) -> EmailModel:
+    contact_queries = handler(ContactQueries)
+    contact = await contact_queries.run(ContactQueries.get_contact_by_id, contact_id)
 
     if contact is None:
         raise HTTPException(404, {"message": "Contact not found"})
 
     try:
-        commands = EmailCommands(database_engine)
-        email = commands.update_email(email_id, command)
+        commands = handler(EmailCommands)
+        email = await commands.run(EmailCommands.update_email, email_id, command)
         return mappers.map_email(email)
     except EmailNotFound:
         raise HTTPException(404, {"message": "Email not found."})
@@ -237,16 +278,16 @@ def update_email(contact_id: int, email_id: int,  command: UpdateEmail) -> Email
 
 # DELETE /contacts/{contact_id}/emails/{email_id} -> Delete an email
 @router.delete("/{contact_id}/emails/{email_id}")
-def delete_email(contact_id: int, email_id: int):
-    contact_queries = ContactQueries(database_engine)
-    contact = contact_queries.get_contact_by_id(contact_id)
+async def delete_email(contact_id: int, email_id: int):
+    contact_queries = handler(ContactQueries)
+    contact = await contact_queries.run(ContactQueries.get_contact_by_id, contact_id)
 
     if contact is None:
         raise HTTPException(404, {"message": "Contact not found"})
 
     try:
-        commands = EmailCommands(database_engine)
-        commands.delete_email(email_id)
+        commands = handler(EmailCommands)
+        await commands.run(EmailCommands.delete_email, email_id)
         return {"message": "Email successfully deleted."}
     except EmailNotFound:
         raise HTTPException(404, {"message": "Email not found"})
@@ -1,11 +1,14 @@
+import logging
 from pathlib import Path
-from fastapi import FastAPI
+from fastapi import FastAPI, Request, Response
 from fastapi.responses import FileResponse
 from fastapi.staticfiles import StaticFiles
 from fastapi.middleware.cors import CORSMiddleware
+from api.chat_endpoints import router as chat_router
+from api.cli_endpoints import router as cli_router
 from api.contact_endpoints import router as contacts_router
 from api.notes_endpoints import router as notes_router
-from api.chat_endpoints import router as chat_router
+from data.instrumentation import sql_stats
 from llm.tools import mcp
 
 # CORS
@@ -25,10 +28,25 @@ app.add_middleware(
     allow_credentials=True, # Allow cookies and authorization headers
     allow_methods=["*"],    # Allow all methods (GET, POST, PUT, DELETE, etc.)
     allow_headers=["*"],    # Allow all headers
+    expose_headers=["X-Next-After", "X-SQL-Count", "X-SQL-Time"], # Pagination cursor, SQL statistics
 )
+
+logger = logging.getLogger(__name__)
+
+# SQL statements executed for the request, the slowest ones are logged at debug level
+@app.middleware("http")
+async def count_sql_statements(request: Request, call_next) -> Response:
+    with sql_stats() as stats:
+        response = await call_next(request)
+    response.headers["X-SQL-Count"] = str(stats.statements)
+    response.headers["X-SQL-Time"] = f"{stats.seconds * 1000:.1f}"
+    logger.debug("%s %s: %s", request.method, request.url.path, stats.details())
+    return response
+
 app.include_router(contacts_router)
 app.include_router(notes_router)
 app.include_router(chat_router)
+app.include_router(cli_router)
 
 # MCP server
 app.mount("/mcp", mcp_app)
@@ -0,0 +1,46 @@
+"""
+Query and command handlers of the REST endpoints.
+
+This module decides how the routers run the handlers, by Magic_API_MODE:
+awaited on the event loop through aiosqlite (async, default), or as
+blocking calls in the threadpool (threads), where FastAPI also runs
+blocking endpoints. Endpoints are written once for both modes and await
+`handler(ContactQueries).run(ContactQueries.get_contacts, ...)`.
+"""
+
+import os
+from collections.abc import Callable
+from typing import Concatenate
+from sqlalchemy import Engine
+from starlette.concurrency import run_in_threadpool
+from data.abstractions import DatabaseAware
+from data.async_database import async_database_engine
+from data.async_handlers import AsyncHandler
+from data.database import get_database_engine
+
+api_modes = ("async", "threads")
+configured_mode = os.getenv("Magic_API_MODE", "async").strip().lower()
+if configured_mode not in api_modes:
+    raise ValueError(f"Unknown API mode '{configured_mode}'. Expected one of: {", ".join(api_modes)}")
+
+
+class ThreadHandler[H: DatabaseAware]:
+    handler: H
+
+    def __init__(self, handler_type: type[H], engine: Engine):
+        self.handler = handler_type(engine)
+
+    async def run[**P, R](self, method: Callable[Concatenate[H, P], R], *args: P.args, **kwargs: P.kwargs) -> R:
+        """
+        Awaits a method of the handler called in the threadpool
+        """
+        return await run_in_threadpool(method, self.handler, *args, **kwargs)
+
+
+def handler[H: DatabaseAware](handler_type: type[H]) -> AsyncHandler[H] | ThreadHandler[H]:
+    """
+    Handler of the type for the configured API mode
+    """
+    if configured_mode == "threads":
+        return ThreadHandler(handler_type, get_database_engine())
+    return AsyncHandler(handler_type, async_database_engine)
@@ -1,5 +1,6 @@
-from data.models import Contact, Email, Note, Phone, Tag
-from api.models import ContactModel, EmailModel, NoteModel, PhoneModel
+from data.import_commands import ImportReport
+from data.models import Contact, Email, Note, NoteSearchResult, Phone, Tag
+from api.models import ContactModel, EmailModel, ImportRejectModel, ImportReportModel, NoteModel, NoteSearchModel, PhoneModel
 
 def map_contact(contact: Contact) -> ContactModel:
     return ContactModel(
@@ -25,5 +26,28 @@ def map_note(note: Note) -> NoteModel:
         tags=list(map(map_tag, note.tags))
     )
 
+def map_note_search_result(result: NoteSearchResult) -> NoteSearchModel:
+    return NoteSearchModel(
+        id=result.note.note_id,
+        text=result.note.text,
+        tags=list(map(map_tag, result.note.tags)),
+        rank=result.rank,
+        snippet=result.snippet
+    )
+
 def map_tag(tag: Tag) -> str:
     return tag.label
+
+def map_import_report(report: ImportReport) -> ImportReportModel:
+    return ImportReportModel(
+        records=report.records,
+        imported=report.imported,
+        rejected=report.rejected,
+        duplicates=report.duplicates,
+        seconds=report.seconds,
+        recordsPerSecond=report.records_per_second,
+        rejects=[
+            ImportRejectModel(record=reject.record, name=reject.name, reason=reject.reason)
+            for reject in report.rejects
+        ]
+    )
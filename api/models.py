@@ -14,6 +14,10 @@ class NoteModel(BaseModel):
     text: str
     tags: list[str]
 
+class NoteSearchModel(NoteModel):
+    rank: float
+    snippet: str
+
 class ContactModel(BaseModel):
     id: int
     name: str
@@ -23,5 +27,38 @@ class ContactModel(BaseModel):
     notes: list[NoteModel]
     tags: list[str]
 
+class ImportRejectModel(BaseModel):
+    record: int
+    name: str
+    reason: str
+
+class ImportReportModel(BaseModel):
+    records: int
+    imported: int
+    rejected: int
+    duplicates: int
+    seconds: float
+    recordsPerSecond: float
+    rejects: list[ImportRejectModel]
+
 class ChatMessage(BaseModel):
     text: str
+
+class CliCommandModel(BaseModel):
+    command: str
+    args: list[str] = []
+
+class CliResultModel(BaseModel):
+    # Name of the cli.abstractions.Result
+    status: str
+    message: str
+
+class CliCompletionModel(BaseModel):
+    text: str
+    startPosition: int
+    display: str
+    meta: str
+
+class CliCompletionsModel(BaseModel):
+    completions: list[CliCompletionModel]
+    suggestion: str | None
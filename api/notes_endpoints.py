@@ -1,41 +1,60 @@
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Query, Response
 from data.tag_commands import AddTag, RemoveTag
 from data.note_commands import NoteCommands, CreateNote, UpdateNote
 from data.note_queries import NoteQueries
 from data.exceptions import NoteNotFound
-from data.database import database_engine
-from api.models import NoteModel
+from data.pagination import next_page_after
+from api.handlers import handler
+from api.models import NoteModel, NoteSearchModel
 import api.mappers as mappers
 
 router = APIRouter(prefix="/notes")
 
 
-# GET /notes?tag={tag} -> get all notes, and get all notes by tag
+# GET /notes?tag={tag}&limit={limit}&after={note_id} -> get all notes, and get all notes by tag
+# With limit the response is a single page, cursor of the next page is sent in X-Next-After header
 @router.get("")
-def get_notes(tag: str | None = None) -> list[NoteModel]:
-    queries = NoteQueries(database_engine)
+async def get_notes(
+    response: Response,
+    tag: str | None = None,
+    limit: int | None = Query(None, ge=1, le=1000),
+    after: int | None = None
+) -> list[NoteModel]:
+    queries = handler(NoteQueries)
     if tag is not None:
-        notes = queries.get_notes_by_tag(tag)
+        notes = await queries.run(NoteQueries.get_notes_by_tag, tag, limit, after)
     else:
-        notes = queries.get_notes()
+        notes = await queries.run(NoteQueries.get_notes, limit, after)
+
+    next_after = next_page_after([note.note_id for note in notes], limit)
+    if next_after is not None:
+        response.headers["X-Next-After"] = str(next_after)
 
     return list(map(mappers.map_note, notes))
 
 
+# GET /notes/search?q={text}&limit={limit} -> full-text search, best matches first
+@router.get("/search")
+async def search_notes(q: str, limit: int = Query(20, ge=1, le=100)) -> list[NoteSearchModel]:
+    queries = handler(NoteQueries)
+    results = await queries.run(NoteQueries.search_notes, q, limit)
+    return list(map(mappers.map_note_search_result, results))
+
+
 #  POST /notes -> add a note by contact ID
 @router.post("")
-def create_note(command: CreateNote) -> NoteModel:
-    commands = NoteCommands(database_engine)
-    note = commands.add_note(command)
+async def create_note(command: CreateNote) -> NoteModel:
+    commands = handler(NoteCommands)
+    note = await commands.run(NoteCommands.add_note, command)
     return mappers.map_note(note)
 
 
 #  PUT /notes -> update a note by its ID
 @router.put("/{note_id}")
-def update_note(note_id: int, command: UpdateNote) -> NoteModel:
+async def update_note(note_id: int, command: UpdateNote) -> NoteModel:
     try:
-        commands = NoteCommands(database_engine)
-        note = commands.update_note(note_id, command)
+        commands = handler(NoteCommands)
+        note = await commands.run(NoteCommands.update_note, note_id, command)
         return mappers.map_note(note)
     except NoteNotFound:
         raise HTTPException(404, {"message": "Note not found"})
@@ -43,10 +62,10 @@ def update_note(note_id: int, command: UpdateNote) -> NoteModel:
 
 # POST /notes/{note_id}/tags -> add a tag to the note
 @router.post("/{note_id}/tags")
-def add_tag_to_note(note_id: int, command: AddTag) -> NoteModel:
+async def add_tag_to_note(note_id: int, command: AddTag) -> NoteModel:
     try:
-        commands = NoteCommands(database_engine)
-        note = commands.add_tag_to_note(note_id, command)
+        commands = handler(NoteCommands)
+        note = await commands.run(NoteCommands.add_tag_to_note, note_id, command)
         return mappers.map_note(note)
     except NoteNotFound:
         raise HTTPException(404, {"message": "Note not found"})
@@ -54,10 +73,10 @@ def add_tag_to_note(note_id: int, command: AddTag) -> NoteModel:
 
 # DELETE /notes/{note_id} -> delete a note by its ID
 @router.delete("/{note_id}")
-def delete_note(note_id: int):
-    commands = NoteCommands(database_engine)
+async def delete_note(note_id: int):
+    commands = handler(NoteCommands)
     try:
-        commands.delete_note(note_id)
+        await commands.run(NoteCommands.delete_note, note_id)
         return {"message": "Note deleted successfully"}
     except NoteNotFound:
         raise HTTPException(404, {"message": "Note not found"})
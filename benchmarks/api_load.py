@@ -0,0 +1,139 @@
+"""
+Requests per second and latency of the API under concurrent clients.
+
+Seeds a temporary database, then serves it with uvicorn once with the
+threaded routers (blocking handlers in the anyio threadpool) and once with
+the async routers (handlers awaited on the event loop through aiosqlite).
+Every client sends requests one after another for the given duration,
+picking a contact page, a single contact or a contact's phones at random.
+The query cache is turned off so every request reads the database.
+
+The clients run in this process, on the same machine as the server:
+on a machine with few cores they compete with it for CPU.
+
+Usage:
+    python -m benchmarks.api_load [clients] [seconds] [contact_count]
+"""
+
+import asyncio
+import os
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+import httpx
+from sqlalchemy import create_engine
+from data.schema import ensure_schema
+from benchmarks.seed import seed_contacts
+
+PORT = 8765
+BASE_URL = f"http://127.0.0.1:{PORT}"
+
+
+def request_path(rng: random.Random, contact_count: int) -> str:
+    contact_id = rng.randint(1, contact_count)
+    match rng.randrange(3):
+        case 0:
+            return f"/contacts?limit=20&after={contact_id}"
+        case 1:
+            return f"/contacts/{contact_id}"
+        case _:
+            return f"/contacts/{contact_id}/phones"
+
+
+async def client(
+    http: httpx.AsyncClient,
+    seed: int,
+    contact_count: int,
+    deadline: float,
+    latencies: list[float],
+    errors: list[int]
+) -> None:
+    rng = random.Random(seed)
+    while time.perf_counter() < deadline:
+        path = request_path(rng, contact_count)
+        started = time.perf_counter()
+        try:
+            response = await http.get(path)
+            if response.status_code != 200:
+                errors.append(response.status_code)
+                continue
+        except httpx.HTTPError:
+            errors.append(0)
+            continue
+        latencies.append(time.perf_counter() - started)
+
+
+async def load(clients: int, seconds: float, contact_count: int) -> tuple[list[float], list[int], float]:
+    latencies: list[float] = []
+    errors: list[int] = []
+    limits = httpx.Limits(max_connections=clients, max_keepalive_connections=clients)
+    async with httpx.AsyncClient(base_url=BASE_URL, limits=limits, timeout=60) as http:
+        started = time.perf_counter()
+        deadline = started + seconds
+        _ = await asyncio.gather(*(
+            client(http, seed, contact_count, deadline, latencies, errors) for seed in range(clients)
+        ))
+        duration = time.perf_counter() - started
+    return latencies, errors, duration
+
+
+def wait_until_ready(server: subprocess.Popen[bytes]) -> None:
+    for _ in range(300):
+        if server.poll() is not None:
+            raise RuntimeError("API server exited during startup")
+        try:
+            _ = httpx.get(f"{BASE_URL}/contacts/1", timeout=1)
+            return
+        except httpx.HTTPError:
+            time.sleep(0.1)
+    raise RuntimeError("API server did not start")
+
+
+def measure(mode: str, directory: str, clients: int, seconds: float, contact_count: int) -> None:
+    environment = os.environ | {
+        "Magic_DB_PATH": directory,
+        "Magic_API_MODE": mode,
+        "Magic_QUERY_CACHE": "off",
+    }
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "api.endpoints:app", "--port", str(PORT), "--log-level", "warning"],
+        env=environment,
+    )
+    try:
+        wait_until_ready(server)
+        latencies, errors, duration = asyncio.run(load(clients, seconds, contact_count))
+    finally:
+        server.terminate()
+        _ = server.wait()
+
+    latencies.sort()
+    p50 = statistics.median(latencies) if latencies else 0.0
+    p99 = latencies[int(len(latencies) * 0.99)] if latencies else 0.0
+    print(
+        f"{mode:<8} {len(latencies) / duration:8.0f} requests/s"
+        f"  p50 {p50 * 1000:8.1f} ms  p99 {p99 * 1000:8.1f} ms  errors {len(errors)}"
+    )
+
+
+def run(clients: int, seconds: float, contact_count: int) -> None:
+    with tempfile.TemporaryDirectory() as directory:
+        engine = create_engine(f"sqlite:///{Path(directory) / "contacts.db"}")
+        ensure_schema(engine)
+        seed_contacts(engine, contact_count)
+        engine.dispose()
+
+        print(f"{clients} clients, {seconds:.0f} s per mode, {contact_count} contacts")
+        for mode in ["threads", "async"]:
+            measure(mode, directory, clients, seconds, contact_count)
+
+
+if __name__ == "__main__":
+    run(
+        int(sys.argv[1]) if len(sys.argv) > 1 else 200,
+        float(sys.argv[2]) if len(sys.argv) > 2 else 20,
+        int(sys.argv[3]) if len(sys.argv) > 3 else 10_000,
+    )
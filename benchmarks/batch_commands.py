@@ -0,0 +1,78 @@
+"""
+Import throughput of the batch executor against the per-command handlers.
+
+Creates contacts with a second phone, an e-mail, a tag and a note each,
+once through the command handlers (a session and commit per command)
+and once through BatchCommands.
+
+Usage:
+    python -m benchmarks.batch_commands [contact_count]
+"""
+
+import sys
+import tempfile
+import time
+from pathlib import Path
+from sqlalchemy import create_engine
+from data.batch_commands import BatchCommands, BatchItem
+from data.contact_commands import ContactCommands, CreateContact
+from data.email_commands import CreateEmail, EmailCommands
+from data.note_commands import CreateNote, NoteCommands
+from data.phone_commands import CreatePhone, PhoneCommands
+from data.schema import ensure_schema
+from data.sqlite_profile import apply_profile, get_profile
+from data.tag_commands import AddTag
+from benchmarks.seed import TAG_COUNT, contact_name, tag_label
+
+
+def batch_items(contact_count: int) -> list[BatchItem]:
+    items: list[BatchItem] = []
+    for contact_id in range(1, contact_count + 1):
+        name = contact_name(contact_id)
+        items += [
+            BatchItem(CreateContact(name=name, phone_number=f"{contact_id:010d}", date_of_birth=None)),
+            BatchItem(CreatePhone(phone_number=f"{contact_id + 5_000_000:010d}"), contact_name=name),
+            BatchItem(CreateEmail(email_address=f"contact{contact_id}@example.com"), contact_name=name),
+            BatchItem(AddTag(label=tag_label(contact_id % TAG_COUNT + 1)), contact_name=name),
+            BatchItem(CreateNote(text=f"Imported note for {name}"), contact_name=name),
+        ]
+    return items
+
+
+def run_handlers(engine, items: list[BatchItem]) -> None:
+    contacts, phones, emails, notes = ContactCommands(engine), PhoneCommands(engine), EmailCommands(engine), NoteCommands(engine)
+    for item in items:
+        match item.command:
+            case CreateContact():
+                _ = contacts.add_contact(item.command)
+            case CreatePhone():
+                _ = phones.add_phone_for_contact_by_name(item.contact_name or "", item.command)
+            case CreateEmail():
+                _ = emails.add_email_for_contact_by_name(item.contact_name or "", item.command)
+            case AddTag():
+                contacts.add_tag_to_contact_by_name(item.contact_name or "", item.command)
+            case CreateNote():
+                _ = notes.add_note_for_contact_by_name(item.contact_name or "", item.command)
+
+
+def run(contact_count: int) -> None:
+    items = batch_items(contact_count)
+    runners = {
+        "handlers": lambda engine: run_handlers(engine, items),
+        "BatchCommands": lambda engine: BatchCommands(engine).execute(items),
+    }
+    for label, runner in runners.items():
+        with tempfile.TemporaryDirectory() as directory:
+            engine = create_engine(f"sqlite:///{Path(directory) / "contacts.db"}")
+            apply_profile(engine, get_profile(None))
+            ensure_schema(engine)
+
+            started = time.perf_counter()
+            _ = runner(engine)
+            duration = time.perf_counter() - started
+            print(f"{label:<14} {len(items)} commands in {duration:8.2f} s ({len(items) / duration:10.0f} commands/s)")
+            engine.dispose()
+
+
+if __name__ == "__main__":
+    run(int(sys.argv[1]) if len(sys.argv) > 1 else 2_000)
@@ -0,0 +1,274 @@
+"""
+Deterministic synthetic dataset generator.
+
+Fills an empty database with contacts whose phone, e-mail, note and tag
+cardinalities follow the distributions of a `DatasetProfile`: tag popularity
+is Zipf-skewed, birth years are normally spread around a mean year and
+note lengths have a long tail. The same seed and profile always produce
+the same rows.
+
+Rows are written in chunks with executemany inserts straight into the
+tables from data/models.py, bypassing the per-row command handlers. The
+secondary indexes and the notes full-text index are dropped for the load
+and rebuilt once at the end.
+
+Usage:
+    python -m benchmarks.dataset [1k|100k|1M|<count>] [--output contacts.db] [--seed N] [--tags N] [--force]
+"""
+
+import argparse
+import bisect
+import itertools
+import random
+import sys
+import time
+from collections import Counter
+from collections.abc import Sequence
+from dataclasses import dataclass, field
+from datetime import date, timedelta
+from pathlib import Path
+from sqlalchemy import Engine, create_engine, func, select, text
+from data.models import Base, Contact, ContactNote, ContactTag, Email, Note, NoteTag, Phone, Tag
+from data.schema import ensure_indexes, ensure_note_search, ensure_schema
+from data.sqlite_profile import apply_profile, get_profile
+
+# Contacts generated and inserted at once
+CHUNK_SIZE = 50_000
+# Distinct sentences notes are composed of
+SENTENCE_POOL = 2_048
+
+sizes = {"1k": 1_000, "100k": 100_000, "1M": 1_000_000}
+
+first_names = [
+    "Olena", "Andrii", "Iryna", "Taras", "Oksana", "Dmytro", "Natalia", "Serhii", "Kateryna", "Mykola",
+    "Anna", "Oleksandr", "Maria", "Ivan", "Sofia", "Yurii", "Tetiana", "Bohdan", "Yulia", "Petro",
+    "Emma", "Liam", "Olivia", "Noah", "Ava", "Lucas", "Mia", "Leon", "Chloe", "Hugo",
+]
+last_names = [
+    "Shevchenko", "Kovalenko", "Bondarenko", "Tkachenko", "Kravchenko", "Melnyk", "Boyko", "Koval",
+    "Oliinyk", "Lysenko", "Moroz", "Savchenko", "Rudenko", "Marchenko", "Ponomarenko", "Smith",
+    "Johnson", "Brown", "Taylor", "Martin", "Bernard", "Dubois", "Muller", "Schmidt", "Rossi",
+]
+email_domains = ["example.com", "mail.example.org", "company.example.net", "post.example.io"]
+phone_prefixes = ["050", "063", "066", "067", "068", "073", "093", "095", "096", "097", "098", "099"]
+note_words = [
+    "call", "meeting", "project", "birthday", "gift", "invoice", "review", "lunch", "office", "trip",
+    "family", "contract", "deadline", "conference", "coffee", "report", "budget", "client", "team", "plan",
+    "remember", "ask", "about", "next", "week", "monday", "friday", "after", "before", "discuss",
+    "send", "documents", "prefers", "email", "evening", "morning", "weekend", "vacation", "kids", "school",
+    "moved", "new", "apartment", "address", "recommendation", "book", "concert", "tickets", "dinner", "restaurant",
+    "allergic", "to", "nuts", "likes", "jazz", "football", "hiking", "photography", "cooking", "travel",
+    "works", "at", "startup", "bank", "university", "hospital", "studio", "agency", "remote", "promotion",
+]
+
+
+@dataclass(frozen=True)
+class DatasetProfile:
+    """
+    Distributions of the generated data.
+    A cardinality tuple holds the relative weights of 0, 1, 2, ... items.
+    """
+    # Phones per contact, every contact has at least one like the ones added by the application
+    phones: tuple[float, ...] = (0, 70, 25, 5)
+    emails: tuple[float, ...] = (35, 50, 12, 3)
+    notes: tuple[float, ...] = (40, 30, 15, 8, 4, 2, 1)
+    contact_tags: tuple[float, ...] = (30, 30, 20, 12, 8)
+    note_tags: tuple[float, ...] = (50, 35, 15)
+    tag_count: int = 200
+    # Zipf exponent of tag popularity, 0 makes every tag equally popular
+    tag_skew: float = 1.1
+    # Share of contacts with a known date of birth
+    birthday_share: float = 0.8
+    birth_year_mean: float = 1985
+    birth_year_deviation: float = 15
+    birth_years: tuple[int, int] = (1930, 2015)
+    # Sentences per note, drawn from a log-normal distribution
+    note_sentences_median: float = 3
+    note_sentences_sigma: float = 0.9
+    note_sentences_max: int = 60
+
+
+@dataclass
+class DatasetSummary:
+    seed: int
+    rows: dict[str, int] = field(default_factory=dict)
+    seconds: float = 0.0
+
+    def total(self) -> int:
+        return sum(self.rows.values())
+
+
+class _Sampler:
+    """
+    Draws item counts from cardinality weights
+    """
+    def __init__(self, weights: Sequence[float]):
+        if not weights or min(weights) < 0 or sum(weights) <= 0:
+            raise ValueError(f"Invalid cardinality weights: {weights}")
+        self.cumulative = list(itertools.accumulate(weights))
+        self.total = self.cumulative[-1]
+
+    def sample(self, rng: random.Random) -> int:
+        return bisect.bisect_right(self.cumulative, rng.random() * self.total)
+
+
+def contact_name(first_name: str, last_name: str, occurrence: int) -> str:
+    return f"{first_name} {last_name}" if occurrence == 1 else f"{first_name} {last_name} {occurrence}"
+
+
+def tag_label(tag_id: int) -> str:
+    return f"tag-{tag_id:03d}"
+
+
+def _sentences(rng: random.Random) -> list[str]:
+    sentences: list[str] = []
+    for _ in range(SENTENCE_POOL):
+        words = rng.choices(note_words, k=rng.randint(4, 14))
+        sentences.append(" ".join(words).capitalize() + ".")
+    return sentences
+
+
+def _birthday(rng: random.Random, profile: DatasetProfile) -> date | None:
+    if rng.random() >= profile.birthday_share:
+        return None
+    first_year, last_year = profile.birth_years
+    year = min(last_year, max(first_year, round(rng.gauss(profile.birth_year_mean, profile.birth_year_deviation))))
+    first_day = date(year, 1, 1)
+    return first_day + timedelta(days=rng.randrange((date(year + 1, 1, 1) - first_day).days))
+
+
+def _distinct_tags(rng: random.Random, tag_ids: range, cumulative: list[float], count: int) -> list[int]:
+    if count == 0:
+        return []
+    # Popular tags are drawn repeatedly, duplicates are dropped so skewed contacts get fewer tags
+    return list(dict.fromkeys(rng.choices(tag_ids, cum_weights=cumulative, k=count)))
+
+
+def _insert_statement(model: type) -> str:
+    """
+    Positional INSERT into the writable columns of the model, in declaration order
+    """
+    columns = [column.name for column in model.__table__.columns if column.computed is None]
+    return f"INSERT INTO {model.__tablename__} ({", ".join(columns)}) VALUES ({", ".join("?" * len(columns))})"
+
+
+def generate_dataset(
+    engine: Engine,
+    contact_count: int,
+    profile: DatasetProfile = DatasetProfile(),
+    seed: int = 42,
+) -> DatasetSummary:
+    """
+    Fills an empty database with `contact_count` contacts drawn from the profile distributions.
+    Returns the number of rows written to every table.
+    """
+    started = time.perf_counter()
+    rng = random.Random(seed)
+    phones = _Sampler(profile.phones)
+    emails = _Sampler(profile.emails)
+    notes = _Sampler(profile.notes)
+    contact_tags = _Sampler(profile.contact_tags)
+    note_tags = _Sampler(profile.note_tags)
+
+    tag_ids = range(1, profile.tag_count + 1)
+    tag_weights = list(itertools.accumulate(1 / rank ** profile.tag_skew for rank in tag_ids))
+    sentences = _sentences(rng)
+    names: Counter[tuple[str, str]] = Counter()
+    summary = DatasetSummary(seed)
+    statements = {model: _insert_statement(model) for model in [Tag, Contact, Phone, Email, Note, ContactNote, ContactTag, NoteTag]}
+
+    ensure_schema(engine)
+    with engine.begin() as connection:
+        if connection.execute(select(func.count()).select_from(Contact)).scalar_one():
+            raise ValueError("Dataset can only be generated into an empty database")
+        # Notes are indexed once after the load instead of by a trigger per row
+        for trigger in ["notes_fts_after_insert", "notes_fts_after_delete", "notes_fts_after_update"]:
+            _ = connection.execute(text(f"DROP TRIGGER IF EXISTS {trigger}"))
+        _ = connection.execute(text("DROP TABLE IF EXISTS notes_fts"))
+        # Secondary indexes are built from the sorted rows after the load, faster than row by row
+        for table in Base.metadata.sorted_tables:
+            for index in table.indexes:
+                _ = connection.execute(text(f"DROP INDEX IF EXISTS {index.name}"))
+
+        tags = [(tag_id, tag_label(tag_id)) for tag_id in tag_ids]
+        _ = connection.exec_driver_sql(statements[Tag], tags)
+        summary.rows["tags"] = len(tags)
+
+        phone_id = email_id = note_id = 0
+        for chunk_start in range(1, contact_count + 1, CHUNK_SIZE):
+            rows: dict[type, list[tuple[object, ...]]] = {
+                model: [] for model in [Contact, Phone, Email, Note, ContactNote, ContactTag, NoteTag]
+            }
+            for contact_id in range(chunk_start, min(chunk_start + CHUNK_SIZE, contact_count + 1)):
+                first_name, last_name = rng.choice(first_names), rng.choice(last_names)
+                names[first_name, last_name] += 1
+                birthday = _birthday(rng, profile)
+                rows[Contact].append((
+                    contact_id,
+                    contact_name(first_name, last_name, names[first_name, last_name]),
+                    birthday.isoformat() if birthday else None,
+                ))
+                for _ in range(phones.sample(rng)):
+                    phone_id += 1
+                    prefix = phone_prefixes[phone_id % len(phone_prefixes)]
+                    rows[Phone].append((phone_id, contact_id, f"{prefix}{phone_id // len(phone_prefixes):07d}"))
+                for _ in range(emails.sample(rng)):
+                    email_id += 1
+                    address = f"{first_name}.{last_name}.{email_id}@{rng.choice(email_domains)}".lower()
+                    rows[Email].append((email_id, contact_id, address))
+                for tag_id in _distinct_tags(rng, tag_ids, tag_weights, contact_tags.sample(rng)):
+                    rows[ContactTag].append((contact_id, tag_id))
+                for _ in range(notes.sample(rng)):
+                    note_id += 1
+                    length = min(profile.note_sentences_max, max(1, round(rng.lognormvariate(0, profile.note_sentences_sigma) * profile.note_sentences_median)))
+                    rows[Note].append((note_id, " ".join(rng.choices(sentences, k=length))))
+                    rows[ContactNote].append((contact_id, note_id))
+                    for tag_id in _distinct_tags(rng, tag_ids, tag_weights, note_tags.sample(rng)):
+                        rows[NoteTag].append((note_id, tag_id))
+
+            for model, model_rows in rows.items():
+                if model_rows:
+                    _ = connection.exec_driver_sql(statements[model], model_rows)
+                table_name = str(model.__tablename__)
+                summary.rows[table_name] = summary.rows.get(table_name, 0) + len(model_rows)
+
+    _ = ensure_indexes(engine)
+    ensure_note_search(engine)
+    summary.seconds = time.perf_counter() - started
+    return summary
+
+
+def parse_size(size: str) -> int:
+    return sizes[size] if size in sizes else int(size.replace("_", ""))
+
+
+def main(arguments: list[str]) -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.dataset")
+    _ = parser.add_argument("size", nargs="?", default="100k", help="contacts: 1k, 100k, 1M or a number")
+    _ = parser.add_argument("--output", type=Path, default=Path("contacts.db"), help="database file to create")
+    _ = parser.add_argument("--seed", type=int, default=42)
+    _ = parser.add_argument("--tags", type=int, default=DatasetProfile.tag_count, help="distinct tags")
+    _ = parser.add_argument("--force", action="store_true", help="replace an existing database file")
+    options = parser.parse_args(arguments)
+
+    if options.output.exists():
+        if not options.force:
+            print(f"{options.output} already exists, use --force to replace it")
+            return 1
+        options.output.unlink()
+        for suffix in ["-wal", "-shm"]:
+            options.output.with_name(options.output.name + suffix).unlink(missing_ok=True)
+
+    engine = create_engine(f"sqlite:///{options.output.resolve()}")
+    apply_profile(engine, get_profile("fast"))
+    summary = generate_dataset(engine, parse_size(options.size), DatasetProfile(tag_count=options.tags), options.seed)
+    engine.dispose()
+
+    for table_name, count in summary.rows.items():
+        print(f"{table_name:<15} {count:>10,}")
+    print(f"{summary.total():,} rows in {summary.seconds:.1f} s, saved to {options.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
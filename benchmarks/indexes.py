@@ -0,0 +1,100 @@
+"""
+Before/after timings of the query handlers for the schema indexes.
+
+Seeds a temporary database, drops the indexes to mimic a database created
+by an older version, times the lookups, then applies the indexes with
+`ensure_indexes` and times the same lookups again.
+
+Usage:
+    python -m benchmarks.indexes [contact_count]
+"""
+
+import sys
+import tempfile
+import time
+from collections.abc import Callable
+from pathlib import Path
+from sqlalchemy import create_engine, inspect, text
+from data.contact_commands import ContactCommands, CreateContact
+from data.contact_queries import ContactQueries
+from data.email_queries import EmailQueries
+from data.exceptions import ContactAlreadyExists
+from data.models import Base
+from data.note_queries import NoteQueries
+from data.phone_queries import PhoneQueries
+from data.schema import ensure_indexes
+from benchmarks.seed import contact_name, seed_contacts, tag_label
+
+REPEAT = 20
+TIME_BUDGET = 2.0
+
+
+def measure(action: Callable[[], object]) -> float:
+    """
+    Returns average duration of the action in milliseconds.
+    Slow actions are repeated fewer times to stay within the time budget.
+    """
+    runs = 0
+    started = time.perf_counter()
+    while runs < REPEAT and (runs == 0 or time.perf_counter() - started < TIME_BUDGET):
+        _ = action()
+        runs += 1
+    return (time.perf_counter() - started) / runs * 1000
+
+
+def run(contact_count: int) -> None:
+    with tempfile.TemporaryDirectory() as directory:
+        engine = create_engine(f"sqlite:///{Path(directory) / "contacts.db"}")
+        Base.metadata.create_all(engine)
+        seed_contacts(engine, contact_count)
+
+        with engine.begin() as connection:
+            for table in Base.metadata.sorted_tables:
+                for index in inspect(connection).get_indexes(table.name):
+                    _ = connection.execute(text(f"DROP INDEX {index["name"]}"))
+
+        contacts = ContactQueries(engine)
+        phones = PhoneQueries(engine)
+        emails = EmailQueries(engine)
+        notes = NoteQueries(engine)
+        contact_commands = ContactCommands(engine)
+
+        name = contact_name(contact_count // 2)
+        contact_id = contact_count // 2
+
+        def add_duplicate_contact():
+            try:
+                _ = contact_commands.add_contact(
+                    CreateContact(name=name, phone_number="9999999999", date_of_birth=None)
+                )
+            except ContactAlreadyExists:
+                pass
+
+        handlers: dict[str, Callable[[], object]] = {
+            "ContactQueries.get_contact_by_name": lambda: contacts.get_contact_by_name(name),
+            "ContactQueries.get_contact_by_id": lambda: contacts.get_contact_by_id(contact_id),
+            "ContactQueries.get_contacts_by_tag": lambda: contacts.get_contacts_by_tag(tag_label(7)),
+            "ContactCommands.add_contact (duplicate)": add_duplicate_contact,
+            "PhoneQueries.get_contact_phones": lambda: phones.get_contact_phones(contact_id),
+            "PhoneQueries.get_contact_phones_by_name": lambda: phones.get_contact_phones_by_name(name),
+            "EmailQueries.get_contact_emails": lambda: emails.get_contact_emails(contact_id),
+            "EmailQueries.get_contact_emails_by_name": lambda: emails.get_contact_emails_by_name(name),
+            "NoteQueries.get_notes_for_contact": lambda: notes.get_notes_for_contact(contact_id),
+            "NoteQueries.get_notes_for_contact_by_name": lambda: notes.get_notes_for_contact_by_name(name),
+            "NoteQueries.get_notes_by_tag": lambda: notes.get_notes_by_tag(tag_label(7)),
+        }
+
+        before = {label: measure(action) for label, action in handlers.items()}
+        _ = ensure_indexes(engine)
+        after = {label: measure(action) for label, action in handlers.items()}
+
+        print(f"{contact_count} contacts, average of up to {REPEAT} runs")
+        print(f"{"handler":<45} {"before, ms":>12} {"after, ms":>12}")
+        for label in handlers:
+            print(f"{label:<45} {before[label]:>12.2f} {after[label]:>12.2f}")
+
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    run(int(sys.argv[1]) if len(sys.argv) > 1 else 100_000)
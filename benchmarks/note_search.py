@@ -0,0 +1,71 @@
+"""
+Latency of note search on a large notes table.
+
+Compares the full-text search handlers with the previous
+`LIKE '%fragment%'` scan.
+
+Usage:
+    python -m benchmarks.note_search [note_count]
+"""
+
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+from sqlalchemy import create_engine, insert, select
+from sqlalchemy.orm import Session
+from data.models import Base, Note
+from data.note_queries import NoteQueries
+from benchmarks.indexes import measure
+
+WORDS = [
+    "call", "meeting", "buy", "groceries", "project", "deadline", "birthday", "gift", "doctor",
+    "appointment", "invoice", "payment", "trip", "flight", "hotel", "review", "report", "email",
+    "plumber", "garden", "car", "service", "school", "parents", "dinner", "party", "book", "gym",
+]
+
+
+def run(note_count: int) -> None:
+    rng = random.Random(42)
+    with tempfile.TemporaryDirectory() as directory:
+        engine = create_engine(f"sqlite:///{Path(directory) / "contacts.db"}")
+        Base.metadata.create_all(engine)
+
+        started = time.perf_counter()
+        with engine.begin() as connection:
+            batch: list[dict[str, object]] = []
+            for note_id in range(1, note_count + 1):
+                words = rng.choices(WORDS, k=rng.randint(5, 40))
+                words.insert(rng.randrange(len(words)), f"ref{note_id}")
+                batch.append({"note_id": note_id, "text": " ".join(words)})
+                if len(batch) == 10_000:
+                    _ = connection.execute(insert(Note), batch)
+                    batch = []
+            if batch:
+                _ = connection.execute(insert(Note), batch)
+        print(f"{note_count} notes seeded and indexed in {time.perf_counter() - started:.1f} s")
+
+        queries = NoteQueries(engine)
+        reference = f"ref{note_count // 2}"
+
+        def like_scan():
+            with Session(engine) as session:
+                return session.scalar(select(Note).where(Note.text.like(f"%{reference}%")))
+
+        timings = {
+            "LIKE '%fragment%' (previous)": measure(like_scan),
+            "search_notes (rare word)": measure(lambda: queries.search_notes(reference)),
+            "search_notes (prefix, rare)": measure(lambda: queries.search_notes(reference[:-1])),
+            "search_notes (common words)": measure(lambda: queries.search_notes("groceries deadline")),
+            "find_note_by_text_fragment": measure(lambda: queries.find_note_by_text_fragment(reference)),
+        }
+
+        for label, duration in timings.items():
+            print(f"{label:<32} {duration:>10.3f} ms")
+
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    run(int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000)
@@ -0,0 +1,71 @@
+"""
+Fast database seeding for benchmarks.
+
+Rows are written with Core executemany inserts straight into the tables
+from data/models.py, bypassing the per-row command handlers.
+"""
+
+import random
+from datetime import date, timedelta
+from sqlalchemy import Engine, insert
+from data.models import Contact, ContactNote, ContactTag, Email, Note, NoteTag, Phone, Tag
+
+TAG_COUNT = 50
+
+
+def contact_name(contact_id: int) -> str:
+    return f"Contact {contact_id:07d}"
+
+
+def tag_label(tag_id: int) -> str:
+    return f"tag-{tag_id:03d}"
+
+
+def seed_contacts(engine: Engine, contact_count: int, seed: int = 42, tag_count: int = TAG_COUNT) -> None:
+    """
+    Fills an empty database with `contact_count` contacts.
+    Every contact gets 1-2 phones, 0-1 e-mails, 0-3 of `tag_count` tags and one note.
+    """
+    rng = random.Random(seed)
+    first_birthday = date(1950, 1, 1)
+
+    tags = [{"tag_id": i, "label": tag_label(i)} for i in range(1, tag_count + 1)]
+    contacts: list[dict[str, object]] = []
+    phones: list[dict[str, object]] = []
+    emails: list[dict[str, object]] = []
+    notes: list[dict[str, object]] = []
+    contact_notes: list[dict[str, object]] = []
+    contact_tags: list[dict[str, object]] = []
+    note_tags: list[dict[str, object]] = []
+
+    for contact_id in range(1, contact_count + 1):
+        has_birthday = rng.random() < 0.7
+        contacts.append({
+            "contact_id": contact_id,
+            "name": contact_name(contact_id),
+            "date_of_birth": first_birthday + timedelta(days=rng.randrange(20000)) if has_birthday else None,
+        })
+        for _ in range(rng.randint(1, 2)):
+            phones.append({"contact_id": contact_id, "phone_number": f"{len(phones):010d}"})
+        if rng.random() < 0.5:
+            emails.append({"contact_id": contact_id, "email_address": f"user{contact_id}@example.com"})
+        for tag_id in rng.sample(range(1, tag_count + 1), min(tag_count, rng.randint(0, 3))):
+            contact_tags.append({"contact_id": contact_id, "tag_id": tag_id})
+
+        notes.append({"note_id": contact_id, "text": f"Note {contact_id} about contact {contact_id}"})
+        contact_notes.append({"contact_id": contact_id, "note_id": contact_id})
+        note_tags.append({"note_id": contact_id, "tag_id": rng.randint(1, tag_count)})
+
+    with engine.begin() as connection:
+        for model, rows in [
+            (Tag, tags),
+            (Contact, contacts),
+            (Phone, phones),
+            (Email, emails),
+            (Note, notes),
+            (ContactNote, contact_notes),
+            (ContactTag, contact_tags),
+            (NoteTag, note_tags),
+        ]:
+            if rows:
+                _ = connection.execute(insert(model), rows)
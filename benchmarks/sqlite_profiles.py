@@ -0,0 +1,54 @@
+"""
+Write throughput of the SQLite connection profiles.
+
+For the SQLite defaults (rollback journal, no pragmas) and every profile
+from data/sqlite_profile.py, creates contacts one commit at a time through
+the command handlers, then adds notes in a single bulk transaction.
+
+Usage:
+    python -m benchmarks.sqlite_profiles [commit_count]
+"""
+
+import sys
+import tempfile
+import time
+from pathlib import Path
+from sqlalchemy import create_engine, insert
+from data.contact_commands import ContactCommands, CreateContact
+from data.models import Note
+from data.schema import ensure_schema
+from data.sqlite_profile import apply_profile, profiles
+
+BULK_ROWS = 100_000
+
+
+def run(commit_count: int) -> None:
+    print(f"{"profile":<10} {"commits/s":>12} {"bulk rows/s":>14}")
+    for name in [None, *profiles]:
+        with tempfile.TemporaryDirectory() as directory:
+            engine = create_engine(f"sqlite:///{Path(directory) / "contacts.db"}")
+            if name is not None:
+                apply_profile(engine, profiles[name])
+            ensure_schema(engine)
+            commands = ContactCommands(engine)
+
+            started = time.perf_counter()
+            for index in range(commit_count):
+                _ = commands.add_contact(CreateContact(
+                    name=f"Contact {index:07d}",
+                    phone_number=f"{index:010d}",
+                    date_of_birth=None
+                ))
+            commits_per_second = commit_count / (time.perf_counter() - started)
+
+            started = time.perf_counter()
+            with engine.begin() as connection:
+                _ = connection.execute(insert(Note), [{"text": f"Bulk note {index}"} for index in range(BULK_ROWS)])
+            rows_per_second = BULK_ROWS / (time.perf_counter() - started)
+
+            print(f"{name or "default":<10} {commits_per_second:>12.0f} {rows_per_second:>14.0f}")
+            engine.dispose()
+
+
+if __name__ == "__main__":
+    run(int(sys.argv[1]) if len(sys.argv) > 1 else 2_000)
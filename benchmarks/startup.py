@@ -0,0 +1,153 @@
+"""
+Startup time of the CLI and the API.
+
+For every mode, imports its entry module in a fresh interpreter with
+`python -X importtime` and reads the import time of the module and the
+packages it pulled in. The CLI must show its prompt without importing the
+database layer, the API without the Anthropic SDK; a mode importing one
+of its deferred packages, or a CLI import slower than the budget, fails
+the run with exit code 1, so the benchmark can gate regressions in CI.
+On POSIX the time until `magic8` prints its prompt is measured as well.
+
+Usage:
+    python -m benchmarks.startup [--budget-ms 150] [--repeat 5]
+"""
+
+import argparse
+import os
+import re
+import subprocess
+import sys
+import tempfile
+import time
+from dataclasses import dataclass
+from pathlib import Path
+
+BUDGET_MS = 150
+REPEAT = 5
+ROOT = Path(__file__).resolve().parent.parent
+
+import_line = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \| (\s*)(\S+)$")
+
+
+@dataclass(frozen=True)
+class Mode:
+    name: str
+    module: str
+    # Packages imported on first use, never while starting
+    deferred: tuple[str, ...]
+    budget: bool
+
+
+modes = [
+    Mode("cli", "cli.main_loop", ("sqlalchemy", "pydantic", "anthropic", "fastmcp"), budget=True),
+    Mode("api", "api.endpoints", ("anthropic",), budget=False),
+    # magic8 --connect: commands and completion served by a running API server
+    Mode("client", "cli.remote_backend", ("sqlalchemy", "pydantic", "anthropic", "fastmcp"), budget=False),
+    # magic8 --connect <command> and --connect --batch
+    Mode("one-shot", "cli.batch", ("sqlalchemy", "anthropic", "fastmcp"), budget=False),
+]
+
+
+@dataclass
+class ImportProfile:
+    # Cumulative import time in microseconds by module
+    modules: dict[str, int]
+    total_us: int
+
+    def packages(self) -> dict[str, int]:
+        """
+        Cumulative import time of the top-level packages
+        """
+        packages: dict[str, int] = {}
+        for name, microseconds in self.modules.items():
+            package = name.partition(".")[0]
+            packages[package] = max(packages.get(package, 0), microseconds)
+        return packages
+
+
+def profile_imports(module: str, env: dict[str, str] | None = None) -> ImportProfile:
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=ROOT,
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    modules: dict[str, int] = {}
+    for line in result.stderr.splitlines():
+        match = import_line.match(line)
+        if match:
+            modules[match[4]] = int(match[2])
+    return ImportProfile(modules, modules.get(module, 0))
+
+
+def time_to_prompt(env: dict[str, str], prompt: bytes = b"Enter a command") -> float:
+    """
+    Seconds from starting the CLI in a pseudo-terminal until it prints the prompt
+    """
+    import pty
+
+    started = time.perf_counter()
+    pid, fd = pty.fork()
+    if pid == 0:
+        os.chdir(ROOT)
+        os.execve(sys.executable, [sys.executable, "main.py"], env)
+
+    output = b""
+    try:
+        while prompt not in output:
+            chunk = os.read(fd, 1024)
+            if not chunk:
+                raise RuntimeError(f"CLI exited before the prompt: {output[-200:]!r}")
+            output += chunk
+        elapsed = time.perf_counter() - started
+        _ = os.write(fd, b"exit\r")
+        # Reads until the CLI exits and closes the terminal
+        while True:
+            try:
+                if not os.read(fd, 1024):
+                    break
+            except OSError:
+                break
+    finally:
+        os.close(fd)
+        _ = os.waitpid(pid, 0)
+    return elapsed
+
+
+def run(budget_ms: float, repeat: int) -> int:
+    failures: list[str] = []
+    with tempfile.TemporaryDirectory() as directory:
+        # A database and a command history of its own, the user's files are not touched
+        env = {**os.environ, "Magic_DB_PATH": directory, "HOME": directory}
+
+        for mode in modes:
+            profiles = [profile_imports(mode.module, env) for _ in range(repeat)]
+            best = min(profiles, key=lambda profile: profile.total_us)
+            print(f"{mode.name}: import {mode.module} {best.total_us / 1000:.1f} ms (best of {repeat})")
+            for package, microseconds in sorted(best.packages().items(), key=lambda item: -item[1])[:8]:
+                print(f"    {package:<24} {microseconds / 1000:>8.1f} ms")
+
+            imported = sorted(package for package in mode.deferred if package in best.packages())
+            if imported:
+                failures.append(f"{mode.name} imports {", ".join(imported)} while starting")
+            if mode.budget and best.total_us / 1000 > budget_ms:
+                failures.append(f"{mode.name} import takes {best.total_us / 1000:.1f} ms, budget is {budget_ms:.0f} ms")
+
+        if os.name == "posix":
+            seconds = min(time_to_prompt(env) for _ in range(repeat))
+            print(f"cli: prompt after {seconds * 1000:.1f} ms, interpreter startup included (best of {repeat})")
+
+    for failure in failures:
+        print(f"FAILED: {failure}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    _ = parser.add_argument("--budget-ms", type=float, default=BUDGET_MS, help="import time budget of the CLI")
+    _ = parser.add_argument("--repeat", type=int, default=REPEAT, help="runs per measurement, the best one counts")
+    args = parser.parse_args()
+    sys.exit(run(args.budget_ms, args.repeat))
@@ -0,0 +1,503 @@
+"""
+Scale benchmark suite for the query and command handlers.
+
+Seeds a temporary database of the chosen size, then times every public
+method of the handlers in data/*_queries.py and data/*_commands.py:
+queries first, on the seeded data, then commands, each run on rows
+prepared for it outside the timing. Results are printed and can be saved
+as JSON; two saved runs are compared method by method on their fastest
+run, and the comparison fails when a method got slower than the threshold.
+
+Usage:
+    python -m benchmarks.suite run [--size 1k|100k|1M|<count>] [--tags N] [--output results.json] [--filter text]
+    python -m benchmarks.suite compare base.json new.json [--threshold 1.5]
+"""
+
+import argparse
+import importlib
+import inspect
+import json
+import platform
+import random
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+from collections.abc import Callable
+from dataclasses import asdict, dataclass
+from datetime import datetime
+from itertools import count, islice
+from pathlib import Path
+from typing import Any
+from sqlalchemy import Engine, create_engine
+from data.abstractions import DatabaseCommandHandler, DatabaseQueryHandler
+from data.batch_commands import BatchCommands, BatchItem
+from data.contact_commands import ContactCommands, CreateContact, UpdateContact
+from data.contact_formats import ContactRecord
+from data.contact_queries import ContactQueries
+from data.email_commands import CreateEmail, EmailCommands, UpdateEmail
+from data.email_queries import EmailQueries
+from data.export_queries import ExportQueries
+from data.import_commands import ImportCommands
+from data.note_commands import CreateNote, NoteCommands, UpdateNote
+from data.note_queries import NoteQueries
+from data.phone_commands import CreatePhone, PhoneCommands, UpdatePhone
+from data.phone_queries import PhoneQueries
+from data.schema import ensure_schema
+from data.sqlite_profile import apply_profile, get_profile
+from data.tag_commands import AddTag, RemoveTag
+from data.tag_queries import TagQueries
+from benchmarks.seed import TAG_COUNT, contact_name, seed_contacts, tag_label
+
+REPEAT = 20
+TIME_BUDGET = 2.0
+PAGE_SIZE = 50
+# Records read from the export iterator, the whole export is timed by benchmarks/export.py
+EXPORT_RECORDS = 1000
+# Contacts written by one batch or import run
+WRITE_BATCH_SIZE = 100
+# Consecutive runs of the same code differ by up to 1.4x on a busy machine
+DEFAULT_THRESHOLD = 1.5
+# Differences below this are noise whatever the ratio
+MIN_DIFFERENCE_MS = 0.1
+
+sizes = {"1k": 1_000, "100k": 100_000, "1M": 1_000_000}
+
+
+@dataclass
+class Case:
+    # Handler method as "Class.method", with an optional variant in parentheses
+    name: str
+    action: Callable[[Any], object]
+    # Prepares the argument of the action outside the timing, gets the run number
+    setup: Callable[[int], Any] = lambda _: None
+
+
+@dataclass
+class Timing:
+    runs: int
+    mean_ms: float
+    median_ms: float
+    min_ms: float
+    max_ms: float
+
+
+def handler_methods() -> list[str]:
+    """
+    Public methods of every query and command handler, as "Class.method"
+    """
+    data_directory = Path(__file__).parent.parent / "data"
+    methods: list[str] = []
+    for path in sorted(data_directory.glob("*_queries.py")) + sorted(data_directory.glob("*_commands.py")):
+        module = importlib.import_module(f"data.{path.stem}")
+        for class_name, handler in inspect.getmembers(module, inspect.isclass):
+            if handler.__module__ != module.__name__:
+                continue
+            if not issubclass(handler, (DatabaseQueryHandler, DatabaseCommandHandler)):
+                continue
+            methods.extend(
+                f"{class_name}.{method}"
+                for method, _ in inspect.getmembers(handler, inspect.isfunction)
+                if not method.startswith("_")
+            )
+    return methods
+
+
+def measure(case: Case) -> Timing:
+    """
+    Times the action up to REPEAT times after a warm-up run,
+    slow actions are repeated fewer times to stay within the time budget
+    """
+    _ = case.action(case.setup(-1))
+    durations: list[float] = []
+    started = time.perf_counter()
+    while len(durations) < REPEAT and (not durations or time.perf_counter() - started < TIME_BUDGET):
+        argument = case.setup(len(durations))
+        action_started = time.perf_counter()
+        _ = case.action(argument)
+        durations.append((time.perf_counter() - action_started) * 1000)
+    return Timing(
+        runs=len(durations),
+        mean_ms=statistics.fmean(durations),
+        median_ms=statistics.median(durations),
+        min_ms=min(durations),
+        max_ms=max(durations),
+    )
+
+
+def build_cases(engine: Engine, contact_count: int, tag_count: int, seed: int = 7) -> list[Case]:
+    rng = random.Random(seed)
+    unique = count(1)
+
+    contact_queries = ContactQueries(engine)
+    note_queries = NoteQueries(engine)
+    phone_queries = PhoneQueries(engine)
+    email_queries = EmailQueries(engine)
+    contact_commands = ContactCommands(engine)
+    phone_commands = PhoneCommands(engine)
+    email_commands = EmailCommands(engine)
+    note_commands = NoteCommands(engine)
+
+    def contact_id(_: int = 0) -> int:
+        return rng.randint(1, contact_count)
+
+    def seeded_name(_: int = 0) -> str:
+        return contact_name(contact_id())
+
+    def tag(_: int = 0) -> str:
+        return tag_label(rng.randint(1, tag_count))
+
+    def phone_number() -> str:
+        return f"9{next(unique):09d}"
+
+    def email_address() -> str:
+        return f"suite{next(unique)}@example.com"
+
+    def new_contact(_: int = 0):
+        number = next(unique)
+        return contact_commands.add_contact(
+            CreateContact(name=f"Suite contact {number}", phone_number=f"8{number:09d}", date_of_birth=None)
+        )
+
+    def tagged_contact(_: int):
+        contact = new_contact()
+        label = tag()
+        contact_commands.add_tag_to_contact_by_name(contact.name, AddTag(label=label))
+        return contact, label
+
+    def new_phone(_: int):
+        return phone_commands.add_phone_for_contact(contact_id(), CreatePhone(phone_number=phone_number()))
+
+    def new_email(_: int):
+        return email_commands.add_email_for_contact(contact_id(), CreateEmail(email_address=email_address()))
+
+    def new_note(_: int):
+        # Marker words are unique, so fragment lookups find exactly this note
+        return note_commands.add_note(CreateNote(text=f"Suite note marker{next(unique)}x"))
+
+    def tagged_note(_: int):
+        note = new_note(0)
+        label = tag()
+        tagged = note_commands.add_tag_to_note(note.note_id, AddTag(label=label))
+        return tagged, label
+
+    def fragment(note) -> str:
+        return note.text.split()[-1]
+
+    def batch_items(_: int) -> list[BatchItem]:
+        items: list[BatchItem] = []
+        for _ in range(WRITE_BATCH_SIZE):
+            name = f"Suite batch {next(unique)}"
+            items += [
+                BatchItem(CreateContact(name=name, phone_number=phone_number(), date_of_birth=None)),
+                BatchItem(CreateEmail(email_address=email_address()), contact_name=name),
+                BatchItem(AddTag(label=tag()), contact_name=name),
+                BatchItem(CreateNote(text=f"Batch note for {name}"), contact_name=name),
+            ]
+        return items
+
+    def import_records(_: int) -> list[ContactRecord]:
+        return [
+            ContactRecord(
+                record=record,
+                name=f"Suite import {next(unique)}",
+                phone_numbers=[phone_number()],
+                email_addresses=[email_address()],
+                tags=[tag()],
+                notes=["Imported by the benchmark suite"],
+            )
+            for record in range(1, WRITE_BATCH_SIZE + 1)
+        ]
+
+    queries = [
+        Case("ContactQueries.get_contacts", lambda after: contact_queries.get_contacts(PAGE_SIZE, after), contact_id),
+        Case("ContactQueries.get_contacts_by_tag", lambda label: contact_queries.get_contacts_by_tag(label, PAGE_SIZE), tag),
+        Case("ContactQueries.get_contact_by_id", contact_queries.get_contact_by_id, contact_id),
+        Case("ContactQueries.get_contact_by_name", contact_queries.get_contact_by_name, seeded_name),
+        Case("ContactQueries.get_contact_names", lambda _: contact_queries.get_contact_names()),
+        Case("ContactQueries.get_contact_ids_and_names", lambda _: contact_queries.get_contact_ids_and_names()),
+        Case(
+            "ContactQueries.get_contact_summaries",
+            lambda after: contact_queries.get_contact_summaries(None, PAGE_SIZE, after, with_phones=True, with_tags=True),
+            contact_id
+        ),
+        Case("ContactQueries.get_contacts_with_birthdays_in_days", lambda _: contact_queries.get_contacts_with_birthdays_in_days(7)),
+        Case("NoteQueries.get_notes", lambda after: note_queries.get_notes(PAGE_SIZE, after), contact_id),
+        Case("NoteQueries.get_note_texts", lambda _: note_queries.get_note_texts()),
+        Case("NoteQueries.get_note_ids_and_texts", lambda _: note_queries.get_note_ids_and_texts()),
+        Case("NoteQueries.get_notes_for_contact", note_queries.get_notes_for_contact, contact_id),
+        Case("NoteQueries.get_notes_for_contact_by_name", note_queries.get_notes_for_contact_by_name, seeded_name),
+        Case("NoteQueries.get_notes_by_tag", lambda label: note_queries.get_notes_by_tag(label, PAGE_SIZE), tag),
+        Case(
+            "NoteQueries.get_notes_for_contact_by_tag",
+            lambda arguments: note_queries.get_notes_for_contact_by_tag(*arguments),
+            lambda _: (contact_id(), tag())
+        ),
+        Case(
+            "NoteQueries.get_notes_for_contact_by_name_and_tag",
+            lambda arguments: note_queries.get_notes_for_contact_by_name_and_tag(*arguments),
+            lambda _: (seeded_name(), tag())
+        ),
+        Case(
+            "NoteQueries.find_note_by_text_fragment",
+            note_queries.find_note_by_text_fragment,
+            lambda _: f"about contact {contact_id()}"
+        ),
+        Case(
+            "NoteQueries.find_note_by_text_fragment (mid-word)",
+            note_queries.find_note_by_text_fragment,
+            lambda _: f"bout contact {contact_id()}"
+        ),
+        Case("NoteQueries.search_notes", note_queries.search_notes, lambda _: f"contact {contact_id()}"),
+        Case("PhoneQueries.get_contact_phones", phone_queries.get_contact_phones, contact_id),
+        Case("PhoneQueries.get_contact_phones_by_name", phone_queries.get_contact_phones_by_name, seeded_name),
+        Case("PhoneQueries.get_phone_numbers_by_contact", lambda _: phone_queries.get_phone_numbers_by_contact()),
+        Case("EmailQueries.get_contact_emails", email_queries.get_contact_emails, contact_id),
+        Case("EmailQueries.get_contact_emails_by_name", email_queries.get_contact_emails_by_name, seeded_name),
+        Case("EmailQueries.get_email_addresses_by_contact", lambda _: email_queries.get_email_addresses_by_contact()),
+        Case("TagQueries.get_tag_labels", lambda _: TagQueries(engine).get_tag_labels()),
+        Case("TagQueries.get_assigned_tag_ids_and_labels", lambda _: TagQueries(engine).get_assigned_tag_ids_and_labels()),
+        Case(
+            f"ExportQueries.iter_contact_records (first {EXPORT_RECORDS})",
+            lambda _: list(islice(ExportQueries(engine).iter_contact_records(), EXPORT_RECORDS))
+        ),
+        Case("ExportQueries.get_max_notes_per_contact", lambda _: ExportQueries(engine).get_max_notes_per_contact()),
+    ]
+
+    commands = [
+        Case("ContactCommands.add_contact", contact_commands.add_contact, lambda _: CreateContact(
+            name=f"Suite contact {next(unique)}", phone_number=phone_number(), date_of_birth=None
+        )),
+        Case(
+            "ContactCommands.update_contact",
+            lambda contact: contact_commands.update_contact(contact.contact_id, UpdateContact(name=f"{contact.name} renamed", date_of_birth=None)),
+            new_contact
+        ),
+        Case(
+            "ContactCommands.update_contact_by_name",
+            lambda contact: contact_commands.update_contact_by_name(contact.name, UpdateContact(name=f"{contact.name} renamed", date_of_birth=None)),
+            new_contact
+        ),
+        Case("ContactCommands.delete_contact", lambda contact: contact_commands.delete_contact(contact.contact_id), new_contact),
+        Case("ContactCommands.delete_contact_by_name", lambda contact: contact_commands.delete_contact_by_name(contact.name), new_contact),
+        Case(
+            "ContactCommands.add_tag_to_contact",
+            lambda contact: contact_commands.add_tag_to_contact(contact.contact_id, AddTag(label=tag())),
+            new_contact
+        ),
+        Case(
+            "ContactCommands.add_tag_to_contact_by_name",
+            lambda contact: contact_commands.add_tag_to_contact_by_name(contact.name, AddTag(label=tag())),
+            new_contact
+        ),
+        Case(
+            "ContactCommands.remove_tag_from_contact",
+            lambda tagged: contact_commands.remove_tag_from_contact(tagged[0].contact_id, RemoveTag(label=tagged[1])),
+            tagged_contact
+        ),
+        Case(
+            "ContactCommands.remove_tag_from_contact_by_name",
+            lambda tagged: contact_commands.remove_tag_from_contact_by_name(tagged[0].name, RemoveTag(label=tagged[1])),
+            tagged_contact
+        ),
+        Case(
+            "PhoneCommands.add_phone_for_contact",
+            lambda contact: phone_commands.add_phone_for_contact(contact, CreatePhone(phone_number=phone_number())),
+            contact_id
+        ),
+        Case(
+            "PhoneCommands.add_phone_for_contact_by_name",
+            lambda name: phone_commands.add_phone_for_contact_by_name(name, CreatePhone(phone_number=phone_number())),
+            seeded_name
+        ),
+        Case(
+            "PhoneCommands.update_phone",
+            lambda phone: phone_commands.update_phone(phone.phone_id, UpdatePhone(phone_number=phone_number())),
+            new_phone
+        ),
+        Case(
+            "PhoneCommands.update_phone_by_number",
+            lambda phone: phone_commands.update_phone_by_number(
+                contact_name(phone.contact_id), phone.phone_number, UpdatePhone(phone_number=phone_number())
+            ),
+            new_phone
+        ),
+        Case("PhoneCommands.delete_phone", lambda phone: phone_commands.delete_phone(phone.phone_id), new_phone),
+        Case(
+            "PhoneCommands.delete_phone_by_number",
+            lambda phone: phone_commands.delete_phone_by_number(contact_name(phone.contact_id), phone.phone_number),
+            new_phone
+        ),
+        Case(
+            "EmailCommands.add_email_for_contact",
+            lambda contact: email_commands.add_email_for_contact(contact, CreateEmail(email_address=email_address())),
+            contact_id
+        ),
+        Case(
+            "EmailCommands.add_email_for_contact_by_name",
+            lambda name: email_commands.add_email_for_contact_by_name(name, CreateEmail(email_address=email_address())),
+            seeded_name
+        ),
+        Case(
+            "EmailCommands.update_email",
+            lambda email: email_commands.update_email(email.email_id, UpdateEmail(email_address=email_address())),
+            new_email
+        ),
+        Case(
+            "EmailCommands.update_email_by_address",
+            lambda email: email_commands.update_email_by_address(
+                contact_name(email.contact_id), email.email_address, UpdateEmail(email_address=email_address())
+            ),
+            new_email
+        ),
+        Case("EmailCommands.delete_email", lambda email: email_commands.delete_email(email.email_id), new_email),
+        Case(
+            "EmailCommands.delete_email_by_address",
+            lambda email: email_commands.delete_email_by_address(contact_name(email.contact_id), email.email_address),
+            new_email
+        ),
+        Case(
+            "NoteCommands.add_note_for_contact",
+            lambda contact: note_commands.add_note_for_contact(contact, CreateNote(text="Suite note for a contact")),
+            contact_id
+        ),
+        Case(
+            "NoteCommands.add_note_for_contact_by_name",
+            lambda name: note_commands.add_note_for_contact_by_name(name, CreateNote(text="Suite note for a contact")),
+            seeded_name
+        ),
+        Case("NoteCommands.add_note", lambda _: note_commands.add_note(CreateNote(text="Suite note"))),
+        Case("NoteCommands.update_note", lambda note: note_commands.update_note(note.note_id, UpdateNote(text=f"{note.text} updated")), new_note),
+        Case(
+            "NoteCommands.update_note_by_fragment",
+            lambda note: note_commands.update_note_by_fragment(fragment(note), UpdateNote(text=f"{note.text} updated")),
+            new_note
+        ),
+        Case("NoteCommands.delete_note", lambda note: note_commands.delete_note(note.note_id), new_note),
+        Case("NoteCommands.delete_note_from_fragment", lambda note: note_commands.delete_note_from_fragment(fragment(note)), new_note),
+        Case("NoteCommands.add_tag_to_note", lambda note: note_commands.add_tag_to_note(note.note_id, AddTag(label=tag())), new_note),
+        Case(
+            "NoteCommands.add_tag_to_note_by_fragment",
+            lambda note: note_commands.add_tag_to_note_by_fragment(fragment(note), AddTag(label=tag())),
+            new_note
+        ),
+        Case(
+            "NoteCommands.remove_tag_from_note",
+            lambda tagged: note_commands.remove_tag_from_note(tagged[0].note_id, RemoveTag(label=tagged[1])),
+            tagged_note
+        ),
+        Case(
+            "NoteCommands.remove_tag_from_note_by_fragment",
+            lambda tagged: note_commands.remove_tag_from_note_by_fragment(fragment(tagged[0]), RemoveTag(label=tagged[1])),
+            tagged_note
+        ),
+        Case(f"BatchCommands.execute ({WRITE_BATCH_SIZE} contacts)", BatchCommands(engine).execute, batch_items),
+        Case(f"ImportCommands.import_contacts ({WRITE_BATCH_SIZE} contacts)", ImportCommands(engine).import_contacts, import_records),
+    ]
+
+    return queries + commands
+
+
+def run_suite(contact_count: int, tag_count: int = TAG_COUNT, name_filter: str | None = None) -> dict[str, Any]:
+    with tempfile.TemporaryDirectory() as directory:
+        engine = create_engine(f"sqlite:///{Path(directory) / "contacts.db"}")
+        apply_profile(engine, get_profile(None))
+        ensure_schema(engine)
+        seeding_started = time.perf_counter()
+        seed_contacts(engine, contact_count, tag_count=tag_count)
+        seeding_seconds = time.perf_counter() - seeding_started
+
+        results: dict[str, dict[str, Any]] = {}
+        for case in build_cases(engine, contact_count, tag_count):
+            if name_filter and name_filter.lower() not in case.name.lower():
+                continue
+            timing = measure(case)
+            results[case.name] = asdict(timing)
+            print(f"{case.name:<62} {timing.median_ms:>10.2f} ms  ({timing.runs} runs)", flush=True)
+        engine.dispose()
+
+    covered = {name.split(" ")[0] for name in results}
+    return {
+        "meta": {
+            "created": datetime.now().isoformat(timespec="seconds"),
+            "contacts": contact_count,
+            "tags": tag_count,
+            "seeding_seconds": round(seeding_seconds, 2),
+            "python": platform.python_version(),
+            "sqlite": sqlite3.sqlite_version,
+            "platform": platform.platform(),
+            "not_covered": [] if name_filter else [method for method in handler_methods() if method not in covered],
+        },
+        "results": results,
+    }
+
+
+def compare(base: dict[str, Any], new: dict[str, Any], threshold: float = DEFAULT_THRESHOLD) -> list[str]:
+    """
+    Prints both runs side by side, returns names of methods slower than the threshold
+    """
+    regressions: list[str] = []
+    print(f"base: {base["meta"]["contacts"]} contacts, {base["meta"]["created"]}")
+    print(f"new:  {new["meta"]["contacts"]} contacts, {new["meta"]["created"]}")
+    print(f"{"method (fastest run)":<62} {"base, ms":>10} {"new, ms":>10} {"ratio":>7}")
+    for name, timing in base["results"].items():
+        if name not in new["results"]:
+            print(f"{name:<62} {timing["min_ms"]:>10.2f} {"-":>10}")
+            continue
+        # The fastest run is the least disturbed by other processes
+        before, after = timing["min_ms"], new["results"][name]["min_ms"]
+        ratio = after / before if before > 0 else 1.0
+        verdict = ""
+        if abs(after - before) >= MIN_DIFFERENCE_MS:
+            if ratio >= threshold:
+                verdict = "REGRESSION"
+                regressions.append(name)
+            elif ratio <= 1 / threshold:
+                verdict = "faster"
+        print(f"{name:<62} {before:>10.2f} {after:>10.2f} {ratio:>6.2f}x {verdict}")
+    for name in new["results"].keys() - base["results"].keys():
+        print(f"{name:<62} {"-":>10} {new["results"][name]["min_ms"]:>10.2f}")
+    return regressions
+
+
+def parse_size(size: str) -> int:
+    return sizes[size] if size in sizes else int(size.replace("_", ""))
+
+
+def main(arguments: list[str]) -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.suite")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = commands.add_parser("run", help="seed a database and time every handler method")
+    _ = run_parser.add_argument("--size", default="100k", help="contacts: 1k, 100k, 1M or a number")
+    _ = run_parser.add_argument("--tags", type=int, default=TAG_COUNT, help="distinct tags")
+    _ = run_parser.add_argument("--output", type=Path, help="JSON file for the results")
+    _ = run_parser.add_argument("--filter", help="time only methods whose name contains the text")
+
+    compare_parser = commands.add_parser("compare", help="compare two saved runs")
+    _ = compare_parser.add_argument("base", type=Path)
+    _ = compare_parser.add_argument("new", type=Path)
+    _ = compare_parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD, help="slowdown ratio reported as a regression")
+
+    options = parser.parse_args(arguments)
+    if options.command == "run":
+        report = run_suite(parse_size(options.size), options.tags, options.filter)
+        if report["meta"]["not_covered"]:
+            print(f"Not covered: {", ".join(report["meta"]["not_covered"])}")
+        if options.output:
+            _ = options.output.write_text(json.dumps(report, indent=2), encoding="utf-8")
+            print(f"Results saved to {options.output}")
+        return 0
+
+    base = json.loads(options.base.read_text(encoding="utf-8"))
+    new = json.loads(options.new.read_text(encoding="utf-8"))
+    regressions = compare(base, new, options.threshold)
+    if regressions:
+        print(f"{len(regressions)} regressions over {options.threshold:.2f}x")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
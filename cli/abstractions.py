@@ -3,8 +3,11 @@ Core abstractions for CLI command handling.
 
 This module defines the result types and type aliases used throughout
 the CLI layer for command execution and response handling.
+Handlers of list commands return their output as an iterator of lines,
+which is printed while the following rows are still being read.
 """
 
+from collections.abc import Iterator
 from enum import Enum
 from typing import Callable
 
@@ -18,8 +21,16 @@ class Result(Enum):
     WARNING = 2
     ERROR = 3
 
-CommandResult = tuple[Result, str]
+CommandOutput = str | Iterator[str]
+CommandResult = tuple[Result, CommandOutput]
 CommandHandler = Callable[
     [list[str]],
     CommandResult
 ]
+
+
+def message_text(message: CommandOutput) -> str:
+    """
+    Whole output of a command as one text, lines of streamed output are read to the end
+    """
+    return message if isinstance(message, str) else "\n".join(message)
@@ -0,0 +1,186 @@
+"""
+Client of the CLI endpoints of a running API server.
+
+This module sends CLI commands to an API server started with `magic8 --api`,
+which runs them with its own engine and query cache. Requests carry the
+token the server keeps in a file of the user. Every thread keeps one
+keep-alive HTTP connection to the server, so a command costs one request
+on an open connection. Only the standard library is imported, a client
+process starts without the database layer.
+
+Output of list commands is streamed by the server (see api/cli_endpoints.py)
+and read from the connection while it is printed. The connection is closed
+when a command is sent before the output of the previous one was read.
+
+The server is found at Magic_API_URL, http://127.0.0.1:8000 by default.
+"""
+
+import http.client
+import json
+import os
+import threading
+from collections.abc import Iterator
+from dataclasses import dataclass
+from typing import Any
+from urllib.parse import urlencode, urlsplit
+from cli.abstractions import CommandHandler, CommandResult, Result
+from cli.cli_token import TOKEN_HEADER, read_token
+
+DEFAULT_SERVER_URL = "http://127.0.0.1:8000"
+DEFAULT_TIMEOUT_SECONDS = 30.0
+# Content type of streamed command output, one JSON record per line
+STREAM_MEDIA_TYPE = "application/x-ndjson"
+
+
+class ApiError(Exception):
+    pass
+
+
+@dataclass
+class RemoteSqlStats:
+    """
+    SQL statements the server executed for a command, of streamed output counted once it is read
+    """
+    statements: int
+    milliseconds: float
+
+    def details(self) -> str:
+        return f"{self.statements} SQL statements in {self.milliseconds:.1f} ms on the server"
+
+
+@dataclass
+class RemoteCompletion:
+    text: str
+    start_position: int
+    display: str
+    meta: str
+
+
+class ApiClient:
+    def __init__(self, url: str | None = None, timeout: float = DEFAULT_TIMEOUT_SECONDS, token: str | None = None):
+        self.url = url or os.getenv("Magic_API_URL") or DEFAULT_SERVER_URL
+        parts = urlsplit(self.url)
+        if parts.scheme != "http" or not parts.hostname:
+            raise ValueError(f"Unsupported API server URL '{self.url}'. Expected http://host[:port]")
+        self.host = parts.hostname
+        self.port = parts.port or 80
+        self.prefix = parts.path.rstrip("/")
+        self.timeout = timeout
+        self.token = token
+        self._local = threading.local()
+
+    def commands(self) -> list[str]:
+        commands, _ = self._request("GET", "/cli/commands")
+        return commands
+
+    def execute(self, command: str, args: list[str]) -> tuple[CommandResult, RemoteSqlStats]:
+        """
+        Runs the command on the server, returns its result and the SQL statements it executed
+        """
+        response, data = self._exchange("POST", "/cli/commands", {"command": command, "args": args})
+        stats = RemoteSqlStats(int(response.headers.get("X-SQL-Count", 0)), float(response.headers.get("X-SQL-Time", 0)))
+        if data is None:
+            status = json.loads(response.readline())["status"]
+            return (Result[status], self._streamed_lines(response, stats)), stats
+        result = json.loads(data)
+        return (Result[result["status"]], result["message"]), stats
+
+    def completions(self, text: str, cursor: int) -> tuple[list[RemoteCompletion], str | None]:
+        """
+        Returns completions and the auto-suggestion for the prompt text
+        """
+        query = f"/cli/completions?{urlencode({"text": text, "cursor": cursor})}"
+        result, _ = self._request("GET", query)
+        completions = [
+            RemoteCompletion(completion["text"], completion["startPosition"], completion["display"], completion["meta"])
+            for completion in result["completions"]
+        ]
+        return completions, result["suggestion"]
+
+    def handlers(self) -> dict[str, CommandHandler]:
+        """
+        Handlers running the commands of the server, for the one-shot and batch modes
+        """
+        def handler(command: str) -> CommandHandler:
+            return lambda args: self.execute(command, args)[0]
+        return {command: handler(command) for command in self.commands()}
+
+    def close(self) -> None:
+        connection = getattr(self._local, "connection", None)
+        if connection is not None:
+            connection.close()
+            self._local.connection = None
+
+    def _streamed_lines(self, response: http.client.HTTPResponse, stats: RemoteSqlStats) -> Iterator[str]:
+        try:
+            for record in map(json.loads, response):
+                if "lines" in record:
+                    yield from record["lines"]
+                else:
+                    stats.statements += record["sqlCount"]
+                    stats.milliseconds += record["sqlTime"]
+        except (OSError, http.client.HTTPException) as ex:
+            self.close()
+            raise ApiError(f"API server at {self.url} stopped sending the output: {ex}") from ex
+
+    def _connection(self) -> http.client.HTTPConnection:
+        connection = getattr(self._local, "connection", None)
+        streamed = getattr(self._local, "streamed", None)
+        if connection is not None and streamed is not None and not streamed.isclosed():
+            # Output of the previous command was not read to the end, its rest is not waited for
+            self.close()
+            connection = None
+        if connection is None:
+            connection = http.client.HTTPConnection(self.host, self.port, timeout=self.timeout)
+            self._local.connection = connection
+        return connection
+
+    def _request(self, method: str, path: str, body: Any = None) -> tuple[Any, http.client.HTTPMessage]:
+        response, data = self._exchange(method, path, body)
+        if data is None:
+            raise ApiError(f"API server streamed the answer to {method} {path}")
+        return json.loads(data), response.headers
+
+    def _exchange(self, method: str, path: str, body: Any = None) -> tuple[http.client.HTTPResponse, bytes | None]:
+        """
+        Sends the request, returns the response and its body, None for streamed output left to be read
+        """
+        token = self.token or read_token()
+        if token is None:
+            raise ApiError("No API server token found, start the server with `magic8 --api` first")
+        payload = json.dumps(body).encode() if body is not None else None
+        headers = {TOKEN_HEADER: token}
+        if payload is not None:
+            headers["Content-Type"] = "application/json"
+
+        reused = self._connection().sock is not None
+        try:
+            response, data = self._send(method, path, payload, headers)
+        except (http.client.RemoteDisconnected, BrokenPipeError, ConnectionResetError) as ex:
+            self.close()
+            if not reused:
+                raise ApiError(f"API server at {self.url} closed the connection") from ex
+            # The server closed the idle keep-alive connection, the request is sent again on a new one
+            response, data = self._send(method, path, payload, headers)
+
+        if response.status >= 400:
+            detail = (data if data is not None else response.read()).decode(errors="replace")
+            raise ApiError(f"API server answered {response.status} {response.reason}: {detail[:200]}")
+        return response, data
+
+    def _send(
+        self, method: str, path: str, payload: bytes | None, headers: dict[str, str]
+    ) -> tuple[http.client.HTTPResponse, bytes | None]:
+        connection = self._connection()
+        try:
+            connection.request(method, self.prefix + path, payload, headers)
+            response = connection.getresponse()
+            if response.getheader("Content-Type", "").startswith(STREAM_MEDIA_TYPE):
+                self._local.streamed = response
+                return response, None
+            return response, response.read()
+        except (http.client.RemoteDisconnected, BrokenPipeError, ConnectionResetError):
+            raise
+        except OSError as ex:
+            self.close()
+            raise ApiError(f"API server at {self.url} is not reachable, start it with `magic8 --api`: {ex}") from ex
@@ -0,0 +1,92 @@
+"""
+Command handlers and completion of the CLI.
+
+This module opens the database, creates the command handlers and builds
+the completion index with the completer and the auto-suggester reading it.
+It imports the whole database layer, the main loop loads it on a startup
+thread while the prompt is already shown.
+"""
+
+from collections.abc import Iterator
+from dataclasses import dataclass
+from prompt_toolkit.auto_suggest import AutoSuggest
+from prompt_toolkit.completion import Completer
+from sqlalchemy import Connection, Engine
+from data.database import get_database_engine
+from data.instrumentation import SqlStats, sql_stats
+from cli.abstractions import CommandHandler, CommandResult
+from cli.contact_commands import ContactCommandHandlers
+from cli.phone_commands import PhoneCommandHandlers
+from cli.email_commands import EmailCommandHandlers
+from cli.birthday_commands import BirthdayCommandHandlers
+from cli.note_commands import NoteCommandHandlers
+from cli.import_commands import ImportCommandHandlers
+from cli.export_commands import ExportCommandHandlers
+from cli.pipeline import execute_handler
+from cli.completion import build_completer, build_auto_suggest
+from cli.completion_index import CompletionIndex
+
+
+@dataclass
+class Backend:
+    handlers: dict[str, CommandHandler]
+    # Handler commands and the commands of the main loop
+    commands: list[str]
+    completion_index: CompletionIndex
+    completer: Completer
+    auto_suggest: AutoSuggest
+
+    def execute(self, command: str, args: list[str]) -> tuple[CommandResult, SqlStats]:
+        """
+        Runs the handler of the command, returns its result and the SQL statements it executed
+        """
+        with sql_stats() as stats:
+            status, message = execute_handler(self.handlers[command], args)
+        # Re-reads only the rows the command wrote
+        self.completion_index.refresh()
+        if not isinstance(message, str):
+            message = _measured(message, stats)
+        return (status, message), stats
+
+
+def _measured(lines: Iterator[str], stats: SqlStats) -> Iterator[str]:
+    """
+    Streamed output counting the statements reading its further pages in the stats of the command
+    """
+    while True:
+        with sql_stats(stats):
+            line = next(lines, None)
+        if line is None:
+            return
+        yield line
+
+
+def create_handlers(engine: Engine | Connection) -> dict[str, CommandHandler]:
+    """
+    Returns handlers of all commands by name. Handlers created for a connection
+    run in its transaction and bypass the query cache of the engine.
+    """
+    return {
+        **ContactCommandHandlers(engine).get_commands(),
+        **PhoneCommandHandlers(engine).get_commands(),
+        **EmailCommandHandlers(engine).get_commands(),
+        **BirthdayCommandHandlers(engine).get_commands(),
+        **NoteCommandHandlers(engine).get_commands(),
+        **ImportCommandHandlers(engine).get_commands(),
+        **ExportCommandHandlers(engine).get_commands()
+    }
+
+
+def load_backend() -> Backend:
+    database_engine = get_database_engine()
+    handlers = create_handlers(database_engine)
+
+    commands = ["hello", *handlers.keys(), "close", "exit", "history-clear"]
+
+    # Contact names, tags, phones, e-mails and notes for completion, built once and kept in memory
+    completion_index = CompletionIndex(database_engine)
+    completion_index.attach()
+
+    completer = build_completer(completion_index, commands)
+    auto_suggest = build_auto_suggest(completion_index, commands)
+    return Backend(handlers, commands, completion_index, completer, auto_suggest)
@@ -0,0 +1,146 @@
+"""
+Background completion and auto-suggest for the CLI prompt.
+
+This module runs the completer and the auto-suggester of the prompt on a
+worker thread, so a slow lookup never holds up typing. A request waits for
+a short pause in typing before it starts, and is abandoned when the text of
+the prompt changed meanwhile. Results which take longer than the latency
+budget are dropped, the prompt shows nothing for that keystroke instead of
+waiting for them.
+"""
+
+import asyncio
+import threading
+from collections.abc import AsyncGenerator, Callable, Iterable
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import override
+from prompt_toolkit.application.current import get_app_or_none
+from prompt_toolkit.auto_suggest import AutoSuggest, Suggestion
+from prompt_toolkit.buffer import Buffer
+from prompt_toolkit.completion import CompleteEvent, Completer, Completion
+from prompt_toolkit.document import Document
+
+# Pause in typing before a lookup starts
+DEBOUNCE_SECONDS = 0.05
+# Longest wait for a lookup, later results are dropped
+LATENCY_BUDGET_SECONDS = 0.25
+
+
+@dataclass
+class BackgroundStats:
+    requests: int = 0
+    # Abandoned because the text changed before the results were shown
+    stale: int = 0
+    # Dropped because they did not arrive within the latency budget
+    late: int = 0
+
+
+class BackgroundWorker:
+    """
+    Runs lookups of the completer and the auto-suggester off the input thread
+    """
+    def __init__(
+        self,
+        debounce: float = DEBOUNCE_SECONDS,
+        budget: float = LATENCY_BUDGET_SECONDS,
+        max_workers: int = 2
+    ):
+        self.debounce = debounce
+        self.budget = budget
+        self.stats = BackgroundStats()
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="completion")
+
+    async def run[T](self, is_current: Callable[[], bool], lookup: Callable[[threading.Event], T]) -> T | None:
+        """
+        Returns result of the lookup, None when the request went stale or the lookup was late.
+        The lookup is given an event set once its result is no longer wanted.
+        """
+        self.stats.requests += 1
+        await asyncio.sleep(self.debounce)
+        if not is_current():
+            self.stats.stale += 1
+            return None
+
+        abandoned = threading.Event()
+        future = asyncio.get_running_loop().run_in_executor(self._executor, lookup, abandoned)
+        try:
+            result = await asyncio.wait_for(future, self.budget)
+        except TimeoutError:
+            abandoned.set()
+            self.stats.late += 1
+            return None
+        except asyncio.CancelledError:
+            abandoned.set()
+            raise
+
+        if not is_current():
+            self.stats.stale += 1
+            return None
+        return result
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+def _is_current(document: Document) -> bool:
+    # Outside of a running prompt there is no newer text to compare with
+    app = get_app_or_none()
+    if app is None or not app.is_running:
+        return True
+    return app.current_buffer.document == document
+
+
+class BackgroundCompleter(Completer):
+    """
+    Completer looking up completions of the wrapped completer on a worker thread
+    """
+    completer: Completer
+    worker: BackgroundWorker
+
+    def __init__(self, completer: Completer, worker: BackgroundWorker):
+        self.completer = completer
+        self.worker = worker
+
+    @override
+    def get_completions(self, document: Document, complete_event: CompleteEvent) -> Iterable[Completion]:
+        return self.completer.get_completions(document, complete_event)
+
+    @override
+    async def get_completions_async(
+        self, document: Document, complete_event: CompleteEvent
+    ) -> AsyncGenerator[Completion, None]:
+        def lookup(abandoned: threading.Event) -> list[Completion]:
+            completions: list[Completion] = []
+            for completion in self.completer.get_completions(document, complete_event):
+                if abandoned.is_set():
+                    break
+                completions.append(completion)
+            return completions
+
+        completions = await self.worker.run(lambda: _is_current(document), lookup)
+        for completion in completions or []:
+            yield completion
+
+
+class BackgroundAutoSuggest(AutoSuggest):
+    """
+    Auto-suggest looking up the suggestion of the wrapped auto-suggest on a worker thread
+    """
+    auto_suggest: AutoSuggest
+    worker: BackgroundWorker
+
+    def __init__(self, auto_suggest: AutoSuggest, worker: BackgroundWorker):
+        self.auto_suggest = auto_suggest
+        self.worker = worker
+
+    @override
+    def get_suggestion(self, buffer: Buffer, document: Document) -> Suggestion | None:
+        return self.auto_suggest.get_suggestion(buffer, document)
+
+    @override
+    async def get_suggestion_async(self, buff: Buffer, document: Document) -> Suggestion | None:
+        return await self.worker.run(
+            lambda: buff.document == document,
+            lambda _: self.auto_suggest.get_suggestion(buff, document)
+        )
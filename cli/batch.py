@@ -0,0 +1,205 @@
+"""
+One-shot and batch execution of CLI commands.
+
+This module runs commands without the interactive prompt: a single command
+given on the command line (`magic8 add-contact "Anna Koval" 0501112233`)
+or a script of commands, one per line, read from a file or from stdin
+(`magic8 --batch commands.txt`, `magic8 --batch -`). Script lines are parsed
+like the prompt input, empty lines and lines starting with # are skipped.
+
+All commands of a batch run through one engine. With --transaction the
+whole batch is a single transaction committed at the end, and every command
+runs in a savepoint, so a failed command leaves no partial changes behind.
+--stop-on-error stops at the first failed command; a batch run as one
+transaction is then rolled back. A summary with the throughput is printed
+to stderr at the end.
+
+With `--connect` the commands run in a running API server instead
+(see cli/api_client.py), the database layer is then not imported.
+"""
+
+from __future__ import annotations
+import argparse
+import sys
+import time
+from collections.abc import Callable, Iterable, Iterator
+from contextlib import nullcontext
+from dataclasses import dataclass
+from typing import TYPE_CHECKING
+from cli.abstractions import CommandHandler, CommandResult, Result, message_text
+from cli.command_line import parse_input
+from cli.messages import print_status_message
+from cli.pipeline import execute_handler
+
+if TYPE_CHECKING:
+    from sqlalchemy import Engine
+    from sqlalchemy.engine import NestedTransaction
+
+# Commands which end a script like they end the interactive session
+END_COMMANDS = ("exit", "close")
+
+
+@dataclass
+class BatchSummary:
+    commands: int = 0
+    failed: int = 0
+    seconds: float = 0.0
+    # Stopped at a failed command with --stop-on-error
+    stopped: bool = False
+    committed: bool = True
+
+    @property
+    def commands_per_second(self) -> float:
+        return self.commands / self.seconds if self.seconds else 0.0
+
+    def details(self) -> str:
+        outcome = "" if self.committed else ", rolled back"
+        return (
+            f"{self.commands} commands, {self.failed} failed in {self.seconds:.2f} s "
+            f"({self.commands_per_second:.0f} commands/s){outcome}"
+        )
+
+
+def succeeded(status: Result) -> bool:
+    return status in (Result.SUCCESS, Result.SUCCESS_DATA)
+
+
+def run_command(handlers: dict[str, CommandHandler], command: str, args: list[str]) -> CommandResult:
+    if command == "hello":
+        return Result.SUCCESS, "How can I help you?"
+    handler = handlers.get(command)
+    if handler is None:
+        return Result.WARNING, f'Invalid command. Available commands: {", ".join(["hello", *handlers])}'
+    return execute_handler(handler, args)
+
+
+def read_commands(lines: Iterable[str]) -> Iterator[tuple[int, str, list[str]]]:
+    """
+    Yields line number, command and arguments of every command line of the script
+    """
+    for number, line in enumerate(lines, start=1):
+        line = line.strip()
+        if not line or line.startswith("#"):
+            continue
+        command, args = parse_input(line)
+        if command in END_COMMANDS:
+            return
+        yield number, command, args
+
+
+def run_script(
+    handlers: dict[str, CommandHandler],
+    lines: Iterable[str],
+    summary: BatchSummary,
+    stop_on_error: bool = False,
+    quiet: bool = False,
+    begin_command: Callable[[], NestedTransaction] | None = None,
+) -> None:
+    """
+    Runs the commands of the script through the handlers, counting them in the summary.
+    Every command runs in the transaction begin_command starts, if given.
+    """
+    for number, command, args in read_commands(lines):
+        savepoint = begin_command() if begin_command is not None else None
+        status, message = run_command(handlers, command, args)
+        summary.commands += 1
+
+        if succeeded(status):
+            if savepoint is not None:
+                savepoint.commit()
+            if not quiet:
+                print_status_message(status, message)
+            continue
+
+        if savepoint is not None:
+            savepoint.rollback()
+        summary.failed += 1
+        print_status_message(status, f"Line {number}: {message_text(message)}")
+        if stop_on_error:
+            summary.stopped = True
+            return
+
+
+def run_batch(
+    engine: Engine,
+    lines: Iterable[str],
+    transaction: bool = False,
+    stop_on_error: bool = False,
+    quiet: bool = False,
+) -> BatchSummary:
+    """
+    Runs the commands of the script, returns numbers of commands run and failed
+    """
+    from cli.backend import create_handlers
+    from data.query_cache import invalidate_all
+
+    summary = BatchSummary()
+    started = time.perf_counter()
+    if not transaction:
+        run_script(create_handlers(engine), lines, summary, stop_on_error, quiet)
+    else:
+        with engine.connect() as connection:
+            batch = connection.begin()
+            # pysqlite opens transactions lazily, a savepoint outside of one would commit on release
+            _ = connection.exec_driver_sql("BEGIN")
+            run_script(create_handlers(connection), lines, summary, stop_on_error, quiet, connection.begin_nested)
+            if summary.stopped:
+                batch.rollback()
+                summary.committed = False
+            else:
+                batch.commit()
+
+        # Handlers of the connection wrote past the query cache and write listeners of the engine
+        invalidate_all(engine)
+
+    summary.seconds = time.perf_counter() - started
+    return summary
+
+
+def _local_handlers() -> dict[str, CommandHandler]:
+    from cli.backend import create_handlers
+    from data.database import get_database_engine
+    return create_handlers(get_database_engine())
+
+
+def _remote_handlers() -> dict[str, CommandHandler]:
+    from cli.api_client import ApiClient
+    return ApiClient().handlers()
+
+
+def run_one_shot(argv: list[str], remote: bool = False) -> int:
+    """
+    Runs the command given on the command line, returns the exit code
+    """
+    command, args = argv[0].strip().lower(), argv[1:]
+    handlers = _remote_handlers() if remote else _local_handlers()
+    status, message = run_command(handlers, command, args)
+    print_status_message(status, message)
+    return 0 if succeeded(status) else 1
+
+
+def run_batch_script(argv: list[str], remote: bool = False) -> int:
+    """
+    Runs the script named by the --batch arguments, returns the exit code
+    """
+    parser = argparse.ArgumentParser(prog="magic8 --batch", description="Runs CLI commands from a file, one per line.")
+    _ = parser.add_argument("script", help="file with commands, - for stdin")
+    _ = parser.add_argument("--transaction", action="store_true", help="run the whole batch in one transaction")
+    _ = parser.add_argument("--stop-on-error", action="store_true", help="stop at the first failed command")
+    _ = parser.add_argument("--quiet", action="store_true", help="print only failed commands")
+    args = parser.parse_args(argv)
+    if remote and args.transaction:
+        parser.error("--transaction needs the local database, it cannot be used with --connect")
+
+    with nullcontext(sys.stdin) if args.script == "-" else open(args.script, encoding="utf-8") as script:
+        if remote:
+            summary = BatchSummary()
+            started = time.perf_counter()
+            run_script(_remote_handlers(), script, summary, args.stop_on_error, args.quiet)
+            summary.seconds = time.perf_counter() - started
+        else:
+            from data.database import get_database_engine
+            summary = run_batch(get_database_engine(), script, args.transaction, args.stop_on_error, args.quiet)
+
+    print(f"Batch: {summary.details()}", file=sys.stderr)
+    return 0 if summary.failed == 0 else 1
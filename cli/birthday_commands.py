@@ -6,11 +6,12 @@ and retrieving upcoming birthday reminders.
 """
 
 from datetime import datetime
-from sqlalchemy import Engine
+from sqlalchemy import Connection, Engine
 from cli.abstractions import Result
 from data.exceptions import ContactNotFound
 from data.contact_commands import ContactCommands, UpdateContact
 from data.contact_queries import ContactQueries
+from data.load_plans import contact_only
 from data.models import BirthdayReminder
 
 
@@ -18,7 +19,7 @@ class BirthdayCommandHandlers:
     commands: ContactCommands
     queries: ContactQueries
 
-    def __init__(self, engine: Engine):
+    def __init__(self, engine: Engine | Connection):
         self.commands = ContactCommands(engine)
         self.queries = ContactQueries(engine)
 
@@ -102,7 +103,7 @@ class BirthdayCommandHandlers:
             return Result.WARNING, f"Invalid number '{args[0]}'. Please provide a valid integer"
 
         try:
-            reminders = self.queries.get_contacts_with_birthdays_in_days(days)
+            reminders = self.queries.get_contacts_with_birthdays_in_days(days, load=contact_only)
 
             if len(reminders) == 0:
                 return Result.WARNING, f"No birthdays in the next {days} day(s)"
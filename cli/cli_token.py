@@ -0,0 +1,52 @@
+"""
+Shared secret of the API server and its CLI clients.
+
+This module keeps the token that `magic8 --connect` sends with every
+command. The API server creates it on first use in a file readable only
+by the user, ~/.magic8_cli_token by default (Magic_CLI_TOKEN_PATH), and
+clients of the same user read it from there, so only processes of that
+user can run commands in the server. Only the standard library is
+imported, the client process starts without the database layer.
+"""
+
+import os
+import secrets
+from pathlib import Path
+
+TOKEN_HEADER = "X-Magic8-Token"
+
+
+def token_path() -> Path:
+    configured_path = os.getenv("Magic_CLI_TOKEN_PATH")
+    return Path(configured_path) if configured_path else Path.home() / ".magic8_cli_token"
+
+
+def read_token() -> str | None:
+    """
+    Token of the running server, None when no server created one yet
+    """
+    try:
+        return token_path().read_text(encoding="utf-8").strip() or None
+    except FileNotFoundError:
+        return None
+
+
+def ensure_token() -> str:
+    """
+    Token kept in the token file, created with a new random token if missing
+    """
+    token = read_token()
+    if token is not None:
+        return token
+
+    token = secrets.token_urlsafe(32)
+    path = token_path()
+    try:
+        # Created readable and writable by the user only, an existing file is not replaced
+        descriptor = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+    except FileExistsError:
+        # Another server process created it in the meantime
+        return ensure_token()
+    with os.fdopen(descriptor, "w", encoding="utf-8") as file:
+        _ = file.write(token)
+    return token
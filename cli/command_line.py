@@ -0,0 +1,20 @@
+"""
+Parsing of command lines.
+
+This module splits a line typed at the prompt or read from a script into
+the command and its arguments, using shell-like quoting rules.
+"""
+
+import shlex
+
+
+def parse_input(user_input: str) -> tuple[str, list[str]]:
+    if not user_input:
+        return "", []
+    try:
+        parts = shlex.split(user_input, posix=True)
+    except ValueError:
+        parts = user_input.split()
+    cmd = (parts[0].strip().lower() if parts else "")
+    args = parts[1:] if len(parts) > 1 else []
+    return cmd, args
@@ -4,21 +4,22 @@ Smart command completion and auto-suggest for the CLI.
 This module provides intelligent auto-completion and suggestion features
 using prompt_toolkit, including context-aware completion for commands,
 contact names, tags, phone numbers, and email addresses.
+Names, tags, phones, e-mails and notes are looked up in a CompletionIndex
+kept in memory, the database is not queried while typing.
 """
 
 from __future__ import annotations
 import shlex
-from typing import Callable, override
+from typing import TYPE_CHECKING, Callable, override
 from collections.abc import Iterable
-from sqlalchemy import Engine
 from prompt_toolkit.auto_suggest import AutoSuggest, Suggestion
 from prompt_toolkit.buffer import Buffer
 from prompt_toolkit.completion import CompleteEvent, Completer, Completion
 from prompt_toolkit.document import Document
-from data.contact_queries import ContactQueries
-from data.note_queries import NoteQueries
-from data.phone_queries import PhoneQueries
-from data.email_queries import EmailQueries
+
+if TYPE_CHECKING:
+    # Imports the database layer, the index is created by the caller
+    from cli.completion_index import CompletionIndex
 
 BUILTIN_COMMANDS = [
     "hello", "exit", "close",
@@ -32,10 +33,12 @@ BUILTIN_COMMANDS = [
     # Birthdays
     "add-birthday", "remove-birthday", "get-birthdays",
     # Notes (global)
-    "get-notes", "add-note", "edit-note", "delete-note",
+    "get-notes", "search-notes", "add-note", "edit-note", "delete-note",
     "add-tag-to-note", "remove-tag-from-note",
     # Notes (contact-scoped)
     "add-note-to-contact",
+    # Import / export
+    "import", "export",
 ]
 
 def _split_words(s: str) -> list[str]:
@@ -87,109 +90,6 @@ def _quote_token(s: str) -> str:
     escaped = s.replace('\\', '\\\\').replace('"', '\\"')
     return f'"{escaped}"'
 
-def _fetch_contact_names(engine: Engine) -> list[str]:
-    """
-    Fetch all contact names from the database.
-    
-    Args:
-        engine: SQLAlchemy database engine
-        
-    Returns:
-        List of contact names, empty list on error
-    """
-    try:
-        q = ContactQueries(engine)
-        return [c.name for c in q.get_contacts()]
-    except Exception:
-        return []
-
-def _fetch_contact_phones(engine: Engine, contact_name: str) -> list[str]:
-    """
-    Fetch all phone numbers for a specific contact.
-    
-    Args:
-        engine: SQLAlchemy database engine
-        contact_name: Name of the contact
-        
-    Returns:
-        Sorted list of unique phone numbers, empty list on error
-    """
-    try:
-        pq = PhoneQueries(engine)
-        phones = pq.get_contact_phones_by_name(contact_name) # list[Phone]
-        phone_numbers = { phone.phone_number for phone in phones }
-        return sorted(phone_numbers)
-    except Exception:
-        return []
-
-def _fetch_contact_emails(engine: Engine, contact_name: str) -> list[str]:
-    """
-    Fetch all email addresses for a specific contact.
-    
-    Args:
-        engine: SQLAlchemy database engine
-        contact_name: Name of the contact
-        
-    Returns:
-        Sorted list of unique email addresses, empty list on error
-    """
-    try:
-        eq = EmailQueries(engine)
-        emails = eq.get_contact_emails_by_name(contact_name) # list[Email]
-        email_addresses = { email.email_address for email in emails }
-        return sorted(email_addresses)
-    except Exception:
-        return []
-
-def _fetch_all_tags(engine: Engine) -> list[str]:
-    """
-    Fetch all unique tags from both contacts and notes.
-    
-    Args:
-        engine: SQLAlchemy database engine
-        
-    Returns:
-        Sorted list of unique tag labels, empty list on error
-    """
-    tags: set[str] = set()
-
-    try:
-        cq = ContactQueries(engine)
-        for c in cq.get_contacts():
-            for t in c.tags:
-                tags.add(t.label)
-    except Exception:
-        return []
-
-    try:
-        nq = NoteQueries(engine)
-        for note in nq.get_notes():
-            for tag in note.tags:
-                tags.add(tag.label)
-
-    except Exception:
-        # Ignore note tags if error, but we already have contact tags
-        return sorted(tags)
-
-    return sorted(tags)
-
-def _fetch_notes_texts(engine: Engine) -> list[str]:
-    """
-    Fetch all note texts from the database.
-    
-    Args:
-        engine: SQLAlchemy database engine
-        
-    Returns:
-        List of note texts, empty list on error
-    """
-    try:
-        queries = NoteQueries(engine)
-        notes = [note.text for note in queries.get_notes()]
-        return notes
-    except Exception:
-        return []
-
 def _prefix_match(items: Iterable[str], prefix: str) -> list[str]:
     """
     Filter items that start with the given prefix (case-insensitive).
@@ -234,6 +134,7 @@ COMPLETION_RULES: dict[str, list[str]] = {
 
     # Notes (global)
     "get-notes":                    ["tag?"                 ],
+    "search-notes":                 ["free!"                ],
     "add-note":                     ["free!", "tag?"        ],
     "edit-note":                    ["note-fragment!", "free!" ],
     "delete-note":                  ["note-fragment!"       ],
@@ -241,10 +142,17 @@ COMPLETION_RULES: dict[str, list[str]] = {
     "remove-tag-from-note":         ["note-fragment!", "tag!" ],
     # Notes (contact-scoped)
     "add-note-to-contact":          ["name!", "free!", "tag!" ],
+
+    # Import / export
+    "import":                       ["free!", "format?"     ],
+    "export":                       ["free!", "format?"     ],
 }
 
 PHONE_MASKS = ["050########", "067########"]
 
+# Completions shown in the menu at most, the first ones in alphabetical order
+MAX_COMPLETIONS = 200
+
 class CLIAutoSuggest(AutoSuggest):
     get_candidates: Callable[..., list[str]]
 
@@ -287,10 +195,10 @@ class CLIAutoSuggest(AutoSuggest):
 
 class CLICompleter(Completer):
     commands: Iterable[str]
-    engine: Engine
+    index: CompletionIndex
 
-    def __init__(self, engine: Engine, commands: list[str]):
-        self.engine = engine
+    def __init__(self, index: CompletionIndex, commands: list[str]):
+        self.index = index
         self.commands = sorted(set(commands or BUILTIN_COMMANDS))
 
     @override
@@ -341,18 +249,18 @@ class CLICompleter(Completer):
         rule = rules[arg_pos - 1].strip().lower()
 
         if rule.startswith("name"):
-            names = _fetch_contact_names(self.engine)
-            yield from complete_words(_prefix_match(names, current_prefix))
+            names = self.index.contact_names(current_prefix, MAX_COMPLETIONS)
+            yield from complete_words(names)
             return
 
         if rule.startswith("tag"):
-            tags = _fetch_all_tags(self.engine)
-            yield from complete_words(_prefix_match(tags, current_prefix))
+            tags = self.index.tag_labels(current_prefix, MAX_COMPLETIONS)
+            yield from complete_words(tags)
             return
 
         if rule.startswith("phone("):
             name = parts[1] if len(parts) > 1 else ""
-            phones = _fetch_contact_phones(self.engine, name) if name else []
+            phones = self.index.contact_phones(name) if name else []
 
             # Для add-phone показываем и шаблоны, и реальные номера
             if first == "add-phone":
@@ -363,13 +271,16 @@ class CLICompleter(Completer):
 
         if rule.startswith("email("):
             name = parts[1] if len(parts) > 1 else ""
-            emails = _fetch_contact_emails(self.engine, name) if name else []
+            emails = self.index.contact_emails(name) if name else []
             yield from complete_words(_prefix_match(emails, current_prefix))
             return
 
         if rule.startswith("note-fragment"):
-            frags = _fetch_notes_texts(self.engine)
-            yield from complete_words(_prefix_match(frags, current_prefix))
+            frags = self.index.notes_starting_with(current_prefix, MAX_COMPLETIONS)
+            if current_prefix:
+                # Notes with a word starting with the typed text, a fragment from the middle finds the note too
+                frags += self.index.notes_with_word(current_prefix, MAX_COMPLETIONS)
+            yield from complete_words(frags, meta="note")
             return
 
         if rule.startswith("days"):
@@ -384,34 +295,39 @@ class CLICompleter(Completer):
             yield from complete_words(_prefix_match(PHONE_MASKS, current_prefix), meta="mask")
             return
 
+        if rule.startswith("format"):
+            formats = ["ndjson", "csv", "vcard"] if first == "export" else ["csv", "vcard"]
+            yield from complete_words(_prefix_match(formats, current_prefix))
+            return
+
         # free — ничего не подсказываем
         return
 
-def build_completer(engine: Engine, all_commands: list[str]) -> CLICompleter:
+def build_completer(index: CompletionIndex, all_commands: list[str]) -> CLICompleter:
     """
     Build a CLI completer instance with context-aware completion.
     
     Args:
-        engine: SQLAlchemy database engine for fetching completion data
+        index: Completion index with contact names, tags, phones, e-mails and notes
         all_commands: List of all available command names
         
     Returns:
         Configured CLICompleter instance
     """
-    return CLICompleter(engine, all_commands)
+    return CLICompleter(index, all_commands)
 
-def build_auto_suggest(engine: Engine, all_commands: list[str]) -> CLIAutoSuggest:
+def build_auto_suggest(index: CompletionIndex, all_commands: list[str]) -> CLIAutoSuggest:
     """
     Build an auto-suggest instance for inline completion hints.
     
     Args:
-        engine: SQLAlchemy database engine for fetching suggestion data
+        index: Completion index shared with the completer
         all_commands: List of all available command names
         
     Returns:
         Configured CLIAutoSuggest instance
     """
-    completer = CLICompleter(engine, all_commands)
+    completer = CLICompleter(index, all_commands)
 
     def _get_candidates(full_text: str, cursor_pos: int, word_index: int, prefix: str) -> list[str]:
         if word_index == 0:
@@ -429,27 +345,30 @@ def build_auto_suggest(engine: Engine, all_commands: list[str]) -> CLIAutoSugges
 
         rule = rules[arg_pos - 1].strip().lower()
 
+        # A suggestion is shown only for a single match, two matches are enough to decide
         if rule.startswith("name"):
-            return _fetch_contact_names(engine)
+            return index.contact_names(prefix, 2)
         if rule.startswith("tag"):
-            return _fetch_all_tags(engine)
+            return index.tag_labels(prefix, 2)
         if rule.startswith("phone("):
             name = parts[1] if len(parts) > 1 else ""
-            phones = _fetch_contact_phones(engine, name) if name else []
+            phones = index.contact_phones(name) if name else []
             if first == "add-phone":
                 return PHONE_MASKS + phones
             return phones
         if rule.startswith("email("):
             name = parts[1] if len(parts) > 1 else ""
-            return _fetch_contact_emails(engine, name) if name else []
+            return index.contact_emails(name) if name else []
         if rule.startswith("note-fragment"):
-            return _fetch_notes_texts(engine)
+            return index.notes_starting_with(prefix, 2)
         if rule.startswith("days"):
             return ["3", "7", "14", "30"]
         if rule.startswith("date"):
             return ["YYYY-MM-DD"]
         if rule.startswith("phone-new"):
             return PHONE_MASKS
+        if rule.startswith("format"):
+            return ["ndjson", "csv", "vcard"] if first == "export" else ["csv", "vcard"]
         # free
         return []
 
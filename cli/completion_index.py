@@ -0,0 +1,301 @@
+"""
+In-memory completion index for the CLI.
+
+This module keeps everything the completer and the auto-suggester offer
+in memory: contact names, tag labels, phones and e-mails of every contact,
+note texts and the words of the notes. Names, labels, texts and words are
+kept in sorted arrays of lower-cased keys, so a prefix lookup is a binary
+search instead of a database query per keystroke.
+
+The index is built once at startup, the words of the notes on the first
+lookup by a word. Committed transactions report the rows they wrote
+(see data/row_changes.py), and before the next lookup only those rows are
+re-read and replaced in the index. Topics written by statements whose rows
+are not known, or with more written rows than MAX_ROWS_PER_REFRESH, are
+reloaded whole.
+
+Lookups may run in the background-completion thread while the prompt
+thread refreshes the index, both hold the lock of the index. Rows are read
+from the database without holding it, one refresh at a time.
+"""
+
+import bisect
+import threading
+from collections import Counter, defaultdict
+from collections.abc import Callable, Iterable
+from dataclasses import dataclass
+from sqlalchemy import Engine
+from data.contact_queries import ContactQueries
+from data.email_queries import EmailQueries
+from data.note_queries import NoteQueries
+from data.note_search import token_pattern
+from data.phone_queries import PhoneQueries
+from data.query_cache import CONTACTS, EMAILS, NOTES, PHONES, TAGS
+from data.row_changes import WrittenRows, add_row_listener, remove_row_listener
+from data.tag_queries import TagQueries
+
+# Written rows of a topic beyond which the topic is reloaded whole
+MAX_ROWS_PER_REFRESH = 1000
+
+
+class SortedWords:
+    """
+    Words sorted case-insensitively, looked up by prefix
+    """
+    def __init__(self, words: Iterable[str] = ()):
+        pairs = sorted({(word.lower(), word) for word in words})
+        self.keys = [key for key, _ in pairs]
+        self.words = [word for _, word in pairs]
+
+    def __len__(self) -> int:
+        return len(self.words)
+
+    def starting_with(self, prefix: str, limit: int | None = None) -> list[str]:
+        prefix = prefix.lower()
+        start = bisect.bisect_left(self.keys, prefix)
+        end = bisect.bisect_left(self.keys, prefix + "\U0010ffff", lo=start)
+        if limit is not None:
+            end = min(end, start + limit)
+        return self.words[start:end]
+
+    def add(self, word: str) -> None:
+        position, found = self._find(word)
+        if not found:
+            self.keys.insert(position, word.lower())
+            self.words.insert(position, word)
+
+    def remove(self, word: str) -> None:
+        position, found = self._find(word)
+        if found:
+            del self.keys[position]
+            del self.words[position]
+
+    def _find(self, word: str) -> tuple[int, bool]:
+        # Words of the same key are sorted among themselves
+        key = word.lower()
+        start = bisect.bisect_left(self.keys, key)
+        end = bisect.bisect_right(self.keys, key, lo=start)
+        position = bisect.bisect_left(self.words, word, lo=start, hi=end)
+        return position, position < end and self.words[position] == word
+
+
+@dataclass
+class _Loaded:
+    # Ids of the re-read rows, None when the whole topic was reloaded
+    ids: list[int] | None
+    rows: list[tuple[int, str]]
+
+
+class CompletionIndex:
+    engine: Engine
+
+    def __init__(self, engine: Engine):
+        self.engine = engine
+        self.names = SortedWords()
+        self.tags = SortedWords()
+        self.note_texts = SortedWords()
+        self.note_words: SortedWords | None = None
+        self._contact_ids: dict[str, int] = {}
+        self._contact_names: dict[int, str] = {}
+        self._phones: dict[int, list[str]] = {}
+        self._emails: dict[int, list[str]] = {}
+        self._tag_labels: dict[int, str] = {}
+        self._notes: dict[int, str] = {}
+        # Notes of the same text are offered once
+        self._note_text_counts: Counter[str] = Counter()
+        # Texts of the notes with each word, in the order they were indexed
+        self._notes_by_word: dict[str, dict[str, None]] = {}
+        self._written = WrittenRows()
+        self._lock = threading.Lock()
+        # One refresh at a time, rows read by an earlier refresh are never applied over later ones
+        self._refresh_lock = threading.Lock()
+
+    def attach(self) -> None:
+        """
+        Builds the index and follows writes made through the engine
+        """
+        add_row_listener(self.engine, self.rows_written)
+        self.refresh([CONTACTS, PHONES, EMAILS, NOTES, TAGS])
+
+    def detach(self) -> None:
+        remove_row_listener(self.engine, self.rows_written)
+
+    def rows_written(self, rows: WrittenRows) -> None:
+        with self._lock:
+            self._written.update(rows)
+
+    def refresh(self, topics: Iterable[str] | None = None) -> None:
+        """
+        Reloads the topics whole and re-reads the rows written since the last refresh
+        """
+        with self._refresh_lock:
+            self._refresh(topics)
+
+    def _refresh(self, topics: Iterable[str] | None) -> None:
+        with self._lock:
+            written, self._written = self._written, WrittenRows()
+        written.unknown.update(topics or ())
+
+        contacts = self._load(written, CONTACTS, ContactQueries(self.engine).get_contact_ids_and_names)
+        phones = self._load(written, PHONES, PhoneQueries(self.engine).get_phone_numbers_by_contact)
+        emails = self._load(written, EMAILS, EmailQueries(self.engine).get_email_addresses_by_contact)
+        tags = self._load(written, TAGS, TagQueries(self.engine).get_assigned_tag_ids_and_labels)
+        notes = self._load(written, NOTES, NoteQueries(self.engine).get_note_ids_and_texts)
+
+        with self._lock:
+            if contacts is not None:
+                self.names = self._apply_names(contacts, self._contact_names, self.names, self._contact_ids)
+            if phones is not None:
+                self._apply_by_contact(phones, self._phones)
+            if emails is not None:
+                self._apply_by_contact(emails, self._emails)
+            if tags is not None:
+                self.tags = self._apply_names(tags, self._tag_labels, self.tags)
+            if notes is not None:
+                self._apply_notes(notes)
+
+    def contact_names(self, prefix: str = "", limit: int | None = None) -> list[str]:
+        with self._lock:
+            return self.names.starting_with(prefix, limit)
+
+    def tag_labels(self, prefix: str = "", limit: int | None = None) -> list[str]:
+        with self._lock:
+            return self.tags.starting_with(prefix, limit)
+
+    def contact_phones(self, contact_name: str) -> list[str]:
+        with self._lock:
+            contact_id = self._contact_ids.get(contact_name)
+            return list(self._phones.get(contact_id, [])) if contact_id is not None else []
+
+    def contact_emails(self, contact_name: str) -> list[str]:
+        with self._lock:
+            contact_id = self._contact_ids.get(contact_name)
+            return list(self._emails.get(contact_id, [])) if contact_id is not None else []
+
+    def notes_starting_with(self, prefix: str = "", limit: int | None = None) -> list[str]:
+        with self._lock:
+            return self.note_texts.starting_with(prefix, limit)
+
+    def notes_with_word(self, prefix: str, limit: int | None = None) -> list[str]:
+        """
+        Note texts containing a word which starts with the prefix
+        """
+        with self._lock:
+            note_words = self.note_words
+            if note_words is None:
+                note_words = self._index_note_words()
+            texts: dict[str, None] = {}
+            for word in note_words.starting_with(prefix):
+                texts.update(self._notes_by_word[word])
+                if limit is not None and len(texts) >= limit:
+                    break
+            return list(texts)[:limit]
+
+    def _load(
+        self,
+        written: WrittenRows,
+        topic: str,
+        load: Callable[[list[int] | None, bool], list[tuple[int, str]]]
+    ) -> _Loaded | None:
+        """
+        Reads the written rows of the topic past the query cache, None when none were written
+        """
+        ids = written.ids.get(topic, set())
+        if topic in written.unknown or len(ids) > MAX_ROWS_PER_REFRESH:
+            return _Loaded(None, load(None, False))
+        if ids:
+            return _Loaded(sorted(ids), load(sorted(ids), False))
+        return None
+
+    def _apply_names(
+        self,
+        loaded: _Loaded,
+        names: dict[int, str],
+        words: SortedWords,
+        ids: dict[str, int] | None = None
+    ) -> SortedWords:
+        """
+        Replaces the names of the loaded ids, returns the words of all names
+        """
+        if loaded.ids is None:
+            names.clear()
+            names.update(loaded.rows)
+            if ids is not None:
+                ids.clear()
+                ids.update((name, row_id) for row_id, name in loaded.rows)
+            return SortedWords(names.values())
+
+        for row_id in loaded.ids:
+            name = names.pop(row_id, None)
+            if name is not None:
+                words.remove(name)
+                if ids is not None:
+                    del ids[name]
+        for row_id, name in loaded.rows:
+            names[row_id] = name
+            words.add(name)
+            if ids is not None:
+                ids[name] = row_id
+        return words
+
+    def _apply_by_contact(self, loaded: _Loaded, by_contact: dict[int, list[str]]) -> None:
+        if loaded.ids is None:
+            by_contact.clear()
+        for contact_id in loaded.ids or ():
+            _ = by_contact.pop(contact_id, None)
+        values: defaultdict[int, list[str]] = defaultdict(list)
+        for contact_id, value in loaded.rows:
+            values[contact_id].append(value)
+        by_contact.update(values)
+
+    def _apply_notes(self, loaded: _Loaded) -> None:
+        if loaded.ids is None:
+            self._notes = dict(loaded.rows)
+            self._note_text_counts = Counter(self._notes.values())
+            self.note_texts = SortedWords(self._note_text_counts)
+            # Words are indexed on the first lookup, most sessions never complete notes by a word
+            self.note_words = None
+            return
+
+        for note_id in loaded.ids:
+            text = self._notes.pop(note_id, None)
+            if text is not None:
+                self._note_text_counts[text] -= 1
+                if not self._note_text_counts[text]:
+                    del self._note_text_counts[text]
+                    self.note_texts.remove(text)
+                    self._remove_note_words(text)
+        for note_id, text in loaded.rows:
+            self._notes[note_id] = text
+            self._note_text_counts[text] += 1
+            if self._note_text_counts[text] == 1:
+                self.note_texts.add(text)
+                self._add_note_words(text)
+
+    def _index_note_words(self) -> SortedWords:
+        notes_by_word: defaultdict[str, dict[str, None]] = defaultdict(dict)
+        for text in self._note_text_counts:
+            for word in set(token_pattern.findall(text.lower())):
+                notes_by_word[word][text] = None
+        self._notes_by_word = dict(notes_by_word)
+        self.note_words = SortedWords(notes_by_word)
+        return self.note_words
+
+    def _add_note_words(self, text: str) -> None:
+        if self.note_words is None:
+            return
+        for word in set(token_pattern.findall(text.lower())):
+            if word not in self._notes_by_word:
+                self._notes_by_word[word] = {}
+                self.note_words.add(word)
+            self._notes_by_word[word][text] = None
+
+    def _remove_note_words(self, text: str) -> None:
+        if self.note_words is None:
+            return
+        for word in set(token_pattern.findall(text.lower())):
+            texts = self._notes_by_word.get(word, {})
+            _ = texts.pop(text, None)
+            if not texts:
+                _ = self._notes_by_word.pop(word, None)
+                self.note_words.remove(word)
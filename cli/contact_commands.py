@@ -5,13 +5,16 @@ This module provides CLI command handlers for managing contacts,
 including CRUD operations and tag management.
 """
 
+from collections.abc import Iterator
+from itertools import chain
 from pydantic import ValidationError
-from sqlalchemy import Engine
+from sqlalchemy import Connection, Engine
 from cli.abstractions import Result
+from cli.listing import FieldValue, ListOptionError, fetch_pages, parse_list_options, render_pages
 from data.contact_commands import ContactCommands, CreateContact, UpdateContact
 from data.contact_queries import ContactQueries
 from data.exceptions import ContactAlreadyExists, ContactNotFound, PhoneAlreadyExists, TagNotFound
-from data.models import Contact
+from data.models import ContactSummary
 from data.tag_commands import AddTag, RemoveTag
 
 
@@ -19,7 +22,7 @@ class ContactCommandHandlers:
     commands: ContactCommands
     queries: ContactQueries
 
-    def __init__(self, engine: Engine):
+    def __init__(self, engine: Engine | Connection):
         self.commands = ContactCommands(engine)
         self.queries = ContactQueries(engine)
 
@@ -38,30 +41,42 @@ class ContactCommandHandlers:
         }
 
     
-    def get_contacts(self, args: list[str]) -> tuple[Result, str]:
+    def get_contacts(self, args: list[str]) -> tuple[Result, str | Iterator[str]]:
         """
-        Returns all contacts or contacts filtered by tag.
+        Returns all contacts or contacts filtered by tag, read and printed page by page.
         Returns tuple: status, contacts text representation
         """
-        if len(args) == 0:
-            contacts = self.queries.get_contacts()
-        elif len(args) == 1:
-            tag = args[0]
-            contacts = self.queries.get_contacts_by_tag(tag)
-        else:
-            return Result.ERROR, f"ERROR: 'get-contacts' command accepts zero or one argument: [tag]. Provided {len(args)} value(s)"
+        try:
+            options = parse_list_options("get-contacts", args)
+        except ListOptionError as e:
+            return Result.ERROR, f"ERROR: {e}"
+
+        if len(options.arguments) > 1:
+            return Result.ERROR, f"ERROR: 'get-contacts' command accepts zero or one argument: [tag]. Provided {len(options.arguments)} value(s)"
+        tag = options.arguments[0] if options.arguments else None
 
-        if len(contacts) == 0:
+        def fetch(limit: int, after: int | None, offset: int) -> list[ContactSummary]:
+            return self.queries.get_contact_summaries(
+                tag=tag, limit=limit, after=after, offset=offset, with_phones=True, with_tags=True, cache=False
+            )
+
+        pages = fetch_pages(fetch, lambda contact: contact.contact_id, options)
+        first_page = next(pages, None)
+        if first_page is None:
             return Result.WARNING, "No contacts found"
 
-        def contact_to_str(contact: Contact):
-            phones = ", ".join([phone.phone_number for phone in contact.phones])
+        def contact_to_str(contact: ContactSummary):
+            phones = ", ".join(contact.phones)
             birthday_after_pipe = f" | Birthday: {contact.date_of_birth.strftime("%d.%m.%Y")}" if contact.date_of_birth else ""
-            tags = ", ".join([tag.label for tag in contact.tags]) if contact.tags else ""
+            tags = ", ".join(contact.tags)
             tags_after_pipe = f" | Tags: {tags}" if tags else ""
             return f"{contact.name} ({phones}){birthday_after_pipe}{tags_after_pipe}"
 
-        return Result.SUCCESS_DATA, "\n".join(map(contact_to_str, contacts))
+        def contact_fields(contact: ContactSummary) -> dict[str, FieldValue]:
+            return {"name": contact.name, "phones": contact.phones, "birthday": contact.date_of_birth, "tags": contact.tags}
+
+        lines = render_pages(chain([first_page], pages), options.format, contact_to_str, contact_fields)
+        return Result.SUCCESS_DATA, lines
 
     def get_contact(self, args: list[str]) -> tuple[Result, str]:
         """
@@ -5,7 +5,7 @@ This module provides CLI command handlers for managing email addresses
 associated with contacts, including add, edit, and delete operations.
 """
 
-from sqlalchemy import Engine
+from sqlalchemy import Connection, Engine
 from pydantic import ValidationError
 from cli.abstractions import Result
 from data.exceptions import ContactNotFound, EmailAlreadyExists, EmailNotFound
@@ -18,7 +18,7 @@ class EmailCommandHandlers:
     commands: EmailCommands
     queries: EmailQueries
 
-    def __init__(self, engine: Engine):
+    def __init__(self, engine: Engine | Connection):
         self.commands = EmailCommands(engine)
         self.queries = EmailQueries(engine)
 
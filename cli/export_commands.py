@@ -0,0 +1,67 @@
+"""
+CLI command handlers for exporting contacts.
+
+This module provides the CLI command handler that writes the whole
+address book to an NDJSON, CSV or vCard file.
+"""
+
+import time
+from pathlib import Path
+from sqlalchemy import Connection, Engine
+from cli.abstractions import Result
+from data.contact_formats import ExportFormat, write_contacts
+from data.export_queries import ExportQueries
+
+formats_by_extension: dict[str, ExportFormat] = {
+    "ndjson": "ndjson",
+    "jsonl": "ndjson",
+    "csv": "csv",
+    "vcf": "vcard",
+    "vcard": "vcard",
+}
+
+
+class ExportCommandHandlers:
+    queries: ExportQueries
+
+    def __init__(self, engine: Engine | Connection):
+        self.queries = ExportQueries(engine)
+
+    def get_commands(self):
+        """
+        Returns all commands this handler can process
+        """
+        return {
+            "export": self.export_contacts
+        }
+
+    def export_contacts(self, args: list[str]) -> tuple[Result, str]:
+        """
+        Writes all contacts to a file, the format is taken from the argument or file extension.
+        Returns tuple: status, message
+        """
+        if len(args) not in [1, 2]:
+            return Result.ERROR, f"ERROR: 'export' command accepts one or two arguments: path and [ndjson|csv|vcard]. Provided {len(args)} value(s)"
+
+        path = Path(args[0]).expanduser()
+        format_name = args[1].lower() if len(args) == 2 else path.suffix.lstrip(".").lower() or "ndjson"
+        format = formats_by_extension.get(format_name)
+        if format is None:
+            return Result.WARNING, f"Unknown format '{format_name}'. Use ndjson, csv or vcard"
+
+        started = time.perf_counter()
+        contact_count = 0
+
+        def counted(records):
+            nonlocal contact_count
+            for record in records:
+                contact_count += 1
+                yield record
+
+        with path.open("w", encoding="utf-8", newline="") as file:
+            records = counted(self.queries.iter_contact_records())
+            for text in write_contacts(records, format, self.queries.get_max_notes_per_contact):
+                _ = file.write(text)
+
+        duration = time.perf_counter() - started
+        return Result.SUCCESS, f"Exported {contact_count} contact(s) to '{path}' in {duration:.2f} s."
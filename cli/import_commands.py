@@ -0,0 +1,58 @@
+"""
+CLI command handlers for importing contacts.
+
+This module provides the CLI command handler that imports contacts
+from CSV and vCard files.
+"""
+
+from pathlib import Path
+from typing import cast
+from sqlalchemy import Connection, Engine
+from cli.abstractions import Result
+from data.contact_formats import ContactFormat, contact_formats, read_contacts
+from data.import_commands import ImportCommands
+
+
+class ImportCommandHandlers:
+    commands: ImportCommands
+
+    def __init__(self, engine: Engine | Connection):
+        self.commands = ImportCommands(engine)
+
+    def get_commands(self):
+        """
+        Returns all commands this handler can process
+        """
+        return {
+            "import": self.import_contacts
+        }
+
+    def import_contacts(self, args: list[str]) -> tuple[Result, str]:
+        """
+        Imports contacts from a CSV or vCard file.
+        Returns tuple: status, import report
+        """
+        if len(args) not in [1, 2]:
+            return Result.ERROR, f"ERROR: 'import' command accepts one or two arguments: path and [csv|vcard]. Provided {len(args)} value(s)"
+
+        path = Path(args[0]).expanduser()
+        format_name = args[1].lower() if len(args) == 2 else None
+        if format_name is not None and format_name not in contact_formats:
+            return Result.ERROR, f"ERROR: 'import' command accepts format {"|".join(contact_formats)}. Provided '{args[1]}'"
+        format = cast(ContactFormat, format_name) if format_name is not None else None
+        if not path.is_file():
+            return Result.WARNING, f"File '{path}' not found"
+
+        with path.open(encoding="utf-8-sig", errors="replace", newline="") as file:
+            report = self.commands.import_contacts(read_contacts(file, format, path.name))
+
+        lines = [
+            f"Imported {report.imported} of {report.records} contact(s) in {report.seconds:.2f} s ({report.records_per_second:.0f} records/s)",
+            f"Rejected: {report.rejected}, duplicate phones and e-mails skipped: {report.duplicates}",
+            *(f"  Record {reject.record} '{reject.name}': {reject.reason}" for reject in report.rejects),
+        ]
+        if report.rejected > len(report.rejects):
+            lines.append(f"  ... and {report.rejected - len(report.rejects)} more")
+
+        status = Result.SUCCESS_DATA if report.imported > 0 else Result.WARNING
+        return status, "\n".join(lines)
@@ -0,0 +1,196 @@
+"""
+Paged, streamed output of list commands.
+
+This module lets list commands print rows while the following ones are
+still being read: rows are fetched a page at a time with keyset
+pagination, the handler fetches the first page itself and returns the
+output as an iterator of lines, which reads every further page only when
+the lines before it are printed. So the first screen is shown as soon as
+the first page is read, and memory use does not grow with the result:
+pages are read past the query cache, which would keep every one of them.
+
+List commands accept `--limit N`, `--offset N` and
+`--format text|table|json|csv` after their arguments. The text format is
+the one line per row output of the command, the table columns are sized
+to the rows of the first page.
+"""
+
+import csv
+import io
+import json
+from collections.abc import Callable, Iterable, Iterator, Sequence
+from dataclasses import dataclass, field
+from datetime import date
+from itertools import chain
+from typing import Literal, cast, get_args
+
+type ListFormat = Literal["text", "table", "json", "csv"]
+type FieldValue = str | Sequence[str] | date | None
+
+# Rows read with one query
+PAGE_SIZE = 500
+# Widest table column, longer values overflow it
+MAX_COLUMN_WIDTH = 40
+
+list_formats: tuple[str, ...] = get_args(ListFormat.__value__)
+
+
+class ListOptionError(Exception):
+    pass
+
+
+@dataclass
+class ListOptions:
+    # Arguments of the command other than the list options
+    arguments: list[str] = field(default_factory=list)
+    limit: int | None = None
+    offset: int = 0
+    format: ListFormat = "text"
+
+
+def parse_list_options(command: str, args: list[str]) -> ListOptions:
+    """
+    Splits --limit, --offset and --format off the command arguments
+    """
+    options = ListOptions()
+    remaining = iter(args)
+    for arg in remaining:
+        name, separator, value = arg.partition("=")
+        if name not in ("--limit", "--offset", "--format"):
+            options.arguments.append(arg)
+            continue
+        if not separator:
+            value = next(remaining, None)
+            if value is None:
+                raise ListOptionError(f"'{command}' option {name} needs a value")
+
+        if name == "--format":
+            if value.lower() not in list_formats:
+                raise ListOptionError(f"'{command}' option --format accepts {"|".join(list_formats)}. Provided '{value}'")
+            options.format = cast(ListFormat, value.lower())
+            continue
+
+        number = int(value) if value.isdigit() else -1
+        if number < 0 or (name == "--limit" and number == 0):
+            raise ListOptionError(f"'{command}' option {name} accepts a positive number. Provided '{value}'")
+        if name == "--limit":
+            options.limit = number
+        else:
+            options.offset = number
+    return options
+
+
+def fetch_pages[T](
+    fetch: Callable[[int, int | None, int], list[T]],
+    key: Callable[[T], int],
+    options: ListOptions,
+    page_size: int = PAGE_SIZE
+) -> Iterator[list[T]]:
+    """
+    Yields pages of rows read by fetch(limit, after, offset) until the limit of the options is reached
+    """
+    remaining = options.limit
+    after: int | None = None
+    offset = options.offset
+    while remaining is None or remaining > 0:
+        limit = page_size if remaining is None else min(page_size, remaining)
+        page = fetch(limit, after, offset)
+        if page:
+            yield page
+        if len(page) < limit:
+            return
+        after = key(page[-1])
+        offset = 0
+        if remaining is not None:
+            remaining -= len(page)
+
+
+def render_pages[T](
+    pages: Iterator[list[T]],
+    format: ListFormat,
+    to_text: Callable[[T], str],
+    to_fields: Callable[[T], dict[str, FieldValue]]
+) -> Iterator[str]:
+    """
+    Lines of the rows in the format, a page is read when the lines of the page before it are taken
+    """
+    rows = chain.from_iterable(pages)
+    if format == "text":
+        yield from map(to_text, rows)
+    elif format == "json":
+        yield from _json_lines(map(to_fields, rows))
+    elif format == "csv":
+        yield from _csv_lines(map(to_fields, rows))
+    else:
+        yield from _table_lines([to_fields(row) for row in page] for page in pages)
+
+
+def _cell(value: FieldValue, separator: str, date_format: str) -> str:
+    if value is None:
+        return ""
+    if isinstance(value, date):
+        return value.strftime(date_format)
+    if isinstance(value, str):
+        return value
+    return separator.join(value)
+
+
+def _json_lines(rows: Iterator[dict[str, FieldValue]]) -> Iterator[str]:
+    """
+    One JSON array, a row per line
+    """
+    def to_json(row: dict[str, FieldValue]) -> str:
+        values = {name: value.isoformat() if isinstance(value, date) else value for name, value in row.items()}
+        return json.dumps(values, ensure_ascii=False)
+
+    yield "["
+    previous: str | None = None
+    # A row is written once the next one shows whether it needs a comma
+    for row in rows:
+        if previous is not None:
+            yield f"  {previous},"
+        previous = to_json(row)
+    if previous is not None:
+        yield f"  {previous}"
+    yield "]"
+
+
+def _csv_lines(rows: Iterator[dict[str, FieldValue]]) -> Iterator[str]:
+    """
+    CSV with a header row, several values in a cell are separated by ';' as in exported files
+    """
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator="")
+
+    def line(values: Iterable[str]) -> str:
+        _ = buffer.seek(0)
+        _ = buffer.truncate()
+        _ = writer.writerow(values)
+        return buffer.getvalue()
+
+    first = next(rows, None)
+    if first is None:
+        return
+    yield line(first)
+    for row in chain([first], rows):
+        yield line(_cell(value, ";", "%Y-%m-%d") for value in row.values())
+
+
+def _table_lines(pages: Iterator[list[dict[str, FieldValue]]]) -> Iterator[str]:
+    first = next(pages, None)
+    if not first:
+        return
+    columns = list(first[0])
+    widths = [
+        min(max(len(column), *(len(_cell(row[column], ", ", "%d.%m.%Y")) for row in first)), MAX_COLUMN_WIDTH)
+        for column in columns
+    ]
+
+    def line(values: Iterable[str]) -> str:
+        return "  ".join(value.ljust(width) for value, width in zip(values, widths)).rstrip()
+
+    yield line(column.capitalize() for column in columns)
+    yield line("-" * width for width in widths)
+    for page in chain([first], pages):
+        for row in page:
+            yield line(_cell(value, ", ", "%d.%m.%Y") for value in row.values())
@@ -4,49 +4,67 @@ Main CLI loop with interactive prompt and command routing.
 This module implements the main REPL (Read-Eval-Print Loop) for the
 contact management assistant, including prompt_toolkit integration
 for auto-completion, command history, and colored output.
+Completion reads from an in-memory index refreshed after every command,
+lookups run on a worker thread so typing never waits for them.
+The prompt is shown before the database and the command handlers are
+loaded, they are loaded on a startup thread and the first command waits
+for them; completion starts once they are loaded.
+With `--connect` commands and completion are served by a running API
+server instead, the CLI process does not open the database.
+Long output is shown a screen at a time, Magic_PAGER=off turns the pager off.
+With Magic_SQL_STATS=on the SQL statements executed by every command
+are printed after its output.
 """
 
-from data.database import database_engine
-from cli.messages import print_assistant_message, print_status_message
-from cli.abstractions import CommandHandler, Result
-from cli.contact_commands import ContactCommandHandlers
-from cli.phone_commands import PhoneCommandHandlers
-from cli.email_commands import EmailCommandHandlers
-from cli.birthday_commands import BirthdayCommandHandlers
-from cli.note_commands import NoteCommandHandlers
-from cli.pipeline import execute_handler
-from cli.completion import build_completer, build_auto_suggest
+from __future__ import annotations
+from cli.messages import print_assistant_message, print_debug_message, print_status_message
+from cli.abstractions import Result
+from cli.command_line import parse_input
+from cli.pager import terminal_pager
+from cli.background_completion import BackgroundAutoSuggest, BackgroundCompleter, BackgroundWorker
+from concurrent.futures import Future, ThreadPoolExecutor
 from prompt_toolkit import PromptSession
+from prompt_toolkit.auto_suggest import DynamicAutoSuggest
+from prompt_toolkit.completion import DynamicCompleter
 from prompt_toolkit.history import FileHistory
 from prompt_toolkit.key_binding import KeyBindings
 from pathlib import Path
-import shlex
-
-def parse_input(user_input: str) -> tuple[str, list[str]]:
-    if not user_input:
-        return "", []
-    try:
-        parts = shlex.split(user_input, posix=True)
-    except ValueError:
-        parts = user_input.split()
-    cmd = (parts[0].strip().lower() if parts else "")
-    args = parts[1:] if len(parts) > 1 else []
-    return cmd, args
-
-def launch_main_loop():
-    handlers: dict[str, CommandHandler] = {
-        **ContactCommandHandlers(database_engine).get_commands(),
-        **PhoneCommandHandlers(database_engine).get_commands(),
-        **EmailCommandHandlers(database_engine).get_commands(),
-        **BirthdayCommandHandlers(database_engine).get_commands(),
-        **NoteCommandHandlers(database_engine).get_commands()
-    }
-
-    commands = ["hello", *handlers.keys(), "close", "exit", "history-clear"]
-
-    # prompt_toolkit: комплитер + автосуггест
-    completer = build_completer(database_engine, commands)
-    auto_suggest = build_auto_suggest(database_engine, commands)
+from typing import TYPE_CHECKING
+import os
+
+if TYPE_CHECKING:
+    from cli.backend import Backend
+    from cli.remote_backend import RemoteBackend
+
+show_sql_stats = os.getenv("Magic_SQL_STATS", "off").lower() == "on"
+
+def _load_backend() -> Backend:
+    # Imported on the startup thread, the prompt does not wait for the database layer
+    from cli.backend import load_backend
+    return load_backend()
+
+def _connect_backend() -> RemoteBackend:
+    from cli.remote_backend import connect_backend
+    return connect_backend()
+
+def launch_main_loop(remote: bool = False):
+    startup = ThreadPoolExecutor(max_workers=1, thread_name_prefix="startup")
+    loading: Future[Backend | RemoteBackend] = startup.submit(_connect_backend if remote else _load_backend)
+    startup.shutdown(wait=False)
+
+    def loaded() -> Backend | RemoteBackend | None:
+        return loading.result() if loading.done() and loading.exception() is None else None
+
+    # prompt_toolkit: комплитер + автосуггест, debounced and looked up off the input thread
+    completion_worker = BackgroundWorker()
+    completer = BackgroundCompleter(
+        DynamicCompleter(lambda: backend.completer if (backend := loaded()) else None),
+        completion_worker
+    )
+    auto_suggest = BackgroundAutoSuggest(
+        DynamicAutoSuggest(lambda: backend.auto_suggest if (backend := loaded()) else None),
+        completion_worker
+    )
 
     history_path = Path.home() / ".goit_cli_history"
     session = PromptSession(
@@ -97,10 +115,20 @@ def launch_main_loop():
                 print_status_message(Result.WARNING, f"Failed to clear history: {e}")
             continue
 
-        elif command in handlers:
-            handler = handlers[command]
-            status, message = execute_handler(handler, args)
-            print_status_message(status, message)
-
         else:
-            print_status_message(Result.WARNING, f'Invalid command. Available commands: {", ".join(commands)}')
+            try:
+                backend = loading.result()
+            except Exception as e:
+                print_status_message(Result.ERROR, f"ERROR: Failed to start. {e}")
+                break
+
+            if command in backend.handlers:
+                (status, message), stats = backend.execute(command, args)
+                print_status_message(status, message, terminal_pager())
+                if show_sql_stats:
+                    print_debug_message(stats.details())
+
+            else:
+                print_status_message(Result.WARNING, f'Invalid command. Available commands: {", ".join(backend.commands)}')
+
+    completion_worker.shutdown()
@@ -3,17 +3,52 @@ Colored message printing utilities for CLI output.
 
 This module provides functions for printing colored messages to the console
 based on result status (success, warning, error) using colorama.
+Streamed command output is printed line by line as it is read, paused
+after every screen when a pager is given.
 """
 
+from collections.abc import Generator
+from itertools import batched
 from colorama import Fore
-from cli.abstractions import Result
+from cli.abstractions import CommandOutput, Result
+from cli.pager import Pager
+
+# Lines of unpaged output printed with one write
+PRINT_BATCH_LINES = 100
 
 
 def print_assistant_message(message: str):
     print(f"{Fore.BLUE}{message}{Fore.RESET}")
 
 
-def print_status_message(status: Result, message: str):
+def print_status_message(status: Result, message: CommandOutput, pager: Pager | None = None):
+    if isinstance(message, str) and pager is None:
+        _print_status_line(status, message)
+        return
+
+    lines = message.splitlines() if isinstance(message, str) else message
+    try:
+        if pager is None:
+            for batch in batched(lines, PRINT_BATCH_LINES):
+                _print_status_line(status, "\n".join(batch))
+            return
+
+        shown = 0
+        for line in lines:
+            rows = pager.rows(line)
+            if shown and shown + rows > pager.page_lines:
+                if not pager.more():
+                    break
+                shown = 0
+            _print_status_line(status, line)
+            shown += rows
+    finally:
+        # Stops reading the rows left when the pager was quit
+        if isinstance(lines, Generator):
+            lines.close()
+
+
+def _print_status_line(status: Result, message: str):
     if status == Result.SUCCESS:
         print(f"{Fore.GREEN}{message}{Fore.RESET}")
 
@@ -25,3 +60,7 @@ def print_status_message(status: Result, message: str):
 
     else:
         print(message)
+
+
+def print_debug_message(message: str):
+    print(f"{Fore.LIGHTBLACK_EX}{message}{Fore.RESET}")
@@ -6,35 +6,36 @@ both standalone and contact-associated, including tag management
 and text search functionality.
 """
 
-from sqlalchemy import Engine
+from collections.abc import Iterator
+from itertools import chain
+from sqlalchemy import Connection, Engine
 from cli.abstractions import Result
+from cli.listing import FieldValue, ListOptionError, fetch_pages, parse_list_options, render_pages
 from data.exceptions import ContactNotFound, NoteNotFound, TagNotFound
 from data.note_commands import NoteCommands, CreateNote, UpdateNote
 from data.note_queries import NoteQueries
-from data.models import Note
+from data.models import Note, NoteSearchResult
 from data.tag_commands import AddTag, RemoveTag
+from data.tag_queries import TagQueries
 
 
 class NoteCommandHandlers:
     commands: NoteCommands
     queries: NoteQueries
 
-    def __init__(self, engine: Engine):
+    def __init__(self, engine: Engine | Connection):
         self.commands = NoteCommands(engine)
         self.queries = NoteQueries(engine)
 
     @staticmethod
     def list_note_texts(engine: Engine) -> list[str]:
         queries = NoteQueries(engine)
-        notes = [note.text for note in queries.get_notes()]
-        return notes
+        return queries.get_note_texts()
 
     @staticmethod
     def list_note_tags(engine: Engine) -> list[str]:
-        queries = NoteQueries(engine)
-        tags: set[str] = set()
-        tags = { tag.label for note in queries.get_notes() for tag in note.tags }
-        return list(sorted(tags))
+        queries = TagQueries(engine)
+        return queries.get_tag_labels()
 
     def get_commands(self):
         """
@@ -42,6 +43,7 @@ class NoteCommandHandlers:
         """
         return {
             "get-notes": self.get_notes,
+            "search-notes": self.search_notes,
             "add-note": self.add_note,
             "edit-note": self.edit_note,
             "delete-note": self.delete_note,
@@ -51,27 +53,59 @@ class NoteCommandHandlers:
             "add-note-to-contact": self.add_note_to_contact
         }
 
-    def get_notes(self, args: list[str]) -> tuple[Result, str]:
+    def get_notes(self, args: list[str]) -> tuple[Result, str | Iterator[str]]:
         """
-        Shows all notes or notes filtered by tag.
+        Shows all notes or notes filtered by tag, read and printed page by page.
         Returns tuple: status, message
         """
-        if len(args) == 0:
-            notes = self.queries.get_notes()
-        elif len(args) == 1:
-            tag = args[0]
-            notes = self.queries.get_notes_by_tag(tag)
-        else:
-            return Result.ERROR, f"ERROR: 'get-notes' command accepts zero or one argument: [tag]. Provided {len(args)} value(s)"
-
-        if len(notes) == 0:
+        try:
+            options = parse_list_options("get-notes", args)
+        except ListOptionError as e:
+            return Result.ERROR, f"ERROR: {e}"
+
+        if len(options.arguments) > 1:
+            return Result.ERROR, f"ERROR: 'get-notes' command accepts zero or one argument: [tag]. Provided {len(options.arguments)} value(s)"
+        tag = options.arguments[0] if options.arguments else None
+
+        def fetch(limit: int, after: int | None, offset: int) -> list[Note]:
+            if tag is None:
+                return self.queries.get_notes(limit=limit, after=after, offset=offset, cache=False)
+            return self.queries.get_notes_by_tag(tag, limit=limit, after=after, offset=offset, cache=False)
+
+        pages = fetch_pages(fetch, lambda note: note.note_id, options)
+        first_page = next(pages, None)
+        if first_page is None:
             return Result.WARNING, "No notes found"
 
         def note_to_str(note: Note):
             tags = ", ".join([tag.label for tag in note.tags]) if note.tags else "No tags"
             return f"{note.text} | Tags: {tags}"
 
-        return Result.SUCCESS_DATA, "\n".join(map(note_to_str, notes))
+        def note_fields(note: Note) -> dict[str, FieldValue]:
+            return {"text": note.text, "tags": [tag.label for tag in note.tags]}
+
+        lines = render_pages(chain([first_page], pages), options.format, note_to_str, note_fields)
+        return Result.SUCCESS_DATA, lines
+
+    def search_notes(self, args: list[str]) -> tuple[Result, str]:
+        """
+        Shows notes matching the search words, best matches first.
+        Returns tuple: status, message
+        """
+        if len(args) == 0:
+            return Result.ERROR, "ERROR: 'search-notes' command accepts search words. Provided 0 value(s)"
+
+        search_text = " ".join(args)
+        results = self.queries.search_notes(search_text)
+
+        if len(results) == 0:
+            return Result.WARNING, f"No notes found for '{search_text}'"
+
+        def result_to_str(result: NoteSearchResult):
+            tags = ", ".join([tag.label for tag in result.note.tags]) if result.note.tags else "No tags"
+            return f"{result.snippet} | Tags: {tags}"
+
+        return Result.SUCCESS_DATA, "\n".join(map(result_to_str, results))
 
     def get_contact_notes(self, args: list[str]) -> tuple[Result, str]:
         """
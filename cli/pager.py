@@ -0,0 +1,59 @@
+"""
+Built-in pager of the interactive CLI.
+
+This module pauses long command output after every screen and waits for
+Enter before the next one; q stops the output, and the rows that were not
+shown are then not read from the database at all. The pager is used only
+when stdout is a terminal and can be turned off with Magic_PAGER=off.
+"""
+
+import os
+import shutil
+import sys
+from collections.abc import Callable
+from math import ceil
+from colorama import Fore
+
+MORE_PROMPT = "-- More -- Enter: next page, q: quit "
+
+
+class Pager:
+    # Screen rows shown before pausing
+    page_lines: int
+    # Width of the screen, longer lines wrap to several rows
+    columns: int | None
+    read_answer: Callable[[str], str]
+
+    def __init__(self, page_lines: int, columns: int | None = None, read_answer: Callable[[str], str] = input):
+        self.page_lines = max(page_lines, 1)
+        self.columns = columns
+        self.read_answer = read_answer
+
+    def rows(self, line: str) -> int:
+        """
+        Screen rows the line takes
+        """
+        if not self.columns:
+            return 1
+        return sum(max(ceil(len(part) / self.columns), 1) for part in line.split("\n"))
+
+    def more(self) -> bool:
+        """
+        Asks whether to show the next page, returns False when the output should stop
+        """
+        try:
+            answer = self.read_answer(f"{Fore.LIGHTBLACK_EX}{MORE_PROMPT}{Fore.RESET}")
+        except (EOFError, KeyboardInterrupt):
+            return False
+        return answer.strip().lower() not in ("q", "quit")
+
+
+def terminal_pager() -> Pager | None:
+    """
+    Pager for a screen of the terminal, None when output is not paged
+    """
+    if os.getenv("Magic_PAGER", "on").lower() == "off" or not sys.stdout.isatty():
+        return None
+    # The last line of the screen is taken by the prompt of the pager
+    size = shutil.get_terminal_size()
+    return Pager(size.lines - 1, size.columns)
@@ -5,7 +5,7 @@ This module provides CLI command handlers for managing phone numbers
 associated with contacts, including add, edit, and delete operations.
 """
 
-from sqlalchemy import Engine
+from sqlalchemy import Connection, Engine
 from pydantic import ValidationError
 from cli.abstractions import Result
 from data.exceptions import ContactNotFound, PhoneAlreadyExists, PhoneNotFound
@@ -18,7 +18,7 @@ class PhoneCommandHandlers:
     commands: PhoneCommands
     queries: PhoneQueries
 
-    def __init__(self, engine: Engine):
+    def __init__(self, engine: Engine | Connection):
         self.commands = PhoneCommands(engine)
         self.queries = PhoneQueries(engine)
 
@@ -3,8 +3,11 @@ Command execution pipeline with exception handling.
 
 This module provides a safe execution wrapper for command handlers,
 catching and translating domain exceptions into user-friendly messages.
+Streamed output is read after the handler returns, an exception raised
+while reading it ends the output with the same message.
 """
 
+from collections.abc import Iterator
 from pydantic import ValidationError
 from cli.abstractions import CommandHandler, CommandResult, Result
 from data.exceptions import AlreadyExistsError, DomainError, NotFoundError
@@ -15,19 +18,34 @@ def execute_handler(handler: CommandHandler, args: list[str]) -> CommandResult:
     Executes command handler in a safe manner and handles generic exceptions
     """
     try:
-        return handler(args)
+        status, message = handler(args)
+        return status, message if isinstance(message, str) else _guarded(message)
 
-    except ValidationError as e:
-        return Result.WARNING, f"WARNING: Validation error. {e}"
+    except Exception as e:
+        return _error_result(e)
 
-    except NotFoundError:
-        return Result.WARNING, "WARNING: Item not found"
 
-    except AlreadyExistsError:
-        return Result.WARNING, "WARNING: Item already exists"
+def _guarded(lines: Iterator[str]) -> Iterator[str]:
+    try:
+        yield from lines
+    except Exception as e:
+        _, message = _error_result(e)
+        yield message
 
-    except DomainError as e:
-        return Result.ERROR, f"ERROR: Unhandled domain error.\n{e}"
 
-    except Exception as e:
-        return Result.ERROR, f"ERROR: Unhandled exception.\n{e}"
+def _error_result(error: Exception) -> tuple[Result, str]:
+    match error:
+        case ValidationError():
+            return Result.WARNING, f"WARNING: Validation error. {error}"
+
+        case NotFoundError():
+            return Result.WARNING, "WARNING: Item not found"
+
+        case AlreadyExistsError():
+            return Result.WARNING, "WARNING: Item already exists"
+
+        case DomainError():
+            return Result.ERROR, f"ERROR: Unhandled domain error.\n{error}"
+
+        case _:
+            return Result.ERROR, f"ERROR: Unhandled exception.\n{error}"
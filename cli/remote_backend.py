@@ -0,0 +1,97 @@
+"""
+Commands and completion of the CLI served by a running API server.
+
+This module is the counterpart of cli/backend.py for `magic8 --connect`:
+commands run in the API server, completions and auto-suggestions come from
+the completion index of the server. The completer and the auto-suggester
+ask for the same prompt text on every keystroke, one request answers both.
+"""
+
+import threading
+from collections.abc import Iterable
+from typing import override
+from prompt_toolkit.auto_suggest import AutoSuggest, Suggestion
+from prompt_toolkit.buffer import Buffer
+from prompt_toolkit.completion import CompleteEvent, Completer, Completion
+from prompt_toolkit.document import Document
+from cli.abstractions import CommandHandler, CommandResult, Result
+from cli.api_client import ApiClient, ApiError, RemoteCompletion, RemoteSqlStats
+
+
+class RemoteCompletions:
+    """
+    Completions of the server for the latest prompt text
+    """
+    def __init__(self, client: ApiClient):
+        self.client = client
+        self._latest: tuple[tuple[str, int], tuple[list[RemoteCompletion], str | None]] | None = None
+        self._lock = threading.Lock()
+
+    def get(self, document: Document) -> tuple[list[RemoteCompletion], str | None]:
+        key = (document.text, document.cursor_position)
+        with self._lock:
+            latest = self._latest
+        if latest is not None and latest[0] == key:
+            return latest[1]
+
+        try:
+            result = self.client.completions(*key)
+        except ApiError:
+            # Typing goes on without completions, a failed command reports the error
+            return [], None
+        with self._lock:
+            self._latest = (key, result)
+        return result
+
+
+class RemoteCompleter(Completer):
+    def __init__(self, completions: RemoteCompletions):
+        self.completions = completions
+
+    @override
+    def get_completions(self, document: Document, complete_event: CompleteEvent) -> Iterable[Completion]:
+        completions, _ = self.completions.get(document)
+        for completion in completions:
+            yield Completion(
+                completion.text,
+                start_position=completion.start_position,
+                display=completion.display,
+                display_meta=completion.meta or None,
+            )
+
+
+class RemoteAutoSuggest(AutoSuggest):
+    def __init__(self, completions: RemoteCompletions):
+        self.completions = completions
+
+    @override
+    def get_suggestion(self, buffer: Buffer, document: Document) -> Suggestion | None:
+        _, suggestion = self.completions.get(document)
+        return Suggestion(suggestion) if suggestion else None
+
+
+class RemoteBackend:
+    client: ApiClient
+    handlers: dict[str, CommandHandler]
+    commands: list[str]
+
+    def __init__(self, client: ApiClient):
+        self.client = client
+        self.handlers = client.handlers()
+        self.commands = ["hello", *self.handlers, "close", "exit", "history-clear"]
+        completions = RemoteCompletions(client)
+        self.completer = RemoteCompleter(completions)
+        self.auto_suggest = RemoteAutoSuggest(completions)
+
+    def execute(self, command: str, args: list[str]) -> tuple[CommandResult, RemoteSqlStats]:
+        """
+        Runs the command on the server, returns its result and the SQL statements it executed
+        """
+        try:
+            return self.client.execute(command, args)
+        except ApiError as ex:
+            return (Result.ERROR, f"ERROR: {ex}"), RemoteSqlStats(0, 0.0)
+
+
+def connect_backend(url: str | None = None) -> RemoteBackend:
+    return RemoteBackend(ApiClient(url))
@@ -6,13 +6,17 @@ including query handlers, domain commands and corresponding command handlers.
 """
 
 from pydantic import BaseModel
-from sqlalchemy import Engine
+from sqlalchemy import Connection, Engine
 
 
 class DatabaseAware:
-    engine: Engine
+    # A connection runs the handler in its transaction (CLI batch scripts). Query cache and
+    # write listeners are kept per engine, so handlers of a connection read past the cache and
+    # tell no listener about their writes; the owner of the transaction calls
+    # invalidate_all for the engine once the transaction ends.
+    engine: Engine | Connection
 
-    def __init__(self, engine: Engine):
+    def __init__(self, engine: Engine | Connection):
         self.engine = engine
 
 
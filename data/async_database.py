@@ -0,0 +1,20 @@
+"""
+Async database engine.
+
+This module opens the database configured in data/database.py through the
+aiosqlite driver for the async API routers and MCP tools. Connections use
+the same SQLite profile and instrumentation, and query results are cached
+in the same cache as the sync engine, so writes made through either engine
+invalidate them.
+"""
+
+from sqlalchemy.ext.asyncio import create_async_engine
+from data.database import configured_profile, database_path, get_database_engine, slow_query_ms
+from data.instrumentation import instrument
+from data.query_cache import share_query_cache
+from data.sqlite_profile import apply_profile, get_profile
+
+async_database_engine = create_async_engine(f"sqlite+aiosqlite:///{database_path.resolve()}")
+apply_profile(async_database_engine.sync_engine, get_profile(configured_profile))
+instrument(async_database_engine.sync_engine, slow_query_ms)
+share_query_cache(async_database_engine.sync_engine, get_database_engine())
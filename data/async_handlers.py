@@ -0,0 +1,29 @@
+"""
+Async counterparts of the query and command handlers.
+
+This module runs the existing handlers on an AsyncEngine the same way
+AsyncSession runs the ORM: the handler method executes in a greenlet and
+every database call inside it is awaited on the event loop through the
+aiosqlite driver. Handlers keep a single implementation, their caching and
+invalidation included, and async callers never block the event loop or
+occupy a worker thread while waiting for SQLite.
+"""
+
+from collections.abc import Callable
+from typing import Concatenate
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.util import greenlet_spawn
+from data.abstractions import DatabaseAware
+
+
+class AsyncHandler[H: DatabaseAware]:
+    handler: H
+
+    def __init__(self, handler_type: type[H], engine: AsyncEngine):
+        self.handler = handler_type(engine.sync_engine)
+
+    async def run[**P, R](self, method: Callable[Concatenate[H, P], R], *args: P.args, **kwargs: P.kwargs) -> R:
+        """
+        Awaits a method of the handler, e.g. `await queries.run(ContactQueries.get_contacts, limit, after)`
+        """
+        return await greenlet_spawn(method, self.handler, *args, **kwargs)
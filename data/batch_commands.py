@@ -0,0 +1,269 @@
+"""
+Batch executor for write commands.
+
+This module applies a sequence of CreateContact, CreatePhone, CreateEmail,
+CreateNote and AddTag commands with set-based statements: commands of a
+chunk are validated together against the database and each other, tags
+are resolved once, rows are written with executemany inserts and every
+chunk is committed once. Rejected commands are reported by their position
+in the sequence while the rest of the chunk is still applied; commands for
+a contact whose CreateContact was rejected are rejected with it, so they
+are not applied to another contact of the same name. A CreateContact may
+carry further phone numbers, numbers already stored are then skipped
+instead of rejecting the contact, which is rejected only when all of its
+numbers are taken.
+"""
+
+from collections.abc import Iterable, Sequence
+from dataclasses import dataclass, field
+from itertools import batched
+from typing import Any, TypeGuard
+from sqlalchemy import insert, select
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import InstrumentedAttribute, Session
+from data.abstractions import DatabaseCommandHandler
+from data.contact_commands import CreateContact
+from data.email_commands import CreateEmail
+from data.exceptions import ContactAlreadyExists, ContactNotCreated, ContactNotFound, EmailAlreadyExists, PhoneAlreadyExists
+from data.integrity import already_exists_error
+from data.models import Contact, ContactNote, ContactTag, Email, Note, Phone, Tag
+from data.note_commands import CreateNote
+from data.phone_commands import CreatePhone
+from data.query_cache import CONTACT_GRAPH, invalidates
+from data.tag_commands import AddTag
+
+type BatchCommand = CreateContact | CreatePhone | CreateEmail | CreateNote | AddTag
+
+# Values per IN (...) lookup, well below the SQLite limit of bound parameters
+LOOKUP_SIZE = 10_000
+
+
+@dataclass(frozen=True)
+class BatchItem:
+    command: BatchCommand
+    # Contact the command applies to: not used by CreateContact, optional for CreateNote
+    contact_name: str | None = None
+    # Further phone numbers of a CreateContact, added with it unless already stored
+    phone_numbers: tuple[str, ...] = ()
+
+
+@dataclass
+class BatchError:
+    index: int
+    error: Exception
+
+
+@dataclass
+class BatchResult:
+    applied: int = 0
+    commits: int = 0
+    # Phone numbers of created contacts skipped because they are already stored
+    skipped: int = 0
+    errors: list[BatchError] = field(default_factory=list)
+
+
+def find_existing[T](session: Session, column: InstrumentedAttribute[T], values: set[T]) -> set[T]:
+    existing: set[T] = set()
+    for lookup in batched(values, LOOKUP_SIZE):
+        existing.update(session.scalars(select(column).where(column.in_(lookup))))
+    return existing
+
+
+def find_ids[T](
+    session: Session,
+    key: InstrumentedAttribute[T],
+    id: InstrumentedAttribute[int],
+    values: set[T]
+) -> dict[T, int]:
+    ids: dict[T, int] = {}
+    for lookup in batched(values, LOOKUP_SIZE):
+        ids.update((value, value_id) for value_id, value in session.execute(select(id, key).where(key.in_(lookup))))
+    return ids
+
+
+class BatchCommands(DatabaseCommandHandler):
+    @invalidates(*CONTACT_GRAPH)
+    def execute(self, items: Iterable[BatchItem], chunk_size: int = 1000) -> BatchResult:
+        """
+        Applies the commands in order, committing once per chunk of `chunk_size` items.
+
+        When a chunk still fails on a constraint (e.g. a concurrent write took the same name),
+        it is replayed item by item within savepoints so only the conflicting items are rejected.
+        """
+        result = BatchResult()
+        # Names of rejected CreateContact commands, whose later commands are rejected too
+        rejected: set[str] = set()
+        for chunk in batched(enumerate(items), chunk_size):
+            with Session(self.engine) as session:
+                rejected_before = set(rejected)
+                try:
+                    errors, skipped = self._apply(session, chunk, rejected)
+                    session.commit()
+                except IntegrityError:
+                    session.rollback()
+                    rejected.clear()
+                    rejected.update(rejected_before)
+                    errors, skipped = self._apply_one_by_one(session, chunk, rejected)
+                    session.commit()
+
+            result.applied += len(chunk) - len(errors)
+            result.commits += 1
+            result.skipped += skipped
+            result.errors.extend(errors)
+        return result
+
+    def _apply_one_by_one(
+        self,
+        session: Session,
+        chunk: Sequence[tuple[int, BatchItem]],
+        rejected: set[str]
+    ) -> tuple[list[BatchError], int]:
+        errors: list[BatchError] = []
+        skipped = 0
+        for index, item in chunk:
+            try:
+                with session.begin_nested():
+                    item_errors, item_skipped = self._apply(session, [(index, item)], rejected)
+                errors.extend(item_errors)
+                skipped += item_skipped
+            except IntegrityError as error:
+                errors.append(BatchError(index, already_exists_error(error) or error))
+                if isinstance(item.command, CreateContact):
+                    rejected.add(item.command.name)
+        return errors, skipped
+
+    def _apply(
+        self,
+        session: Session,
+        chunk: Sequence[tuple[int, BatchItem]],
+        rejected: set[str]
+    ) -> tuple[list[BatchError], int]:
+        """
+        Validates the chunk against the database and writes the accepted commands without committing.
+        Names of rejected CreateContact commands are added to `rejected`, commands for them are rejected.
+        Returns the rejected commands and the number of skipped phone numbers of created contacts.
+        """
+        names: set[str] = set()
+        phone_numbers: set[str] = set()
+        email_addresses: set[str] = set()
+        for _, item in chunk:
+            match item.command:
+                case CreateContact(name=name, phone_number=phone_number):
+                    names.add(name)
+                    phone_numbers.add(phone_number)
+                    phone_numbers.update(item.phone_numbers)
+                case CreatePhone(phone_number=phone_number):
+                    phone_numbers.add(phone_number)
+                case CreateEmail(email_address=email_address):
+                    email_addresses.add(email_address)
+                case _:
+                    pass
+            if item.contact_name is not None:
+                names.add(item.contact_name)
+
+        contact_ids = find_ids(session, Contact.name, Contact.contact_id, names)
+        existing_phones = find_existing(session, Phone.phone_number, phone_numbers)
+        existing_emails = find_existing(session, Email.email_address, email_addresses)
+
+        errors: list[BatchError] = []
+        # Created contacts with the phone numbers they get
+        new_contacts: list[tuple[CreateContact, list[str]]] = []
+        new_phones: list[tuple[str, str]] = []
+        new_emails: list[tuple[str, str]] = []
+        new_tags: list[tuple[str, str]] = []
+        new_notes: list[tuple[str | None, str]] = []
+        created: set[str] = set()
+        skipped = 0
+
+        def contact_known(name: str | None) -> TypeGuard[str]:
+            # Contacts created later in the batch are not known yet, same as running commands one by one
+            return name is not None and (name in contact_ids or name in created)
+
+        for index, item in chunk:
+            command, contact_name = item.command, item.contact_name
+            error: Exception | None = None
+            match command:
+                case CreateContact():
+                    numbers = list(dict.fromkeys((command.phone_number, *item.phone_numbers)))
+                    new_numbers = [number for number in numbers if number not in existing_phones]
+                    if contact_known(command.name):
+                        error = ContactAlreadyExists()
+                    elif not new_numbers:
+                        error = PhoneAlreadyExists()
+                    else:
+                        created.add(command.name)
+                        rejected.discard(command.name)
+                        existing_phones.update(new_numbers)
+                        new_contacts.append((command, new_numbers))
+                        skipped += len(numbers) - len(new_numbers)
+                    if error is not None:
+                        rejected.add(command.name)
+                case _ if contact_name in rejected:
+                    error = ContactNotCreated()
+                case CreatePhone() if contact_known(contact_name):
+                    if command.phone_number in existing_phones:
+                        error = PhoneAlreadyExists()
+                    else:
+                        existing_phones.add(command.phone_number)
+                        new_phones.append((contact_name, command.phone_number))
+                case CreateEmail() if contact_known(contact_name):
+                    if command.email_address in existing_emails:
+                        error = EmailAlreadyExists()
+                    else:
+                        existing_emails.add(command.email_address)
+                        new_emails.append((contact_name, command.email_address))
+                case AddTag() if contact_known(contact_name):
+                    new_tags.append((contact_name, command.label))
+                case CreateNote() if contact_name is None or contact_known(contact_name):
+                    new_notes.append((contact_name, command.text))
+                case _:
+                    error = ContactNotFound()
+            if error is not None:
+                errors.append(BatchError(index, error))
+
+        if new_contacts:
+            inserted = session.execute(
+                insert(Contact).returning(Contact.contact_id, Contact.name),
+                [{"name": command.name, "date_of_birth": command.date_of_birth} for command, _ in new_contacts]
+            )
+            contact_ids.update((name, contact_id) for contact_id, name in inserted)
+            new_phones[:0] = [(command.name, number) for command, numbers in new_contacts for number in numbers]
+
+        if new_phones:
+            _ = session.execute(insert(Phone), [
+                {"contact_id": contact_ids[name], "phone_number": phone_number} for name, phone_number in new_phones
+            ])
+
+        if new_emails:
+            _ = session.execute(insert(Email), [
+                {"contact_id": contact_ids[name], "email_address": email_address} for name, email_address in new_emails
+            ])
+
+        if new_tags:
+            labels = {label for _, label in new_tags}
+            tag_ids = find_ids(session, Tag.label, Tag.tag_id, labels)
+            missing = [{"label": label} for label in labels if label not in tag_ids]
+            if missing:
+                inserted = session.execute(insert(Tag).returning(Tag.tag_id, Tag.label), missing)
+                tag_ids.update((label, tag_id) for tag_id, label in inserted)
+            # Tags already assigned to the contact are kept as they are
+            _ = session.execute(sqlite_insert(ContactTag).on_conflict_do_nothing(), [
+                {"contact_id": contact_ids[name], "tag_id": tag_ids[label]}
+                for name, label in dict.fromkeys(new_tags)
+            ])
+
+        if new_notes:
+            note_ids = session.scalars(
+                insert(Note).returning(Note.note_id, sort_by_parameter_order=True),
+                [{"text": text} for _, text in new_notes]
+            ).all()
+            contact_notes: list[dict[str, Any]] = [
+                {"contact_id": contact_ids[name], "note_id": note_id}
+                for (name, _), note_id in zip(new_notes, note_ids)
+                if name is not None
+            ]
+            if contact_notes:
+                _ = session.execute(insert(ContactNote), contact_notes)
+
+        return errors, skipped
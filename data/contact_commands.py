@@ -3,15 +3,20 @@ Command handlers for contact-related write operations.
 
 This module provides database write operations for contacts,
 including creation, update, deletion, and tag management.
+Duplicate names and phone numbers are rejected by the unique constraints
+of the schema, or checked for first where a legacy database lacks them
+(see data/integrity.py); written rows are returned by INSERT/UPDATE ... RETURNING.
 """
 
 from datetime import date
 from pydantic import Field
-from sqlalchemy import select
+from sqlalchemy import ColumnElement, select, update
 from sqlalchemy.orm import Session
 from data.abstractions import DomainCommand, DatabaseCommandHandler
-from data.exceptions import ContactAlreadyExists, ContactNotFound, PhoneAlreadyExists, TagNotFound
+from data.exceptions import ContactNotFound, TagNotFound
+from data.integrity import ensure_unique, unique_constraints
 from data.models import Contact, Phone, Tag
+from data.query_cache import CONTACT_GRAPH, CONTACTS, PHONES, TAGS, invalidates
 from data.tag_commands import AddTag, RemoveTag
 from data.validation import phone_number_pattern
 
@@ -28,15 +33,12 @@ class UpdateContact(DomainCommand):
 
 
 class ContactCommands(DatabaseCommandHandler):
+    @invalidates(CONTACTS, PHONES)
     def add_contact(self, command: CreateContact) -> Contact:
-        with Session(self.engine) as session:
-            duplicate = session.scalar(select(Contact).where(Contact.name == command.name))
-            if duplicate:
-                raise ContactAlreadyExists()
-
-            duplicate = session.scalar(select(Phone).where(Phone.phone_number == command.phone_number))
-            if duplicate:
-                raise PhoneAlreadyExists()
+        # Objects stay loaded after commit, relationships of the new contact are known to be empty
+        with Session(self.engine, expire_on_commit=False) as session, unique_constraints():
+            ensure_unique(session, Contact.name, command.name)
+            ensure_unique(session, Phone.phone_number, command.phone_number)
 
             phone = Phone()
             phone.phone_number = command.phone_number
@@ -44,58 +46,42 @@ class ContactCommands(DatabaseCommandHandler):
             contact = Contact()
             contact.name = command.name
             contact.date_of_birth = command.date_of_birth
-            contact.phones.append(phone)
+            contact.phones = [phone]
+            contact.emails = []
+            contact.notes = []
+            contact.tags = []
 
             session.add(contact)
             session.commit()
-            session.refresh(contact)
             session.expunge(contact)
             return contact
 
+    @invalidates(CONTACTS)
     def update_contact(self, contact_id: int, command: UpdateContact) -> Contact:
-        with Session(self.engine) as session:
-            contact = session.get(Contact, contact_id)
-            if not contact:
-                raise ContactNotFound()
-
-            duplicate = session.scalar(
-                select(Contact).where(
-                    Contact.contact_id != contact_id,
-                    Contact.name == command.name
-                )
-            )
-            if duplicate:
-                raise ContactAlreadyExists()
-
-            contact.name = command.name
-            contact.date_of_birth = command.date_of_birth
-            session.commit()
-            session.refresh(contact)
-            session.expunge(contact)
-            return contact
+        return self._update_contact_where(Contact.contact_id == contact_id, command)
 
+    @invalidates(CONTACTS)
     def update_contact_by_name(self, contact_name: str, command: UpdateContact) -> Contact:
-        with Session(self.engine) as session:
-            contact = session.scalar(select(Contact).where(Contact.name == contact_name))
+        return self._update_contact_where(Contact.name == contact_name, command)
+
+    def _update_contact_where(self, condition: ColumnElement[bool], command: UpdateContact) -> Contact:
+        with Session(self.engine, expire_on_commit=False) as session, unique_constraints():
+            ensure_unique(session, Contact.name, command.name, updated=condition)
+            query = (
+                update(Contact)
+                .where(condition)
+                .values(name=command.name, date_of_birth=command.date_of_birth)
+                .returning(Contact)
+            )
+            contact = session.scalar(query)
             if not contact:
                 raise ContactNotFound()
 
-            duplicate = session.scalar(
-                select(Contact).where(
-                    Contact.contact_id != contact.contact_id,
-                    Contact.name == command.name
-                )
-            )
-            if duplicate:
-                raise ContactAlreadyExists()
-
-            contact.name = command.name
-            contact.date_of_birth = command.date_of_birth
             session.commit()
-            session.refresh(contact)
             session.expunge(contact)
             return contact
 
+    @invalidates(*CONTACT_GRAPH)
     def delete_contact(self, contact_id: int) -> None:
         with Session(self.engine) as session:
             contact = session.get(Contact, contact_id)
@@ -105,6 +91,7 @@ class ContactCommands(DatabaseCommandHandler):
             session.delete(contact)
             session.commit()
 
+    @invalidates(*CONTACT_GRAPH)
     def delete_contact_by_name(self, contact_name: str) -> None:
         with Session(self.engine) as session:
             query = select(Contact).where(Contact.name == contact_name)
@@ -115,6 +102,7 @@ class ContactCommands(DatabaseCommandHandler):
             session.delete(contact)
             session.commit()
 
+    @invalidates(TAGS)
     def add_tag_to_contact(self, contact_id: int, command: AddTag) -> Contact:
         with Session(self.engine) as session:
             contact = session.get(Contact, contact_id)
@@ -136,6 +124,7 @@ class ContactCommands(DatabaseCommandHandler):
             session.refresh(contact)
             return contact
 
+    @invalidates(TAGS)
     def add_tag_to_contact_by_name(self, contact_name: str, command: AddTag) -> None:
         with Session(self.engine) as session:
             contact = session.scalar(select(Contact).where(Contact.name == contact_name))
@@ -155,6 +144,7 @@ class ContactCommands(DatabaseCommandHandler):
             session.add(contact)
             session.commit()
 
+    @invalidates(TAGS)
     def remove_tag_from_contact(self, contact_id: int, command: RemoveTag) -> None:
         with Session(self.engine) as session:
             contact = session.get(Contact, contact_id)
@@ -171,6 +161,7 @@ class ContactCommands(DatabaseCommandHandler):
             contact.tags.remove(tag)
             session.commit()
 
+    @invalidates(TAGS)
     def remove_tag_from_contact_by_name(self, contact_name: str, command: RemoveTag) -> None:
         with Session(self.engine) as session:
             contact = session.scalar(select(Contact).where(Contact.name == contact_name))
@@ -178,7 +169,7 @@ class ContactCommands(DatabaseCommandHandler):
                 raise ContactNotFound()
 
             tag = session.scalar(select(Tag).where(
-                Tag.contacts.has(Contact.contact_id == contact.contact_id),
+                Tag.contacts.any(Contact.contact_id == contact.contact_id),
                 Tag.label == command.label))
 
             if not tag:
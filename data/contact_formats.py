@@ -0,0 +1,400 @@
+"""
+Streaming readers and writers of address book files.
+
+This module reads contacts from CSV files (own export, Google and Outlook
+style headers) and vCard 3.0/4.0 files one record at a time, so files of
+any size are parsed in constant memory. Values are normalized to the
+formats accepted by the domain commands; values that cannot be normalized
+are left out of the record.
+
+Contacts are written as NDJSON, CSV or vCard 3.0 the same way, record by
+record, in text chunks ready to be sent or written.
+"""
+
+import csv
+import io
+import json
+import re
+from collections.abc import Callable, Iterable, Iterator
+from dataclasses import dataclass, field
+from datetime import date, datetime
+from itertools import chain, repeat
+from typing import Literal, get_args
+from data.validation import email_address_pattern, phone_number_pattern
+
+type ContactFormat = Literal["csv", "vcard"]
+type ExportFormat = Literal["ndjson", "csv", "vcard"]
+
+contact_formats: tuple[str, ...] = get_args(ContactFormat.__value__)
+
+# Separators of several values in one CSV cell: own export and Google Contacts
+multi_value_separator = re.compile(r"\s*(?:;|:::)\s*")
+tag_separator = re.compile(r"\s*(?:,|;|:::)\s*")
+birthday_formats = ["%Y-%m-%d", "%Y%m%d", "%d.%m.%Y"]
+
+# Written text is sent in chunks of about this many characters
+WRITE_CHUNK_SIZE = 64 * 1024
+# vCard lines longer than this are folded
+VCARD_LINE_LENGTH = 75
+
+export_media_types: dict[str, str] = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv",
+    "vcard": "text/vcard",
+}
+export_extensions: dict[str, str] = {
+    "ndjson": "ndjson",
+    "csv": "csv",
+    "vcard": "vcf",
+}
+
+
+@dataclass
+class ContactRecord:
+    # Position of the record in the file, starting at 1
+    record: int
+    name: str
+    phone_numbers: list[str] = field(default_factory=list)
+    email_addresses: list[str] = field(default_factory=list)
+    date_of_birth: date | None = None
+    tags: list[str] = field(default_factory=list)
+    notes: list[str] = field(default_factory=list)
+
+
+def normalize_phone_number(value: str) -> str | None:
+    """
+    Phone number as 10 digits, the Ukrainian country code is dropped.
+    Returns None when the number has another format.
+    """
+    digits = "".join(character for character in value if character.isdigit())
+    if len(digits) == 12 and digits.startswith("380"):
+        digits = digits[2:]
+    return digits if re.match(phone_number_pattern, digits) else None
+
+
+def normalize_email_address(value: str) -> str | None:
+    value = value.strip()
+    return value if re.match(email_address_pattern, value) else None
+
+
+def parse_birthday(value: str) -> date | None:
+    """
+    Birthday from ISO (1990-05-15, 19900515), vCard date-time or the CLI format (15.05.1990).
+    Birthdays without year (--0515) are not supported and return None.
+    """
+    value = value.strip().split("T")[0]
+    for birthday_format in birthday_formats:
+        try:
+            return datetime.strptime(value, birthday_format).date()
+        except ValueError:
+            continue
+    return None
+
+
+def _unique[T](values: Iterable[T | None]) -> list[T]:
+    return [value for value in dict.fromkeys(values) if value is not None]
+
+
+def detect_format(file_name: str | None, first_line: str) -> ContactFormat:
+    """
+    Format by file extension, otherwise by the first line of the file
+    """
+    if file_name:
+        extension = file_name.rsplit(".", 1)[-1].lower()
+        if extension in ["vcf", "vcard"]:
+            return "vcard"
+        if extension == "csv":
+            return "csv"
+    return "vcard" if first_line.lstrip("\ufeff").strip().upper() == "BEGIN:VCARD" else "csv"
+
+
+def read_contacts(lines: Iterable[str], format: ContactFormat | None = None, file_name: str | None = None) -> Iterator[ContactRecord]:
+    """
+    Reads contacts from lines of a CSV or vCard file, the format is detected when not given
+    """
+    lines = iter(lines)
+    if format is None:
+        first_line = next(lines, "")
+        format = detect_format(file_name, first_line)
+        lines = chain([first_line], lines)
+
+    if format == "vcard":
+        return read_vcard(lines)
+    return read_csv(lines)
+
+
+# CSV
+
+def _header_role(header: str) -> str | None:
+    header = header.strip().lower().replace("_", " ").replace("-", " ")
+    # Type and label columns describe the value column next to them
+    if header.endswith(" type") or header.endswith(" label"):
+        return None
+    if header in ["name", "full name", "display name"]:
+        return "name"
+    if header in ["first name", "given name"]:
+        return "first name"
+    if header in ["last name", "family name"]:
+        return "last name"
+    if "phone" in header or header in ["mobile", "tel", "telephone"]:
+        return "phone"
+    if "mail" in header:
+        return "email"
+    if header in ["birthday", "date of birth", "dob", "bday"]:
+        return "birthday"
+    if header in ["tags", "labels", "groups", "categories", "group membership"]:
+        return "tags"
+    # Own export writes one column per note: note1, note2, ...
+    if re.fullmatch(r"notes?( ?\d+)?", header):
+        return "note"
+    return None
+
+
+def read_csv(lines: Iterable[str]) -> Iterator[ContactRecord]:
+    """
+    Reads contacts from CSV lines with a header row.
+    Several phones, e-mails or tags can be given in separate columns or in one cell.
+    """
+    reader = csv.reader(line.lstrip("\ufeff") for line in lines)
+    header = next(reader, None)
+    if header is None:
+        return
+    roles = [_header_role(column) for column in header]
+    # Cells past the header are further notes when the header ends with a note column
+    roles_past_header = repeat("note" if roles and roles[-1] == "note" else None)
+
+    for record, row in enumerate(reader, start=1):
+        if not any(cell.strip() for cell in row):
+            continue
+
+        values: dict[str, list[str]] = {}
+        for role, cell in zip(chain(roles, roles_past_header), row):
+            cell = cell.strip()
+            if role is not None and cell:
+                values.setdefault(role, []).append(cell)
+
+        name = " ".join(values.get("name", [])[:1]) or " ".join(values.get("first name", []) + values.get("last name", []))
+        birthdays = values.get("birthday", [])
+        yield ContactRecord(
+            record=record,
+            name=name,
+            phone_numbers=_unique(
+                normalize_phone_number(phone)
+                for cell in values.get("phone", []) for phone in multi_value_separator.split(cell)
+            ),
+            email_addresses=_unique(
+                normalize_email_address(email)
+                for cell in values.get("email", []) for email in multi_value_separator.split(cell)
+            ),
+            date_of_birth=parse_birthday(birthdays[0]) if birthdays else None,
+            tags=_unique(tag for cell in values.get("tags", []) for tag in tag_separator.split(cell) if tag),
+            notes=values.get("note", []),
+        )
+
+
+# vCard
+
+def _unfold(lines: Iterable[str]) -> Iterator[str]:
+    """
+    Joins continuation lines, which start with a space or a tab
+    """
+    current: str | None = None
+    for line in lines:
+        line = line.rstrip("\r\n")
+        if line[:1] in [" ", "\t"] and current is not None:
+            current += line[1:]
+            continue
+        if current is not None:
+            yield current
+        current = line.lstrip("\ufeff")
+    if current is not None:
+        yield current
+
+
+def _split_escaped(value: str, separator: str) -> list[str]:
+    """
+    Splits a vCard value on unescaped separators and unescapes the parts
+    """
+    parts: list[str] = []
+    current: list[str] = []
+    characters = iter(value)
+    for character in characters:
+        if character == "\\":
+            escaped = next(characters, "")
+            current.append("\n" if escaped in ["n", "N"] else escaped)
+        elif character == separator:
+            parts.append("".join(current))
+            current = []
+        else:
+            current.append(character)
+    parts.append("".join(current))
+    return parts
+
+
+def _unescape(value: str) -> str:
+    return _split_escaped(value, "")[0]
+
+
+def read_vcard(lines: Iterable[str]) -> Iterator[ContactRecord]:
+    """
+    Reads contacts from vCard 3.0/4.0 lines, any number of cards per file
+    """
+    record = 0
+    properties: list[tuple[str, str]] | None = None
+
+    for line in _unfold(lines):
+        if ":" not in line:
+            continue
+        key, value = line.split(":", 1)
+        # group.NAME;PARAM=...
+        name = key.split(";", 1)[0].rsplit(".", 1)[-1].upper()
+
+        if name == "BEGIN" and value.strip().upper() == "VCARD":
+            properties = []
+        elif name == "END" and value.strip().upper() == "VCARD" and properties is not None:
+            record += 1
+            yield _vcard_contact(record, properties)
+            properties = None
+        elif properties is not None:
+            properties.append((name, value))
+
+
+def _vcard_contact(record: int, properties: list[tuple[str, str]]) -> ContactRecord:
+    values: dict[str, list[str]] = {}
+    for name, value in properties:
+        values.setdefault(name, []).append(value)
+
+    full_names = values.get("FN", [])
+    if full_names:
+        full_name = _unescape(full_names[0]).strip()
+    else:
+        # N:Family;Given;Additional;Prefix;Suffix
+        family, given, *_ = _split_escaped(values.get("N", [";"])[0], ";") + [""]
+        full_name = f"{given} {family}".strip()
+
+    birthdays = values.get("BDAY", [])
+    return ContactRecord(
+        record=record,
+        name=full_name,
+        # TEL can be a URI in vCard 4.0: tel:+380-50-123-4567
+        phone_numbers=_unique(normalize_phone_number(phone.removeprefix("tel:")) for phone in values.get("TEL", [])),
+        email_addresses=_unique(normalize_email_address(_unescape(email)) for email in values.get("EMAIL", [])),
+        date_of_birth=parse_birthday(birthdays[0]) if birthdays else None,
+        tags=_unique(
+            tag.strip() or None
+            for categories in values.get("CATEGORIES", []) for tag in _split_escaped(categories, ",")
+        ),
+        notes=[_unescape(note) for note in values.get("NOTE", [])],
+    )
+
+
+# Writers
+
+def write_contacts(
+    contacts: Iterable[ContactRecord],
+    format: ExportFormat,
+    count_note_columns: Callable[[], int] | None = None
+) -> Iterator[str]:
+    """
+    Writes contacts in the format, yielding text in chunks of about WRITE_CHUNK_SIZE characters.
+    The first piece of text (CSV header or the first contact) is yielded on its own right away.
+    count_note_columns returns the number of note columns of CSV, the most notes of one contact;
+    it is called for CSV only, when the header is written.
+    """
+    if format == "csv":
+        texts = write_csv(contacts, count_note_columns() if count_note_columns else 1)
+    else:
+        writers = {"ndjson": write_ndjson, "vcard": write_vcard}
+        texts = writers[format](contacts)
+    first = next(texts, None)
+    if first is None:
+        return
+    yield first
+
+    buffer: list[str] = []
+    size = 0
+    for text in texts:
+        buffer.append(text)
+        size += len(text)
+        if size >= WRITE_CHUNK_SIZE:
+            yield "".join(buffer)
+            buffer, size = [], 0
+    if buffer:
+        yield "".join(buffer)
+
+
+def write_ndjson(contacts: Iterable[ContactRecord]) -> Iterator[str]:
+    """
+    One JSON object per line, with the same field names as the REST API
+    """
+    for contact in contacts:
+        yield json.dumps({
+            "name": contact.name,
+            "dateOfBirth": contact.date_of_birth.isoformat() if contact.date_of_birth else None,
+            "phones": contact.phone_numbers,
+            "emails": contact.email_addresses,
+            "tags": contact.tags,
+            "notes": contact.notes,
+        }, ensure_ascii=False) + "\n"
+
+
+def write_csv(contacts: Iterable[ContactRecord], note_columns: int = 1) -> Iterator[str]:
+    """
+    CSV readable by read_csv. Several phones, e-mails and tags are separated
+    by ';' in one cell, every note has a column of its own: note1, note2, ...
+    Notes of a contact with more notes than note_columns are written in cells past the header.
+    """
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator="\n")
+
+    def row(values: list[str]) -> str:
+        _ = buffer.seek(0)
+        _ = buffer.truncate()
+        _ = writer.writerow(values)
+        return buffer.getvalue()
+
+    yield row(["name", "phones", "emails", "birthday", "tags", *(f"note{number}" for number in range(1, max(note_columns, 1) + 1))])
+    for contact in contacts:
+        yield row([
+            contact.name,
+            ";".join(contact.phone_numbers),
+            ";".join(contact.email_addresses),
+            contact.date_of_birth.isoformat() if contact.date_of_birth else "",
+            ";".join(contact.tags),
+            *contact.notes,
+        ])
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace(",", "\\,").replace(";", "\\;").replace("\n", "\\n")
+
+
+def _fold(line: str) -> str:
+    """
+    Splits a content line into lines of at most VCARD_LINE_LENGTH characters, continued with a space
+    """
+    parts = [line[:VCARD_LINE_LENGTH]]
+    parts += [" " + line[start:start + VCARD_LINE_LENGTH - 1] for start in range(VCARD_LINE_LENGTH, len(line), VCARD_LINE_LENGTH - 1)]
+    return "\r\n".join(parts) + "\r\n"
+
+
+def write_vcard(contacts: Iterable[ContactRecord]) -> Iterator[str]:
+    """
+    vCard 3.0, one card per contact
+    """
+    for contact in contacts:
+        lines = [
+            "BEGIN:VCARD",
+            "VERSION:3.0",
+            f"FN:{_escape(contact.name)}",
+            f"N:{_escape(contact.name)};;;;",
+            *(f"TEL;TYPE=CELL:{phone}" for phone in contact.phone_numbers),
+            *(f"EMAIL;TYPE=INTERNET:{email}" for email in contact.email_addresses),
+        ]
+        if contact.date_of_birth:
+            lines.append(f"BDAY:{contact.date_of_birth.isoformat()}")
+        if contact.tags:
+            lines.append(f"CATEGORIES:{",".join(map(_escape, contact.tags))}")
+        lines += [f"NOTE:{_escape(note)}" for note in contact.notes]
+        lines.append("END:VCARD")
+        yield "".join(map(_fold, lines))
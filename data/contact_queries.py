@@ -3,45 +3,203 @@ Query handlers for contact-related database operations.
 
 This module provides read-only database operations for contacts,
 including retrieval by ID, name, tag, and birthday reminder functionality.
+Contact lists support keyset pagination by contact id, an eager-load plan
+chosen by the caller, and column-only projections for names and summaries.
 """
 
 import calendar
 from datetime import date, timedelta
-from sqlalchemy import select
+from sqlalchemy import ColumnElement, func, null, or_, select
 from sqlalchemy.orm import Session
 from data.abstractions import DatabaseQueryHandler
-from data.models import BirthdayReminder, Contact, Tag
+from data.load_plans import LoadPlan
+from data.models import BirthdayReminder, Contact, ContactSummary, ContactTag, Phone, Tag
+from data.pagination import keyset_page
+from data.query_cache import CONTACT_GRAPH, CONTACTS, PHONES, TAGS, cached
+
+# Separator of aggregated values, cannot appear in phone numbers or tag labels typed by users
+AGGREGATE_SEPARATOR = "\x1f"
+
+# Birthdays on Saturday and Sunday are celebrated up to two days later, on Monday
+MAX_WEEKEND_SHIFT_DAYS = 2
+
+
+def birthday_ordinal(day: date) -> int:
+    """
+    Month and day as MMDD number, same as Contact.birthday_ordinal
+    """
+    return day.month * 100 + day.day
+
+
+def birthday_window_condition(start: date, end: date) -> ColumnElement[bool] | None:
+    """
+    Condition on Contact.birthday_ordinal selecting contacts whose birthday
+    falls between start and end (inclusive), which can span a new year.
+    Returns None when the window covers the whole year.
+    """
+    if (end - start).days >= 365:
+        return None
+
+    first, last = birthday_ordinal(start), birthday_ordinal(end)
+    if start.year == end.year:
+        ranges = [(first, last)]
+    else:
+        ranges = [(first, 1231), (101, last)]
+
+    # Born on February 29 are celebrated on March 1 in non-leap years
+    march_first = birthday_ordinal(date(2001, 3, 1))
+    if any(low <= march_first <= high for low, high in ranges):
+        ranges.append((229, 229))
+
+    return or_(*[Contact.birthday_ordinal.between(low, high) for low, high in ranges])
+
+
+def _split_aggregate(value: str | None) -> tuple[str, ...]:
+    return tuple(value.split(AGGREGATE_SEPARATOR)) if value else ()
 
 
 class ContactQueries(DatabaseQueryHandler):
-    def get_contacts(self) -> list[Contact]:
+    @cached(*CONTACT_GRAPH)
+    def get_contacts(
+        self,
+        limit: int | None = None,
+        after: int | None = None,
+        load: LoadPlan = ()
+    ) -> list[Contact]:
         with Session(self.engine) as session:
-            query = select(Contact)
+            query = keyset_page(select(Contact).options(*load), Contact.contact_id, limit, after)
             contacts = session.scalars(query)
             return list(contacts)
 
-    def get_contacts_by_tag(self, tag: str) -> list[Contact]:
+    @cached(*CONTACT_GRAPH)
+    def get_contacts_by_tag(
+        self,
+        tag: str,
+        limit: int | None = None,
+        after: int | None = None,
+        load: LoadPlan = ()
+    ) -> list[Contact]:
         with Session(self.engine) as session:
-            query = select(Contact).join(Contact.tags).where(Tag.label == tag)
+            query = (
+                select(Contact)
+                .options(*load)
+                .join(ContactTag, ContactTag.contact_id == Contact.contact_id)
+                .join(Tag, Tag.tag_id == ContactTag.tag_id)
+                .where(Tag.label == tag)
+            )
+            # Paging by the association key reads contacts in ix_contact_tags_tag_id order without sorting
+            query = keyset_page(query, ContactTag.contact_id, limit, after)
             contacts = session.scalars(query)
             return list(contacts)
 
-    def get_contact_by_id(self, contact_id: int) -> Contact | None:
+    @cached(*CONTACT_GRAPH)
+    def get_contact_by_id(self, contact_id: int, load: LoadPlan = ()) -> Contact | None:
         with Session(self.engine) as session:
-            query = select(Contact).where(Contact.contact_id == contact_id)
+            query = select(Contact).options(*load).where(Contact.contact_id == contact_id)
             contact = session.scalar(query)
             return contact
 
-    def get_contact_by_name(self, contact_name: str) -> Contact | None:
+    @cached(*CONTACT_GRAPH)
+    def get_contact_by_name(self, contact_name: str, load: LoadPlan = ()) -> Contact | None:
         with Session(self.engine) as session:
-            query = select(Contact).where(Contact.name == contact_name)
+            query = select(Contact).options(*load).where(Contact.name == contact_name)
             contact = session.scalar(query)
             return contact
 
-    def get_contacts_with_birthdays_in_days(self, days_before_reminder: int) -> list[BirthdayReminder]:
+    @cached(CONTACTS)
+    def get_contact_names(self) -> list[str]:
+        """
+        Names of all contacts in alphabetical order, without loading contacts
+        """
+        with Session(self.engine) as session:
+            query = select(Contact.name).order_by(Contact.name)
+            return list(session.scalars(query))
+
+    @cached(CONTACTS)
+    def get_contact_ids_and_names(
+        self,
+        contact_ids: list[int] | None = None,
+        cache: bool = True
+    ) -> list[tuple[int, str]]:
+        """
+        Ids and names of all contacts or of the contacts with the ids, without loading contacts
+        """
+        with Session(self.engine) as session:
+            query = select(Contact.contact_id, Contact.name)
+            if contact_ids is not None:
+                query = query.where(Contact.contact_id.in_(contact_ids))
+            return [(contact_id, name) for contact_id, name in session.execute(query)]
+
+    @cached(CONTACTS, PHONES, TAGS)
+    def get_contact_summaries(
+        self,
+        tag: str | None = None,
+        limit: int | None = None,
+        after: int | None = None,
+        with_phones: bool = False,
+        with_tags: bool = False,
+        offset: int | None = None,
+        cache: bool = True
+    ) -> list[ContactSummary]:
+        """
+        Contacts as compact rows read with a single column-only query.
+        Phones and tags are aggregated by the database when requested.
+        """
+        phones = (
+            select(func.group_concat(Phone.phone_number, AGGREGATE_SEPARATOR))
+            .where(Phone.contact_id == Contact.contact_id)
+            .scalar_subquery()
+        )
+        tags = (
+            select(func.group_concat(Tag.label, AGGREGATE_SEPARATOR))
+            .join(ContactTag, ContactTag.tag_id == Tag.tag_id)
+            .where(ContactTag.contact_id == Contact.contact_id)
+            .scalar_subquery()
+        )
+
+        with Session(self.engine) as session:
+            query = select(
+                Contact.contact_id,
+                Contact.name,
+                Contact.date_of_birth,
+                phones if with_phones else null(),
+                tags if with_tags else null(),
+            )
+            if tag is not None:
+                query = query.where(
+                    Contact.contact_id.in_(
+                        select(ContactTag.contact_id)
+                        .join(Tag, Tag.tag_id == ContactTag.tag_id)
+                        .where(Tag.label == tag)
+                    )
+                )
+            query = keyset_page(query, Contact.contact_id, limit, after, offset)
+
+            return [
+                ContactSummary(
+                    contact_id=contact_id,
+                    name=name,
+                    date_of_birth=date_of_birth,
+                    phones=_split_aggregate(contact_phones),
+                    tags=_split_aggregate(contact_tags),
+                )
+                for contact_id, name, date_of_birth, contact_phones, contact_tags in session.execute(query)
+            ]
+
+    @cached(*CONTACT_GRAPH)
+    def get_contacts_with_birthdays_in_days(
+        self,
+        days_before_reminder: int,
+        today: date | None = None,
+        load: LoadPlan = ()
+    ) -> list[BirthdayReminder]:
         """
         Get contacts with birthdays in the next N days.
+
+        Candidates are selected by an index range scan over the birthday ordinal,
+        the exact celebration day of each candidate is then computed in Python.
         """
+        today = today or date.today()
 
         def get_workday_celebration_day_for(birthday: date) -> date:
             """
@@ -62,7 +220,6 @@ class ContactQueries(DatabaseQueryHandler):
             """
             Returns celebration day on current year or next.
             """
-            today = date.today()
             birthday = get_this_date_at_year(dob, today.year)
             # Get celebration date before comparison with today:
             # If birthday is on Saturday, and today is Sunday - we still can congratulate on Monday
@@ -75,10 +232,19 @@ class ContactQueries(DatabaseQueryHandler):
                 celebration = get_workday_celebration_day_for(birthday)
                 return celebration
 
+        if days_before_reminder < 0:
+            return []
+
+        window = birthday_window_condition(
+            today - timedelta(days=MAX_WEEKEND_SHIFT_DAYS),
+            today + timedelta(days=days_before_reminder)
+        )
+
         with Session(self.engine) as session:
-            query = select(Contact).where(Contact.date_of_birth.is_not(None))
+            query = select(Contact).options(*load).where(Contact.date_of_birth.is_not(None))
+            if window is not None:
+                query = query.where(window)
             contacts = session.scalars(query)
-            today = date.today()
             reminders: list[BirthdayReminder] = []
             for contact in contacts:
                 if contact.date_of_birth is None:
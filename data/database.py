@@ -1,20 +1,71 @@
 """
 Database initialization and configuration.
 
-This module sets up the SQLite database connection and creates all tables.
+This module sets up the SQLite database connection, creates all tables
+and adds indexes missing from databases created by older versions.
 The database location can be configured via the Magic_DB_PATH environment variable (for deployment),
 otherwise it defaults to the user's home directory.
+Connections use the SQLite profile named by the Magic_DB_PROFILE environment variable
+(durable, balanced or fast), balanced by default.
+Query results are cached in memory unless Magic_QUERY_CACHE is set to off.
+Statements slower than Magic_SLOW_QUERY_MS milliseconds (100 by default, off to disable) are logged.
+
+The engine is created and the schema checked on the first call of `get_database_engine()`
+(or use of `database_engine`),
+importing this module does not import SQLAlchemy or open the database.
 """
 
+from __future__ import annotations
 import os
+import threading
 from pathlib import Path
-from sqlalchemy import create_engine
-from data.models import Base
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from sqlalchemy import Engine
+
+    # Created by the module __getattr__ on first use
+    database_engine: Engine
 
 configured_path = os.getenv("Magic_DB_PATH")
 configured_name = "contacts.db"
+configured_profile = os.getenv("Magic_DB_PROFILE")
+configured_cache = os.getenv("Magic_QUERY_CACHE", "on")
+configured_slow_query_ms = os.getenv("Magic_SLOW_QUERY_MS", "100")
+slow_query_ms = None if configured_slow_query_ms.lower() == "off" else float(configured_slow_query_ms)
 
 database_path = Path(configured_path) / configured_name if configured_path else Path.home() / configured_name
-database_engine = create_engine(f"sqlite:///{database_path.resolve()}")
 
-Base.metadata.create_all(database_engine)
+_engine: Engine | None = None
+_engine_lock = threading.Lock()
+
+
+def get_database_engine() -> Engine:
+    """
+    Returns the application engine, created with the schema checked on the first call
+    """
+    global _engine
+    with _engine_lock:
+        if _engine is None:
+            from sqlalchemy import create_engine
+            from data.instrumentation import instrument
+            from data.query_cache import enable_query_cache
+            from data.schema import ensure_schema
+            from data.sqlite_profile import apply_profile, get_profile
+
+            engine = create_engine(f"sqlite:///{database_path.resolve()}")
+            apply_profile(engine, get_profile(configured_profile))
+            instrument(engine, slow_query_ms)
+            if configured_cache.lower() not in ("off", "0", "false"):
+                _ = enable_query_cache(engine)
+
+            ensure_schema(engine)
+            _engine = engine
+        return _engine
+
+
+def __getattr__(name: str) -> object:
+    # `from data.database import database_engine` keeps working, it creates the engine
+    if name == "database_engine":
+        return get_database_engine()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
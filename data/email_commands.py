@@ -3,14 +3,19 @@ Command handlers for email address-related write operations.
 
 This module provides database write operations for email addresses,
 including creation, update, and deletion.
+Duplicates are rejected by the unique constraint on emails.email_address
+(checked for first where a legacy database lacks it),
+written rows are returned by INSERT/UPDATE ... RETURNING.
 """
 
 from pydantic import Field
-from sqlalchemy import select
+from sqlalchemy import ColumnElement, insert, literal, select, update
 from sqlalchemy.orm import Session
 from data.abstractions import DomainCommand, DatabaseCommandHandler
-from data.exceptions import ContactNotFound, EmailAlreadyExists, EmailNotFound
+from data.exceptions import ContactNotFound, EmailNotFound
+from data.integrity import ensure_unique, unique_constraints
 from data.models import Contact, Email
+from data.query_cache import EMAILS, invalidates
 from data.validation import email_address_pattern
 
 
@@ -23,97 +28,64 @@ class UpdateEmail(DomainCommand):
 
 
 class EmailCommands(DatabaseCommandHandler):
+    @invalidates(EMAILS)
     def add_email_for_contact(self, contact_id: int, command: CreateEmail) -> Email:
-        with Session(self.engine) as session:
-            contact = session.scalar(select(Contact).where(Contact.contact_id == contact_id))
-            if not contact:
-                raise ContactNotFound()
-
-            duplicate = session.scalar(select(Email).where(Email.email_address == command.email_address))
-            if duplicate:
-                raise EmailAlreadyExists()
-
-            email = Email()
-            email.email_address = command.email_address
-
-            contact.emails.append(email)
-
-            session.add(email)
-            session.commit()
-            session.refresh(email)
-            session.expunge(email)
-            return email
+        return self._add_email_where(Contact.contact_id == contact_id, command)
 
+    @invalidates(EMAILS)
     def add_email_for_contact_by_name(self, contact_name: str, command: CreateEmail) -> Email:
-        with Session(self.engine) as session:
-            contact = session.scalar(select(Contact).where(Contact.name == contact_name))
-            if not contact:
-                raise ContactNotFound()
-
-            duplicate = session.scalar(select(Email).where(Email.email_address == command.email_address))
-            if duplicate:
-                raise EmailAlreadyExists()
-
-            email = Email()
-            email.email_address = command.email_address
-
-            contact.emails.append(email)
-
-            session.add(email)
-            session.commit()
-            session.refresh(email)
-            session.expunge(email)
-            return email
+        return self._add_email_where(Contact.name == contact_name, command)
 
+    @invalidates(EMAILS)
     def update_email(self, email_id: int, command: UpdateEmail) -> Email:
-        with Session(self.engine) as session:
-            email = session.get(Email, email_id)
-            if not email:
-                raise EmailNotFound()
+        return self._update_email_where(Email.email_id == email_id, command)
 
-            duplicate = session.scalar(
-                select(Email).where(
-                    Email.email_id != email_id,
-                    Email.email_address == command.email_address
+    @invalidates(EMAILS)
+    def update_email_by_address(self, contact_name: str, email_address: str, command: UpdateEmail) -> Email:
+        contact_id = select(Contact.contact_id).where(Contact.name == contact_name).scalar_subquery()
+        return self._update_email_where(
+            (Email.email_address == email_address) & (Email.contact_id == contact_id),
+            command
+        )
+
+    def _add_email_where(self, contact_condition: ColumnElement[bool], command: CreateEmail) -> Email:
+        with Session(self.engine, expire_on_commit=False) as session, unique_constraints():
+            ensure_unique(session, Email.email_address, command.email_address)
+            # Inserts nothing when no contact matches the condition
+            query = (
+                insert(Email)
+                .from_select(
+                    [Email.contact_id, Email.email_address],
+                    select(Contact.contact_id, literal(command.email_address)).where(contact_condition)
                 )
+                .returning(Email)
             )
-            if duplicate:
-                raise EmailAlreadyExists()
-
-            email.email_address = command.email_address
+            email = session.scalar(query)
+            if not email:
+                raise ContactNotFound()
 
             session.commit()
-            session.refresh(email)
             session.expunge(email)
             return email
 
-    def update_email_by_address(self, contact_name: str, email_address: str, command: UpdateEmail) -> Email:
-        with Session(self.engine) as session:
-            email = session.scalar(
-                select(Email).where(
-                    Email.email_address == email_address,
-                    Email.contact.has(Contact.name == contact_name)
-                )
+    def _update_email_where(self, condition: ColumnElement[bool], command: UpdateEmail) -> Email:
+        with Session(self.engine, expire_on_commit=False) as session, unique_constraints():
+            ensure_unique(session, Email.email_address, command.email_address, updated=condition)
+            query = (
+                update(Email)
+                .where(condition)
+                .values(email_address=command.email_address)
+                .returning(Email)
             )
+            email = session.scalar(query)
             if not email:
                 raise EmailNotFound()
 
-            duplicate = session.scalar(
-                select(Email).where(
-                    Email.email_id != email.email_id,
-                    Email.email_address == command.email_address
-                )
-            )
-            if duplicate:
-                raise EmailAlreadyExists()
-
-            email.email_address = command.email_address
-
             session.commit()
-            session.refresh(email)
             session.expunge(email)
             return email
 
+    @invalidates(EMAILS)
     def delete_email(self, email_id: int) -> None:
         with Session(self.engine) as session:
             email = session.get(Email, email_id)
@@ -123,6 +95,7 @@ class EmailCommands(DatabaseCommandHandler):
             session.delete(email)
             session.commit()
 
+    @invalidates(EMAILS)
     def delete_email_by_address(self, contact_name: str, email_address: str) -> None:
         with Session(self.engine) as session:
             email = session.scalar(
@@ -9,17 +9,35 @@ from sqlalchemy import select
 from sqlalchemy.orm import Session
 from data.abstractions import DatabaseQueryHandler
 from data.models import Contact, Email
+from data.query_cache import CONTACTS, EMAILS, cached
 
 
 class EmailQueries(DatabaseQueryHandler):
+    @cached(EMAILS)
     def get_contact_emails(self, contact_id: int) -> list[Email]:
         with Session(self.engine) as session:
             query = select(Email).where(Email.contact_id == contact_id)
             emails = session.scalars(query)
             return list(emails)
 
+    @cached(CONTACTS, EMAILS)
     def get_contact_emails_by_name(self, contact_name: str) -> list[Email]:
         with Session(self.engine) as session:
-            query = select(Email).where(Email.contact.has(Contact.name == contact_name))
+            query = select(Email).join(Email.contact).where(Contact.name == contact_name)
             emails = session.scalars(query)
             return list(emails)
+
+    @cached(EMAILS)
+    def get_email_addresses_by_contact(
+        self,
+        contact_ids: list[int] | None = None,
+        cache: bool = True
+    ) -> list[tuple[int, str]]:
+        """
+        Contact ids and addresses of all e-mails or of the e-mails of the contacts with the ids, without loading e-mails
+        """
+        with Session(self.engine) as session:
+            query = select(Email.contact_id, Email.email_address).order_by(Email.contact_id, Email.email_address)
+            if contact_ids is not None:
+                query = query.where(Email.contact_id.in_(contact_ids))
+            return [(contact_id, email_address) for contact_id, email_address in session.execute(query)]
@@ -26,6 +26,11 @@ class ContactAlreadyExists(AlreadyExistsError):
     Raised when contact with this name already exists
     """
 
+class ContactNotCreated(NotFoundError):
+    """
+    Raised for a batch command of a contact whose creation was rejected
+    """
+
 class PhoneNotFound(NotFoundError):
     """
     Raised when phone is not found during command execution
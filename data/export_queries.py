@@ -0,0 +1,63 @@
+"""
+Query handler for exporting the address book.
+
+This module reads all contacts with their phones, e-mails, tags and notes
+as a stream: rows are fetched with yield_per, related rows are loaded for
+each batch of contacts, and contacts already handed out are not kept,
+so memory use does not grow with the size of the address book.
+The most notes of one contact are counted up front for the note columns
+of a CSV file.
+"""
+
+from collections.abc import Iterator
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session, selectinload
+from data.abstractions import DatabaseQueryHandler
+from data.contact_formats import ContactRecord
+from data.models import Contact, ContactNote, Note
+
+# Contacts fetched and loaded with their related rows at once
+EXPORT_BATCH_SIZE = 1000
+
+
+class ExportQueries(DatabaseQueryHandler):
+    def get_max_notes_per_contact(self) -> int:
+        """
+        Most notes of one contact, the number of note columns of a CSV export
+        """
+        notes_per_contact = (
+            select(func.count().label("note_count"))
+            .select_from(ContactNote)
+            .group_by(ContactNote.contact_id)
+            .subquery()
+        )
+        with Session(self.engine) as session:
+            return session.scalar(select(func.max(notes_per_contact.c.note_count))) or 0
+
+    def iter_contact_records(self, batch_size: int = EXPORT_BATCH_SIZE) -> Iterator[ContactRecord]:
+        """
+        All contacts in contact id order, read lazily while the iterator is consumed
+        """
+        query = (
+            select(Contact)
+            .options(
+                selectinload(Contact.phones),
+                selectinload(Contact.emails),
+                selectinload(Contact.tags),
+                selectinload(Contact.notes).raiseload(Note.tags),
+            )
+            .order_by(Contact.contact_id)
+            .execution_options(yield_per=batch_size)
+        )
+
+        with Session(self.engine) as session:
+            for record, contact in enumerate(session.scalars(query), start=1):
+                yield ContactRecord(
+                    record=record,
+                    name=contact.name,
+                    phone_numbers=[phone.phone_number for phone in contact.phones],
+                    email_addresses=[email.email_address for email in contact.emails],
+                    date_of_birth=contact.date_of_birth,
+                    tags=[tag.label for tag in contact.tags],
+                    notes=[note.text for note in contact.notes],
+                )
@@ -0,0 +1,124 @@
+"""
+Command handler for importing contacts from address book files.
+
+This module maps contacts read by data/contact_formats.py onto domain
+commands and applies them with the batch executor, one chunk of records
+at a time. The executor checks the chunk against the database: contacts
+whose name is already taken are rejected; phones and e-mails already
+stored for any contact are skipped as duplicates.
+"""
+
+import time
+from collections.abc import Iterable
+from dataclasses import dataclass, field
+from itertools import batched
+from data.abstractions import DatabaseCommandHandler
+from data.batch_commands import BatchCommands, BatchItem
+from data.contact_commands import CreateContact
+from data.contact_formats import ContactRecord
+from data.email_commands import CreateEmail
+from data.exceptions import AlreadyExistsError, ContactAlreadyExists, PhoneAlreadyExists
+from data.note_commands import CreateNote
+from data.tag_commands import AddTag
+
+# Rejected records listed in the report, the rest are only counted
+MAX_REPORTED_REJECTS = 100
+
+reject_reasons: dict[type[Exception], str] = {
+    ContactAlreadyExists: "Contact already exists",
+    # All phone numbers of the contact are taken
+    PhoneAlreadyExists: "No new valid phone number",
+}
+
+
+@dataclass
+class ImportReject:
+    record: int
+    name: str
+    reason: str
+
+
+@dataclass
+class ImportReport:
+    records: int = 0
+    imported: int = 0
+    rejected: int = 0
+    # Phones and e-mails skipped because they are already stored
+    duplicates: int = 0
+    seconds: float = 0.0
+    rejects: list[ImportReject] = field(default_factory=list)
+
+    @property
+    def records_per_second(self) -> float:
+        return self.records / self.seconds if self.seconds > 0 else 0.0
+
+    def reject(self, record: int, name: str, reason: str) -> None:
+        self.rejected += 1
+        if len(self.rejects) < MAX_REPORTED_REJECTS:
+            self.rejects.append(ImportReject(record, name, reason))
+
+
+class ImportCommands(DatabaseCommandHandler):
+    def import_contacts(self, contacts: Iterable[ContactRecord], chunk_size: int = 1000) -> ImportReport:
+        """
+        Imports contacts with their phones, e-mails, birthdays, tags and notes.
+        Every chunk of records is checked against the database with one lookup
+        of names, phones and e-mails each, and committed once.
+        """
+        report = ImportReport()
+        batch = BatchCommands(self.engine)
+        started = time.perf_counter()
+
+        for chunk in batched(contacts, chunk_size):
+            report.records += len(chunk)
+            items, records = self._to_batch_items(chunk, report)
+
+            result = batch.execute(items, chunk_size=len(items) or 1)
+            report.duplicates += result.skipped
+            for error in result.errors:
+                record = records[error.index]
+                if isinstance(items[error.index].command, CreateContact):
+                    report.imported -= 1
+                    report.reject(record.record, record.name, reject_reasons.get(type(error.error), str(error.error)))
+                    if isinstance(error.error, PhoneAlreadyExists):
+                        report.duplicates += len(set(record.phone_numbers))
+                # Later commands of a rejected contact are rejected with it and not counted
+                elif isinstance(error.error, AlreadyExistsError):
+                    report.duplicates += 1
+
+        report.seconds = time.perf_counter() - started
+        return report
+
+    def _to_batch_items(
+        self,
+        chunk: tuple[ContactRecord, ...],
+        report: ImportReport
+    ) -> tuple[list[BatchItem], list[ContactRecord]]:
+        """
+        Batch items of the records of the chunk and the record of every item
+        """
+        items: list[BatchItem] = []
+        records: list[ContactRecord] = []
+        for contact in chunk:
+            if not contact.name:
+                report.reject(contact.record, contact.name, "No name")
+                continue
+            if not contact.phone_numbers:
+                report.reject(contact.record, contact.name, reject_reasons[PhoneAlreadyExists])
+                continue
+            report.imported += 1
+
+            first_phone, *other_phones = contact.phone_numbers
+            contact_items = [
+                BatchItem(
+                    CreateContact(name=contact.name, phone_number=first_phone, date_of_birth=contact.date_of_birth),
+                    phone_numbers=tuple(other_phones)
+                ),
+                *(BatchItem(CreateEmail(email_address=email), contact.name) for email in contact.email_addresses),
+                *(BatchItem(AddTag(label=tag), contact.name) for tag in contact.tags),
+                *(BatchItem(CreateNote(text=note), contact.name) for note in contact.notes),
+            ]
+            items.extend(contact_items)
+            records.extend([contact] * len(contact_items))
+
+        return items, records
@@ -0,0 +1,110 @@
+"""
+SQL statement statistics and slow query log.
+
+This module hooks into the cursor events of an engine and records every
+statement executed while an API request, CLI command or MCP tool call is
+measured: the statement count, the total time spent in the database and
+the slowest statements. Statements running longer than the slow query
+threshold are logged as warnings whether measured or not.
+
+Measurements are tracked in a context variable, so they follow a request
+into the threadpool, into tasks it starts and into the greenlets of the
+async handlers.
+"""
+
+import logging
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from sqlalchemy import Engine, event
+from sqlalchemy.engine import ExceptionContext
+
+logger = logging.getLogger(__name__)
+
+# Slowest statements kept per measurement
+SLOWEST_KEPT = 3
+# Characters of a statement shown in logs
+STATEMENT_PREVIEW = 200
+
+
+@dataclass
+class SqlStatement:
+    seconds: float
+    statement: str
+
+
+@dataclass
+class SqlStats:
+    statements: int = 0
+    seconds: float = 0.0
+    slowest: list[SqlStatement] = field(default_factory=list)
+
+    def record(self, statement: str, seconds: float) -> None:
+        self.statements += 1
+        self.seconds += seconds
+        if len(self.slowest) < SLOWEST_KEPT or seconds > self.slowest[-1].seconds:
+            self.slowest.append(SqlStatement(seconds, statement))
+            self.slowest.sort(key=lambda slow: slow.seconds, reverse=True)
+            del self.slowest[SLOWEST_KEPT:]
+
+    def summary(self) -> str:
+        return f"{self.statements} SQL statements, {self.seconds * 1000:.1f} ms"
+
+    def details(self) -> str:
+        lines = [self.summary()]
+        lines.extend(f"  {slow.seconds * 1000:8.1f} ms  {_preview(slow.statement)}" for slow in self.slowest)
+        return "\n".join(lines)
+
+
+_current: ContextVar[SqlStats | None] = ContextVar("sql_stats", default=None)
+
+
+def _preview(statement: str) -> str:
+    statement = " ".join(statement.split())
+    return statement if len(statement) <= STATEMENT_PREVIEW else statement[:STATEMENT_PREVIEW] + "…"
+
+
+@contextmanager
+def sql_stats(stats: SqlStats | None = None) -> Iterator[SqlStats]:
+    """
+    Records statements executed inside, a nested measurement takes them over until it ends.
+    Given stats are continued, for work measured in several steps.
+    """
+    stats = stats if stats is not None else SqlStats()
+    token = _current.set(stats)
+    try:
+        yield stats
+    finally:
+        _current.reset(token)
+
+
+def instrument(engine: Engine, slow_query_ms: float | None = None) -> None:
+    """
+    Records statements of the engine in the current measurement
+    and logs statements slower than `slow_query_ms`
+    """
+    def before_cursor_execute(connection, _cursor, _statement, _parameters, context, _executemany):
+        connection.info.setdefault("sql_started", []).append((context, time.perf_counter()))
+
+    def after_cursor_execute(connection, _cursor, statement, parameters, _context, executemany):
+        _, started = connection.info["sql_started"].pop()
+        seconds = time.perf_counter() - started
+        stats = _current.get()
+        if stats is not None:
+            stats.record(statement, seconds)
+        if slow_query_ms is not None and seconds * 1000 >= slow_query_ms:
+            rows = len(parameters) if executemany else 1
+            logger.warning("Slow query %.1f ms (%d parameter sets): %s", seconds * 1000, rows, _preview(statement))
+
+    def handle_error(exception_context: ExceptionContext):
+        # A failed statement gets no after_cursor_execute, its start time is dropped here
+        connection = exception_context.connection
+        started = connection.info.get("sql_started") if connection is not None else None
+        if started and started[-1][0] is exception_context.execution_context:
+            _ = started.pop()
+
+    event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", after_cursor_execute)
+    event.listen(engine, "handle_error", handle_error)
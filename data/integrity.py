@@ -0,0 +1,102 @@
+"""
+Translation of database constraint violations into domain exceptions.
+
+Write handlers rely on the unique constraints of the schema instead of
+checking for duplicates before writing. This module maps the resulting
+IntegrityError to the corresponding AlreadyExistsError.
+
+A database whose unique index could not be created because its data
+already had duplicates (see data/schema.py) does not reject new ones;
+for such a column handlers check for the value before writing instead,
+until the duplicates are resolved and the index created on a later start.
+"""
+
+import threading
+from collections.abc import Iterator
+from contextlib import contextmanager
+from weakref import WeakKeyDictionary
+from sqlalchemy import ColumnElement, Engine, exists, inspect, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import InstrumentedAttribute, Session
+from data.exceptions import AlreadyExistsError, ContactAlreadyExists, EmailAlreadyExists, PhoneAlreadyExists
+
+# Unique columns as reported by SQLite: "UNIQUE constraint failed: <table>.<column>"
+unique_violations: dict[str, type[AlreadyExistsError]] = {
+    "contacts.name": ContactAlreadyExists,
+    "phones.phone_number": PhoneAlreadyExists,
+    "emails.email_address": EmailAlreadyExists,
+}
+
+
+def already_exists_error(error: IntegrityError) -> AlreadyExistsError | None:
+    """
+    Returns the domain exception for a unique constraint violation, None for other violations
+    """
+    message = str(error.orig)
+    for column, exception in unique_violations.items():
+        if f"UNIQUE constraint failed: {column}" in message:
+            return exception()
+    return None
+
+
+@contextmanager
+def unique_constraints() -> Iterator[None]:
+    """
+    Raises the domain exception when a statement inside violates a unique constraint
+    """
+    try:
+        yield
+    except IntegrityError as error:
+        domain_error = already_exists_error(error)
+        if domain_error is None:
+            raise
+        raise domain_error from error
+
+
+# Unique columns without a unique index, by engine, read once per engine
+_unenforced: WeakKeyDictionary[Engine, frozenset[str]] = WeakKeyDictionary()
+_unenforced_lock = threading.Lock()
+
+
+def unenforced_unique_columns(engine: Engine) -> frozenset[str]:
+    """
+    Unique columns of unique_violations which have no unique index in the database
+    """
+    with _unenforced_lock:
+        columns = _unenforced.get(engine)
+        if columns is None:
+            inspector = inspect(engine)
+            indexed: set[str] = set()
+            for table in {column.partition(".")[0] for column in unique_violations}:
+                for index in inspector.get_indexes(table):
+                    if index["unique"] and len(index["column_names"]) == 1:
+                        indexed.add(f"{table}.{index["column_names"][0]}")
+                for constraint in inspector.get_unique_constraints(table):
+                    if len(constraint["column_names"]) == 1:
+                        indexed.add(f"{table}.{constraint["column_names"][0]}")
+            columns = frozenset(unique_violations) - indexed
+            _unenforced[engine] = columns
+        return columns
+
+
+def ensure_unique(
+    session: Session,
+    column: InstrumentedAttribute[str],
+    value: str,
+    updated: ColumnElement[bool] | None = None
+) -> None:
+    """
+    Raises the domain exception when the value is taken and no unique index would reject it.
+    Rows matching `updated` are the ones being written and are not counted.
+    """
+    name = f"{column.class_.__tablename__}.{column.key}"
+    bind = session.get_bind()
+    engine = bind if isinstance(bind, Engine) else bind.engine
+    if name not in unenforced_unique_columns(engine):
+        return
+
+    condition = column == value
+    if updated is not None:
+        condition = condition & ~updated
+    if session.scalar(select(exists().where(condition))):
+        raise unique_violations[name]()
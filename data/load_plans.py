@@ -0,0 +1,37 @@
+"""
+Eager-load plans for query handlers.
+
+Relationships of Contact and Note are loaded eagerly by default so that
+detached entities can be mapped to API models. Query handlers accept
+one of these plans to load only the relationships a caller needs;
+relationships left out raise on access instead of silently querying.
+"""
+
+from collections.abc import Sequence
+from sqlalchemy.orm import raiseload, selectinload
+from sqlalchemy.orm.interfaces import ORMOption
+from data.models import Contact, Note
+
+LoadPlan = Sequence[ORMOption]
+
+# Every relationship, same as the model defaults
+contact_full: LoadPlan = (
+    selectinload(Contact.phones),
+    selectinload(Contact.emails),
+    selectinload(Contact.notes),
+    selectinload(Contact.tags),
+)
+
+# Phones and tags, as shown in contact lists
+contact_list: LoadPlan = (
+    selectinload(Contact.phones),
+    selectinload(Contact.tags),
+    raiseload(Contact.emails),
+    raiseload(Contact.notes),
+)
+
+# Contact columns only
+contact_only: LoadPlan = (raiseload("*"),)
+
+# Note text only, without tags
+note_only: LoadPlan = (raiseload(Note.tags),)
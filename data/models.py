@@ -3,13 +3,14 @@ SQLAlchemy ORM models for the contact management system.
 
 This module defines the database schema including Contact, Phone, Email,
 Note, and Tag entities, along with their relationships and association tables.
+Note texts are indexed by an SQLite FTS5 table kept in sync by triggers.
 """
 
 from __future__ import annotations
 from dataclasses import dataclass
 from datetime import date
-from typing import override
-from sqlalchemy import Date, ForeignKey, Integer, String
+from typing import NamedTuple, override
+from sqlalchemy import DDL, Computed, Date, Float, ForeignKey, Index, Integer, String, column, event, table
 from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column, relationship
 
 
@@ -21,8 +22,15 @@ class Contact(Base):
     __tablename__: str = "contacts"
 
     contact_id: Mapped[int] = mapped_column("contact_id", Integer, primary_key=True)
-    name: Mapped[str] = mapped_column("name", String(64), nullable=False)
+    name: Mapped[str] = mapped_column("name", String(64), nullable=False, unique=True, index=True)
     date_of_birth: Mapped[date | None] = mapped_column("date_of_birth", Date, nullable=True)
+    # Month and day of birth as MMDD number (e.g. 1990-05-15 -> 515), maintained by SQLite
+    birthday_ordinal: Mapped[int | None] = mapped_column(
+        "birthday_ordinal",
+        Integer,
+        Computed("CAST(substr(date_of_birth, 6, 2) || substr(date_of_birth, 9, 2) AS INTEGER)", persisted=False),
+        index=True
+    )
 
     phones: Mapped[list[Phone]] = relationship(back_populates="contact", cascade="all", lazy="selectin")
     emails: Mapped[list[Email]] = relationship(back_populates="contact", cascade="all", lazy="selectin")
@@ -38,8 +46,8 @@ class Phone(Base):
     __tablename__: str = "phones"
 
     phone_id: Mapped[int] = mapped_column("phone_id", Integer, primary_key=True)
-    contact_id: Mapped[int] = mapped_column("contact_id", ForeignKey(Contact.contact_id), nullable=False)
-    phone_number: Mapped[str] = mapped_column("phone_number", String(16), nullable=False)
+    contact_id: Mapped[int] = mapped_column("contact_id", ForeignKey(Contact.contact_id), nullable=False, index=True)
+    phone_number: Mapped[str] = mapped_column("phone_number", String(16), nullable=False, unique=True, index=True)
 
     contact: Mapped[Contact] = relationship(back_populates="phones")
 
@@ -52,8 +60,8 @@ class Email(Base):
     __tablename__: str = "emails"
 
     email_id: Mapped[int] = mapped_column("email_id", Integer, primary_key=True)
-    contact_id: Mapped[int] = mapped_column("contact_id", ForeignKey(Contact.contact_id), nullable=False)
-    email_address: Mapped[str] = mapped_column("email_address", String(256), nullable=False)
+    contact_id: Mapped[int] = mapped_column("contact_id", ForeignKey(Contact.contact_id), nullable=False, index=True)
+    email_address: Mapped[str] = mapped_column("email_address", String(256), nullable=False, unique=True, index=True)
 
     contact: Mapped[Contact] = relationship(back_populates="emails")
 
@@ -76,11 +84,47 @@ class Note(Base):
         return f"Note({self.text[:32]},tags={self.tags})"
 
 
+# External-content FTS5 index over notes.text, rowid is notes.note_id
+notes_fts = table(
+    "notes_fts",
+    column("rowid", Integer),
+    column("text", String),
+    column("rank", Float),
+)
+
+notes_fts_ddl = [
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS notes_fts USING fts5(
+        text, content='notes', content_rowid='note_id', tokenize='unicode61 remove_diacritics 2'
+    )
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS notes_fts_after_insert AFTER INSERT ON notes BEGIN
+        INSERT INTO notes_fts(rowid, text) VALUES (new.note_id, new.text);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS notes_fts_after_delete AFTER DELETE ON notes BEGIN
+        INSERT INTO notes_fts(notes_fts, rowid, text) VALUES ('delete', old.note_id, old.text);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS notes_fts_after_update AFTER UPDATE OF text ON notes BEGIN
+        INSERT INTO notes_fts(notes_fts, rowid, text) VALUES ('delete', old.note_id, old.text);
+        INSERT INTO notes_fts(rowid, text) VALUES (new.note_id, new.text);
+    END
+    """,
+]
+
+for statement in notes_fts_ddl:
+    event.listen(Note.__table__, "after_create", DDL(statement).execute_if(dialect="sqlite"))
+
+
 class Tag(Base):
     __tablename__: str = "tags"
 
     tag_id: Mapped[int] = mapped_column("tag_id", Integer, primary_key=True)
-    label: Mapped[str] = mapped_column("label", String(64), nullable=False)
+    label: Mapped[str] = mapped_column("label", String(64), nullable=False, unique=True, index=True)
 
     contacts: Mapped[list[Contact]] = relationship(secondary="contact_tags", back_populates="tags")
     notes: Mapped[list[Note]] = relationship(secondary="note_tags", back_populates="tags")
@@ -92,6 +136,7 @@ class Tag(Base):
 
 class ContactTag(Base):
     __tablename__: str = "contact_tags"
+    __table_args__: tuple[Index, ...] = (Index("ix_contact_tags_tag_id", "tag_id", "contact_id"),)
 
     contact_id: Mapped[int] = mapped_column("contact_id", ForeignKey(Contact.contact_id), primary_key=True)
     tag_id: Mapped[int] = mapped_column("tag_id", ForeignKey(Tag.tag_id), primary_key=True)
@@ -99,6 +144,7 @@ class ContactTag(Base):
 
 class ContactNote(Base):
     __tablename__: str = "contact_notes"
+    __table_args__: tuple[Index, ...] = (Index("ix_contact_notes_note_id", "note_id", "contact_id"),)
 
     contact_id: Mapped[int] = mapped_column("contact_id", ForeignKey(Contact.contact_id), primary_key=True)
     note_id: Mapped[int] = mapped_column("note_id", ForeignKey(Note.note_id), primary_key=True)
@@ -106,6 +152,7 @@ class ContactNote(Base):
 
 class NoteTag(Base):
     __tablename__: str = "note_tags"
+    __table_args__: tuple[Index, ...] = (Index("ix_note_tags_tag_id", "tag_id", "note_id"),)
 
     note_id: Mapped[int] = mapped_column("note_id", ForeignKey(Note.note_id), primary_key=True)
     tag_id: Mapped[int] = mapped_column("tag_id", ForeignKey(Tag.tag_id), primary_key=True)
@@ -115,3 +162,21 @@ class NoteTag(Base):
 class BirthdayReminder:
     contact: Contact
     birthday: date
+
+
+class ContactSummary(NamedTuple):
+    """
+    Compact contact row for list views, without ORM state
+    """
+    contact_id: int
+    name: str
+    date_of_birth: date | None
+    phones: tuple[str, ...] = ()
+    tags: tuple[str, ...] = ()
+
+
+@dataclass
+class NoteSearchResult:
+    note: Note
+    rank: float
+    snippet: str
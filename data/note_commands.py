@@ -11,6 +11,8 @@ from sqlalchemy.orm import Session
 from data.abstractions import DomainCommand, DatabaseCommandHandler
 from data.exceptions import ContactNotFound, NoteNotFound, TagNotFound
 from data.models import Contact, Note, Tag
+from data.note_search import find_note_by_fragment
+from data.query_cache import NOTES, TAGS, invalidates
 from data.tag_commands import AddTag, RemoveTag
 
 
@@ -23,6 +25,7 @@ class UpdateNote(DomainCommand):
 
 
 class NoteCommands(DatabaseCommandHandler):
+    @invalidates(NOTES)
     def add_note_for_contact(self, contact_id: int, command: CreateNote) -> Note:
         with Session(self.engine) as session:
             contact = session.scalar(
@@ -40,6 +43,7 @@ class NoteCommands(DatabaseCommandHandler):
             session.refresh(note)
             return note
 
+    @invalidates(NOTES)
     def add_note_for_contact_by_name(
         self, contact_name: str, command: CreateNote
     ) -> Note:
@@ -59,6 +63,7 @@ class NoteCommands(DatabaseCommandHandler):
             session.refresh(note)
             return note
 
+    @invalidates(NOTES)
     def add_note(self, command: CreateNote) -> Note:
         with Session(self.engine) as session:
             note = Note()
@@ -68,6 +73,7 @@ class NoteCommands(DatabaseCommandHandler):
             session.refresh(note)
             return note
 
+    @invalidates(NOTES)
     def update_note(self, note_id: int, command: UpdateNote) -> Note:
         with Session(self.engine) as session:
             note = session.get(Note, note_id)
@@ -79,10 +85,10 @@ class NoteCommands(DatabaseCommandHandler):
             session.refresh(note)
             return note
 
+    @invalidates(NOTES)
     def update_note_by_fragment(self, fragment: str, command: UpdateNote) -> Note:
         with Session(self.engine) as session:
-            query = select(Note).where(Note.text.like(f"%{fragment}%"))
-            note = session.scalar(query)
+            note = find_note_by_fragment(session, fragment)
             if not note:
                 raise NoteNotFound()
 
@@ -91,6 +97,7 @@ class NoteCommands(DatabaseCommandHandler):
             session.refresh(note)
             return note
 
+    @invalidates(NOTES, TAGS)
     def delete_note(self, note_id: int) -> None:
         with Session(self.engine) as session:
             note = session.get(Note, note_id)
@@ -100,16 +107,17 @@ class NoteCommands(DatabaseCommandHandler):
             session.delete(note)
             session.commit()
 
+    @invalidates(NOTES, TAGS)
     def delete_note_from_fragment(self, fragment: str) -> None:
         with Session(self.engine) as session:
-            query = select(Note).where(Note.text.like(f"%{fragment}%"))
-            note = session.scalar(query)
+            note = find_note_by_fragment(session, fragment)
             if not note:
                 raise NoteNotFound()
 
             session.delete(note)
             session.commit()
 
+    @invalidates(TAGS)
     def add_tag_to_note(self, note_id: int, command: AddTag) -> Note:
         with Session(self.engine) as session:
             note = session.get(Note, note_id)
@@ -131,10 +139,10 @@ class NoteCommands(DatabaseCommandHandler):
             session.refresh(note) # added This line
             return note # to see something in the response body 
 
+    @invalidates(TAGS)
     def add_tag_to_note_by_fragment(self, fragment: str, command: AddTag) -> None:
         with Session(self.engine) as session:
-            query = select(Note).where(Note.text.like(f"%{fragment}%"))
-            note = session.scalar(query)
+            note = find_note_by_fragment(session, fragment)
             if not note:
                 raise NoteNotFound()
 
@@ -151,6 +159,7 @@ class NoteCommands(DatabaseCommandHandler):
             session.add(note)
             session.commit()
 
+    @invalidates(TAGS)
     def remove_tag_from_note(self, note_id: int, command: RemoveTag) -> None:
         with Session(self.engine) as session:
             note = session.get(Note, note_id)
@@ -159,7 +168,7 @@ class NoteCommands(DatabaseCommandHandler):
 
             tag = session.scalar(
                 select(Tag).where(
-                    Tag.notes.has(Note.note_id == note.note_id),
+                    Tag.notes.any(Note.note_id == note.note_id),
                     Tag.label == command.label,
                 )
             )
@@ -170,12 +179,12 @@ class NoteCommands(DatabaseCommandHandler):
             note.tags.remove(tag)
             session.commit()
 
+    @invalidates(TAGS)
     def remove_tag_from_note_by_fragment(
         self, fragment: str, command: RemoveTag
     ) -> None:
         with Session(self.engine) as session:
-            query = select(Note).where(Note.text.like(f"%{fragment}%"))
-            note = session.scalar(query)
+            note = find_note_by_fragment(session, fragment)
             if not note:
                 raise NoteNotFound()
 
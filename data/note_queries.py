@@ -2,60 +2,145 @@
 Query handlers for note-related database operations.
 
 This module provides read-only database operations for notes,
-including retrieval by contact, tag, and text search functionality.
+including retrieval by contact, tag, and full-text search functionality.
+Note lists support keyset pagination by note id and an eager-load plan
+chosen by the caller.
 """
 
-from sqlalchemy import select
+from sqlalchemy import func, literal_column, select
 from sqlalchemy.orm import Session
 from data.abstractions import DatabaseQueryHandler
-from data.models import Contact, Note, Tag
+from data.load_plans import LoadPlan
+from data.models import Contact, Note, NoteSearchResult, NoteTag, Tag, notes_fts
+from data.note_search import find_note_by_fragment, match_expression
+from data.pagination import keyset_page
+from data.query_cache import CONTACTS, NOTES, TAGS, cached
 
 
 class NoteQueries(DatabaseQueryHandler):
-    def get_notes(self) -> list[Note]:
+    @cached(NOTES, TAGS)
+    def get_notes(
+        self,
+        limit: int | None = None,
+        after: int | None = None,
+        load: LoadPlan = (),
+        offset: int | None = None,
+        cache: bool = True
+    ) -> list[Note]:
         with Session(self.engine) as session:
-            query = select(Note)
+            query = keyset_page(select(Note).options(*load), Note.note_id, limit, after, offset)
             notes = session.scalars(query)
             return list(notes)
 
+    @cached(NOTES)
+    def get_note_texts(self) -> list[str]:
+        """
+        Texts of all notes in note id order, without loading notes
+        """
+        with Session(self.engine) as session:
+            query = select(Note.text).order_by(Note.note_id)
+            return list(session.scalars(query))
+
+    @cached(NOTES)
+    def get_note_ids_and_texts(self, note_ids: list[int] | None = None, cache: bool = True) -> list[tuple[int, str]]:
+        """
+        Ids and texts of all notes or of the notes with the ids, without loading notes
+        """
+        with Session(self.engine) as session:
+            query = select(Note.note_id, Note.text).order_by(Note.note_id)
+            if note_ids is not None:
+                query = query.where(Note.note_id.in_(note_ids))
+            return [(note_id, text) for note_id, text in session.execute(query)]
+
+    @cached(NOTES, TAGS)
     def get_notes_for_contact(self, contact_id: int) -> list[Note]:
         with Session(self.engine) as session:
-            query = select(Note).where(Note.contact.has(Contact.contact_id == contact_id))
+            query = select(Note).join(Note.contact).where(Contact.contact_id == contact_id)
             notes = session.scalars(query)
             return list(notes)
 
+    @cached(CONTACTS, NOTES, TAGS)
     def get_notes_for_contact_by_name(self, contact_name: str) -> list[Note]:
         with Session(self.engine) as session:
-            query = select(Note).where(Note.contact.has(Contact.name == contact_name))
+            query = select(Note).join(Note.contact).where(Contact.name == contact_name)
             notes = session.scalars(query)
             return list(notes)
 
-    def get_notes_by_tag(self, tag: str) -> list[Note]:
+    @cached(NOTES, TAGS)
+    def get_notes_by_tag(
+        self,
+        tag: str,
+        limit: int | None = None,
+        after: int | None = None,
+        offset: int | None = None,
+        cache: bool = True
+    ) -> list[Note]:
         with Session(self.engine) as session:
-            query = select(Note).join(Note.tags).where(Tag.label == tag)
+            query = (
+                select(Note)
+                .join(NoteTag, NoteTag.note_id == Note.note_id)
+                .join(Tag, Tag.tag_id == NoteTag.tag_id)
+                .where(Tag.label == tag)
+            )
+            # Paging by the association key reads notes in ix_note_tags_tag_id order without sorting
+            query = keyset_page(query, NoteTag.note_id, limit, after, offset)
             notes = session.scalars(query)
             return list(notes)
 
+    @cached(NOTES, TAGS)
     def get_notes_for_contact_by_tag(self, contact_id: int, tag: str) -> list[Note]:
         with Session(self.engine) as session:
-            query = select(Note).join(Note.tags).where(
-                Note.contact.has(Contact.contact_id == contact_id),
+            query = select(Note).join(Note.contact).join(Note.tags).where(
+                Contact.contact_id == contact_id,
                 Tag.label == tag
             )
             notes = session.scalars(query)
             return list(notes)
 
+    @cached(CONTACTS, NOTES, TAGS)
     def get_notes_for_contact_by_name_and_tag(self, contact_name: str, tag: str) -> list[Note]:
         with Session(self.engine) as session:
-            query = select(Note).join(Note.tags).where(
-                Note.contact.has(Contact.name == contact_name),
+            query = select(Note).join(Note.contact).join(Note.tags).where(
+                Contact.name == contact_name,
                 Tag.label == tag
             )
             notes = session.scalars(query)
             return list(notes)
 
+    @cached(NOTES, TAGS)
     def find_note_by_text_fragment(self, text_fragment: str) -> Note | None:
         with Session(self.engine) as session:
-            query = select(Note).where(Note.text.like(f"%{text_fragment}%"))
-            note = session.scalar(query)
+            note = find_note_by_fragment(session, text_fragment)
             return note
+
+    @cached(NOTES, TAGS)
+    def search_notes(
+        self,
+        search_text: str,
+        limit: int = 20,
+        highlight: tuple[str, str] = ("[", "]")
+    ) -> list[NoteSearchResult]:
+        """
+        Full-text search over notes ordered by relevance (bm25).
+        Every word of the search text is matched as a word prefix.
+        """
+        expression = match_expression(search_text)
+        if expression is None:
+            return []
+
+        fts = literal_column("notes_fts")
+        rank = func.bm25(fts).label("rank")
+        snippet = func.snippet(fts, 0, highlight[0], highlight[1], "…", 16).label("snippet")
+
+        with Session(self.engine) as session:
+            query = (
+                select(Note, rank, snippet)
+                .join(notes_fts, notes_fts.c.rowid == Note.note_id)
+                .where(notes_fts.c.text.match(expression))
+                .order_by(notes_fts.c.rank)
+                .limit(limit)
+            )
+            return [
+                NoteSearchResult(note=note, rank=note_rank, snippet=note_snippet)
+                for note, note_rank, note_snippet in session.execute(query)
+            ]
@@ -0,0 +1,51 @@
+"""
+Full-text search helpers for notes.
+
+This module translates user input into FTS5 match expressions and resolves
+notes by text fragment using the `notes_fts` index, shared by the note
+query and command handlers.
+"""
+
+import re
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+from data.models import Note, notes_fts
+
+# Same token characters as the unicode61 tokenizer: letters and digits
+token_pattern = re.compile(r"[^\W_]+")
+
+
+def match_expression(text: str) -> str | None:
+    """
+    Builds an FTS5 expression matching notes which contain every word
+    of the text as a word prefix. Returns None if the text has no words.
+    """
+    tokens = token_pattern.findall(text)
+    if not tokens:
+        return None
+    return " ".join(f'"{token}"*' for token in tokens)
+
+
+def find_note_by_fragment(session: Session, fragment: str) -> Note | None:
+    """
+    Finds the best ranked note containing the text fragment.
+
+    Candidates come from the FTS index and are checked for the exact fragment.
+    Fragments starting in the middle of a word cannot be found through the index,
+    so the lookup falls back to a substring scan ordered by note id.
+    """
+    expression = match_expression(fragment)
+    if expression:
+        query = (
+            select(Note)
+            .join(notes_fts, notes_fts.c.rowid == Note.note_id)
+            .where(notes_fts.c.text.match(expression), Note.text.like(f"%{fragment}%"))
+            .order_by(notes_fts.c.rank)
+            .limit(1)
+        )
+        note = session.scalar(query)
+        if note:
+            return note
+
+    query = select(Note).where(Note.text.like(f"%{fragment}%")).order_by(Note.note_id).limit(1)
+    return session.scalar(query)
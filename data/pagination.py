@@ -0,0 +1,43 @@
+"""
+Keyset (cursor) pagination helpers for query handlers.
+
+A page is requested with `limit` and `after`: rows are ordered by an
+integer key and only rows with the key greater than `after` are returned,
+so every page is read with an index range scan regardless of its position.
+`offset` skips rows of the first page only, following pages continue
+from the key of the last row read.
+"""
+
+from collections.abc import Sequence
+from sqlalchemy import Select
+from sqlalchemy.orm import InstrumentedAttribute
+
+
+def keyset_page[*Ts](
+    query: Select[*Ts],
+    key: InstrumentedAttribute[int],
+    limit: int | None,
+    after: int | None,
+    offset: int | None = None
+) -> Select[*Ts]:
+    """
+    Orders the query by the key and restricts it to a single page.
+    Without limit all rows after the cursor are returned.
+    """
+    query = query.order_by(key)
+    if after is not None:
+        query = query.where(key > after)
+    if limit is not None:
+        query = query.limit(limit)
+    if offset:
+        query = query.offset(offset)
+    return query
+
+
+def next_page_after(keys: Sequence[int], limit: int | None) -> int | None:
+    """
+    Returns cursor of the next page, or None if the returned page is the last one.
+    """
+    if limit is None or len(keys) < limit or not keys:
+        return None
+    return keys[-1]
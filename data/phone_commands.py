@@ -3,14 +3,19 @@ Command handlers for phone number-related write operations.
 
 This module provides database write operations for phone numbers,
 including creation, update, and deletion.
+Duplicates are rejected by the unique constraint on phones.phone_number
+(checked for first where a legacy database lacks it),
+written rows are returned by INSERT/UPDATE ... RETURNING.
 """
 
 from pydantic import Field
-from sqlalchemy import select
+from sqlalchemy import ColumnElement, insert, literal, select, update
 from sqlalchemy.orm import Session
 from data.abstractions import DomainCommand, DatabaseCommandHandler
-from data.exceptions import ContactNotFound, PhoneAlreadyExists, PhoneNotFound
+from data.exceptions import ContactNotFound, PhoneNotFound
+from data.integrity import ensure_unique, unique_constraints
 from data.models import Contact, Phone
+from data.query_cache import PHONES, invalidates
 from data.validation import phone_number_pattern
 
 
@@ -23,97 +28,64 @@ class UpdatePhone(DomainCommand):
 
 
 class PhoneCommands(DatabaseCommandHandler):
+    @invalidates(PHONES)
     def add_phone_for_contact(self, contact_id: int, command: CreatePhone) -> Phone:
-        with Session(self.engine) as session:
-            contact = session.scalar(select(Contact).where(Contact.contact_id == contact_id))
-            if not contact:
-                raise ContactNotFound()
-
-            duplicate = session.scalar(select(Phone).where(Phone.phone_number == command.phone_number))
-            if duplicate:
-                raise PhoneAlreadyExists()
-
-            phone = Phone()
-            phone.phone_number = command.phone_number
-
-            contact.phones.append(phone)
-
-            session.add(phone)
-            session.commit()
-            session.refresh(phone)
-            session.expunge(phone)
-            return phone
+        return self._add_phone_where(Contact.contact_id == contact_id, command)
 
+    @invalidates(PHONES)
     def add_phone_for_contact_by_name(self, contact_name: str, command: CreatePhone) -> Phone:
-        with Session(self.engine) as session:
-            contact = session.scalar(select(Contact).where(Contact.name == contact_name))
-            if not contact:
-                raise ContactNotFound()
-
-            duplicate = session.scalar(select(Phone).where(Phone.phone_number == command.phone_number))
-            if duplicate:
-                raise PhoneAlreadyExists()
-
-            phone = Phone()
-            phone.phone_number = command.phone_number
-
-            contact.phones.append(phone)
-
-            session.add(phone)
-            session.commit()
-            session.refresh(phone)
-            session.expunge(phone)
-            return phone
+        return self._add_phone_where(Contact.name == contact_name, command)
 
+    @invalidates(PHONES)
     def update_phone(self, phone_id: int, command: UpdatePhone) -> Phone:
-        with Session(self.engine) as session:
-            phone = session.get(Phone, phone_id)
-            if not phone:
-                raise PhoneNotFound()
+        return self._update_phone_where(Phone.phone_id == phone_id, command)
 
-            duplicate = session.scalar(
-                select(Phone).where(
-                    Phone.phone_id != phone_id,
-                    Phone.phone_number == command.phone_number
+    @invalidates(PHONES)
+    def update_phone_by_number(self, contact_name: str, phone_number: str, command: UpdatePhone) -> Phone:
+        contact_id = select(Contact.contact_id).where(Contact.name == contact_name).scalar_subquery()
+        return self._update_phone_where(
+            (Phone.phone_number == phone_number) & (Phone.contact_id == contact_id),
+            command
+        )
+
+    def _add_phone_where(self, contact_condition: ColumnElement[bool], command: CreatePhone) -> Phone:
+        with Session(self.engine, expire_on_commit=False) as session, unique_constraints():
+            ensure_unique(session, Phone.phone_number, command.phone_number)
+            # Inserts nothing when no contact matches the condition
+            query = (
+                insert(Phone)
+                .from_select(
+                    [Phone.contact_id, Phone.phone_number],
+                    select(Contact.contact_id, literal(command.phone_number)).where(contact_condition)
                 )
+                .returning(Phone)
             )
-            if duplicate:
-                raise PhoneAlreadyExists()
-
-            phone.phone_number = command.phone_number
+            phone = session.scalar(query)
+            if not phone:
+                raise ContactNotFound()
 
             session.commit()
-            session.refresh(phone)
             session.expunge(phone)
             return phone
 
-    def update_phone_by_number(self, contact_name: str, phone_number: str, command: UpdatePhone) -> Phone:
-        with Session(self.engine) as session:
-            phone = session.scalar(
-                select(Phone).where(
-                    Phone.phone_number == phone_number,
-                    Phone.contact.has(Contact.name == contact_name)
-                )
+    def _update_phone_where(self, condition: ColumnElement[bool], command: UpdatePhone) -> Phone:
+        with Session(self.engine, expire_on_commit=False) as session, unique_constraints():
+            ensure_unique(session, Phone.phone_number, command.phone_number, updated=condition)
+            query = (
+                update(Phone)
+                .where(condition)
+                .values(phone_number=command.phone_number)
+                .returning(Phone)
             )
+            phone = session.scalar(query)
             if not phone:
                 raise PhoneNotFound()
 
-            duplicate = session.scalar(
-                select(Phone).where(
-                    Phone.phone_id != phone.phone_id,
-                    Phone.phone_number == command.phone_number
-                )
-            )
-            if duplicate:
-                raise PhoneAlreadyExists()
-
-            phone.phone_number = command.phone_number
-
             session.commit()
-            session.refresh(phone)
             session.expunge(phone)
             return phone
 
+    @invalidates(PHONES)
     def delete_phone(self, phone_id: int) -> None:
         with Session(self.engine) as session:
             phone = session.get(Phone, phone_id)
@@ -123,6 +95,7 @@ class PhoneCommands(DatabaseCommandHandler):
             session.delete(phone)
             session.commit()
 
+    @invalidates(PHONES)
     def delete_phone_by_number(self, contact_name: str, phone_number: str) -> None:
         with Session(self.engine) as session:
             phone = session.scalar(
@@ -9,17 +9,35 @@ from sqlalchemy import select
 from sqlalchemy.orm import Session
 from data.abstractions import DatabaseQueryHandler
 from data.models import Contact, Phone
+from data.query_cache import CONTACTS, PHONES, cached
 
 
 class PhoneQueries(DatabaseQueryHandler):
+    @cached(PHONES)
     def get_contact_phones(self, contact_id: int) -> list[Phone]:
         with Session(self.engine) as session:
             query = select(Phone).where(Phone.contact_id == contact_id)
             phones = session.scalars(query)
             return list(phones)
 
+    @cached(CONTACTS, PHONES)
     def get_contact_phones_by_name(self, contact_name: str) -> list[Phone]:
         with Session(self.engine) as session:
-            query = select(Phone).where(Phone.contact.has(Contact.name == contact_name))
+            query = select(Phone).join(Phone.contact).where(Contact.name == contact_name)
             phones = session.scalars(query)
             return list(phones)
+
+    @cached(PHONES)
+    def get_phone_numbers_by_contact(
+        self,
+        contact_ids: list[int] | None = None,
+        cache: bool = True
+    ) -> list[tuple[int, str]]:
+        """
+        Contact ids and phone numbers of all phones or of the phones of the contacts with the ids, without loading phones
+        """
+        with Session(self.engine) as session:
+            query = select(Phone.contact_id, Phone.phone_number).order_by(Phone.contact_id, Phone.phone_number)
+            if contact_ids is not None:
+                query = query.where(Phone.contact_id.in_(contact_ids))
+            return [(contact_id, phone_number) for contact_id, phone_number in session.execute(query)]
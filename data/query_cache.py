@@ -0,0 +1,250 @@
+"""
+Read-through cache for query handlers.
+
+This module keeps results of query handler methods in a bounded LRU cache
+with a time to live, one cache per engine. Every cached method declares
+the topics (tables) its result is read from, every command handler method
+declares the topics it writes to, and a write drops exactly the cached
+results that read from one of its topics.
+
+Engines have no cache until enable_query_cache is called for them, so
+handlers created for test engines always read from the database.
+The time to live bounds how long writes made by other processes
+(e.g. the CLI and the API sharing a database file) stay unnoticed.
+
+Write listeners registered for an engine are told the topics of every
+command handler method that wrote through it, whether caching is enabled
+or not, so other in-memory views of the data can follow the writes.
+Handlers of a connection run in its uncommitted transaction: they neither
+read the cache nor tell the listeners, and whoever ends the transaction
+calls invalidate_all for the engine.
+
+A cached method called with cache=False reads the database and leaves
+the cache alone, for reads too large or too rarely repeated to keep, such
+as the pages of a whole list printed by the CLI.
+
+Cached results are shared between callers: returned lists are copies,
+but ORM objects inside them are the same detached instances and must
+not be modified.
+"""
+
+import threading
+import time
+from collections import Counter, OrderedDict
+from collections.abc import Callable, Hashable, Iterable
+from dataclasses import dataclass
+from functools import wraps
+from typing import Any, Concatenate
+from weakref import WeakKeyDictionary
+from sqlalchemy import Engine
+from data.abstractions import DatabaseAware
+
+# Topics, one per table or group of tables written together
+CONTACTS = "contacts"
+PHONES = "phones"
+EMAILS = "emails"
+# Notes and their assignment to contacts
+NOTES = "notes"
+# Tags and their assignment to contacts and notes
+TAGS = "tags"
+
+# Contacts loaded with all their relationships
+CONTACT_GRAPH = (CONTACTS, PHONES, EMAILS, NOTES, TAGS)
+
+DEFAULT_MAX_ENTRIES = 1024
+DEFAULT_TTL_SECONDS = 30.0
+
+
+@dataclass
+class CacheStats:
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+    invalidations: int = 0
+
+    @property
+    def hit_ratio(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+
+@dataclass
+class _Entry:
+    value: Any
+    topics: frozenset[str]
+    expires: float
+
+
+class QueryCache:
+    def __init__(
+        self,
+        max_entries: int = DEFAULT_MAX_ENTRIES,
+        ttl: float = DEFAULT_TTL_SECONDS,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.stats = CacheStats()
+        self._clock = clock
+        self._entries: OrderedDict[Hashable, _Entry] = OrderedDict()
+        # Bumped on every write, results loaded while a write committed are not stored
+        self._generations: Counter[str] = Counter()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get_or_load[T](self, key: Hashable, topics: Iterable[str], load: Callable[[], T]) -> T:
+        """
+        Returns the cached result for the key, or loads and stores it
+        """
+        topics = frozenset(topics)
+        with self._lock:
+            now = self._clock()
+            entry = self._entries.get(key)
+            if entry is not None and entry.expires > now:
+                self._entries.move_to_end(key)
+                self.stats.hits += 1
+                return entry.value
+            if entry is not None:
+                del self._entries[key]
+            self.stats.misses += 1
+            generations = [self._generations[topic] for topic in topics]
+
+        # Loaded without holding the lock, concurrent lookups of the same key may load it twice
+        value = load()
+
+        with self._lock:
+            if generations == [self._generations[topic] for topic in topics]:
+                self._entries[key] = _Entry(value, topics, self._clock() + self.ttl)
+                self._entries.move_to_end(key)
+                while len(self._entries) > self.max_entries:
+                    _ = self._entries.popitem(last=False)
+                    self.stats.evictions += 1
+        return value
+
+    def invalidate(self, topics: Iterable[str]) -> None:
+        """
+        Drops the results read from any of the topics
+        """
+        topics = frozenset(topics)
+        with self._lock:
+            self._generations.update(topics)
+            stale = [key for key, entry in self._entries.items() if entry.topics & topics]
+            for key in stale:
+                del self._entries[key]
+            self.stats.invalidations += len(stale)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._generations.update(self._generations.keys())
+            self._entries.clear()
+
+
+_caches: WeakKeyDictionary[Engine, QueryCache] = WeakKeyDictionary()
+_write_listeners: WeakKeyDictionary[Engine, list[Callable[[frozenset[str]], None]]] = WeakKeyDictionary()
+
+
+def enable_query_cache(
+    engine: Engine,
+    max_entries: int = DEFAULT_MAX_ENTRIES,
+    ttl: float = DEFAULT_TTL_SECONDS
+) -> QueryCache:
+    cache = QueryCache(max_entries, ttl)
+    _caches[engine] = cache
+    return cache
+
+
+def disable_query_cache(engine: Engine) -> None:
+    _ = _caches.pop(engine, None)
+
+
+def get_query_cache(engine: Engine) -> QueryCache | None:
+    return _caches.get(engine)
+
+
+def share_query_cache(engine: Engine, source: Engine) -> None:
+    """
+    Uses the cache of the source engine for another engine of the same database
+    """
+    cache = _caches.get(source)
+    if cache is not None:
+        _caches[engine] = cache
+
+
+def add_write_listener(engine: Engine, listener: Callable[[frozenset[str]], None]) -> None:
+    """
+    Calls the listener with the topics of every command handler method writing through the engine
+    """
+    _write_listeners.setdefault(engine, []).append(listener)
+
+
+def remove_write_listener(engine: Engine, listener: Callable[[frozenset[str]], None]) -> None:
+    listeners = _write_listeners.get(engine, [])
+    if listener in listeners:
+        listeners.remove(listener)
+
+
+def invalidate_all(engine: Engine) -> None:
+    """
+    Drops every cached result of the engine and tells its write listeners that all topics changed,
+    after writes made past the handlers of the engine, e.g. by handlers of one of its connections
+    """
+    cache = _caches.get(engine)
+    if cache is not None:
+        cache.clear()
+    for listener in list(_write_listeners.get(engine, [])):
+        listener(frozenset(CONTACT_GRAPH))
+
+
+def _shared(value: Any) -> Any:
+    # Callers may modify the list they get, but not the one kept in the cache
+    return list(value) if isinstance(value, list) else value
+
+
+type HandlerMethod[H: DatabaseAware, **P, R] = Callable[Concatenate[H, P], R]
+
+
+def cached[H: DatabaseAware, **P, R](*topics: str) -> Callable[[HandlerMethod[H, P, R]], HandlerMethod[H, P, R]]:
+    """
+    Caches results of a query handler method, keyed on the method and its arguments.
+    Calls with cache=False bypass the cache, the method declares the argument.
+    """
+    def decorator(method: HandlerMethod[H, P, R]) -> HandlerMethod[H, P, R]:
+        @wraps(method)
+        def wrapper(self: H, *args: P.args, **kwargs: P.kwargs) -> R:
+            # Handlers of a connection read its transaction, past the cache of the engine
+            cache = _caches.get(self.engine) if isinstance(self.engine, Engine) else None
+            if cache is None or kwargs.get("cache") is False:
+                return method(self, *args, **kwargs)
+
+            key = (method.__qualname__, args, tuple(sorted(kwargs.items())))
+            try:
+                _ = hash(key)
+            except TypeError:
+                return method(self, *args, **kwargs)
+
+            return _shared(cache.get_or_load(key, topics, lambda: method(self, *args, **kwargs)))
+        return wrapper
+    return decorator
+
+
+def invalidates[H: DatabaseAware, **P, R](*topics: str) -> Callable[[HandlerMethod[H, P, R]], HandlerMethod[H, P, R]]:
+    """
+    Drops cached results read from the topics once a command handler method returns or fails
+    """
+    def decorator(method: HandlerMethod[H, P, R]) -> HandlerMethod[H, P, R]:
+        @wraps(method)
+        def wrapper(self: H, *args: P.args, **kwargs: P.kwargs) -> R:
+            try:
+                return method(self, *args, **kwargs)
+            finally:
+                # Writes of a connection are not committed yet, see invalidate_all
+                if isinstance(self.engine, Engine):
+                    cache = _caches.get(self.engine)
+                    if cache is not None:
+                        cache.invalidate(topics)
+                    for listener in list(_write_listeners.get(self.engine, [])):
+                        listener(frozenset(topics))
+        return wrapper
+    return decorator
@@ -0,0 +1,211 @@
+"""
+Rows written through an engine.
+
+This module follows the ORM sessions of engines which have row listeners
+and tells the listeners, once a transaction commits, which rows it wrote.
+Rows are reported by topic (see data/query_cache.py) and id: contact ids
+for contacts, phones and e-mails, so the phones of a contact are re-read
+together, note ids for notes and tag ids for tags and their assignments.
+
+Rows are collected from the unit of work at every flush, and from DML
+statements by their parameters or their RETURNING rows. A statement whose
+rows can not be told (e.g. an UPDATE without RETURNING) marks its whole
+topic as written.
+
+Rows written by a session bound to a connection are reported when the
+transaction of the connection commits, rolled back transactions report
+nothing. Rows of a rolled back savepoint are still reported, listeners
+re-read the rows and find them as they were.
+"""
+
+from collections import defaultdict
+from collections.abc import Callable, Iterable, Mapping
+from dataclasses import dataclass, field
+from itertools import chain
+from typing import Any
+from weakref import WeakKeyDictionary
+from sqlalchemy import Connection, Engine, Row, Table, event
+from sqlalchemy.orm import ORMExecuteState, Session, UOWTransaction, attributes
+from sqlalchemy.orm.attributes import instance_state
+from sqlalchemy.orm.base import PASSIVE_NO_INITIALIZE
+from sqlalchemy.sql.dml import UpdateBase
+from data.query_cache import CONTACTS, EMAILS, NOTES, PHONES, TAGS
+
+# Topic and id column of the rows written to each table
+_row_ids = {
+    "contacts": (CONTACTS, "contact_id"),
+    "phones": (PHONES, "contact_id"),
+    "emails": (EMAILS, "contact_id"),
+    "notes": (NOTES, "note_id"),
+    "contact_notes": (NOTES, "note_id"),
+    "tags": (TAGS, "tag_id"),
+    "contact_tags": (TAGS, "tag_id"),
+    "note_tags": (TAGS, "tag_id"),
+}
+
+# Key of the rows collected in Session.info and Connection.info
+_INFO_KEY = "written_rows"
+
+
+@dataclass
+class WrittenRows:
+    ids: defaultdict[str, set[int]] = field(default_factory=lambda: defaultdict(set))
+    # Topics written by statements whose rows are not known
+    unknown: set[str] = field(default_factory=set)
+
+    def __bool__(self) -> bool:
+        return bool(self.unknown) or any(self.ids.values())
+
+    def add(self, table: str, ids: Iterable[Any]) -> None:
+        written = _row_ids.get(table)
+        if written is not None:
+            self.ids[written[0]].update(id for id in ids if id is not None)
+
+    def add_unknown(self, table: str) -> None:
+        written = _row_ids.get(table)
+        if written is not None:
+            self.unknown.add(written[0])
+
+    def update(self, other: "WrittenRows") -> None:
+        for topic, ids in other.ids.items():
+            self.ids[topic].update(ids)
+        self.unknown.update(other.unknown)
+
+
+_row_listeners: WeakKeyDictionary[Engine, list[Callable[[WrittenRows], None]]] = WeakKeyDictionary()
+
+
+def add_row_listener(engine: Engine, listener: Callable[[WrittenRows], None]) -> None:
+    """
+    Calls the listener with the rows of every transaction committed through the engine
+    """
+    _row_listeners.setdefault(engine, []).append(listener)
+
+
+def remove_row_listener(engine: Engine, listener: Callable[[WrittenRows], None]) -> None:
+    listeners = _row_listeners.get(engine, [])
+    if listener in listeners:
+        listeners.remove(listener)
+
+
+def _notify(engine: Engine, rows: WrittenRows) -> None:
+    if rows:
+        for listener in list(_row_listeners.get(engine, [])):
+            listener(rows)
+
+
+def _collected(session: Session) -> WrittenRows | None:
+    """
+    Rows written by the session, None when nobody listens to its engine
+    """
+    bind = session.bind
+    engine = bind.engine if isinstance(bind, Connection) else bind
+    if engine is None or not _row_listeners.get(engine):
+        return None
+    return session.info.setdefault(_INFO_KEY, WrittenRows())
+
+
+def _attribute_id(instance: object, fallback: object, key: str) -> Any:
+    # Id columns of a secondary table are found on one of the two sides
+    values = instance_state(instance).dict
+    return values[key] if key in values else instance_state(fallback).dict.get(key)
+
+
+def _collect_instance(rows: WrittenRows, instance: object, whole: bool) -> None:
+    """
+    Collects the rows of an added, modified or deleted instance,
+    of a modified one only those whose columns or collections changed
+    """
+    state = instance_state(instance)
+    mapper = state.mapper
+    table = mapper.local_table
+    if isinstance(table, Table) and table.name in _row_ids:
+        key = _row_ids[table.name][1]
+        if whole or any(state.attrs[column.key].history.has_changes() for column in mapper.column_attrs):
+            rows.add(table.name, state.attrs[key].history.sum())
+
+    for relationship in mapper.relationships:
+        secondary = relationship.secondary
+        if not isinstance(secondary, Table) or secondary.name not in _row_ids:
+            continue
+        history = attributes.get_history(instance, relationship.key, passive=PASSIVE_NO_INITIALIZE)
+        related = history.sum() if whole else [*history.added, *history.deleted]
+        key = _row_ids[secondary.name][1]
+        # Scalar relationships hold None when nothing is related
+        rows.add(secondary.name, (_attribute_id(member, instance, key) for member in related if member is not None))
+
+
+def _row_values(row: Row[Any], key: str) -> list[Any]:
+    # RETURNING either columns, or whole entities
+    values = row._asdict()
+    if key in values:
+        return [values[key]]
+    return [instance_state(value).dict.get(key) for value in row if hasattr(value, "__mapper__")]
+
+
+@event.listens_for(Session, "after_flush")
+def _after_flush(session: Session, _: UOWTransaction) -> None:
+    rows = _collected(session)
+    if rows is None:
+        return
+    # New, dirty and deleted still hold the instances of the flush
+    for instance in chain(session.new, session.deleted):
+        _collect_instance(rows, instance, whole=True)
+    for instance in session.dirty:
+        _collect_instance(rows, instance, whole=False)
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _do_orm_execute(state: ORMExecuteState) -> Any:
+    statement = state.statement
+    if not isinstance(statement, UpdateBase) or not isinstance(statement.table, Table):
+        return None
+    rows = _collected(state.session)
+    table = statement.table.name
+    if rows is None or table not in _row_ids:
+        return None
+
+    key = _row_ids[table][1]
+    if key in statement.exported_columns:
+        result = state.invoke_statement().freeze()
+        rows.add(table, chain.from_iterable(_row_values(row, key) for row in result()))
+        return result()
+
+    parameters = state.parameters
+    parameter_sets = [parameters] if isinstance(parameters, Mapping) else list(parameters or [])
+    if parameter_sets and all(key in values for values in parameter_sets):
+        rows.add(table, (values[key] for values in parameter_sets))
+    else:
+        rows.add_unknown(table)
+    return None
+
+
+@event.listens_for(Session, "after_commit")
+def _after_commit(session: Session) -> None:
+    rows: WrittenRows | None = session.info.pop(_INFO_KEY, None)
+    if rows is None:
+        return
+    bind = session.bind
+    if isinstance(bind, Connection) and bind.in_transaction():
+        # Committed with the transaction of the connection
+        connection_rows: WrittenRows = bind.info.setdefault(_INFO_KEY, WrittenRows())
+        connection_rows.update(rows)
+    elif bind is not None:
+        _notify(bind.engine, rows)
+
+
+@event.listens_for(Session, "after_rollback")
+def _after_rollback(session: Session) -> None:
+    _ = session.info.pop(_INFO_KEY, None)
+
+
+@event.listens_for(Engine, "commit")
+def _connection_commit(connection: Connection) -> None:
+    rows: WrittenRows | None = connection.info.pop(_INFO_KEY, None)
+    if rows is not None:
+        _notify(connection.engine, rows)
+
+
+@event.listens_for(Engine, "rollback")
+def _connection_rollback(connection: Connection) -> None:
+    _ = connection.info.pop(_INFO_KEY, None)
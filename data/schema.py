@@ -0,0 +1,149 @@
+"""
+Schema creation and in-place upgrades for existing databases.
+
+`Base.metadata.create_all` only creates missing tables, so databases created
+by older versions of the application never receive columns and indexes added later.
+This module creates the tables, adds missing nullable and generated columns
+and then adds every missing index; an index whose columns differ from the
+declared ones, e.g. a single-column index later declared composite under
+the same name, is recreated. Unique indexes whose columns already contain
+duplicate values are skipped
+instead of failing or touching user data. The full-text index of notes
+is created and populated from existing notes the same way.
+
+A fingerprint of the models is stored in PRAGMA user_version once the
+database matches them, so later starts skip the checks with one query.
+"""
+
+import logging
+import zlib
+from sqlalchemy import DDL, Engine, Index, func, inspect, select, text
+from sqlalchemy.engine import Connection
+from sqlalchemy.schema import CreateColumn
+from data.models import Base, notes_fts_ddl
+
+logger = logging.getLogger(__name__)
+
+
+def _has_duplicates(connection: Connection, index: Index) -> bool:
+    columns = list(index.columns)
+    query = (
+        select(*columns)
+        .group_by(*columns)
+        .having(func.count() > 1)
+        .limit(1)
+    )
+    return connection.execute(query).first() is not None
+
+
+def ensure_columns(engine: Engine) -> list[str]:
+    """
+    Adds columns declared on the models which are missing in the database.
+    Only nullable and generated columns can be added to existing rows,
+    returns names of the columns which could not be added.
+    """
+    skipped: list[str] = []
+    with engine.begin() as connection:
+        inspector = inspect(connection)
+        for table in Base.metadata.sorted_tables:
+            existing = {column["name"] for column in inspector.get_columns(table.name)}
+            for column in table.columns:
+                if column.name in existing:
+                    continue
+
+                if not column.nullable and column.computed is None:
+                    logger.warning("Column %s.%s was not added: it requires a value for existing rows", table.name, column.name)
+                    skipped.append(f"{table.name}.{column.name}")
+                    continue
+
+                definition = CreateColumn(column).compile(dialect=connection.dialect)
+                _ = connection.execute(text(f"ALTER TABLE {table.name} ADD COLUMN {definition}"))
+
+    return skipped
+
+
+def ensure_indexes(engine: Engine) -> list[str]:
+    """
+    Creates indexes declared on the models which are missing in the database
+    and recreates indexes whose columns or uniqueness differ from the declared ones.
+    Returns names of the unique indexes skipped because of duplicate data.
+    """
+    skipped: list[str] = []
+    with engine.begin() as connection:
+        inspector = inspect(connection)
+        for table in Base.metadata.sorted_tables:
+            existing = {
+                index["name"]: (list(index["column_names"]), bool(index["unique"]))
+                for index in inspector.get_indexes(table.name)
+            }
+            for index in sorted(table.indexes, key=lambda i: str(i.name)):
+                declared = ([column.name for column in index.columns], bool(index.unique))
+                if existing.get(index.name) == declared:
+                    continue
+
+                if index.unique and _has_duplicates(connection, index):
+                    logger.warning("Index %s was not created: column contains duplicate values", index.name)
+                    skipped.append(str(index.name))
+                    continue
+
+                if index.name in existing:
+                    logger.info("Index %s is recreated with columns %s", index.name, ", ".join(declared[0]))
+                    index.drop(connection)
+                index.create(connection)
+
+    return skipped
+
+
+def ensure_note_search(engine: Engine) -> None:
+    """
+    Creates the notes full-text index with its triggers if it is missing
+    and fills it with the notes already stored in the database.
+    """
+    with engine.begin() as connection:
+        if inspect(connection).has_table("notes_fts"):
+            return
+
+        for statement in notes_fts_ddl:
+            _ = connection.execute(DDL(statement))
+        _ = connection.execute(text("INSERT INTO notes_fts(notes_fts) VALUES ('rebuild')"))
+
+
+def schema_version() -> int:
+    """
+    Fingerprint of the tables, columns and indexes declared on the models
+    """
+    parts: list[str] = []
+    for table in Base.metadata.sorted_tables:
+        parts.append(table.name)
+        for column in table.columns:
+            computed = str(column.computed.sqltext) if column.computed is not None else ""
+            parts.append(f"{column.name} {column.type} {column.nullable} {computed}")
+        for index in sorted(table.indexes, key=lambda i: str(i.name)):
+            parts.append(f"{index.name} {index.unique} {[column.name for column in index.columns]}")
+    parts.extend(notes_fts_ddl)
+    # user_version is a signed 32-bit integer, 0 for databases never stamped
+    return zlib.crc32("\n".join(parts).encode()) & 0x7fffffff or 1
+
+
+def read_schema_version(engine: Engine) -> int:
+    with engine.connect() as connection:
+        return connection.exec_driver_sql("PRAGMA user_version").scalar_one()
+
+
+def ensure_schema(engine: Engine) -> None:
+    """
+    Creates missing tables, columns and indexes.
+    Safe to run repeatedly against new and existing databases,
+    does nothing for a database stamped with the current schema version.
+    """
+    version = schema_version()
+    if read_schema_version(engine) == version:
+        return
+
+    Base.metadata.create_all(engine)
+    skipped = ensure_columns(engine) + ensure_indexes(engine)
+    ensure_note_search(engine)
+    # Skipped columns and indexes are retried on the next start
+    if not skipped:
+        with engine.begin() as connection:
+            _ = connection.exec_driver_sql(f"PRAGMA user_version = {version}")
@@ -0,0 +1,100 @@
+"""
+SQLite connection profiles.
+
+This module defines named sets of SQLite pragmas (durable, balanced, fast)
+and applies one of them to every new connection of an engine through
+a connect event.
+"""
+
+from dataclasses import dataclass
+from sqlalchemy import Engine, event
+
+
+@dataclass(frozen=True)
+class SQLiteProfile:
+    # WAL lets readers proceed while a write is in progress
+    journal_mode: str
+    # FULL syncs on every commit, NORMAL only at WAL checkpoints, OFF leaves it to the OS
+    synchronous: str
+    # Page cache size, negative values are in KiB
+    cache_size: int
+    # Bytes of the database file read through memory-mapped I/O
+    mmap_size: int
+    temp_store: str
+    # Milliseconds to wait for a lock held by another connection
+    busy_timeout: int
+    foreign_keys: bool
+
+    def pragmas(self) -> list[str]:
+        return [
+            f"PRAGMA journal_mode = {self.journal_mode}",
+            f"PRAGMA synchronous = {self.synchronous}",
+            f"PRAGMA cache_size = {self.cache_size}",
+            f"PRAGMA mmap_size = {self.mmap_size}",
+            f"PRAGMA temp_store = {self.temp_store}",
+            f"PRAGMA busy_timeout = {self.busy_timeout}",
+            f"PRAGMA foreign_keys = {"ON" if self.foreign_keys else "OFF"}",
+        ]
+
+
+profiles: dict[str, SQLiteProfile] = {
+    # No committed write is lost even on power failure
+    "durable": SQLiteProfile(
+        journal_mode="WAL",
+        synchronous="FULL",
+        cache_size=-16_000,
+        mmap_size=0,
+        temp_store="DEFAULT",
+        busy_timeout=5_000,
+        foreign_keys=True,
+    ),
+    # Survives application crashes, a power failure can lose the last commits
+    "balanced": SQLiteProfile(
+        journal_mode="WAL",
+        synchronous="NORMAL",
+        cache_size=-64_000,
+        mmap_size=256 * 1024 * 1024,
+        temp_store="MEMORY",
+        busy_timeout=5_000,
+        foreign_keys=True,
+    ),
+    # Bulk loads and throwaway databases, an OS crash can corrupt the database
+    "fast": SQLiteProfile(
+        journal_mode="WAL",
+        synchronous="OFF",
+        cache_size=-256_000,
+        mmap_size=1024 * 1024 * 1024,
+        temp_store="MEMORY",
+        busy_timeout=5_000,
+        foreign_keys=True,
+    ),
+}
+
+DEFAULT_PROFILE = "balanced"
+
+
+def get_profile(name: str | None) -> SQLiteProfile:
+    """
+    Returns the profile by name, the default profile when name is empty
+    """
+    name = (name or DEFAULT_PROFILE).strip().lower()
+    if name not in profiles:
+        raise ValueError(f"Unknown SQLite profile '{name}'. Expected one of: {", ".join(profiles)}")
+    return profiles[name]
+
+
+def apply_profile(engine: Engine, profile: SQLiteProfile) -> None:
+    """
+    Applies the profile pragmas to every connection the engine opens
+    """
+    pragmas = profile.pragmas()
+
+    def on_connect(dbapi_connection, _connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            for pragma in pragmas:
+                _ = cursor.execute(pragma)
+        finally:
+            cursor.close()
+
+    event.listen(engine, "connect", on_connect)
@@ -0,0 +1,42 @@
+"""
+Query handlers for tag-related database operations.
+
+This module provides read-only database operations for tags
+shared by contacts and notes.
+"""
+
+from sqlalchemy import or_, select
+from sqlalchemy.orm import Session
+from data.abstractions import DatabaseQueryHandler
+from data.models import Tag
+from data.query_cache import TAGS, cached
+
+
+class TagQueries(DatabaseQueryHandler):
+    @cached(TAGS)
+    def get_tag_labels(self) -> list[str]:
+        """
+        Labels of tags assigned to at least one contact or note, in alphabetical order
+        """
+        with Session(self.engine) as session:
+            query = (
+                select(Tag.label)
+                .where(or_(Tag.contacts.any(), Tag.notes.any()))
+                .order_by(Tag.label)
+            )
+            return list(session.scalars(query))
+
+    @cached(TAGS)
+    def get_assigned_tag_ids_and_labels(
+        self,
+        tag_ids: list[int] | None = None,
+        cache: bool = True
+    ) -> list[tuple[int, str]]:
+        """
+        Ids and labels of all tags or of the tags with the ids, assigned to at least one contact or note
+        """
+        with Session(self.engine) as session:
+            query = select(Tag.tag_id, Tag.label).where(or_(Tag.contacts.any(), Tag.notes.any()))
+            if tag_ids is not None:
+                query = query.where(Tag.tag_id.in_(tag_ids))
+            return [(tag_id, label) for tag_id, label in session.execute(query)]
@@ -0,0 +1,190 @@
+"""
+Local agent loop for chats.
+
+This module lets the model use the MCP tools of an in-process FastMCP server.
+The tools of the server are passed to the Messages API as tool definitions,
+and every tool_use block the model answers with is executed through an
+in-memory MCP client, so tool calls reach the database of this process
+without leaving it. Tool calls of one answer run concurrently.
+Answers are streamed, so text reaches the caller as the model writes it.
+
+Tool definitions are marked for the prompt cache, and token usage of all
+requests is summed in the reply.
+
+The Anthropic SDK is only needed for type checking here, the client is
+created by the caller, so importing this module does not import the SDK.
+
+The loop asks the model at most `max_iterations` times. The last request
+does not allow tools, so the model answers with what it has gathered.
+"""
+
+from __future__ import annotations
+import asyncio
+import logging
+from collections.abc import AsyncIterator, Sequence
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Any
+from fastmcp import Client, FastMCP
+from mcp.types import TextContent, Tool
+from llm.context import cached_tools
+
+if TYPE_CHECKING:
+    from anthropic import AsyncAnthropic
+    from anthropic.types import MessageParam, TextBlockParam, ToolParam, ToolResultBlockParam, ToolUseBlock, Usage
+    from fastmcp.client.transports import FastMCPTransport
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_ITERATIONS = 8
+
+
+@dataclass
+class TextDelta:
+    text: str
+    # Number of the text block of the reply the text belongs to
+    block: int
+
+
+@dataclass
+class ToolStarted:
+    name: str
+
+
+@dataclass
+class TokenUsage:
+    # Tokens processed without the prompt cache
+    input_tokens: int = 0
+    cache_creation_input_tokens: int = 0
+    cache_read_input_tokens: int = 0
+    output_tokens: int = 0
+
+    @property
+    def sent_tokens(self) -> int:
+        return self.input_tokens + self.cache_creation_input_tokens + self.cache_read_input_tokens
+
+    def add(self, usage: Usage) -> None:
+        self.input_tokens += usage.input_tokens
+        self.cache_creation_input_tokens += usage.cache_creation_input_tokens or 0
+        self.cache_read_input_tokens += usage.cache_read_input_tokens or 0
+        self.output_tokens += usage.output_tokens
+
+    def summary(self) -> str:
+        return (
+            f"{self.sent_tokens} tokens sent ({self.cache_read_input_tokens} from cache, "
+            f"{self.cache_creation_input_tokens} cached), {self.output_tokens} received"
+        )
+
+
+@dataclass
+class AgentReply:
+    texts: list[str]
+    iterations: int
+    tool_calls: int
+    # Summed over all model requests of the reply
+    usage: TokenUsage = field(default_factory=TokenUsage)
+
+
+AgentEvent = TextDelta | ToolStarted | AgentReply
+
+
+def tool_definition(tool: Tool) -> ToolParam:
+    return {
+        "name": tool.name,
+        "description": tool.description or "",
+        "input_schema": tool.inputSchema,
+    }
+
+
+async def _call_tool(client: Client[FastMCPTransport], block: ToolUseBlock) -> ToolResultBlockParam:
+    try:
+        result = await client.call_tool_mcp(block.name, block.input if isinstance(block.input, dict) else {})
+    except Exception as ex:
+        logger.warning("Tool %s failed: %s", block.name, ex)
+        return {"type": "tool_result", "tool_use_id": block.id, "content": str(ex), "is_error": True}
+
+    texts = [content.text for content in result.content if isinstance(content, TextContent)]
+    return {
+        "type": "tool_result",
+        "tool_use_id": block.id,
+        "content": [{"type": "text", "text": text} for text in texts],
+        "is_error": result.isError,
+    }
+
+
+async def stream_agent(
+    anthropic: AsyncAnthropic,
+    server: FastMCP,
+    messages: Sequence[MessageParam],
+    model: str,
+    max_tokens: int,
+    max_iterations: int = DEFAULT_MAX_ITERATIONS,
+    system: Sequence[TextBlockParam] = (),
+) -> AsyncIterator[AgentEvent]:
+    """
+    Answers the conversation, executing tools the model asks for in-process.
+    Yields text as the model generates it and names of tools as they start,
+    the last event is the reply with text blocks of every model answer in order.
+    """
+    conversation = list(messages)
+    texts: list[str] = []
+    tool_calls = 0
+    usage = TokenUsage()
+
+    async with Client(server) as client:
+        tools = cached_tools([tool_definition(tool) for tool in await client.list_tools()])
+
+        # An empty system prompt is left out of the request
+        options: dict[str, Any] = {"system": list(system)} if system else {}
+
+        for iteration in range(1, max_iterations + 1):
+            last = iteration == max_iterations
+            async with anthropic.messages.stream(
+                model=model,
+                max_tokens=max_tokens,
+                messages=conversation,
+                tools=tools,
+                tool_choice={"type": "none"} if last else {"type": "auto"},
+                **options,
+            ) as stream:
+                block = len(texts) - 1
+                async for event in stream:
+                    if event.type == "content_block_start" and event.content_block.type == "text":
+                        block += 1
+                    elif event.type == "text":
+                        yield TextDelta(event.text, block)
+                response = await stream.get_final_message()
+            usage.add(response.usage)
+
+            texts.extend(content.text for content in response.content if content.type == "text")
+            tool_uses = [content for content in response.content if content.type == "tool_use"]
+            if response.stop_reason != "tool_use" or not tool_uses or last:
+                yield AgentReply(texts, iteration, tool_calls, usage)
+                return
+
+            for tool_use in tool_uses:
+                yield ToolStarted(tool_use.name)
+            results = await asyncio.gather(*(_call_tool(client, tool_use) for tool_use in tool_uses))
+            tool_calls += len(tool_uses)
+            conversation.append({"role": "assistant", "content": response.content})
+            conversation.append({"role": "user", "content": list(results)})
+
+    yield AgentReply(texts, max_iterations, tool_calls, usage)
+
+
+async def run_agent(
+    anthropic: AsyncAnthropic,
+    server: FastMCP,
+    messages: Sequence[MessageParam],
+    model: str,
+    max_tokens: int,
+    max_iterations: int = DEFAULT_MAX_ITERATIONS,
+    system: Sequence[TextBlockParam] = (),
+) -> AgentReply:
+    """
+    Answers the conversation like stream_agent, returns only the reply
+    """
+    reply = AgentReply([], 0, 0)
+    async for event in stream_agent(anthropic, server, messages, model, max_tokens, max_iterations, system):
+        if isinstance(event, AgentReply):
+            reply = event
+    return reply
@@ -1,32 +1,53 @@
+from __future__ import annotations
 import os
-from collections.abc import Iterable
-from anthropic import Anthropic
-from anthropic.types import MessageParam
+from collections.abc import AsyncIterator
+from functools import cache
+from typing import TYPE_CHECKING
+from llm.agent import AgentEvent, AgentReply, run_agent, stream_agent
+from llm.context import ChatContext, build_context, configured_policy, system_blocks
+from llm.tools import mcp
+
+if TYPE_CHECKING:
+    from anthropic import AsyncAnthropic
+    from anthropic.types import MessageParam
 
 api_key = os.getenv("Anthropic")
 
-client = Anthropic(api_key=api_key)
+model = "claude-haiku-4-5-20251001"
+max_tokens = 1000
+
+# Same for every request, cached by the provider together with the tool definitions
+system_prompt = (
+    "You are Magic 8, the assistant of a personal address book. "
+    "Use the tools to look up and change contacts, phones, e-mails, birthdays, notes and tags. "
+    "Answer briefly."
+)
+
+context_policy = configured_policy()
+
+@cache
+def get_client() -> AsyncAnthropic:
+    # The SDK is imported with the first chat, the API starts without it
+    from anthropic import AsyncAnthropic
+    return AsyncAnthropic(api_key=api_key)
 
-def get_response_for_message(message_text: str) -> list[str]:
+async def get_response_for_message(message_text: str) -> list[str]:
     message: MessageParam = {"role": "user", "content": message_text}
-    return get_response_for_messages([message])
-
-def get_response_for_messages(messages: Iterable[MessageParam]) -> list[str]:
-    response = client.messages.create(
-        model="claude-haiku-4-5-20251001",
-        max_tokens=1000,
-        messages=messages,
-        extra_headers={
-            "anthropic-beta": "mcp-client-2025-04-04"
-        },
-        extra_body={
-            "mcp_servers": [
-                {
-                    "type": "url",
-                    "url": "https://magic-8.azurewebsites.net/mcp/",
-                    "name": "magic-8",
-                }
-            ]
-        }
-    )
-    return [block.text for block in response.content if block.type == "text"]
+    context = await prepare_context([message])
+    reply = await get_response_for_context(context)
+    return reply.texts
+
+async def prepare_context(messages: list[MessageParam], summary: str | None = None) -> ChatContext:
+    """
+    Latest messages of the thread within the token budget, older ones folded into the summary if enabled
+    """
+    return await build_context(get_client(), model, context_policy, messages, summary)
+
+async def get_response_for_context(context: ChatContext) -> AgentReply:
+    # Tools run in this process through an in-memory MCP client
+    system = system_blocks(system_prompt, context.summary)
+    return await run_agent(get_client(), mcp, context.messages, model, max_tokens, system=system)
+
+def stream_response_for_context(context: ChatContext) -> AsyncIterator[AgentEvent]:
+    system = system_blocks(system_prompt, context.summary)
+    return stream_agent(get_client(), mcp, context.messages, model, max_tokens, system=system)
@@ -0,0 +1,279 @@
+"""
+Bounded storage of chat threads.
+
+This module keeps the message history of every chat thread served by
+/chat/{chat_id}. Threads unused for longer than the time to live are dropped,
+only the least recently used threads are kept when there are too many,
+and every thread keeps only its latest messages. Older messages can be
+compacted into a summary kept with the thread.
+
+Threads are kept in process memory by default. With Magic_CHAT_STORE=sqlite
+they are stored in the application database instead, so they survive
+restarts and every worker of a multi-worker deployment serves the same chat.
+"""
+
+from __future__ import annotations
+import os
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from collections.abc import Callable, Sequence
+from dataclasses import dataclass
+from typing import TYPE_CHECKING
+from sqlalchemy import JSON, Column, Engine, Float, ForeignKey, Integer, MetaData, String, Table, Text, delete, func, insert, select, update
+from sqlalchemy.engine import Connection
+
+if TYPE_CHECKING:
+    from anthropic.types import MessageParam
+
+DEFAULT_MAX_CHATS = 1000
+DEFAULT_MAX_MESSAGES = 100
+DEFAULT_TTL_SECONDS = 24 * 60 * 60
+
+metadata = MetaData()
+
+chat_threads = Table(
+    "chat_threads",
+    metadata,
+    Column("chat_id", String(36), primary_key=True),
+    Column("updated_at", Float, nullable=False, index=True),
+    # Summary of older messages removed from the thread
+    Column("summary", Text, nullable=True),
+)
+
+chat_messages = Table(
+    "chat_messages",
+    metadata,
+    Column("message_id", Integer, primary_key=True),
+    Column("chat_id", ForeignKey(chat_threads.c.chat_id), nullable=False, index=True),
+    Column("role", String(16), nullable=False),
+    Column("content", JSON, nullable=False),
+)
+
+
+def trim_thread(messages: Sequence[MessageParam], max_messages: int) -> list[MessageParam]:
+    """
+    Returns the latest `max_messages` messages, starting with a user message as the model expects
+    """
+    kept = list(messages[-max_messages:]) if max_messages > 0 else []
+    while kept and kept[0]["role"] != "user":
+        _ = kept.pop(0)
+    return kept
+
+
+class ChatStore(ABC):
+    def __init__(
+        self,
+        max_chats: int = DEFAULT_MAX_CHATS,
+        max_messages: int = DEFAULT_MAX_MESSAGES,
+        ttl: float = DEFAULT_TTL_SECONDS
+    ):
+        self.max_chats = max_chats
+        self.max_messages = max_messages
+        self.ttl = ttl
+
+    @abstractmethod
+    def load(self, chat_id: str) -> list[MessageParam]:
+        """
+        Returns messages of the thread, an empty list for a new or expired thread
+        """
+
+    @abstractmethod
+    def append(self, chat_id: str, messages: Sequence[MessageParam]) -> None:
+        """
+        Adds messages to the end of the thread and marks it as recently used
+        """
+
+    @abstractmethod
+    def load_summary(self, chat_id: str) -> str | None:
+        """
+        Returns summary of the messages removed by compact
+        """
+
+    @abstractmethod
+    def compact(self, chat_id: str, summary: str, dropped: int) -> None:
+        """
+        Replaces the `dropped` oldest messages of the thread by the summary
+        """
+
+    @abstractmethod
+    def count(self) -> int:
+        """
+        Returns number of threads kept
+        """
+
+
+@dataclass
+class _Thread:
+    messages: list[MessageParam]
+    expires: float
+    summary: str | None = None
+
+
+class MemoryChatStore(ChatStore):
+    def __init__(
+        self,
+        max_chats: int = DEFAULT_MAX_CHATS,
+        max_messages: int = DEFAULT_MAX_MESSAGES,
+        ttl: float = DEFAULT_TTL_SECONDS,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        super().__init__(max_chats, max_messages, ttl)
+        self._clock = clock
+        self._threads: OrderedDict[str, _Thread] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def load(self, chat_id: str) -> list[MessageParam]:
+        with self._lock:
+            thread = self._threads.get(chat_id)
+            if thread is None:
+                return []
+            if thread.expires <= self._clock():
+                del self._threads[chat_id]
+                return []
+            self._threads.move_to_end(chat_id)
+            return list(thread.messages)
+
+    def append(self, chat_id: str, messages: Sequence[MessageParam]) -> None:
+        with self._lock:
+            now = self._clock()
+            thread = self._threads.pop(chat_id, None)
+            if thread is None or thread.expires <= now:
+                thread = _Thread([], now)
+            messages = trim_thread([*thread.messages, *messages], self.max_messages)
+            self._threads[chat_id] = _Thread(messages, now + self.ttl, thread.summary)
+            while len(self._threads) > self.max_chats:
+                _ = self._threads.popitem(last=False)
+
+    def load_summary(self, chat_id: str) -> str | None:
+        with self._lock:
+            thread = self._threads.get(chat_id)
+            return thread.summary if thread is not None and thread.expires > self._clock() else None
+
+    def compact(self, chat_id: str, summary: str, dropped: int) -> None:
+        with self._lock:
+            thread = self._threads.get(chat_id)
+            if thread is not None and thread.expires > self._clock():
+                thread.messages = thread.messages[dropped:]
+                thread.summary = summary
+
+    def count(self) -> int:
+        with self._lock:
+            return len(self._threads)
+
+
+class SqliteChatStore(ChatStore):
+    def __init__(
+        self,
+        engine: Engine,
+        max_chats: int = DEFAULT_MAX_CHATS,
+        max_messages: int = DEFAULT_MAX_MESSAGES,
+        ttl: float = DEFAULT_TTL_SECONDS,
+        clock: Callable[[], float] = time.time
+    ):
+        super().__init__(max_chats, max_messages, ttl)
+        self.engine = engine
+        # Wall clock, shared by all processes using the database
+        self._clock = clock
+        metadata.create_all(engine)
+
+    def load(self, chat_id: str) -> list[MessageParam]:
+        query = (
+            select(chat_messages.c.role, chat_messages.c.content)
+            .join(chat_threads)
+            .where(chat_threads.c.chat_id == chat_id, chat_threads.c.updated_at > self._clock() - self.ttl)
+            .order_by(chat_messages.c.message_id)
+        )
+        with self.engine.connect() as connection:
+            return [{"role": role, "content": content} for role, content in connection.execute(query)]
+
+    def append(self, chat_id: str, messages: Sequence[MessageParam]) -> None:
+        now = self._clock()
+        with self.engine.begin() as connection:
+            expired = select(chat_threads.c.chat_id).where(chat_threads.c.updated_at <= now - self.ttl).scalar_subquery()
+            _ = connection.execute(delete(chat_messages).where(chat_messages.c.chat_id.in_(expired)))
+            _ = connection.execute(delete(chat_threads).where(chat_threads.c.updated_at <= now - self.ttl))
+
+            updated = connection.execute(update(chat_threads).where(chat_threads.c.chat_id == chat_id).values(updated_at=now))
+            if updated.rowcount == 0:
+                _ = connection.execute(insert(chat_threads).values(chat_id=chat_id, updated_at=now))
+            if messages:
+                _ = connection.execute(
+                    insert(chat_messages),
+                    [{"chat_id": chat_id, "role": message["role"], "content": message["content"]} for message in messages]
+                )
+            self._trim(connection, chat_id)
+            self._evict(connection)
+
+    def load_summary(self, chat_id: str) -> str | None:
+        query = select(chat_threads.c.summary).where(
+            chat_threads.c.chat_id == chat_id,
+            chat_threads.c.updated_at > self._clock() - self.ttl
+        )
+        with self.engine.connect() as connection:
+            return connection.execute(query).scalar_one_or_none()
+
+    def compact(self, chat_id: str, summary: str, dropped: int) -> None:
+        oldest = (
+            select(chat_messages.c.message_id)
+            .where(chat_messages.c.chat_id == chat_id)
+            .order_by(chat_messages.c.message_id)
+            .limit(dropped)
+            .scalar_subquery()
+        )
+        with self.engine.begin() as connection:
+            updated = connection.execute(
+                update(chat_threads)
+                .where(chat_threads.c.chat_id == chat_id, chat_threads.c.updated_at > self._clock() - self.ttl)
+                .values(summary=summary)
+            )
+            if updated.rowcount:
+                _ = connection.execute(delete(chat_messages).where(chat_messages.c.message_id.in_(oldest)))
+
+    def count(self) -> int:
+        query = select(func.count()).select_from(chat_threads).where(chat_threads.c.updated_at > self._clock() - self.ttl)
+        with self.engine.connect() as connection:
+            return connection.execute(query).scalar_one()
+
+    def _trim(self, connection: Connection, chat_id: str) -> None:
+        rows = connection.execute(
+            select(chat_messages.c.message_id, chat_messages.c.role)
+            .where(chat_messages.c.chat_id == chat_id)
+            .order_by(chat_messages.c.message_id)
+        ).all()
+        if len(rows) <= self.max_messages and (not rows or rows[0].role == "user"):
+            return
+
+        # Trimming only looks at roles, contents stay in the database
+        kept = trim_thread([{"role": row.role, "content": ""} for row in rows], self.max_messages)
+        first_kept = rows[len(rows) - len(kept)].message_id if kept else None
+        query = delete(chat_messages).where(chat_messages.c.chat_id == chat_id)
+        if first_kept is not None:
+            query = query.where(chat_messages.c.message_id < first_kept)
+        _ = connection.execute(query)
+
+    def _evict(self, connection: Connection) -> None:
+        # Least recently used threads beyond the limit
+        evicted = (
+            select(chat_threads.c.chat_id)
+            .order_by(chat_threads.c.updated_at.desc())
+            .offset(self.max_chats)
+            .scalar_subquery()
+        )
+        _ = connection.execute(delete(chat_messages).where(chat_messages.c.chat_id.in_(evicted)))
+        _ = connection.execute(delete(chat_threads).where(chat_threads.c.chat_id.in_(evicted)))
+
+
+def create_chat_store(name: str | None = None) -> ChatStore:
+    """
+    Returns the chat store named by Magic_CHAT_STORE: memory (default) or sqlite
+    """
+    name = (name or os.getenv("Magic_CHAT_STORE") or "memory").strip().lower()
+    if name == "memory":
+        return MemoryChatStore()
+    if name == "sqlite":
+        # Imported on demand, the memory store does not open the database
+        from data.database import get_database_engine
+        return SqliteChatStore(get_database_engine())
+    raise ValueError(f"Unknown chat store '{name}'. Expected one of: memory, sqlite")
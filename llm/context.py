@@ -0,0 +1,178 @@
+"""
+Conversation size control for chat threads.
+
+This module decides what part of a chat thread is sent to the model.
+Only the latest messages fitting into a token budget are sent, older ones
+are dropped or, when summarization is on, folded into a rolling summary
+of the thread which is sent in the system prompt instead.
+
+Tool definitions and the system prompt are the same for every request,
+they are marked for the provider's prompt cache so repeated requests
+read them from the cache instead of processing them again.
+
+Tokens are estimated locally from the length of the messages, which is
+accurate enough to keep requests within the budget without asking the API.
+
+The budget is read from Magic_CHAT_CONTEXT_TOKENS (8000 by default),
+summarization is turned on with Magic_CHAT_SUMMARY=on.
+"""
+
+from __future__ import annotations
+import json
+import os
+from collections.abc import Sequence
+from dataclasses import dataclass
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from anthropic import AsyncAnthropic
+    from anthropic.types import ContentBlock, ContentBlockParam, MessageParam, TextBlockParam, ToolParam
+
+# Average characters per token of English text
+CHARS_PER_TOKEN = 4
+DEFAULT_BUDGET_TOKENS = 8000
+DEFAULT_SUMMARY_TOKENS = 400
+
+summary_prompt = (
+    "Summarize the conversation below between a user and an address book assistant "
+    "in a few sentences. Keep names, phone numbers, e-mails, dates and decisions, "
+    "they are needed to continue the conversation. Answer with the summary only."
+)
+
+
+@dataclass(frozen=True)
+class ContextPolicy:
+    budget_tokens: int = DEFAULT_BUDGET_TOKENS
+    summarize: bool = False
+    summary_tokens: int = DEFAULT_SUMMARY_TOKENS
+
+
+@dataclass
+class ChatContext:
+    # Latest messages of the thread sent to the model
+    messages: list[MessageParam]
+    summary: str | None
+    # Oldest messages of the thread which are not sent
+    dropped: int
+    estimated_tokens: int
+
+
+def configured_policy() -> ContextPolicy:
+    budget = int(os.getenv("Magic_CHAT_CONTEXT_TOKENS", str(DEFAULT_BUDGET_TOKENS)))
+    summarize = os.getenv("Magic_CHAT_SUMMARY", "off").strip().lower() in ("on", "1", "true")
+    return ContextPolicy(budget_tokens=budget, summarize=summarize)
+
+
+def estimate_tokens(message: MessageParam) -> int:
+    content = message["content"]
+    text = content if isinstance(content, str) else json.dumps(content, default=str)
+    return len(text) // CHARS_PER_TOKEN + 1
+
+
+def fit_window(messages: Sequence[MessageParam], budget_tokens: int) -> int:
+    """
+    Returns number of oldest messages to drop so the rest fits into the budget.
+    The last message is always kept and the kept messages start with a user message.
+    """
+    used = 0
+    first_kept = len(messages)
+    for index in range(len(messages) - 1, -1, -1):
+        used += estimate_tokens(messages[index])
+        if used > budget_tokens and index < len(messages) - 1:
+            break
+        first_kept = index
+
+    while first_kept < len(messages) - 1 and messages[first_kept]["role"] != "user":
+        first_kept += 1
+    return first_kept
+
+
+def system_blocks(prompt: str, summary: str | None) -> list[TextBlockParam]:
+    """
+    System prompt marked for the prompt cache, followed by the summary which changes with the thread
+    """
+    blocks: list[TextBlockParam] = [{"type": "text", "text": prompt, "cache_control": {"type": "ephemeral"}}]
+    if summary:
+        blocks.append({"type": "text", "text": f"Summary of the earlier conversation: {summary}"})
+    return blocks
+
+
+def cached_tools(tools: Sequence[ToolParam]) -> list[ToolParam]:
+    """
+    Tool definitions with the prompt cache marker on the last one, which caches all of them
+    """
+    if not tools:
+        return []
+    return [*tools[:-1], {**tools[-1], "cache_control": {"type": "ephemeral"}}]
+
+
+def _block_text(block: ContentBlockParam | ContentBlock) -> str:
+    """
+    Text of a content block for the transcript, tool calls and results in brackets
+    """
+    if not isinstance(block, dict):
+        # Blocks of a model response appended to the conversation as they are
+        if block.type == "text":
+            return block.text
+        if block.type == "tool_use":
+            return f"[{block.name} called with {json.dumps(block.input, default=str)}]"
+        return ""
+
+    if block["type"] == "text":
+        return block["text"]
+    if block["type"] == "tool_use":
+        return f"[{block["name"]} called with {json.dumps(block["input"], default=str)}]"
+    if block["type"] == "tool_result":
+        content = block.get("content", "")
+        if not isinstance(content, str):
+            content = " ".join(part["text"] for part in content if part["type"] == "text")
+        return f"[tool {"error" if block.get("is_error") else "result"}: {content}]"
+    return ""
+
+
+def _transcript(messages: Sequence[MessageParam]) -> str:
+    lines: list[str] = []
+    for message in messages:
+        content = message["content"]
+        if not isinstance(content, str):
+            content = " ".join(text for text in map(_block_text, content) if text)
+        if content:
+            lines.append(f"{message["role"].capitalize()}: {content}")
+    return "\n".join(lines)
+
+
+async def summarize(
+    anthropic: AsyncAnthropic,
+    model: str,
+    summary: str | None,
+    messages: Sequence[MessageParam],
+    max_tokens: int = DEFAULT_SUMMARY_TOKENS,
+) -> str:
+    """
+    Returns the summary extended with the messages
+    """
+    earlier = f"Summary of the conversation before:\n{summary}\n\n" if summary else ""
+    request: MessageParam = {
+        "role": "user",
+        "content": f"{summary_prompt}\n\n{earlier}Conversation:\n{_transcript(messages)}",
+    }
+    response = await anthropic.messages.create(model=model, max_tokens=max_tokens, messages=[request])
+    return " ".join(block.text for block in response.content if block.type == "text").strip()
+
+
+async def build_context(
+    anthropic: AsyncAnthropic,
+    model: str,
+    policy: ContextPolicy,
+    messages: Sequence[MessageParam],
+    summary: str | None = None,
+) -> ChatContext:
+    """
+    Returns the messages fitting into the budget of the policy and the summary of the thread,
+    extended with the dropped messages when the policy summarizes
+    """
+    dropped = fit_window(messages, policy.budget_tokens)
+    kept = list(messages[dropped:])
+    if dropped and policy.summarize:
+        summary = await summarize(anthropic, model, summary, messages[:dropped], policy.summary_tokens)
+    return ChatContext(kept, summary, dropped, sum(estimate_tokens(message) for message in kept))
@@ -1,5 +1,9 @@
+import logging
 from typing import Any
 from fastmcp import FastMCP
+from fastmcp.server.middleware import CallNext, Middleware, MiddlewareContext
+from fastmcp.tools.tool import ToolResult
+from mcp.types import CallToolRequestParams
 from datetime import date
 from data.contact_commands import ContactCommands, CreateContact, UpdateContact
 from data.contact_queries import ContactQueries
@@ -11,35 +15,62 @@ from data.email_queries import EmailQueries
 from data.note_commands import NoteCommands, CreateNote, UpdateNote
 from data.note_queries import NoteQueries
 from data.tag_commands import AddTag, RemoveTag
-from data.database import database_engine as engine
-from api.mappers import map_contact, map_note, map_phone, map_email
+from data.async_database import async_database_engine as engine
+from data.async_handlers import AsyncHandler
+from data.instrumentation import sql_stats
+from data.pagination import next_page_after
+from api.mappers import map_contact, map_note, map_note_search_result, map_phone, map_email
+
+logger = logging.getLogger(__name__)
+
+
+class SqlStatsMiddleware(Middleware):
+    """Logs SQL statements executed by every tool call at debug level."""
+
+    async def on_call_tool(
+        self,
+        context: MiddlewareContext[CallToolRequestParams],
+        call_next: CallNext[CallToolRequestParams, ToolResult]
+    ) -> ToolResult:
+        with sql_stats() as stats:
+            result = await call_next(context)
+        logger.debug("Tool %s: %s", context.message.name, stats.details())
+        return result
+
 
 mcp = FastMCP(name="Magic 8")
+mcp.add_middleware(SqlStatsMiddleware())
 
 Data = dict[str, Any]
 
 # Contacts
 
 @mcp.tool
-def get_all_contacts() -> list[Data]:
-    """Retrieves a list of all contacts."""
-    queries = ContactQueries(engine)
-    contacts = queries.get_contacts()
-    return [map_contact(contact).model_dump() for contact in contacts]
+async def get_all_contacts(limit: int = 50, after: int | None = None) -> Data:
+    """Retrieves a page of contacts. To get the next page pass returned next_after as after."""
+    queries = AsyncHandler(ContactQueries, engine)
+    contacts = await queries.run(ContactQueries.get_contacts, limit, after)
+    return {
+        "contacts": [map_contact(contact).model_dump() for contact in contacts],
+        "next_after": next_page_after([contact.contact_id for contact in contacts], limit)
+    }
 
 @mcp.tool
-def get_contact_by_name(contact_name: str) -> Data | None:
+async def get_contact_by_name(contact_name: str) -> Data | None:
     """Retrieves a single contact by name."""
-    queries = ContactQueries(engine)
-    contact = queries.get_contact_by_name(contact_name)
+    queries = AsyncHandler(ContactQueries, engine)
+    contact = await queries.run(ContactQueries.get_contact_by_name, contact_name)
     return map_contact(contact).model_dump() if contact else None
 
 @mcp.tool
-def get_contacts_by_tag(tag: str) -> list[Data]:
-    """Retrieves a list of contacts filtered by a specific tag."""
-    queries = ContactQueries(engine)
-    contacts = queries.get_contacts_by_tag(tag)
-    return [map_contact(contact).model_dump() for contact in contacts]
+async def get_contacts_by_tag(tag: str, limit: int = 50, after: int | None = None) -> Data:
+    """Retrieves a page of contacts filtered by a specific tag. To get the next page pass returned next_after as after."""
+    queries = AsyncHandler(ContactQueries, engine)
+    contacts = await queries.run(ContactQueries.get_contacts_by_tag, tag, limit, after)
+    return {
+        "contacts": [map_contact(contact).model_dump() for contact in contacts],
+        "next_after": next_page_after([contact.contact_id for contact in contacts], limit)
+    }
 
 def _map_reminder(reminder: BirthdayReminder):
     return {
@@ -48,27 +79,28 @@ def _map_reminder(reminder: BirthdayReminder):
     }
 
 @mcp.tool
-def get_upcoming_birthdays(days: int = 7) -> list[Data]:
+async def get_upcoming_birthdays(days: int = 7) -> list[Data]:
     """Retrieves contacts with birthdays in the next N days (default 7)."""
-    queries = ContactQueries(engine)
-    reminders = queries.get_contacts_with_birthdays_in_days(days)
+    queries = AsyncHandler(ContactQueries, engine)
+    reminders = await queries.run(ContactQueries.get_contacts_with_birthdays_in_days, days)
     return [_map_reminder(r) for r in reminders]
 
 @mcp.tool
-def get_contact_notes(contact_name: str, tag: str | None = None) -> list[Data]:
+async def get_contact_notes(contact_name: str, tag: str | None = None) -> list[Data]:
     """Retrieves notes for a contact by name, optionally filtered by a tag."""
-    queries = NoteQueries(engine)
+    queries = AsyncHandler(NoteQueries, engine)
     if tag:
-        notes = queries.get_notes_for_contact_by_name_and_tag(contact_name, tag)
+        notes = await queries.run(NoteQueries.get_notes_for_contact_by_name_and_tag, contact_name, tag)
     else:
-        notes = queries.get_notes_for_contact_by_name(contact_name)
+        notes = await queries.run(NoteQueries.get_notes_for_contact_by_name, contact_name)
     return [map_note(note).model_dump() for note in notes]
 
 @mcp.tool
-def create_contact(name: str, phone_number: str, date_of_birth: date | None = None) -> Data:
+async def create_contact(name: str, phone_number: str, date_of_birth: date | None = None) -> Data:
     """Creates a new contact with an optional date of birth."""
-    commands = ContactCommands(engine)
-    contact = commands.add_contact(
+    commands = AsyncHandler(ContactCommands, engine)
+    contact = await commands.run(
+        ContactCommands.add_contact,
         CreateContact(
             name=name,
             phone_number=phone_number,
@@ -78,147 +110,157 @@ def create_contact(name: str, phone_number: str, date_of_birth: date | None = No
     return map_contact(contact).model_dump()
 
 @mcp.tool
-def add_note_to_contact(contact_name: str, content: str) -> Data:
+async def add_note_to_contact(contact_name: str, content: str) -> Data:
     """Adds a new note to an existing contact by name."""
-    commands = NoteCommands(engine)
-    note = commands.add_note_for_contact_by_name(contact_name, CreateNote(text=content))
+    commands = AsyncHandler(NoteCommands, engine)
+    note = await commands.run(NoteCommands.add_note_for_contact_by_name, contact_name, CreateNote(text=content))
     return map_note(note).model_dump()
 
 @mcp.tool
-def add_tag_to_contact(contact_name: str, tag: str) -> Data:
+async def add_tag_to_contact(contact_name: str, tag: str) -> Data:
     """Adds a tag to an existing contact by name."""
-    commands = ContactCommands(engine)
-    commands.add_tag_to_contact_by_name(contact_name, AddTag(label=tag))
+    commands = AsyncHandler(ContactCommands, engine)
+    await commands.run(ContactCommands.add_tag_to_contact_by_name, contact_name, AddTag(label=tag))
     return {"contact_name": contact_name, "tag": tag, "status": "added"}
 
 @mcp.tool
-def remove_tag_from_contact(contact_name: str, tag: str) -> Data:
+async def remove_tag_from_contact(contact_name: str, tag: str) -> Data:
     """Removes a tag from an existing contact by name."""
-    commands = ContactCommands(engine)
-    commands.remove_tag_from_contact_by_name(contact_name, RemoveTag(label=tag))
+    commands = AsyncHandler(ContactCommands, engine)
+    await commands.run(ContactCommands.remove_tag_from_contact_by_name, contact_name, RemoveTag(label=tag))
     return {"contact_name": contact_name, "tag": tag, "status": "removed"}
 
 @mcp.tool
-def update_contact(contact_name: str, new_name: str, date_of_birth: date | None = None) -> Data:
+async def update_contact(contact_name: str, new_name: str, date_of_birth: date | None = None) -> Data:
     """Updates contact information by name, including the name itself and date of birth."""
-    commands = ContactCommands(engine)
-    contact = commands.update_contact_by_name(contact_name, UpdateContact(name=new_name, date_of_birth=date_of_birth))
+    commands = AsyncHandler(ContactCommands, engine)
+    contact = await commands.run(ContactCommands.update_contact_by_name, contact_name, UpdateContact(name=new_name, date_of_birth=date_of_birth))
     return map_contact(contact).model_dump()
 
 @mcp.tool
-def delete_contact(contact_name: str) -> Data:
+async def delete_contact(contact_name: str) -> Data:
     """Deletes a contact by name and returns a status dictionary."""
-    commands = ContactCommands(engine)
-    commands.delete_contact_by_name(contact_name)
+    commands = AsyncHandler(ContactCommands, engine)
+    await commands.run(ContactCommands.delete_contact_by_name, contact_name)
     return {"contact_name": contact_name, "status": "deleted"}
 
 # Phones
 @mcp.tool
-def get_contact_phones(contact_name: str) -> list[Data]:
+async def get_contact_phones(contact_name: str) -> list[Data]:
     """Retrieves all phone numbers for a contact by name."""
-    queries = PhoneQueries(engine)
-    phones = queries.get_contact_phones_by_name(contact_name)
+    queries = AsyncHandler(PhoneQueries, engine)
+    phones = await queries.run(PhoneQueries.get_contact_phones_by_name, contact_name)
     return [map_phone(phone).model_dump() for phone in phones]
 
 @mcp.tool
-def create_phone(contact_name: str, phone_number: str) -> Data:
+async def create_phone(contact_name: str, phone_number: str) -> Data:
     """Creates a new phone entry for a contact by name."""
-    commands = PhoneCommands(engine)
-    phone = commands.add_phone_for_contact_by_name(contact_name, CreatePhone(phone_number=phone_number))
+    commands = AsyncHandler(PhoneCommands, engine)
+    phone = await commands.run(PhoneCommands.add_phone_for_contact_by_name, contact_name, CreatePhone(phone_number=phone_number))
     return map_phone(phone).model_dump()
 
 @mcp.tool
-def update_phone(contact_name: str, old_phone_number: str, new_phone_number: str) -> Data:
+async def update_phone(contact_name: str, old_phone_number: str, new_phone_number: str) -> Data:
     """Updates the phone number for a contact by name and old phone number."""
-    commands = PhoneCommands(engine)
-    phone = commands.update_phone_by_number(contact_name, old_phone_number, UpdatePhone(phone_number=new_phone_number))
+    commands = AsyncHandler(PhoneCommands, engine)
+    phone = await commands.run(PhoneCommands.update_phone_by_number, contact_name, old_phone_number, UpdatePhone(phone_number=new_phone_number))
     return map_phone(phone).model_dump()
 
 @mcp.tool
-def delete_phone(contact_name: str, phone_number: str) -> Data:
+async def delete_phone(contact_name: str, phone_number: str) -> Data:
     """Deletes a phone entry for a contact by name and phone number."""
-    commands = PhoneCommands(engine)
-    commands.delete_phone_by_number(contact_name, phone_number)
+    commands = AsyncHandler(PhoneCommands, engine)
+    await commands.run(PhoneCommands.delete_phone_by_number, contact_name, phone_number)
     return {"contact_name": contact_name, "phone_number": phone_number, "status": "deleted"}
 
 # Emails
 @mcp.tool
-def get_contact_emails(contact_name: str) -> list[Data]:
+async def get_contact_emails(contact_name: str) -> list[Data]:
     """Retrieves all email addresses for a contact by name."""
-    queries = EmailQueries(engine)
-    emails = queries.get_contact_emails_by_name(contact_name)
+    queries = AsyncHandler(EmailQueries, engine)
+    emails = await queries.run(EmailQueries.get_contact_emails_by_name, contact_name)
     return [map_email(email).model_dump() for email in emails]
 
 @mcp.tool
-def create_email(contact_name: str, email_address: str) -> Data:
+async def create_email(contact_name: str, email_address: str) -> Data:
     """Creates a new email entry for a contact by name."""
-    commands = EmailCommands(engine)
-    email = commands.add_email_for_contact_by_name(contact_name, CreateEmail(email_address=email_address))
+    commands = AsyncHandler(EmailCommands, engine)
+    email = await commands.run(EmailCommands.add_email_for_contact_by_name, contact_name, CreateEmail(email_address=email_address))
     return map_email(email).model_dump()
 
 @mcp.tool
-def update_email(contact_name: str, old_email_address: str, new_email_address: str) -> Data:
+async def update_email(contact_name: str, old_email_address: str, new_email_address: str) -> Data:
     """Updates the email address for a contact by name and old email address."""
-    commands = EmailCommands(engine)
-    email = commands.update_email_by_address(contact_name, old_email_address, UpdateEmail(email_address=new_email_address))
+    commands = AsyncHandler(EmailCommands, engine)
+    email = await commands.run(EmailCommands.update_email_by_address, contact_name, old_email_address, UpdateEmail(email_address=new_email_address))
     return map_email(email).model_dump()
 
 @mcp.tool
-def delete_email(contact_name: str, email_address: str) -> Data:
+async def delete_email(contact_name: str, email_address: str) -> Data:
     """Deletes an email entry for a contact by name and email address."""
-    commands = EmailCommands(engine)
-    commands.delete_email_by_address(contact_name, email_address)
+    commands = AsyncHandler(EmailCommands, engine)
+    await commands.run(EmailCommands.delete_email_by_address, contact_name, email_address)
     return {"contact_name": contact_name, "email_address": email_address, "status": "deleted"}
 
 # Notes
 @mcp.tool
-def get_notes(tag: str | None = None) -> list[Data]:
-    """Retrieves a list of all notes, optionally filtered by a tag."""
-    queries = NoteQueries(engine)
+async def get_notes(tag: str | None = None, limit: int = 50, after: int | None = None) -> Data:
+    """Retrieves a page of notes, optionally filtered by a tag. To get the next page pass returned next_after as after."""
+    queries = AsyncHandler(NoteQueries, engine)
     if tag:
-        notes = queries.get_notes_by_tag(tag)
+        notes = await queries.run(NoteQueries.get_notes_by_tag, tag, limit, after)
     else:
-        notes = queries.get_notes()
-    return [map_note(note).model_dump() for note in notes]
+        notes = await queries.run(NoteQueries.get_notes, limit, after)
+    return {
+        "notes": [map_note(note).model_dump() for note in notes],
+        "next_after": next_page_after([note.note_id for note in notes], limit)
+    }
 
 @mcp.tool
-def find_note_by_text(text_fragment: str) -> Data | None:
-    """Finds a note by searching for a text fragment."""
-    queries = NoteQueries(engine)
-    note = queries.find_note_by_text_fragment(text_fragment)
+async def find_note_by_text(text_fragment: str) -> Data | None:
+    """Finds the best matching note containing a text fragment."""
+    queries = AsyncHandler(NoteQueries, engine)
+    note = await queries.run(NoteQueries.find_note_by_text_fragment, text_fragment)
     return map_note(note).model_dump() if note else None
 
 @mcp.tool
-def create_note(content: str) -> Data:
+async def search_notes(search_text: str, limit: int = 10) -> list[Data]:
+    """Full-text search in notes by words or word prefixes, best matches first, with highlighted snippets."""
+    queries = AsyncHandler(NoteQueries, engine)
+    results = await queries.run(NoteQueries.search_notes, search_text, limit)
+    return [map_note_search_result(result).model_dump() for result in results]
+
+@mcp.tool
+async def create_note(content: str) -> Data:
     """Creates a new note."""
-    commands = NoteCommands(engine)
-    note = commands.add_note(CreateNote(text=content))
+    commands = AsyncHandler(NoteCommands, engine)
+    note = await commands.run(NoteCommands.add_note, CreateNote(text=content))
     return map_note(note).model_dump()
 
 @mcp.tool
-def update_note_by_text(text_fragment: str, new_content: str) -> Data:
+async def update_note_by_text(text_fragment: str, new_content: str) -> Data:
     """Updates a note by finding it with a text fragment."""
-    commands = NoteCommands(engine)
-    note = commands.update_note_by_fragment(text_fragment, UpdateNote(text=new_content))
+    commands = AsyncHandler(NoteCommands, engine)
+    note = await commands.run(NoteCommands.update_note_by_fragment, text_fragment, UpdateNote(text=new_content))
     return map_note(note).model_dump()
 
 @mcp.tool
-def delete_note_by_text(text_fragment: str) -> Data:
+async def delete_note_by_text(text_fragment: str) -> Data:
     """Deletes a note by finding it with a text fragment."""
-    commands = NoteCommands(engine)
-    commands.delete_note_from_fragment(text_fragment)
+    commands = AsyncHandler(NoteCommands, engine)
+    await commands.run(NoteCommands.delete_note_from_fragment, text_fragment)
     return {"text_fragment": text_fragment, "status": "deleted"}
 
 @mcp.tool
-def add_tag_to_note_by_text(text_fragment: str, tag: str) -> Data:
+async def add_tag_to_note_by_text(text_fragment: str, tag: str) -> Data:
     """Adds a tag to a note by finding it with a text fragment."""
-    commands = NoteCommands(engine)
-    commands.add_tag_to_note_by_fragment(text_fragment, AddTag(label=tag))
+    commands = AsyncHandler(NoteCommands, engine)
+    await commands.run(NoteCommands.add_tag_to_note_by_fragment, text_fragment, AddTag(label=tag))
     return {"text_fragment": text_fragment, "tag": tag, "status": "added"}
 
 @mcp.tool
-def remove_tag_from_note_by_text(text_fragment: str, tag: str) -> Data:
+async def remove_tag_from_note_by_text(text_fragment: str, tag: str) -> Data:
     """Removes a tag from a note by finding it with a text fragment."""
-    commands = NoteCommands(engine)
-    commands.remove_tag_from_note_by_fragment(text_fragment, RemoveTag(label=tag))
+    commands = AsyncHandler(NoteCommands, engine)
+    await commands.run(NoteCommands.remove_tag_from_note_by_fragment, text_fragment, RemoveTag(label=tag))
     return {"text_fragment": text_fragment, "tag": tag, "status": "removed"}
@@ -1,28 +1,50 @@
 """
 Entry point for the contact management assistant application.
 
-This module provides a dual-mode launcher that can run either:
+This module provides a launcher that can run either:
 - CLI mode: Interactive command-line interface (default)
+- One-shot mode: a single CLI command given as arguments
+- Batch mode: CLI commands read from a file or stdin (--batch)
 - API mode: REST API server (activated with --api flag)
 
 Usage:
-    python main.py           # Launch CLI mode
-    python main.py --api     # Launch API server on http://127.0.0.1:8000
+    python main.py                              # Launch CLI mode
+    python main.py get-contact "Anna Koval"     # Run one command and exit
+    python main.py --batch commands.txt         # Run commands of a file, - for stdin
+    python main.py --connect [...]              # Run CLI modes in a running API server (Magic_API_URL)
+    python main.py --api                        # Launch API server on http://127.0.0.1:8000
 """
 
 import sys
 
 def main():
-    if "--api" in sys.argv:
+    # Commands of the CLI modes run in a running API server instead of this process
+    remote = sys.argv[1:2] == ["--connect"]
+    argv = sys.argv[2:] if remote else sys.argv[1:]
+
+    if "--api" in argv:
         import uvicorn
         from api.endpoints import app
+        from cli.cli_token import ensure_token
 
+        # Written before serving, so `--connect` clients find it right away
+        _ = ensure_token()
         uvicorn.run(app, host="0.0.0.0", port=8000)
 
+    elif argv[:1] == ["--batch"]:
+        from cli.batch import run_batch_script
+
+        sys.exit(run_batch_script(argv[1:], remote))
+
+    elif argv:
+        from cli.batch import run_one_shot
+
+        sys.exit(run_one_shot(argv, remote))
+
     else:
         from cli.main_loop import launch_main_loop
 
-        launch_main_loop()
+        launch_main_loop(remote)
 
 if __name__ == "__main__":
     main()
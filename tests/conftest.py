@@ -0,0 +1,17 @@
+import pytest
+from collections.abc import Iterator
+from sqlalchemy import Engine, create_engine
+from benchmarks.dataset import generate_dataset
+
+DATASET_CONTACTS = 2_000
+
+
+@pytest.fixture(scope="session")
+def dataset_engine(tmp_path_factory: pytest.TempPathFactory) -> Iterator[Engine]:
+    """
+    File database with a generated dataset, shared by the tests of a session
+    """
+    engine = create_engine(f"sqlite:///{tmp_path_factory.mktemp("dataset") / "contacts.db"}")
+    _ = generate_dataset(engine, DATASET_CONTACTS)
+    yield engine
+    engine.dispose()
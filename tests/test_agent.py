@@ -0,0 +1,148 @@
+import asyncio
+import json
+from typing import Any
+import httpx
+from anthropic import AsyncAnthropic
+from fastmcp import FastMCP
+from llm.agent import AgentEvent, AgentReply, TextDelta, TokenUsage, ToolStarted, run_agent, stream_agent
+
+# Messages, content blocks and requests of the Messages API as JSON objects
+type Json = dict[str, Any]
+
+server = FastMCP(name="Test tools")
+running: list[str] = []
+# Tools running when each get_phone call finished
+concurrency: list[int] = []
+
+
+@server.tool
+async def get_phone(contact_name: str) -> str:
+    """Returns phone of the contact."""
+    running.append(contact_name)
+    await asyncio.sleep(0.05)
+    concurrency.append(len(running))
+    running.remove(contact_name)
+    return f"{contact_name}: 0501112233"
+
+
+@server.tool
+def fail(reason: str) -> str:
+    """Always fails."""
+    raise ValueError(reason)
+
+
+def _message(content: list[Json], stop_reason: str) -> Json:
+    return {
+        "id": "msg_test",
+        "type": "message",
+        "role": "assistant",
+        "model": "test-model",
+        "content": content,
+        "stop_reason": stop_reason,
+        "stop_sequence": None,
+        "usage": {"input_tokens": 1, "output_tokens": 1},
+    }
+
+def _tool_use(tool_id: str, name: str, arguments: Json) -> Json:
+    return {"type": "tool_use", "id": tool_id, "name": name, "input": arguments}
+
+def _stream_events(message: Json) -> bytes:
+    """
+    Message as server-sent events of the streaming Messages API, texts in two deltas
+    """
+    events: list[tuple[str, Json]] = [("message_start", {"message": {**message, "content": [], "stop_reason": None}})]
+    for index, block in enumerate(message["content"]):
+        if block["type"] == "text":
+            middle = len(block["text"]) // 2
+            events.append(("content_block_start", {"index": index, "content_block": {"type": "text", "text": ""}}))
+            for part in [block["text"][:middle], block["text"][middle:]]:
+                events.append(("content_block_delta", {"index": index, "delta": {"type": "text_delta", "text": part}}))
+        else:
+            events.append(("content_block_start", {"index": index, "content_block": {**block, "input": {}}}))
+            delta = {"type": "input_json_delta", "partial_json": json.dumps(block["input"])}
+            events.append(("content_block_delta", {"index": index, "delta": delta}))
+        events.append(("content_block_stop", {"index": index}))
+    events.append(("message_delta", {"delta": {"stop_reason": message["stop_reason"], "stop_sequence": None}, "usage": {"output_tokens": 1}}))
+    events.append(("message_stop", {}))
+    return "".join(f"event: {name}\ndata: {json.dumps({"type": name, **data})}\n\n" for name, data in events).encode()
+
+def _fake_anthropic(answers: list[Json], requests: list[Json]) -> AsyncAnthropic:
+    """
+    Client of a fake Messages API answering with the given messages in order
+    """
+    def handle(request: httpx.Request) -> httpx.Response:
+        requests.append(json.loads(request.content))
+        answer = answers[len(requests) - 1]
+        return httpx.Response(200, content=_stream_events(answer), headers={"content-type": "text/event-stream"})
+
+    http_client = httpx.AsyncClient(transport=httpx.MockTransport(handle))
+    return AsyncAnthropic(api_key="test", base_url="http://anthropic.test", http_client=http_client)
+
+
+def test_tools_requested_together_run_concurrently():
+    concurrency.clear()
+    requests: list[Json] = []
+    anthropic = _fake_anthropic([
+        _message([
+            {"type": "text", "text": "Looking up."},
+            _tool_use("t1", "get_phone", {"contact_name": "Ann"}),
+            _tool_use("t2", "get_phone", {"contact_name": "Bob"}),
+        ], "tool_use"),
+        _message([{"type": "text", "text": "Ann and Bob share a number."}], "end_turn"),
+    ], requests)
+
+    reply = asyncio.run(run_agent(anthropic, server, [{"role": "user", "content": "Phones?"}], "test-model", 100))
+
+    assert reply.texts == ["Looking up.", "Ann and Bob share a number."]
+    assert (reply.iterations, reply.tool_calls) == (2, 2)
+    assert max(concurrency) == 2
+    assert {tool["name"] for tool in requests[0]["tools"]} == {"get_phone", "fail"}
+    assert requests[0]["tools"][-1]["cache_control"] == {"type": "ephemeral"}
+    assert "system" not in requests[0]
+    results = requests[1]["messages"][-1]["content"]
+    assert [result["tool_use_id"] for result in results] == ["t1", "t2"]
+    assert results[0]["content"] == [{"type": "text", "text": "Ann: 0501112233"}]
+
+def test_tool_errors_are_returned_to_model():
+    requests: list[Json] = []
+    anthropic = _fake_anthropic([
+        _message([_tool_use("t1", "fail", {"reason": "broken"})], "tool_use"),
+        _message([{"type": "text", "text": "Sorry."}], "end_turn"),
+    ], requests)
+
+    reply = asyncio.run(run_agent(anthropic, server, [{"role": "user", "content": "Fail"}], "test-model", 100))
+
+    assert reply.texts == ["Sorry."]
+    result = requests[1]["messages"][-1]["content"][0]
+    assert result["is_error"] is True
+    assert "broken" in result["content"][0]["text"]
+
+def test_iterations_are_capped():
+    requests: list[Json] = []
+    endless = _message([_tool_use("t1", "get_phone", {"contact_name": "Ann"})], "tool_use")
+    anthropic = _fake_anthropic([endless, endless, endless], requests)
+
+    reply = asyncio.run(run_agent(anthropic, server, [{"role": "user", "content": "Loop"}], "test-model", 100, max_iterations=3))
+
+    assert (reply.iterations, reply.tool_calls) == (3, 2)
+    assert len(requests) == 3
+    assert requests[-1]["tool_choice"] == {"type": "none"}
+
+def test_text_is_streamed_as_generated():
+    requests: list[Json] = []
+    anthropic = _fake_anthropic([
+        _message([{"type": "text", "text": "Checking."}, _tool_use("t1", "get_phone", {"contact_name": "Ann"})], "tool_use"),
+        _message([{"type": "text", "text": "Ann has one phone."}], "end_turn"),
+    ], requests)
+
+    async def collect_events() -> list[AgentEvent]:
+        return [event async for event in stream_agent(anthropic, server, [{"role": "user", "content": "Ann?"}], "test-model", 100)]
+
+    events = asyncio.run(collect_events())
+
+    assert events == [
+        TextDelta("Chec", 0), TextDelta("king.", 0),
+        ToolStarted("get_phone"),
+        TextDelta("Ann has o", 1), TextDelta("ne phone.", 1),
+        AgentReply(["Checking.", "Ann has one phone."], 2, 1, TokenUsage(input_tokens=2, output_tokens=2)),
+    ]
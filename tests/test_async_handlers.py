@@ -0,0 +1,74 @@
+import asyncio
+from pathlib import Path
+from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import create_async_engine
+from data.async_handlers import AsyncHandler
+from data.contact_commands import ContactCommands, CreateContact
+from data.contact_queries import ContactQueries
+from data.exceptions import ContactNotFound
+from data.models import Base
+from data.phone_commands import PhoneCommands, CreatePhone
+from data.query_cache import enable_query_cache, share_query_cache
+
+
+def test_async_handlers_run_queries_and_commands(tmp_path: Path):
+    database_path = tmp_path / "contacts.db"
+    Base.metadata.create_all(create_engine(f"sqlite:///{database_path}"))
+    engine = create_async_engine(f"sqlite+aiosqlite:///{database_path}")
+
+    async def scenario():
+        commands = AsyncHandler(ContactCommands, engine)
+        queries = AsyncHandler(ContactQueries, engine)
+        contact = await commands.run(
+            ContactCommands.add_contact,
+            CreateContact(name="Async Doe", date_of_birth=None, phone_number="0501112233")
+        )
+        pages = await asyncio.gather(*(queries.run(ContactQueries.get_contacts, 10) for _ in range(10)))
+        found = await queries.run(ContactQueries.get_contact_by_name, "Async Doe")
+        await engine.dispose()
+        return contact, pages, found
+
+    contact, pages, found = asyncio.run(scenario())
+
+    assert all([c.contact_id for c in page] == [contact.contact_id] for page in pages)
+    assert found is not None and [phone.phone_number for phone in found.phones] == ["0501112233"]
+
+
+def test_async_handlers_raise_domain_exceptions(tmp_path: Path):
+    database_path = tmp_path / "contacts.db"
+    Base.metadata.create_all(create_engine(f"sqlite:///{database_path}"))
+    engine = create_async_engine(f"sqlite+aiosqlite:///{database_path}")
+
+    async def scenario():
+        commands = AsyncHandler(PhoneCommands, engine)
+        try:
+            _ = await commands.run(PhoneCommands.add_phone_for_contact, 999, CreatePhone(phone_number="0501112233"))
+        finally:
+            await engine.dispose()
+
+    try:
+        asyncio.run(scenario())
+    except ContactNotFound:
+        pass
+    else:
+        assert False, "Expected ContactNotFound exception was not raised"
+
+
+def test_writes_through_sync_engine_invalidate_shared_cache(tmp_path: Path):
+    database_path = tmp_path / "contacts.db"
+    sync_engine = create_engine(f"sqlite:///{database_path}")
+    Base.metadata.create_all(sync_engine)
+    engine = create_async_engine(f"sqlite+aiosqlite:///{database_path}")
+    cache = enable_query_cache(sync_engine)
+    share_query_cache(engine.sync_engine, sync_engine)
+
+    async def names() -> list[str]:
+        return await AsyncHandler(ContactQueries, engine).run(ContactQueries.get_contact_names)
+
+    assert asyncio.run(names()) == []
+    _ = ContactCommands(sync_engine).add_contact(
+        CreateContact(name="Shared Doe", date_of_birth=None, phone_number="0504445566")
+    )
+
+    assert asyncio.run(names()) == ["Shared Doe"]
+    assert cache.stats.invalidations == 1
@@ -0,0 +1,77 @@
+import asyncio
+import threading
+import time
+from collections.abc import Iterable
+from prompt_toolkit.auto_suggest import AutoSuggest, Suggestion
+from prompt_toolkit.buffer import Buffer
+from prompt_toolkit.completion import CompleteEvent, Completer, Completion
+from prompt_toolkit.document import Document
+from cli.background_completion import BackgroundAutoSuggest, BackgroundCompleter, BackgroundWorker
+
+
+class SlowCompleter(Completer):
+    def __init__(self, delay: float):
+        self.delay = delay
+        self.threads: list[str] = []
+
+    def get_completions(self, document: Document, complete_event: CompleteEvent) -> Iterable[Completion]:
+        self.threads.append(threading.current_thread().name)
+        time.sleep(self.delay)
+        yield Completion(document.text + "-done", start_position=-len(document.text))
+
+
+class EchoAutoSuggest(AutoSuggest):
+    def get_suggestion(self, buffer: Buffer, document: Document) -> Suggestion | None:
+        return Suggestion("-suggested")
+
+
+async def _collect(completer: Completer, document: Document) -> list[str]:
+    return [completion.text async for completion in completer.get_completions_async(document, CompleteEvent())]
+
+
+def test_completions_are_looked_up_off_the_input_thread():
+    slow = SlowCompleter(0.01)
+    worker = BackgroundWorker(debounce=0.01, budget=1)
+    completer = BackgroundCompleter(slow, worker)
+
+    texts = asyncio.run(_collect(completer, Document("anna")))
+
+    assert texts == ["anna-done"]
+    assert slow.threads[0].startswith("completion")
+    assert worker.stats.requests == 1 and worker.stats.late == 0
+    worker.shutdown()
+
+
+def test_late_completions_are_dropped_without_waiting_for_them():
+    worker = BackgroundWorker(debounce=0, budget=0.05)
+    completer = BackgroundCompleter(SlowCompleter(0.5), worker)
+
+    started = time.perf_counter()
+    texts = asyncio.run(_collect(completer, Document("anna")))
+    elapsed = time.perf_counter() - started
+
+    assert texts == []
+    assert elapsed < 0.4
+    assert worker.stats.late == 1
+    worker.shutdown()
+
+
+def test_suggestion_for_changed_text_is_abandoned_before_the_lookup():
+    worker = BackgroundWorker(debounce=0.05, budget=1)
+    auto_suggest = BackgroundAutoSuggest(EchoAutoSuggest(), worker)
+    buffer = Buffer()
+    buffer.text = "get-con"
+    document = buffer.document
+
+    async def type_while_waiting() -> Suggestion | None:
+        request = asyncio.create_task(auto_suggest.get_suggestion_async(buffer, document))
+        await asyncio.sleep(0.01)
+        buffer.text = "get-cont"
+        return await request
+
+    assert asyncio.run(type_while_waiting()) is None
+    assert worker.stats.stale == 1
+
+    suggestion = asyncio.run(auto_suggest.get_suggestion_async(buffer, buffer.document))
+    assert suggestion is not None and suggestion.text == "-suggested"
+    worker.shutdown()
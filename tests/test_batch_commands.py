@@ -0,0 +1,126 @@
+from datetime import date
+from sqlalchemy import create_engine, text
+from data.batch_commands import BatchCommands, BatchItem
+from data.contact_commands import ContactCommands, CreateContact
+from data.contact_queries import ContactQueries
+from data.email_commands import CreateEmail
+from data.exceptions import ContactAlreadyExists, ContactNotCreated, ContactNotFound, EmailAlreadyExists, PhoneAlreadyExists
+from data.models import Base
+from data.note_commands import CreateNote
+from data.note_queries import NoteQueries
+from data.phone_commands import CreatePhone
+from data.tag_commands import AddTag
+
+
+def _create_engine():
+    engine = create_engine("sqlite:///:memory:")
+    Base.metadata.create_all(engine)
+    return engine
+
+def test_batch_creates_contacts_with_details():
+    engine = _create_engine()
+
+    result = BatchCommands(engine).execute([
+        BatchItem(CreateContact(name="John Doe", phone_number="0001112223", date_of_birth=date(1990, 5, 15))),
+        BatchItem(CreatePhone(phone_number="0001112224"), contact_name="John Doe"),
+        BatchItem(CreateEmail(email_address="john@example.com"), contact_name="John Doe"),
+        BatchItem(AddTag(label="work"), contact_name="John Doe"),
+        BatchItem(AddTag(label="work"), contact_name="John Doe"),
+        BatchItem(CreateNote(text="Met at the conference"), contact_name="John Doe"),
+        BatchItem(CreateNote(text="Standalone note")),
+    ])
+
+    assert result.errors == []
+    assert result.applied == 7
+    contact = ContactQueries(engine).get_contact_by_name("John Doe")
+    assert contact is not None
+    assert [phone.phone_number for phone in contact.phones] == ["0001112223", "0001112224"]
+    assert [email.email_address for email in contact.emails] == ["john@example.com"]
+    assert [tag.label for tag in contact.tags] == ["work"]
+    assert [note.text for note in contact.notes] == ["Met at the conference"]
+    assert [result.note.text for result in NoteQueries(engine).search_notes("standalone")] == ["Standalone note"]
+
+def test_batch_reports_rejected_items_and_applies_the_rest():
+    engine = _create_engine()
+    _ = ContactCommands(engine).add_contact(CreateContact(name="Jane Doe", phone_number="0001112230", date_of_birth=None))
+
+    result = BatchCommands(engine).execute([
+        BatchItem(CreatePhone(phone_number="0001112231"), contact_name="Jack Black"),
+        BatchItem(CreateContact(name="Jack Black", phone_number="0001112232", date_of_birth=None)),
+        BatchItem(CreateContact(name="Jane Doe", phone_number="0001112233", date_of_birth=None)),
+        BatchItem(CreateContact(name="Jim Beam", phone_number="0001112230", date_of_birth=None)),
+        BatchItem(CreateEmail(email_address="jack@example.com"), contact_name="Jack Black"),
+        BatchItem(CreateEmail(email_address="jack@example.com"), contact_name="Jack Black"),
+    ], chunk_size=4)
+
+    assert [(error.index, type(error.error)) for error in result.errors] == [
+        (0, ContactNotFound),
+        (2, ContactAlreadyExists),
+        (3, PhoneAlreadyExists),
+        (5, EmailAlreadyExists),
+    ]
+    assert result.applied == 2
+    assert result.commits == 2
+
+def test_batch_rejects_details_of_a_rejected_contact():
+    engine = _create_engine()
+    _ = ContactCommands(engine).add_contact(CreateContact(name="Jane Doe", phone_number="0001112250", date_of_birth=None))
+
+    result = BatchCommands(engine).execute([
+        BatchItem(CreateContact(name="Jane Doe", phone_number="0001112251", date_of_birth=None)),
+        BatchItem(CreatePhone(phone_number="0001112252"), contact_name="Jane Doe"),
+        BatchItem(CreateEmail(email_address="jane@example.com"), contact_name="Jane Doe"),
+        BatchItem(AddTag(label="work"), contact_name="Jane Doe"),
+        BatchItem(CreateNote(text="Imported"), contact_name="Jane Doe"),
+        BatchItem(CreateContact(name="Jim Beam", phone_number="0001112250", date_of_birth=None)),
+        BatchItem(CreateContact(name="Jim Beam", phone_number="0001112253", date_of_birth=None)),
+        BatchItem(CreateNote(text="Created on the second try"), contact_name="Jim Beam"),
+    ], chunk_size=3)
+
+    assert [(error.index, type(error.error)) for error in result.errors] == [
+        (0, ContactAlreadyExists),
+        (1, ContactNotCreated),
+        (2, ContactNotCreated),
+        (3, ContactNotCreated),
+        (4, ContactNotCreated),
+        (5, PhoneAlreadyExists),
+    ]
+    contact = ContactQueries(engine).get_contact_by_name("Jane Doe")
+    assert contact is not None
+    assert [phone.phone_number for phone in contact.phones] == ["0001112250"]
+    assert (contact.emails, contact.tags, contact.notes) == ([], [], [])
+    contact = ContactQueries(engine).get_contact_by_name("Jim Beam")
+    assert contact is not None
+    assert [note.text for note in contact.notes] == ["Created on the second try"]
+
+def test_batch_replays_chunk_when_constraint_fails():
+    engine = _create_engine()
+    with engine.begin() as connection:
+        # Duplicate names are not visible to the bulk validation without the unique index
+        _ = connection.execute(text("DROP INDEX ix_contacts_name"))
+        _ = connection.execute(text("CREATE UNIQUE INDEX ix_contacts_name ON contacts (lower(name))"))
+        _ = connection.execute(text("INSERT INTO contacts (name) VALUES ('JOHN DOE')"))
+
+    result = BatchCommands(engine).execute([
+        BatchItem(CreateContact(name="John Doe", phone_number="0001112240", date_of_birth=None)),
+        BatchItem(CreateContact(name="Jane Doe", phone_number="0001112241", date_of_birth=None)),
+    ])
+
+    assert [error.index for error in result.errors] == [0]
+    assert result.applied == 1
+    assert ContactQueries(engine).get_contact_by_name("Jane Doe") is not None
+
+def test_contact_skips_its_phone_numbers_already_stored():
+    engine = _create_engine()
+    _ = ContactCommands(engine).add_contact(CreateContact(name="Jane Doe", phone_number="0001112223", date_of_birth=None))
+
+    result = BatchCommands(engine).execute([
+        BatchItem(CreateContact(name="John Doe", phone_number="0001112223", date_of_birth=None), phone_numbers=("0001112224",)),
+        BatchItem(CreateContact(name="Jim Beam", phone_number="0001112224", date_of_birth=None), phone_numbers=("0001112223",)),
+    ])
+
+    assert [(error.index, type(error.error)) for error in result.errors] == [(1, PhoneAlreadyExists)]
+    assert result.skipped == 1
+    contact = ContactQueries(engine).get_contact_by_name("John Doe")
+    assert contact is not None
+    assert [phone.phone_number for phone in contact.phones] == ["0001112224"]
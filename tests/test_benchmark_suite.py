@@ -0,0 +1,21 @@
+from typing import Any
+import pytest
+import benchmarks.suite as suite
+
+
+def test_suite_times_every_handler_method(monkeypatch: pytest.MonkeyPatch):
+    monkeypatch.setattr(suite, "REPEAT", 2)
+
+    report = suite.run_suite(200, tag_count=10)
+
+    assert report["meta"]["not_covered"] == []
+    assert all(timing["runs"] >= 1 for timing in report["results"].values())
+
+def test_compare_reports_slower_methods():
+    def report(milliseconds: float) -> dict[str, Any]:
+        timing = {"runs": 1, "mean_ms": milliseconds, "median_ms": milliseconds, "min_ms": milliseconds, "max_ms": milliseconds}
+        return {"meta": {"contacts": 1000, "created": "2026-01-01"}, "results": {"ContactQueries.get_contacts": timing}}
+
+    assert suite.compare(report(10), report(20)) == ["ContactQueries.get_contacts"]
+    assert suite.compare(report(10), report(11)) == []
+    assert suite.compare(report(0.01), report(0.05)) == []
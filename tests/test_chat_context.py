@@ -0,0 +1,108 @@
+import asyncio
+import json
+import httpx
+from typing import Any
+from anthropic import AsyncAnthropic
+from anthropic.types import MessageParam, ToolParam
+from llm.context import ContextPolicy, _transcript, build_context, cached_tools, estimate_tokens, fit_window, system_blocks
+
+
+def _thread(exchanges: int, length: int = 100) -> list[MessageParam]:
+    messages: list[MessageParam] = []
+    for number in range(exchanges):
+        messages.append({"role": "user", "content": f"question {number} " + "x" * length})
+        messages.append({"role": "assistant", "content": f"answer {number} " + "y" * length})
+    return messages
+
+def _fake_anthropic(summary: str, requests: list[dict[str, Any]]) -> AsyncAnthropic:
+    def handle(request: httpx.Request) -> httpx.Response:
+        requests.append(json.loads(request.content))
+        return httpx.Response(200, json={
+            "id": "msg_test",
+            "type": "message",
+            "role": "assistant",
+            "model": "test-model",
+            "content": [{"type": "text", "text": summary}],
+            "stop_reason": "end_turn",
+            "stop_sequence": None,
+            "usage": {"input_tokens": 1, "output_tokens": 1},
+        })
+
+    http_client = httpx.AsyncClient(transport=httpx.MockTransport(handle))
+    return AsyncAnthropic(api_key="test", base_url="http://anthropic.test", http_client=http_client)
+
+
+def test_window_keeps_latest_messages_within_budget():
+    messages = _thread(10)
+    exchange = estimate_tokens(messages[0]) + estimate_tokens(messages[1])
+
+    dropped = fit_window(messages, budget_tokens=3 * exchange)
+
+    assert dropped == 14
+    assert messages[dropped]["role"] == "user"
+    assert fit_window(messages, budget_tokens=100 * exchange) == 0
+
+def test_window_keeps_last_message_over_budget():
+    messages = _thread(2, length=1000)
+
+    assert fit_window(messages, budget_tokens=10) == 3
+
+def test_window_starts_with_user_message():
+    messages = _thread(3)
+    budget = estimate_tokens(messages[-1]) + estimate_tokens(messages[-2]) + estimate_tokens(messages[-3])
+
+    # Last three messages fit, but would start with an answer
+    assert fit_window(messages, budget) == 4
+
+def test_stable_prefix_is_marked_for_prompt_cache():
+    tools: list[ToolParam] = [{"name": name, "description": "", "input_schema": {"type": "object"}} for name in ["a", "b"]]
+
+    blocks = system_blocks("You are a test.", "Earlier talk.")
+
+    assert blocks[0].get("cache_control") == {"type": "ephemeral"}
+    assert "cache_control" not in blocks[1] and "Earlier talk." in blocks[1]["text"]
+    assert [tool.get("cache_control") for tool in cached_tools(tools)] == [None, {"type": "ephemeral"}]
+    assert cached_tools([]) == []
+
+def test_dropped_messages_are_folded_into_summary():
+    requests: list[dict[str, Any]] = []
+    anthropic = _fake_anthropic("Ann moved to Kyiv.", requests)
+    messages = _thread(10)
+    policy = ContextPolicy(budget_tokens=estimate_tokens(messages[0]) * 4, summarize=True)
+
+    context = asyncio.run(build_context(anthropic, "test-model", policy, messages, "Ann was asked about her address."))
+
+    assert context.summary == "Ann moved to Kyiv."
+    assert context.messages == messages[context.dropped:]
+    prompt = requests[0]["messages"][0]["content"]
+    assert "Ann was asked about her address." in prompt and "question 0" in prompt
+    assert f"question {context.dropped // 2}" not in prompt
+
+def test_without_summarization_dropped_messages_are_not_sent():
+    requests: list[dict[str, Any]] = []
+    anthropic = _fake_anthropic("unused", requests)
+    messages = _thread(10)
+    policy = ContextPolicy(budget_tokens=estimate_tokens(messages[0]) * 4)
+
+    context = asyncio.run(build_context(anthropic, "test-model", policy, messages, "Kept summary."))
+
+    assert context.dropped > 0 and context.summary == "Kept summary."
+    assert requests == []
+
+def test_transcript_shows_tool_calls_and_results():
+    messages: list[MessageParam] = [
+        {"role": "user", "content": "Phone of Ann?"},
+        {"role": "assistant", "content": [
+            {"type": "text", "text": "Looking it up."},
+            {"type": "tool_use", "id": "call_1", "name": "get_contact", "input": {"name": "Ann"}},
+        ]},
+        {"role": "user", "content": [
+            {"type": "tool_result", "tool_use_id": "call_1", "content": [{"type": "text", "text": "0501112233"}]},
+        ]},
+    ]
+
+    assert _transcript(messages).splitlines() == [
+        "User: Phone of Ann?",
+        'Assistant: Looking it up. [get_contact called with {"name": "Ann"}]',
+        "User: [tool result: 0501112233]",
+    ]
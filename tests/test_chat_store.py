@@ -0,0 +1,98 @@
+import pytest
+from anthropic.types import MessageParam
+from sqlalchemy import create_engine
+from llm.chat_store import ChatStore, MemoryChatStore, SqliteChatStore, create_chat_store, trim_thread
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def _exchange(number: int) -> list[MessageParam]:
+    return [{"role": "user", "content": f"question {number}"}, {"role": "assistant", "content": f"answer {number}"}]
+
+def _store(kind: str, clock: FakeClock, **limits) -> ChatStore:
+    if kind == "memory":
+        return MemoryChatStore(clock=clock, **limits)
+    return SqliteChatStore(create_engine("sqlite:///:memory:"), clock=clock, **limits)
+
+
+@pytest.mark.parametrize("kind", ["memory", "sqlite"])
+def test_threads_keep_messages_in_order(kind: str):
+    store = _store(kind, FakeClock())
+
+    store.append("a", _exchange(1))
+    store.append("b", _exchange(2))
+    store.append("a", _exchange(3))
+
+    assert store.load("a") == [*_exchange(1), *_exchange(3)]
+    assert store.load("b") == _exchange(2)
+    assert store.load("missing") == []
+
+@pytest.mark.parametrize("kind", ["memory", "sqlite"])
+def test_threads_keep_latest_messages(kind: str):
+    store = _store(kind, FakeClock(), max_messages=3)
+
+    for number in range(5):
+        store.append("a", _exchange(number))
+
+    # Three latest messages would start with an answer
+    assert store.load("a") == _exchange(4)
+
+@pytest.mark.parametrize("kind", ["memory", "sqlite"])
+def test_least_recently_used_threads_are_evicted(kind: str):
+    clock = FakeClock()
+    store = _store(kind, clock, max_chats=2)
+
+    for chat_id in ["a", "b", "c"]:
+        clock.now += 1
+        store.append(chat_id, _exchange(1))
+
+    assert store.count() == 2
+    assert store.load("a") == []
+    assert store.load("c") == _exchange(1)
+
+@pytest.mark.parametrize("kind", ["memory", "sqlite"])
+def test_threads_expire(kind: str):
+    clock = FakeClock()
+    store = _store(kind, clock, ttl=60)
+    store.append("a", _exchange(1))
+
+    clock.now += 61
+
+    assert store.load("a") == []
+    store.append("a", _exchange(2))
+    assert store.load("a") == _exchange(2)
+
+def test_sqlite_threads_are_shared_between_stores(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / "contacts.db"}")
+    SqliteChatStore(engine).append("a", _exchange(1))
+
+    assert SqliteChatStore(create_engine(f"sqlite:///{tmp_path / "contacts.db"}")).load("a") == _exchange(1)
+
+def test_trim_thread_starts_with_user_message():
+    messages = [*_exchange(1), *_exchange(2)]
+
+    assert trim_thread(messages, 4) == messages
+    assert trim_thread(messages, 3) == _exchange(2)
+    assert trim_thread(messages, 0) == []
+
+def test_unknown_chat_store_is_rejected():
+    with pytest.raises(ValueError):
+        _ = create_chat_store("redis")
+
+@pytest.mark.parametrize("kind", ["memory", "sqlite"])
+def test_compact_replaces_oldest_messages_by_summary(kind: str):
+    store = _store(kind, FakeClock())
+    for number in range(3):
+        store.append("a", _exchange(number))
+
+    store.compact("a", "Two questions answered.", 4)
+
+    assert store.load_summary("a") == "Two questions answered."
+    assert store.load("a") == _exchange(2)
+    assert store.load_summary("missing") is None
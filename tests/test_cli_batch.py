@@ -0,0 +1,57 @@
+import pytest
+from pathlib import Path
+from sqlalchemy import Engine, create_engine, func, select
+from cli.batch import read_commands, run_batch
+from data.models import Base, Contact
+from data.query_cache import CONTACT_GRAPH, add_write_listener, enable_query_cache
+
+script = """
+# Contacts for the team
+add-contact "Anna Koval" 0501112233
+add-contact "Bohdan Moroz" 0503334455
+add-contact "Anna Koval" 0501112233
+add-email "Anna Koval" anna@example.com
+"""
+
+
+@pytest.fixture
+def engine(tmp_path: Path) -> Engine:
+    engine = create_engine(f"sqlite:///{tmp_path / "contacts.db"}")
+    Base.metadata.create_all(engine)
+    return engine
+
+def _contact_count(engine: Engine) -> int:
+    with engine.connect() as connection:
+        return connection.execute(select(func.count()).select_from(Contact)).scalar_one()
+
+
+def test_script_lines_are_parsed_like_prompt_input():
+    lines = ["", "# comment", 'get-contact "Anna Koval"', "GET-PHONES Anna", "exit", "get-contacts"]
+
+    assert list(read_commands(lines)) == [(3, "get-contact", ["Anna Koval"]), (4, "get-phones", ["Anna"])]
+
+def test_batch_runs_every_command_and_counts_failures(engine: Engine, capsys: pytest.CaptureFixture[str]):
+    summary = run_batch(engine, script.splitlines(), quiet=True)
+
+    assert (summary.commands, summary.failed, summary.committed) == (4, 1, True)
+    assert _contact_count(engine) == 2
+    assert "Line 5:" in capsys.readouterr().out
+
+def test_batch_in_one_transaction_commits_at_the_end(engine: Engine):
+    cache = enable_query_cache(engine)
+    writes: list[frozenset[str]] = []
+    add_write_listener(engine, writes.append)
+
+    summary = run_batch(engine, script.splitlines(), transaction=True, quiet=True)
+
+    assert (summary.commands, summary.failed, summary.committed) == (4, 1, True)
+    assert _contact_count(engine) == 2
+    assert len(cache) == 0
+    # Listeners are told once the transaction ends, not about its uncommitted writes
+    assert writes == [frozenset(CONTACT_GRAPH)]
+
+def test_batch_in_one_transaction_is_rolled_back_when_stopped(engine: Engine):
+    summary = run_batch(engine, script.splitlines(), transaction=True, stop_on_error=True, quiet=True)
+
+    assert (summary.commands, summary.failed, summary.stopped, summary.committed) == (3, 1, True, False)
+    assert _contact_count(engine) == 0
@@ -0,0 +1,154 @@
+import socket
+import threading
+import time
+from collections.abc import Iterator
+from pathlib import Path
+import pytest
+import uvicorn
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from prompt_toolkit.completion import CompleteEvent
+from prompt_toolkit.document import Document
+from sqlalchemy import Engine, create_engine
+from api.cli_endpoints import CliCompletion, get_cli_token, get_completion, get_handlers, router
+from cli.abstractions import Result
+from cli.api_client import ApiClient
+from cli.cli_token import TOKEN_HEADER, ensure_token, read_token
+from cli.backend import create_handlers
+from cli.completion import build_auto_suggest, build_completer
+from cli.completion_index import CompletionIndex
+from cli.remote_backend import RemoteBackend
+from data.models import Base
+
+token = "test-token"
+
+@pytest.fixture
+def app(tmp_path: Path) -> FastAPI:
+    engine: Engine = create_engine(f"sqlite:///{tmp_path / "contacts.db"}")
+    Base.metadata.create_all(engine)
+    handlers = create_handlers(engine)
+    index = CompletionIndex(engine)
+    index.attach()
+    commands = ["hello", *handlers]
+
+    app = FastAPI()
+    app.include_router(router)
+    app.dependency_overrides[get_handlers] = lambda: handlers
+    app.dependency_overrides[get_cli_token] = lambda: token
+    app.dependency_overrides[get_completion] = lambda: CliCompletion(
+        index, build_completer(index, commands), build_auto_suggest(index, commands)
+    )
+    return app
+
+@pytest.fixture
+def server_url(app: FastAPI) -> Iterator[str]:
+    sock = socket.socket()
+    sock.bind(("127.0.0.1", 0))
+    server = uvicorn.Server(uvicorn.Config(app, log_level="warning"))
+    thread = threading.Thread(target=server.run, kwargs={"sockets": [sock]}, daemon=True)
+    thread.start()
+    while not server.started:
+        time.sleep(0.01)
+    yield f"http://127.0.0.1:{sock.getsockname()[1]}"
+    server.should_exit = True
+    thread.join()
+
+
+def test_remote_backend_runs_commands_in_the_server(server_url: str):
+    backend = RemoteBackend(ApiClient(server_url, token=token))
+
+    (status, _), _ = backend.execute("add-contact", ["Anna Koval", "0501112233"])
+    (found, message), _ = backend.execute("get-contact", ["Anna Koval"])
+
+    assert status == Result.SUCCESS
+    assert found == Result.SUCCESS_DATA and "0501112233" in message
+    assert "get-contacts" in backend.commands
+
+def test_client_keeps_one_connection_alive(server_url: str):
+    client = ApiClient(server_url, token=token)
+    _ = client.commands()
+    sock = client._connection().sock
+
+    _ = client.execute("hello", [])
+    _ = client.commands()
+
+    assert client._connection().sock is sock
+
+def test_completions_come_from_the_server_index(server_url: str):
+    backend = RemoteBackend(ApiClient(server_url, token=token))
+    _ = backend.execute("add-contact", ["Anna Koval", "0501112233"])
+    document = Document("get-contact An")
+
+    completions = [completion.text for completion in backend.completer.get_completions(document, CompleteEvent())]
+
+    assert completions == ['"Anna Koval"']
+
+def test_failed_request_is_reported_as_command_error():
+    backend = RemoteBackend.__new__(RemoteBackend)
+    backend.client = ApiClient("http://127.0.0.1:9", timeout=1, token=token)
+
+    (status, message), _ = backend.execute("get-contacts", [])
+
+    assert status == Result.ERROR and "not reachable" in message
+
+def test_commands_are_accepted_only_from_this_machine(app: FastAPI):
+    local = TestClient(app, base_url="http://127.0.0.1:8000", client=("127.0.0.1", 50000))
+    remote = TestClient(app, base_url="http://127.0.0.1:8000", client=("203.0.113.7", 50000))
+    # A page of another site resolved to 127.0.0.1 sends its own host name
+    rebound = TestClient(app, base_url="http://attacker.example:8000", client=("127.0.0.1", 50000))
+    headers = {TOKEN_HEADER: token}
+
+    assert local.get("/cli/commands", headers=headers).status_code == 200
+    assert TestClient(app, base_url="http://[::1]:8000", client=("::1", 50000)).get("/cli/commands", headers=headers).status_code == 200
+    assert remote.get("/cli/commands", headers=headers).status_code == 403
+    assert rebound.get("/cli/commands", headers=headers).status_code == 403
+
+def test_commands_need_the_token_of_the_server(app: FastAPI):
+    local = TestClient(app, base_url="http://127.0.0.1:8000", client=("127.0.0.1", 50000))
+
+    assert local.get("/cli/commands").status_code == 403
+    assert local.get("/cli/commands", headers={TOKEN_HEADER: "guessed"}).status_code == 403
+
+def test_file_commands_are_not_run_for_clients(server_url: str, tmp_path: Path):
+    backend = RemoteBackend(ApiClient(server_url, token=token))
+
+    (status, message), _ = backend.execute("export", [str(tmp_path / "contacts.csv")])
+
+    assert status == Result.WARNING and "without --connect" in message
+    assert not (tmp_path / "contacts.csv").exists()
+
+def test_token_file_is_created_once_for_the_user(tmp_path: Path, monkeypatch: pytest.MonkeyPatch):
+    monkeypatch.setenv("Magic_CLI_TOKEN_PATH", str(tmp_path / "token"))
+
+    assert read_token() is None
+    created = ensure_token()
+
+    assert ensure_token() == read_token() == created
+    assert (tmp_path / "token").stat().st_mode & 0o777 == 0o600
+
+def test_list_output_is_streamed_while_it_is_read(server_url: str, monkeypatch: pytest.MonkeyPatch):
+    monkeypatch.setattr("api.cli_endpoints.STREAM_LINES_PER_CHUNK", 2)
+    client = ApiClient(server_url, token=token)
+    for number in range(5):
+        _ = client.execute("add-contact", [f"Contact {number}", f"050111223{number}"])
+
+    (status, message), _ = client.execute("get-contacts", [])
+    assert status == Result.SUCCESS_DATA and not isinstance(message, str)
+    first = next(message)
+    rest = list(message)
+
+    assert "Contact 0" in first and any("Contact 4" in line for line in rest)
+    # The connection is reused once the output was read to the end
+    sock = client._connection().sock
+    _ = client.commands()
+    assert client._connection().sock is sock
+
+def test_unread_output_does_not_block_the_next_command(server_url: str):
+    client = ApiClient(server_url, token=token)
+    for number in range(5):
+        _ = client.execute("add-contact", [f"Contact {number}", f"050111223{number}"])
+
+    (_, message), _ = client.execute("get-contacts", ["--limit", "1"])
+    assert not isinstance(message, str) and next(message)
+
+    assert "get-contacts" in client.commands()
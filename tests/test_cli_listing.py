@@ -0,0 +1,151 @@
+import csv
+import json
+import pytest
+from datetime import date
+from pathlib import Path
+from sqlalchemy import Engine, create_engine
+from cli.abstractions import Result, message_text
+from cli.contact_commands import ContactCommandHandlers
+from cli.listing import ListOptionError, ListOptions, fetch_pages, parse_list_options
+from cli.messages import print_status_message
+from cli.note_commands import NoteCommandHandlers
+from cli.pager import Pager
+from cli.pipeline import execute_handler
+from data.contact_commands import ContactCommands, CreateContact
+from data.instrumentation import instrument, sql_stats
+from data.models import Base
+from data.note_commands import CreateNote, NoteCommands
+from data.query_cache import enable_query_cache
+from data.tag_commands import AddTag
+
+
+@pytest.fixture
+def engine(tmp_path: Path) -> Engine:
+    engine = create_engine(f"sqlite:///{tmp_path / "contacts.db"}")
+    Base.metadata.create_all(engine)
+    instrument(engine)
+    commands = ContactCommands(engine)
+    for number in range(25):
+        _ = commands.add_contact(CreateContact(
+            name=f"Contact {number:02}",
+            phone_number=f"050{number:07}",
+            date_of_birth=date(1990, 5, 15) if number == 0 else None
+        ))
+    commands.add_tag_to_contact_by_name("Contact 00", AddTag(label="friends"))
+    return engine
+
+
+def test_list_options_are_split_off_the_arguments():
+    options = parse_list_options("get-contacts", ["friends", "--limit", "10", "--offset=5", "--format", "CSV"])
+
+    assert options == ListOptions(arguments=["friends"], limit=10, offset=5, format="csv")
+
+@pytest.mark.parametrize("args", [["--limit", "0"], ["--offset", "-1"], ["--format", "xml"], ["--limit"]])
+def test_invalid_list_options_are_rejected(args: list[str]):
+    with pytest.raises(ListOptionError):
+        _ = parse_list_options("get-contacts", args)
+
+def test_pages_are_read_only_while_the_output_is_taken():
+    reads: list[tuple[int, int | None, int]] = []
+
+    def fetch(limit: int, after: int | None, offset: int) -> list[int]:
+        reads.append((limit, after, offset))
+        start = after + 1 if after is not None else offset
+        return list(range(start, min(start + limit, 10)))
+
+    pages = fetch_pages(fetch, lambda row: row, ListOptions(offset=2, limit=7), page_size=3)
+
+    assert next(pages) == [2, 3, 4]
+    assert reads == [(3, None, 2)]
+    assert list(pages) == [[5, 6, 7], [8]]
+    assert reads == [(3, None, 2), (3, 4, 0), (1, 7, 0)]
+
+def test_contacts_are_streamed_page_by_page(engine: Engine, monkeypatch: pytest.MonkeyPatch):
+    monkeypatch.setattr("cli.listing.PAGE_SIZE", 10)
+    handlers = ContactCommandHandlers(engine)
+
+    with sql_stats() as stats:
+        status, message = handlers.get_contacts([])
+    assert status == Result.SUCCESS_DATA and not isinstance(message, str)
+    # Only the first page is read before the output is printed
+    assert stats.statements == 1
+
+    lines = list(message)
+    assert len(lines) == 25
+    assert lines[0] == "Contact 00 (0500000000) | Birthday: 15.05.1990 | Tags: friends"
+
+def test_pages_are_not_kept_in_the_query_cache(engine: Engine, monkeypatch: pytest.MonkeyPatch):
+    monkeypatch.setattr("cli.listing.PAGE_SIZE", 10)
+    cache = enable_query_cache(engine)
+    _ = NoteCommands(engine).add_note(CreateNote(text="Note"))
+
+    for handler in (ContactCommandHandlers(engine).get_contacts, NoteCommandHandlers(engine).get_notes):
+        _, message = handler([])
+        _ = message_text(message)
+        _, message = handler(["friends"])
+        _ = message_text(message)
+
+    assert len(cache) == 0
+
+def test_contacts_are_limited_and_formatted(engine: Engine):
+    handlers = ContactCommandHandlers(engine)
+
+    _, message = handlers.get_contacts(["--offset", "1", "--limit", "2", "--format", "json"])
+    assert [contact["name"] for contact in json.loads(message_text(message))] == ["Contact 01", "Contact 02"]
+
+    _, message = handlers.get_contacts(["friends", "--format", "csv"])
+    assert list(csv.reader(message_text(message).splitlines())) == [
+        ["name", "phones", "birthday", "tags"],
+        ["Contact 00", "0500000000", "1990-05-15", "friends"],
+    ]
+
+    _, message = handlers.get_contacts(["--limit", "1", "--format", "table"])
+    assert message_text(message).splitlines()[0].split() == ["Name", "Phones", "Birthday", "Tags"]
+
+def test_empty_list_and_invalid_options_are_reported(engine: Engine):
+    handlers = ContactCommandHandlers(engine)
+
+    assert handlers.get_contacts(["colleagues"]) == (Result.WARNING, "No contacts found")
+    assert handlers.get_contacts(["--offset", "100"]) == (Result.WARNING, "No contacts found")
+    status, _ = handlers.get_contacts(["--format", "xml"])
+    assert status == Result.ERROR
+
+def test_notes_are_streamed_in_the_format(engine: Engine):
+    commands = NoteCommands(engine)
+    for number in range(3):
+        _ = commands.add_note(CreateNote(text=f"Note {number}"))
+    handlers = NoteCommandHandlers(engine)
+
+    _, message = handlers.get_notes(["--limit", "2", "--format", "json"])
+
+    assert json.loads(message_text(message)) == [{"text": "Note 0", "tags": []}, {"text": "Note 1", "tags": []}]
+
+def test_pager_stops_reading_when_quit(capsys: pytest.CaptureFixture[str]):
+    taken: list[int] = []
+
+    def lines():
+        for number in range(100):
+            taken.append(number)
+            yield f"line {number}"
+
+    answers = iter(["", "q"])
+    print_status_message(Result.SUCCESS_DATA, lines(), Pager(3, read_answer=lambda _: next(answers)))
+
+    assert capsys.readouterr().out.splitlines() == [f"line {number}" for number in range(6)]
+    assert len(taken) == 7
+
+def test_pager_counts_wrapped_lines_as_screen_rows():
+    pager = Pager(10, columns=20)
+
+    assert [pager.rows(line) for line in ["", "a" * 20, "a" * 21, "a\nb" * 2]] == [1, 1, 2, 3]
+
+def test_failure_while_streaming_ends_the_output():
+    def handler(_: list[str]):
+        def lines():
+            yield "first"
+            raise RuntimeError("database is gone")
+        return Result.SUCCESS_DATA, lines()
+
+    _, message = execute_handler(handler, [])
+
+    assert message_text(message) == "first\nERROR: Unhandled exception.\ndatabase is gone"
@@ -0,0 +1,117 @@
+from prompt_toolkit.buffer import Buffer
+from prompt_toolkit.completion import CompleteEvent
+from prompt_toolkit.document import Document
+from sqlalchemy import create_engine
+from cli.completion import build_auto_suggest, build_completer
+from cli.completion_index import CompletionIndex, SortedWords
+from data.contact_commands import ContactCommands, CreateContact, UpdateContact
+from data.email_commands import CreateEmail, EmailCommands
+from data.instrumentation import instrument, sql_stats
+from data.models import Base
+from data.note_commands import CreateNote, NoteCommands
+from data.phone_commands import CreatePhone, PhoneCommands
+from data.tag_commands import AddTag, RemoveTag
+
+commands = ["get-contact", "add-phone", "edit-phone", "get-emails", "delete-email", "delete-note", "add-tag-to-contact"]
+
+
+def _create_index() -> CompletionIndex:
+    engine = create_engine("sqlite:///:memory:")
+    instrument(engine)
+    Base.metadata.create_all(engine)
+    contacts = ContactCommands(engine)
+    for name, phone in [("Anna Koval", "0501112233"), ("Andrii Melnyk", "0502223344"), ("Bohdan Moroz", "0503334455")]:
+        _ = contacts.add_contact(CreateContact(name=name, date_of_birth=None, phone_number=phone))
+    _ = EmailCommands(engine).add_email_for_contact_by_name("Anna Koval", CreateEmail(email_address="anna@example.com"))
+    contacts.add_tag_to_contact_by_name("Anna Koval", AddTag(label="friends"))
+    _ = NoteCommands(engine).add_note(CreateNote(text="Call about the project budget"))
+
+    index = CompletionIndex(engine)
+    index.attach()
+    return index
+
+def _completions(index: CompletionIndex, text: str) -> list[str]:
+    completer = build_completer(index, commands)
+    return [completion.text for completion in completer.get_completions(Document(text), CompleteEvent())]
+
+
+def test_sorted_words_match_prefix_case_insensitively():
+    words = SortedWords(["beta", "Alpha", "alpine", "ALPS", "gamma"])
+
+    assert words.starting_with("alp") == ["Alpha", "alpine", "ALPS"]
+    assert words.starting_with("alp", limit=2) == ["Alpha", "alpine"]
+    assert words.starting_with("z") == []
+    assert len(words.starting_with("")) == 5
+
+def test_completions_come_from_index_without_queries():
+    index = _create_index()
+
+    with sql_stats() as stats:
+        names = _completions(index, "get-contact An")
+        phones = _completions(index, 'edit-phone "Anna Koval" ')
+        emails = _completions(index, 'delete-email "Anna Koval" ')
+        tags = _completions(index, 'add-tag-to-contact "Anna Koval" fr')
+        notes = _completions(index, "delete-note bud")
+
+    assert stats.statements == 0
+    assert names == ['"Andrii Melnyk"', '"Anna Koval"']
+    assert phones == ["0501112233"]
+    assert emails == ["anna@example.com"]
+    assert tags == ["friends"]
+    assert notes == ['"Call about the project budget"']
+
+def test_index_follows_writes_of_command_handlers():
+    index = _create_index()
+    engine = index.engine
+
+    _ = PhoneCommands(engine).add_phone_for_contact_by_name("Bohdan Moroz", CreatePhone(phone_number="0509998877"))
+    _ = ContactCommands(engine).update_contact_by_name("Anna Koval", UpdateContact(name="Hanna Koval", date_of_birth=None))
+    with sql_stats() as stats:
+        index.refresh()
+
+    # The phones of one contact and the name of another are re-read, nothing else
+    assert stats.statements == 2
+    assert index.contact_phones("Bohdan Moroz") == ["0503334455", "0509998877"]
+    assert index.contact_names("an") == ["Andrii Melnyk"]
+    assert index.contact_emails("Hanna Koval") == ["anna@example.com"]
+
+def test_index_replaces_written_notes_and_tags():
+    index = _create_index()
+    engine = index.engine
+    assert index.notes_with_word("budg") == ["Call about the project budget"]
+
+    notes = NoteCommands(engine)
+    note = notes.add_note(CreateNote(text="Plan the budget review"))
+    _ = notes.add_tag_to_note(note.note_id, AddTag(label="work"))
+    ContactCommands(engine).remove_tag_from_contact_by_name("Anna Koval", RemoveTag(label="friends"))
+    index.refresh()
+
+    assert index.notes_with_word("budg") == ["Call about the project budget", "Plan the budget review"]
+    assert index.notes_with_word("revi") == ["Plan the budget review"]
+    assert index.tag_labels() == ["work"]
+
+    notes.delete_note(note.note_id)
+    index.refresh()
+
+    assert index.notes_starting_with("plan") == []
+    assert index.notes_with_word("revi") == []
+    assert index.tag_labels() == []
+
+def test_deleted_contacts_leave_the_index():
+    index = _create_index()
+    engine = index.engine
+
+    ContactCommands(engine).delete_contact(1)
+    index.refresh()
+
+    assert index.contact_names("an") == ["Andrii Melnyk"]
+    assert index.contact_phones("Anna Koval") == []
+    assert index.contact_emails("Anna Koval") == []
+
+def test_auto_suggest_uses_the_same_index():
+    index = _create_index()
+    auto_suggest = build_auto_suggest(index, commands)
+
+    suggestion = auto_suggest.get_suggestion(Buffer(), Document('add-tag-to-contact "Anna Koval" fr'))
+
+    assert suggestion is not None and suggestion.text == "iends"
@@ -1,8 +1,13 @@
+import pytest
 from datetime import date
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, insert, text
 from data.contact_commands import ContactCommands, CreateContact, UpdateContact
-from data.exceptions import ContactAlreadyExists
-from data.models import Base
+from data.contact_queries import ContactQueries
+from data.email_commands import CreateEmail, EmailCommands
+from data.exceptions import ContactAlreadyExists, EmailAlreadyExists, PhoneAlreadyExists
+from data.models import Base, Contact, Phone
+from data.phone_commands import CreatePhone, PhoneCommands
+from data.tag_commands import AddTag, RemoveTag
 
 engine = create_engine("sqlite:///:memory:")
 commands = ContactCommands(engine)
@@ -71,3 +76,84 @@ def test_delete_contact_by_name():
         )
     )
     commands.delete_contact_by_name(created_contact.name)
+
+def test_create_contact_with_existing_phone():
+    _ = commands.add_contact(CreateContact(name="Mary Major", date_of_birth=None, phone_number="0001112231"))
+    try:
+        _ = commands.add_contact(CreateContact(name="Mary Minor", date_of_birth=None, phone_number="0001112231"))
+    except PhoneAlreadyExists:
+        pass
+    else:
+        assert False, "Expected PhoneAlreadyExists exception was not raised"
+
+def test_update_contact_to_existing_name():
+    _ = commands.add_contact(CreateContact(name="Ann Lee", date_of_birth=None, phone_number="0001112233"))
+    other = commands.add_contact(CreateContact(name="Ann Kim", date_of_birth=None, phone_number="0001112234"))
+    try:
+        _ = commands.update_contact(other.contact_id, UpdateContact(name="Ann Lee", date_of_birth=None))
+    except ContactAlreadyExists:
+        pass
+    else:
+        assert False, "Expected ContactAlreadyExists exception was not raised"
+
+def test_created_contact_is_mappable_without_session():
+    contact = commands.add_contact(CreateContact(name="Tom Fox", date_of_birth=date(1990, 3, 4), phone_number="0001112235"))
+
+    assert [phone.phone_number for phone in contact.phones] == ["0001112235"]
+    assert contact.emails == [] and contact.notes == [] and contact.tags == []
+    assert contact.birthday_ordinal == 304
+
+def test_remove_tag_from_contact_by_name():
+    contact = commands.add_contact(CreateContact(name="Eve Tag", date_of_birth=None, phone_number="0001112236"))
+    commands.add_tag_to_contact_by_name(contact.name, AddTag(label="friends"))
+    commands.add_tag_to_contact_by_name(contact.name, AddTag(label="work"))
+
+    commands.remove_tag_from_contact_by_name(contact.name, RemoveTag(label="friends"))
+
+    stored = ContactQueries(engine).get_contact_by_id(contact.contact_id)
+    assert stored is not None and [tag.label for tag in stored.tags] == ["work"]
+
+def _legacy_engine_with_duplicates():
+    """
+    Database whose unique indexes were skipped by ensure_indexes because of duplicate data
+    """
+    legacy = create_engine("sqlite:///:memory:")
+    Base.metadata.create_all(legacy)
+    with legacy.begin() as connection:
+        for index in ["ix_contacts_name", "ix_phones_phone_number", "ix_emails_email_address"]:
+            _ = connection.execute(text(f"DROP INDEX {index}"))
+        _ = connection.execute(insert(Contact), [
+            {"contact_id": 1, "name": "Old Twin", "date_of_birth": None},
+            {"contact_id": 2, "name": "Old Twin", "date_of_birth": None},
+        ])
+        _ = connection.execute(insert(Phone), [
+            {"contact_id": 1, "phone_number": "0001110000"},
+            {"contact_id": 2, "phone_number": "0001110000"},
+        ])
+    return legacy
+
+def test_duplicates_are_rejected_without_unique_indexes():
+    legacy = _legacy_engine_with_duplicates()
+    legacy_commands = ContactCommands(legacy)
+    created = legacy_commands.add_contact(CreateContact(name="New One", date_of_birth=None, phone_number="0001110001"))
+
+    with pytest.raises(ContactAlreadyExists):
+        _ = legacy_commands.add_contact(CreateContact(name="New One", date_of_birth=None, phone_number="0001110002"))
+    with pytest.raises(PhoneAlreadyExists):
+        _ = legacy_commands.add_contact(CreateContact(name="New Two", date_of_birth=None, phone_number="0001110001"))
+    with pytest.raises(PhoneAlreadyExists):
+        _ = PhoneCommands(legacy).add_phone_for_contact(created.contact_id, CreatePhone(phone_number="0001110000"))
+    _ = EmailCommands(legacy).add_email_for_contact(created.contact_id, CreateEmail(email_address="one@example.com"))
+    with pytest.raises(EmailAlreadyExists):
+        _ = EmailCommands(legacy).add_email_for_contact(created.contact_id, CreateEmail(email_address="one@example.com"))
+    with pytest.raises(ContactAlreadyExists):
+        _ = legacy_commands.update_contact(created.contact_id, UpdateContact(name="Old Twin", date_of_birth=None))
+
+def test_contact_keeps_its_name_on_update_without_unique_indexes():
+    legacy = _legacy_engine_with_duplicates()
+    legacy_commands = ContactCommands(legacy)
+    created = legacy_commands.add_contact(CreateContact(name="New One", date_of_birth=None, phone_number="0001110001"))
+
+    updated = legacy_commands.update_contact(created.contact_id, UpdateContact(name="New One", date_of_birth=date(1990, 1, 2)))
+
+    assert updated.date_of_birth == date(1990, 1, 2)
@@ -0,0 +1,86 @@
+import io
+from datetime import date
+from data.contact_formats import ContactRecord, normalize_phone_number, read_contacts, write_contacts
+
+
+def test_read_vcard_with_folded_and_escaped_values():
+    vcard = (
+        "BEGIN:VCARD\r\n"
+        "VERSION:3.0\r\n"
+        "N:Doe;John;;;\r\n"
+        "FN:John Doe\r\n"
+        "item1.TEL;TYPE=CELL:+380 50 123 4567\r\n"
+        "TEL;TYPE=HOME:(067) 765-4321\r\n"
+        "EMAIL;TYPE=INTERNET:john@example.com\r\n"
+        "BDAY:19900515\r\n"
+        "CATEGORIES:work,friends\r\n"
+        "NOTE:Met in Kyiv\\, at the con\r\n"
+        " ference\r\n"
+        "END:VCARD\r\n"
+        "BEGIN:VCARD\r\n"
+        "VERSION:4.0\r\n"
+        "N:Roe;Jane;;;\r\n"
+        "TEL;VALUE=uri:tel:+380-50-765-4321\r\n"
+        "BDAY:--0515\r\n"
+        "END:VCARD\r\n"
+    )
+
+    contacts = list(read_contacts(io.StringIO(vcard)))
+
+    assert contacts == [
+        ContactRecord(
+            record=1,
+            name="John Doe",
+            phone_numbers=["0501234567", "0677654321"],
+            email_addresses=["john@example.com"],
+            date_of_birth=date(1990, 5, 15),
+            tags=["work", "friends"],
+            notes=["Met in Kyiv, at the conference"],
+        ),
+        ContactRecord(record=2, name="Jane Roe", phone_numbers=["0507654321"]),
+    ]
+
+def test_read_csv_with_google_style_columns():
+    rows = (
+        "Name,Phone 1 - Type,Phone 1 - Value,E-mail 1 - Value,Birthday,Labels\n"
+        "Jim Beam,Mobile,0501112233 ::: 0501112234,jim@example.com,15.05.1980,a ::: b\n"
+        "\"Doe, Jane\",,050-111-22-35,not an e-mail,,\n"
+    )
+
+    contacts = list(read_contacts(io.StringIO(rows), file_name="contacts.csv"))
+
+    assert contacts == [
+        ContactRecord(
+            record=1,
+            name="Jim Beam",
+            phone_numbers=["0501112233", "0501112234"],
+            email_addresses=["jim@example.com"],
+            date_of_birth=date(1980, 5, 15),
+            tags=["a", "b"],
+        ),
+        ContactRecord(record=2, name="Doe, Jane", phone_numbers=["0501112235"]),
+    ]
+
+def test_csv_keeps_every_note_of_a_contact():
+    records = [
+        ContactRecord(record=1, name="Jim Beam", notes=["First note", "Second\n\nwith a blank line", "Third, last"]),
+        ContactRecord(record=2, name="Jane Roe", notes=["Only note"]),
+        ContactRecord(record=3, name="John Doe"),
+    ]
+
+    text = "".join(write_contacts(records, "csv", lambda: 3))
+
+    assert text.splitlines()[0] == "name,phones,emails,birthday,tags,note1,note2,note3"
+    assert list(read_contacts(io.StringIO(text), "csv")) == records
+
+def test_csv_notes_past_the_note_columns_are_read():
+    records = [ContactRecord(record=1, name="Jim Beam", notes=["First note", "Second note"])]
+
+    # The contact got a second note after the note columns were counted
+    text = "".join(write_contacts(records, "csv", lambda: 1))
+
+    assert list(read_contacts(io.StringIO(text), "csv")) == records
+
+def test_normalize_phone_number():
+    assert normalize_phone_number("+38 (050) 123-45-67") == "0501234567"
+    assert normalize_phone_number("123") is None
@@ -0,0 +1,149 @@
+import calendar
+import os
+import random
+import pytest
+from datetime import date, timedelta
+from sqlalchemy import create_engine, select, text
+from sqlalchemy.exc import InvalidRequestError
+from data.contact_queries import ContactQueries
+from data.load_plans import contact_list
+from data.models import Base, Contact, ContactSummary
+
+# Contacts of the scale test, enough for the index to be used; set 1000000 to check production size
+SCALE_CONTACTS = int(os.getenv("MAGIC8_TEST_SCALE_CONTACTS", "10000"))
+
+
+def expected_celebrations(birthdays: dict[int, date], days: int, today: date) -> dict[int, date]:
+    """
+    Reference implementation: celebration day of every contact, computed in Python
+    """
+    def at_year(dob: date, year: int) -> date:
+        if dob.month == 2 and dob.day == 29 and not calendar.isleap(year):
+            return date(year, 3, 1)
+        return date(year, dob.month, dob.day)
+
+    def shifted(day: date) -> date:
+        weekday = day.isoweekday()
+        return day + timedelta(days=0 if weekday < 6 else 8 - weekday)
+
+    result: dict[int, date] = {}
+    for contact_id, dob in birthdays.items():
+        celebration = shifted(at_year(dob, today.year))
+        if celebration < today:
+            celebration = shifted(at_year(dob, today.year + 1))
+        if (celebration - today).days <= days:
+            result[contact_id] = celebration
+    return result
+
+def _create_engine_with_birthdays(birthdays: dict[int, date]):
+    engine = create_engine("sqlite:///:memory:")
+    Base.metadata.create_all(engine)
+    with engine.begin() as connection:
+        _ = connection.exec_driver_sql(
+            "INSERT INTO contacts (contact_id, name, date_of_birth) VALUES (?, ?, ?)",
+            [(contact_id, f"Contact {contact_id}", dob.isoformat()) for contact_id, dob in birthdays.items()]
+        )
+    return engine
+
+def _reminders(queries: ContactQueries, days: int, today: date) -> dict[int, date]:
+    reminders = queries.get_contacts_with_birthdays_in_days(days, today=today)
+    return {reminder.contact.contact_id: reminder.birthday for reminder in reminders}
+
+def test_birthdays_match_reference_for_every_day_of_year():
+    # One contact per calendar day, including February 29
+    birthdays = {
+        contact_id: day
+        for contact_id, day in enumerate(
+            (date(2000, 1, 1) + timedelta(days=offset) for offset in range(366)),
+            start=1
+        )
+    }
+    queries = ContactQueries(_create_engine_with_birthdays(birthdays))
+
+    todays = [date(2023, 1, 1) + timedelta(days=offset) for offset in range(0, 731, 17)]
+    todays += [
+        date(2023, 12, 30), date(2023, 12, 31), date(2024, 1, 1), date(2024, 1, 2),
+        date(2023, 2, 27), date(2023, 2, 28), date(2023, 3, 1), date(2023, 3, 2),
+        date(2024, 2, 27), date(2024, 2, 28), date(2024, 2, 29), date(2024, 3, 1),
+        date(2027, 2, 26), date(2027, 3, 1),
+    ]
+    for today in todays:
+        for days in [0, 1, 2, 7, 30, 365, 400]:
+            assert _reminders(queries, days, today) == expected_celebrations(birthdays, days, today), (today, days)
+
+def test_birthdays_with_negative_days():
+    queries = ContactQueries(_create_engine_with_birthdays({1: date(1990, 5, 15)}))
+
+    assert queries.get_contacts_with_birthdays_in_days(-1, today=date(2025, 5, 15)) == []
+
+def test_birthdays_at_scale_use_index_and_match_reference():
+    rng = random.Random(7)
+    first_birthday = date(1940, 1, 1)
+    birthdays = {
+        contact_id: first_birthday + timedelta(days=rng.randrange(30000))
+        for contact_id in range(1, SCALE_CONTACTS + 1)
+    }
+    engine = _create_engine_with_birthdays(birthdays)
+    queries = ContactQueries(engine)
+
+    for today, days in [(date(2025, 12, 29), 7), (date(2024, 2, 26), 5)]:
+        assert _reminders(queries, days, today) == expected_celebrations(birthdays, days, today), (today, days)
+
+    sql = select(Contact.contact_id).where(Contact.birthday_ordinal.between(101, 107))
+    with engine.connect() as connection:
+        plan = connection.execute(text(f"EXPLAIN QUERY PLAN {sql.compile(compile_kwargs={"literal_binds": True})}")).all()
+    assert any("ix_contacts_birthday_ordinal" in str(row) for row in plan)
+
+def test_get_contacts_pages_by_contact_id():
+    engine = _create_engine_with_birthdays({contact_id: date(1990, 1, 1) for contact_id in range(1, 8)})
+    queries = ContactQueries(engine)
+
+    first_page = queries.get_contacts(limit=3)
+    second_page = queries.get_contacts(limit=3, after=first_page[-1].contact_id)
+    last_page = queries.get_contacts(limit=3, after=second_page[-1].contact_id)
+
+    assert [contact.contact_id for contact in first_page] == [1, 2, 3]
+    assert [contact.contact_id for contact in second_page] == [4, 5, 6]
+    assert [contact.contact_id for contact in last_page] == [7]
+
+def test_get_contacts_by_tag_pages_by_contact_id():
+    engine = _create_engine_with_birthdays({contact_id: date(1990, 1, 1) for contact_id in range(1, 8)})
+    with engine.begin() as connection:
+        _ = connection.execute(text("INSERT INTO tags (tag_id, label) VALUES (1, 'work'), (2, 'family')"))
+        _ = connection.execute(text("INSERT INTO contact_tags (contact_id, tag_id) VALUES (6, 1), (2, 1), (4, 1), (3, 2), (7, 1)"))
+    queries = ContactQueries(engine)
+
+    first_page = queries.get_contacts_by_tag("work", limit=2)
+    second_page = queries.get_contacts_by_tag("work", limit=2, after=first_page[-1].contact_id)
+
+    assert [contact.contact_id for contact in first_page] == [2, 4]
+    assert [contact.contact_id for contact in second_page] == [6, 7]
+
+def test_get_contact_summaries_aggregates_phones_and_tags():
+    engine = _create_engine_with_birthdays({1: date(1990, 5, 15), 2: date(1985, 1, 2)})
+    with engine.begin() as connection:
+        _ = connection.execute(text("INSERT INTO phones (contact_id, phone_number) VALUES (1, '0001112223'), (1, '0001112224')"))
+        _ = connection.execute(text("INSERT INTO tags (tag_id, label) VALUES (1, 'work')"))
+        _ = connection.execute(text("INSERT INTO contact_tags (contact_id, tag_id) VALUES (1, 1)"))
+    queries = ContactQueries(engine)
+
+    summaries = queries.get_contact_summaries(with_phones=True, with_tags=True)
+    tagged = queries.get_contact_summaries(tag="work")
+
+    assert summaries == [
+        ContactSummary(1, "Contact 1", date(1990, 5, 15), ("0001112223", "0001112224"), ("work",)),
+        ContactSummary(2, "Contact 2", date(1985, 1, 2), (), ()),
+    ]
+    assert tagged == [ContactSummary(1, "Contact 1", date(1990, 5, 15))]
+    assert queries.get_contact_names() == ["Contact 1", "Contact 2"]
+
+def test_load_plan_leaves_out_relationships():
+    engine = _create_engine_with_birthdays({1: date(1990, 5, 15)})
+    queries = ContactQueries(engine)
+
+    contact = queries.get_contact_by_id(1, load=contact_list)
+
+    assert contact is not None
+    assert contact.phones == []
+    with pytest.raises(InvalidRequestError):
+        _ = contact.notes
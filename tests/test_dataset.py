@@ -0,0 +1,80 @@
+import re
+import pytest
+from collections import Counter
+from typing import Any
+from sqlalchemy import Engine, create_engine, func, select, text
+from benchmarks.dataset import DatasetProfile, generate_dataset
+from data.contact_queries import ContactQueries
+from data.models import Contact, ContactTag, Email, Note, Phone, notes_fts
+from data.note_queries import NoteQueries
+from data.validation import email_address_pattern, phone_number_pattern
+
+
+def _rows(engine: Engine) -> list[tuple[Any, ...]]:
+    with engine.connect() as connection:
+        return [
+            tuple(row)
+            for table in ["contacts", "phones", "emails", "notes", "contact_notes", "contact_tags", "note_tags"]
+            for row in connection.execute(text(f"SELECT * FROM {table} ORDER BY 1, 2"))
+        ]
+
+
+def test_dataset_has_requested_contacts_with_valid_values(dataset_engine: Engine):
+    with dataset_engine.connect() as connection:
+        assert connection.execute(select(func.count()).select_from(Contact)).scalar_one() == 2_000
+        phones = connection.execute(select(Phone.phone_number)).scalars().all()
+        emails = connection.execute(select(Email.email_address)).scalars().all()
+        contacts_without_phone = connection.execute(
+            select(func.count()).select_from(Contact).where(~Contact.phones.any())
+        ).scalar_one()
+
+    assert all(re.match(phone_number_pattern, phone) for phone in phones)
+    assert all(re.match(email_address_pattern, email) for email in emails)
+    assert contacts_without_phone == 0
+
+def test_tag_popularity_is_skewed(dataset_engine: Engine):
+    with dataset_engine.connect() as connection:
+        usage = Counter(dict(connection.execute(
+            select(ContactTag.tag_id, func.count()).group_by(ContactTag.tag_id)
+        ).all()))
+
+    (top_tag, top_count), = usage.most_common(1)
+    assert top_tag == 1
+    assert top_count > 10 * usage[100]
+
+def test_dataset_is_searchable_through_handlers(dataset_engine: Engine):
+    with dataset_engine.connect() as connection:
+        indexed = connection.execute(select(func.count()).select_from(notes_fts)).scalar_one()
+        notes = connection.execute(select(func.count()).select_from(Note)).scalar_one()
+        name = connection.execute(select(Contact.name).limit(1)).scalar_one()
+
+    assert indexed == notes > 0
+    assert NoteQueries(dataset_engine).search_notes("jazz")
+    found = ContactQueries(dataset_engine).get_contact_by_name(name)
+    assert found is not None and found.phones
+
+def test_same_seed_generates_same_rows():
+    engines = [create_engine("sqlite:///:memory:") for _ in range(3)]
+    _ = generate_dataset(engines[0], 300, seed=7)
+    _ = generate_dataset(engines[1], 300, seed=7)
+    _ = generate_dataset(engines[2], 300, seed=8)
+
+    assert _rows(engines[0]) == _rows(engines[1])
+    assert _rows(engines[0]) != _rows(engines[2])
+
+def test_profile_controls_cardinalities():
+    engine = create_engine("sqlite:///:memory:")
+    profile = DatasetProfile(phones=(0, 0, 1), emails=(1,), notes=(0, 1), contact_tags=(1,), note_tags=(1,), tag_count=5)
+
+    summary = generate_dataset(engine, 100, profile)
+
+    assert summary.rows["phones"] == 200
+    assert summary.rows["emails"] == summary.rows["contact_tags"] == summary.rows["note_tags"] == 0
+    assert summary.rows["notes"] == summary.rows["contact_notes"] == 100
+
+def test_dataset_requires_empty_database():
+    engine = create_engine("sqlite:///:memory:")
+    _ = generate_dataset(engine, 10)
+
+    with pytest.raises(ValueError):
+        _ = generate_dataset(engine, 10)
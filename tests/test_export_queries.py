@@ -0,0 +1,80 @@
+import io
+import json
+from datetime import date
+from typing import Literal
+from sqlalchemy import create_engine
+from data.batch_commands import BatchCommands, BatchItem
+from data.contact_commands import CreateContact
+from data.contact_formats import ContactRecord, read_contacts, write_contacts
+from data.email_commands import CreateEmail
+from data.export_queries import ExportQueries
+from data.models import Base
+from data.note_commands import CreateNote
+from data.tag_commands import AddTag
+
+engine = create_engine("sqlite:///:memory:")
+Base.metadata.create_all(engine)
+
+_ = BatchCommands(engine).execute([
+    BatchItem(CreateContact(name="John Doe", phone_number="0501234567", date_of_birth=date(1990, 5, 15))),
+    BatchItem(CreateEmail(email_address="john@example.com"), contact_name="John Doe"),
+    BatchItem(AddTag(label="work"), contact_name="John Doe"),
+    BatchItem(CreateNote(text="Likes coffee; no sugar, thanks"), contact_name="John Doe"),
+    BatchItem(CreateNote(text="Calls back\n\nafter six"), contact_name="John Doe"),
+    *(BatchItem(CreateContact(name=f"Contact {index}", phone_number=f"{index:010d}", date_of_birth=None)) for index in range(5)),
+])
+
+def test_iter_contact_records_reads_contacts_in_batches():
+    records = list(ExportQueries(engine).iter_contact_records(batch_size=2))
+
+    assert len(records) == 6
+    assert records[0] == ContactRecord(
+        record=1,
+        name="John Doe",
+        phone_numbers=["0501234567"],
+        email_addresses=["john@example.com"],
+        date_of_birth=date(1990, 5, 15),
+        tags=["work"],
+        notes=["Likes coffee; no sugar, thanks", "Calls back\n\nafter six"],
+    )
+
+def test_write_ndjson():
+    lines = "".join(write_contacts(ExportQueries(engine).iter_contact_records(), "ndjson")).splitlines()
+
+    assert len(lines) == 6
+    assert json.loads(lines[0]) == {
+        "name": "John Doe",
+        "dateOfBirth": "1990-05-15",
+        "phones": ["0501234567"],
+        "emails": ["john@example.com"],
+        "tags": ["work"],
+        "notes": ["Likes coffee; no sugar, thanks", "Calls back\n\nafter six"],
+    }
+
+def test_csv_and_vcard_exports_read_back():
+    queries = ExportQueries(engine)
+    records = list(queries.iter_contact_records())
+    assert queries.get_max_notes_per_contact() == 2
+
+    formats: list[Literal["csv", "vcard"]] = ["csv", "vcard"]
+    for format in formats:
+        text = "".join(write_contacts(records, format, queries.get_max_notes_per_contact))
+
+        assert list(read_contacts(io.StringIO(text), format)) == records, format
+
+def test_note_columns_are_counted_for_csv_only_once_written():
+    counts: list[str] = []
+
+    def count_note_columns() -> int:
+        counts.append("counted")
+        return 2
+
+    other_formats: list[Literal["ndjson", "vcard"]] = ["ndjson", "vcard"]
+    for format in other_formats:
+        _ = "".join(write_contacts(ExportQueries(engine).iter_contact_records(), format, count_note_columns))
+    assert counts == []
+
+    texts = write_contacts(ExportQueries(engine).iter_contact_records(), "csv", count_note_columns)
+    assert counts == []
+    assert next(texts) == "name,phones,emails,birthday,tags,note1,note2\n"
+    assert counts == ["counted"]
@@ -0,0 +1,98 @@
+import pytest
+from datetime import date
+from pathlib import Path
+from sqlalchemy import create_engine
+from cli.abstractions import Result
+from cli.import_commands import ImportCommandHandlers
+from data.contact_commands import ContactCommands, CreateContact
+from data.contact_formats import ContactRecord
+from data.contact_queries import ContactQueries
+from data.import_commands import ImportCommands
+from data.models import Base
+
+
+def _create_engine():
+    engine = create_engine("sqlite:///:memory:")
+    Base.metadata.create_all(engine)
+    return engine
+
+def test_import_contacts_with_details():
+    engine = _create_engine()
+
+    report = ImportCommands(engine).import_contacts([
+        ContactRecord(
+            record=1,
+            name="John Doe",
+            phone_numbers=["0501234567", "0677654321"],
+            email_addresses=["john@example.com"],
+            date_of_birth=date(1990, 5, 15),
+            tags=["work"],
+            notes=["Met at the conference"],
+        ),
+    ])
+
+    assert (report.records, report.imported, report.rejected, report.duplicates) == (1, 1, 0, 0)
+    contact = ContactQueries(engine).get_contact_by_name("John Doe")
+    assert contact is not None
+    assert [phone.phone_number for phone in contact.phones] == ["0501234567", "0677654321"]
+    assert [email.email_address for email in contact.emails] == ["john@example.com"]
+    assert contact.date_of_birth == date(1990, 5, 15)
+    assert [tag.label for tag in contact.tags] == ["work"]
+    assert [note.text for note in contact.notes] == ["Met at the conference"]
+
+def test_import_contacts_skips_duplicates_and_reports_rejects():
+    engine = _create_engine()
+    _ = ContactCommands(engine).add_contact(CreateContact(name="Jane Doe", phone_number="0500000001", date_of_birth=None))
+
+    report = ImportCommands(engine).import_contacts([
+        ContactRecord(record=1, name="Jane Doe", phone_numbers=["0500000002"]),
+        ContactRecord(record=2, name="Jack Black", phone_numbers=["0500000001", "0500000003"]),
+        ContactRecord(record=3, name="Jim Beam", phone_numbers=["0500000003"]),
+        ContactRecord(record=4, name="Jack Black", phone_numbers=["0500000004"]),
+        ContactRecord(record=5, name="Joe Bloggs", phone_numbers=["0500000005"]),
+    ], chunk_size=2)
+
+    assert (report.records, report.imported, report.rejected, report.duplicates) == (5, 2, 3, 2)
+    assert [(reject.record, reject.reason) for reject in report.rejects] == [
+        (1, "Contact already exists"),
+        (3, "No new valid phone number"),
+        (4, "Contact already exists"),
+    ]
+    contact = ContactQueries(engine).get_contact_by_name("Jack Black")
+    assert contact is not None
+    assert [phone.phone_number for phone in contact.phones] == ["0500000003"]
+
+def test_import_does_not_add_details_to_a_contact_created_meanwhile(monkeypatch: pytest.MonkeyPatch):
+    engine = _create_engine()
+    commands = ImportCommands(engine)
+    to_batch_items = commands._to_batch_items
+
+    def to_batch_items_then_concurrent_write(*args):
+        items = to_batch_items(*args)
+        _ = ContactCommands(engine).add_contact(CreateContact(name="Jane Doe", phone_number="0500000001", date_of_birth=None))
+        return items
+
+    monkeypatch.setattr(commands, "_to_batch_items", to_batch_items_then_concurrent_write)
+    report = commands.import_contacts([ContactRecord(
+        record=1,
+        name="Jane Doe",
+        phone_numbers=["0500000002", "0500000003"],
+        email_addresses=["jane@example.com"],
+        tags=["work"],
+        notes=["Imported"],
+    )])
+
+    assert (report.imported, report.rejected, report.duplicates) == (0, 1, 0)
+    assert [(reject.record, reject.reason) for reject in report.rejects] == [(1, "Contact already exists")]
+    contact = ContactQueries(engine).get_contact_by_name("Jane Doe")
+    assert contact is not None
+    assert [phone.phone_number for phone in contact.phones] == ["0500000001"]
+    assert (contact.emails, contact.tags, contact.notes) == ([], [], [])
+
+def test_import_rejects_unknown_formats(tmp_path: Path):
+    path = tmp_path / "contacts.txt"
+    _ = path.write_text("name,phone\n")
+
+    status, message = ImportCommandHandlers(_create_engine()).import_contacts([str(path), "xlsx"])
+
+    assert status == Result.ERROR and "csv|vcard" in message
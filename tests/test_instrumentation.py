@@ -0,0 +1,69 @@
+import logging
+import pytest
+from sqlalchemy import create_engine, text
+from sqlalchemy.exc import IntegrityError
+from data.models import Base
+from data.contact_commands import ContactCommands, CreateContact
+from data.contact_queries import ContactQueries
+from data.instrumentation import SLOWEST_KEPT, SqlStats, instrument, sql_stats
+
+engine = create_engine("sqlite:///:memory:")
+instrument(engine)
+
+Base.metadata.create_all(engine)
+
+_ = ContactCommands(engine).add_contact(CreateContact(name="John Doe", date_of_birth=None, phone_number="1111111111"))
+
+
+def test_statements_are_recorded_inside_measurement():
+    with sql_stats() as stats:
+        _ = ContactQueries(engine).get_contacts()
+
+    # Contacts, then phones, e-mails, notes and tags loaded with selectin
+    assert stats.statements == 5
+    assert stats.seconds > 0
+    assert len(stats.slowest) == SLOWEST_KEPT
+
+def test_statements_outside_measurement_are_not_recorded():
+    with sql_stats() as stats:
+        pass
+    _ = ContactQueries(engine).get_contact_names()
+
+    assert stats.statements == 0
+
+def test_nested_measurement_takes_statements_over():
+    with sql_stats() as outer:
+        _ = ContactQueries(engine).get_contact_names()
+        with sql_stats() as inner:
+            _ = ContactQueries(engine).get_contact_names()
+
+    assert (outer.statements, inner.statements) == (1, 1)
+
+def test_slowest_statements_are_kept_in_order():
+    stats = SqlStats()
+    for seconds in [0.1, 0.5, 0.2, 0.4, 0.3]:
+        stats.record(f"SELECT {seconds}", seconds)
+
+    assert [slow.seconds for slow in stats.slowest] == [0.5, 0.4, 0.3]
+    assert stats.statements == 5
+
+def test_slow_queries_are_logged(caplog: pytest.LogCaptureFixture):
+    slow_engine = create_engine("sqlite:///:memory:")
+    instrument(slow_engine, slow_query_ms=0)
+    Base.metadata.create_all(slow_engine)
+
+    with caplog.at_level(logging.WARNING, logger="data.instrumentation"):
+        _ = ContactQueries(slow_engine).get_contact_names()
+
+    assert any("Slow query" in message and "FROM contacts" in message for message in caplog.messages)
+
+def test_failed_statements_are_not_left_on_the_connection():
+    with engine.connect() as connection:
+        for _ in range(3):
+            with pytest.raises(IntegrityError):
+                _ = connection.execute(text("INSERT INTO contacts (contact_id, name) VALUES (1, 'Jane Doe')"))
+        with sql_stats() as stats:
+            _ = connection.execute(text("SELECT count(*) FROM contacts"))
+
+        assert connection.info["sql_started"] == []
+    assert stats.statements == 1
@@ -0,0 +1,35 @@
+import pytest
+from sqlalchemy import create_engine
+from data.exceptions import TagNotFound
+from data.models import Base
+from data.note_commands import CreateNote, NoteCommands
+from data.note_queries import NoteQueries
+from data.tag_commands import AddTag, RemoveTag
+
+engine = create_engine("sqlite:///:memory:")
+commands = NoteCommands(engine)
+
+Base.metadata.create_all(engine)
+
+def test_remove_tag_from_note():
+    note = commands.add_note(CreateNote(text="Buy a gift for Eve"))
+    other = commands.add_note(CreateNote(text="Call Eve back"))
+    for tagged in [note, other]:
+        _ = commands.add_tag_to_note(tagged.note_id, AddTag(label="eve"))
+    _ = commands.add_tag_to_note(note.note_id, AddTag(label="shopping"))
+
+    commands.remove_tag_from_note(note.note_id, RemoveTag(label="eve"))
+
+    assert [tagged.text for tagged in NoteQueries(engine).get_notes_by_tag("eve")] == ["Call Eve back"]
+    assert [tagged.text for tagged in NoteQueries(engine).get_notes_by_tag("shopping")] == ["Buy a gift for Eve"]
+
+def test_remove_tag_of_another_note_is_rejected():
+    note = commands.add_note(CreateNote(text="Plan the trip"))
+    other = commands.add_note(CreateNote(text="Pack for the trip"))
+    _ = commands.add_tag_to_note(other.note_id, AddTag(label="trip"))
+
+    with pytest.raises(TagNotFound):
+        commands.remove_tag_from_note(note.note_id, RemoveTag(label="trip"))
+    commands.remove_tag_from_note_by_fragment("Pack for", RemoveTag(label="trip"))
+
+    assert NoteQueries(engine).get_notes_by_tag("trip") == []
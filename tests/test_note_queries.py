@@ -0,0 +1,103 @@
+from sqlalchemy import create_engine, text
+from data.models import Base
+from data.note_commands import NoteCommands, CreateNote, UpdateNote
+from data.note_queries import NoteQueries
+from data.schema import ensure_note_search
+from data.tag_commands import AddTag
+from data.tag_queries import TagQueries
+
+engine = create_engine("sqlite:///:memory:")
+commands = NoteCommands(engine)
+queries = NoteQueries(engine)
+
+Base.metadata.create_all(engine)
+
+def test_search_notes_matches_word_prefixes():
+    note = commands.add_note(CreateNote(text="Buy groceries for the weekend"))
+
+    results = queries.search_notes("grocer week")
+
+    assert [result.note.note_id for result in results] == [note.note_id]
+    assert "[groceries]" in results[0].snippet
+
+def test_search_notes_orders_by_relevance():
+    weak = commands.add_note(CreateNote(text="Plan a trip somewhere warm, maybe the mountains later in the year"))
+    strong = commands.add_note(CreateNote(text="Mountains trip: mountains checklist"))
+
+    results = queries.search_notes("mountains")
+
+    assert [result.note.note_id for result in results[:2]] == [strong.note_id, weak.note_id]
+    assert results[0].rank <= results[1].rank
+
+def test_search_notes_follows_updates_and_deletes():
+    note = commands.add_note(CreateNote(text="Call the plumber"))
+    _ = commands.update_note(note.note_id, UpdateNote(text="Call the electrician"))
+
+    assert queries.search_notes("plumber") == []
+    assert [result.note.note_id for result in queries.search_notes("electrician")] == [note.note_id]
+
+    commands.delete_note(note.note_id)
+
+    assert queries.search_notes("electrician") == []
+
+def test_search_notes_without_words():
+    assert queries.search_notes("  ?! ") == []
+
+def test_find_note_by_text_fragment_inside_word():
+    note = commands.add_note(CreateNote(text="Unbelievable discount on bicycles"))
+
+    found = queries.find_note_by_text_fragment("believab")
+
+    assert found is not None
+    assert found.note_id == note.note_id
+
+def test_update_note_by_fragment_uses_exact_fragment():
+    _ = commands.add_note(CreateNote(text="Dentist appointment on Monday"))
+    target = commands.add_note(CreateNote(text="Dentist: Monday appointment moved"))
+
+    updated = commands.update_note_by_fragment("Monday appointment", UpdateNote(text="Dentist appointment cancelled"))
+
+    assert updated.note_id == target.note_id
+
+def test_ensure_note_search_indexes_existing_notes():
+    legacy_engine = create_engine("sqlite:///:memory:")
+    Base.metadata.create_all(legacy_engine)
+    with legacy_engine.begin() as connection:
+        for trigger in ["notes_fts_after_insert", "notes_fts_after_delete", "notes_fts_after_update"]:
+            _ = connection.execute(text(f"DROP TRIGGER {trigger}"))
+        _ = connection.execute(text("DROP TABLE notes_fts"))
+        _ = connection.execute(text("INSERT INTO notes (note_id, text) VALUES (1, 'Legacy note about taxes')"))
+
+    ensure_note_search(legacy_engine)
+
+    results = NoteQueries(legacy_engine).search_notes("taxes")
+    assert [result.note.note_id for result in results] == [1]
+
+def test_get_notes_pages_by_note_id():
+    notes = [commands.add_note(CreateNote(text=f"Paged note {index}")) for index in range(5)]
+    after = notes[0].note_id
+
+    page = queries.get_notes(limit=2, after=after)
+
+    assert [note.note_id for note in page] == [notes[1].note_id, notes[2].note_id]
+
+def test_get_notes_by_tag_pages_by_note_id():
+    notes = [commands.add_note(CreateNote(text=f"Tagged note {index}")) for index in range(4)]
+    for note in notes:
+        _ = commands.add_tag_to_note(note.note_id, AddTag(label="paged"))
+
+    first_page = queries.get_notes_by_tag("paged", limit=3)
+    second_page = queries.get_notes_by_tag("paged", limit=3, after=first_page[-1].note_id)
+
+    assert [note.note_id for note in first_page + second_page] == [note.note_id for note in notes]
+
+def test_projections_of_note_texts_and_tag_labels():
+    projection_engine = create_engine("sqlite:///:memory:")
+    Base.metadata.create_all(projection_engine)
+    projection_commands = NoteCommands(projection_engine)
+    first = projection_commands.add_note(CreateNote(text="First"))
+    _ = projection_commands.add_note(CreateNote(text="Second"))
+    _ = projection_commands.add_tag_to_note(first.note_id, AddTag(label="todo"))
+
+    assert NoteQueries(projection_engine).get_note_texts() == ["First", "Second"]
+    assert TagQueries(projection_engine).get_tag_labels() == ["todo"]
@@ -0,0 +1,133 @@
+from sqlalchemy import create_engine, event
+from data.models import Base
+from data.contact_commands import ContactCommands, CreateContact, UpdateContact
+from data.contact_queries import ContactQueries
+from data.phone_commands import PhoneCommands, CreatePhone
+from data.phone_queries import PhoneQueries
+from data.batch_commands import BatchCommands, BatchItem
+from data.query_cache import QueryCache, disable_query_cache, enable_query_cache, get_query_cache
+
+engine = create_engine("sqlite:///:memory:")
+cache = enable_query_cache(engine)
+contact_commands = ContactCommands(engine)
+contact_queries = ContactQueries(engine)
+phone_commands = PhoneCommands(engine)
+phone_queries = PhoneQueries(engine)
+
+Base.metadata.create_all(engine)
+
+statements: list[str] = []
+
+@event.listens_for(engine, "before_cursor_execute")
+def count_statement(conn, cursor, statement, parameters, context, executemany):
+    statements.append(statement)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_cache_returns_stored_result_until_expired():
+    clock = FakeClock()
+    query_cache = QueryCache(ttl=10, clock=clock)
+    loads: list[int] = []
+
+    def load() -> int:
+        loads.append(1)
+        return len(loads)
+
+    assert query_cache.get_or_load("key", ["contacts"], load) == 1
+    clock.now = 9
+    assert query_cache.get_or_load("key", ["contacts"], load) == 1
+    clock.now = 11
+    assert query_cache.get_or_load("key", ["contacts"], load) == 2
+    assert (query_cache.stats.hits, query_cache.stats.misses) == (1, 2)
+
+def test_cache_evicts_least_recently_used():
+    query_cache = QueryCache(max_entries=2)
+    _ = query_cache.get_or_load("a", [], lambda: "a")
+    _ = query_cache.get_or_load("b", [], lambda: "b")
+    _ = query_cache.get_or_load("a", [], lambda: "a")
+    _ = query_cache.get_or_load("c", [], lambda: "c")
+
+    assert query_cache.get_or_load("a", [], lambda: "reloaded") == "a"
+    assert query_cache.get_or_load("c", [], lambda: "reloaded") == "c"
+    assert query_cache.get_or_load("b", [], lambda: "reloaded") == "reloaded"
+    assert query_cache.stats.evictions == 2
+
+def test_invalidation_drops_only_results_of_written_topics():
+    query_cache = QueryCache()
+    _ = query_cache.get_or_load("contacts", ["contacts", "phones"], lambda: "contacts")
+    _ = query_cache.get_or_load("notes", ["notes"], lambda: "notes")
+
+    query_cache.invalidate(["phones"])
+
+    assert query_cache.get_or_load("contacts", ["contacts"], lambda: "reloaded") == "reloaded"
+    assert query_cache.get_or_load("notes", ["notes"], lambda: "reloaded") == "notes"
+    assert query_cache.stats.invalidations == 1
+
+def test_result_loaded_during_write_is_not_stored():
+    query_cache = QueryCache()
+
+    def load_while_writing() -> str:
+        query_cache.invalidate(["contacts"])
+        return "stale"
+
+    assert query_cache.get_or_load("key", ["contacts"], load_while_writing) == "stale"
+    assert query_cache.get_or_load("key", ["contacts"], lambda: "fresh") == "fresh"
+
+def test_query_handler_reads_database_once():
+    _ = contact_commands.add_contact(CreateContact(name="Cached One", date_of_birth=None, phone_number="5550000001"))
+    _ = contact_queries.get_contact_by_name("Cached One")
+
+    statements.clear()
+    contact = contact_queries.get_contact_by_name("Cached One")
+
+    assert contact is not None and contact.name == "Cached One"
+    assert statements == []
+
+def test_returned_lists_are_copies():
+    _ = contact_commands.add_contact(CreateContact(name="Cached Two", date_of_birth=None, phone_number="5550000002"))
+    names = contact_queries.get_contact_names()
+    names.clear()
+
+    assert "Cached Two" in contact_queries.get_contact_names()
+
+def test_command_handler_invalidates_cached_results():
+    contact = contact_commands.add_contact(CreateContact(name="Cached Three", date_of_birth=None, phone_number="5550000003"))
+    assert [phone.phone_number for phone in phone_queries.get_contact_phones(contact.contact_id)] == ["5550000003"]
+    assert contact_queries.get_contact_by_name("Cached Three") is not None
+
+    _ = phone_commands.add_phone_for_contact(contact.contact_id, CreatePhone(phone_number="5550000004"))
+    _ = contact_commands.update_contact(contact.contact_id, UpdateContact(name="Cached Four", date_of_birth=None))
+
+    assert len(phone_queries.get_contact_phones(contact.contact_id)) == 2
+    assert contact_queries.get_contact_by_name("Cached Three") is None
+    assert "Cached Four" in contact_queries.get_contact_names()
+
+def test_batch_commands_invalidate_cached_results():
+    _ = contact_queries.get_contact_names()
+    _ = BatchCommands(engine).execute([
+        BatchItem(CreateContact(name="Cached Five", date_of_birth=None, phone_number="5550000005"))
+    ])
+
+    assert "Cached Five" in contact_queries.get_contact_names()
+
+def test_disabled_cache_reads_database():
+    other_engine = create_engine("sqlite:///:memory:")
+    Base.metadata.create_all(other_engine)
+    queries = ContactQueries(other_engine)
+    _ = enable_query_cache(other_engine)
+    disable_query_cache(other_engine)
+    other_statements: list[str] = []
+    event.listen(other_engine, "before_cursor_execute", lambda *args: other_statements.append(args[2]))
+
+    _ = queries.get_contact_names()
+    _ = queries.get_contact_names()
+
+    assert get_query_cache(other_engine) is None
+    assert len(other_statements) == 2
@@ -0,0 +1,80 @@
+from sqlalchemy import create_engine
+from data.batch_commands import BatchCommands, BatchItem
+from data.contact_commands import ContactCommands, CreateContact, UpdateContact
+from data.models import Base
+from data.note_commands import CreateNote, NoteCommands
+from data.phone_commands import CreatePhone, PhoneCommands, UpdatePhone
+from data.query_cache import CONTACTS, NOTES, PHONES, TAGS
+from data.row_changes import WrittenRows, add_row_listener, remove_row_listener
+from data.tag_commands import AddTag, RemoveTag
+
+
+def _create_engine():
+    engine = create_engine("sqlite:///:memory:")
+    Base.metadata.create_all(engine)
+    written: list[WrittenRows] = []
+    add_row_listener(engine, written.append)
+    return engine, written
+
+def _ids(rows: WrittenRows) -> dict[str, set[int]]:
+    return {topic: ids for topic, ids in rows.ids.items() if ids}
+
+
+def test_handlers_report_the_ids_they_wrote():
+    engine, written = _create_engine()
+    contacts = ContactCommands(engine)
+    anna = contacts.add_contact(CreateContact(name="Anna Koval", date_of_birth=None, phone_number="0501112233"))
+    bohdan = contacts.add_contact(CreateContact(name="Bohdan Moroz", date_of_birth=None, phone_number="0503334455"))
+    _ = PhoneCommands(engine).update_phone_by_number("Bohdan Moroz", "0503334455", UpdatePhone(phone_number="0509998877"))
+    _ = contacts.update_contact_by_name("Anna Koval", UpdateContact(name="Hanna Koval", date_of_birth=None))
+    contacts.add_tag_to_contact_by_name("Hanna Koval", AddTag(label="friends"))
+    contacts.remove_tag_from_contact_by_name("Hanna Koval", RemoveTag(label="friends"))
+    note = NoteCommands(engine).add_note(CreateNote(text="Call Anna"))
+    contacts.delete_contact(bohdan.contact_id)
+
+    assert [_ids(rows) for rows in written] == [
+        {CONTACTS: {anna.contact_id}, PHONES: {anna.contact_id}},
+        {CONTACTS: {bohdan.contact_id}, PHONES: {bohdan.contact_id}},
+        {PHONES: {bohdan.contact_id}},
+        {CONTACTS: {anna.contact_id}},
+        {TAGS: {1}},
+        {TAGS: {1}},
+        {NOTES: {note.note_id}},
+        {CONTACTS: {bohdan.contact_id}, PHONES: {bohdan.contact_id}},
+    ]
+    assert all(not rows.unknown for rows in written)
+
+def test_batch_inserts_report_their_ids():
+    engine, written = _create_engine()
+
+    _ = BatchCommands(engine).execute([
+        BatchItem(CreateContact(name="Anna Koval", date_of_birth=None, phone_number="0501112233")),
+        BatchItem(CreatePhone(phone_number="0509998877"), "Anna Koval"),
+        BatchItem(AddTag(label="friends"), "Anna Koval"),
+        BatchItem(CreateNote(text="Call Anna"), "Anna Koval"),
+    ])
+
+    assert [_ids(rows) for rows in written] == [{CONTACTS: {1}, PHONES: {1}, TAGS: {1}, NOTES: {1}}]
+
+def test_rows_of_a_connection_are_reported_when_it_commits():
+    engine, written = _create_engine()
+    _ = ContactCommands(engine).add_contact(CreateContact(name="Anna Koval", date_of_birth=None, phone_number="0501112233"))
+    written.clear()
+
+    with engine.connect() as connection, connection.begin() as transaction:
+        _ = PhoneCommands(connection).add_phone_for_contact_by_name("Anna Koval", CreatePhone(phone_number="0509998877"))
+        assert written == []
+        transaction.rollback()
+    with engine.connect() as connection, connection.begin():
+        _ = PhoneCommands(connection).add_phone_for_contact_by_name("Anna Koval", CreatePhone(phone_number="0509998866"))
+        assert written == []
+
+    assert [_ids(rows) for rows in written] == [{PHONES: {1}}]
+
+def test_engines_without_listeners_are_not_followed():
+    engine, written = _create_engine()
+    remove_row_listener(engine, written.append)
+
+    _ = ContactCommands(engine).add_contact(CreateContact(name="Anna Koval", date_of_birth=None, phone_number="0501112233"))
+
+    assert written == []
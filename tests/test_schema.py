@@ -0,0 +1,119 @@
+from sqlalchemy import create_engine, inspect, insert, text
+from data.models import Base, Contact, Phone
+from data.schema import ensure_indexes, ensure_schema, read_schema_version, schema_version
+
+
+def _create_legacy_database():
+    engine = create_engine("sqlite:///:memory:")
+    Base.metadata.create_all(engine)
+    with engine.begin() as connection:
+        for table in Base.metadata.sorted_tables:
+            for index in inspect(connection).get_indexes(table.name):
+                _ = connection.execute(text(f"DROP INDEX {index["name"]}"))
+    return engine
+
+def _index_names(engine, table_name: str) -> set[str]:
+    return {str(index["name"]) for index in inspect(engine).get_indexes(table_name)}
+
+def test_ensure_indexes_creates_missing_indexes():
+    engine = _create_legacy_database()
+
+    skipped = ensure_indexes(engine)
+
+    assert skipped == []
+    assert "ix_contacts_name" in _index_names(engine, "contacts")
+    assert "ix_phones_phone_number" in _index_names(engine, "phones")
+    assert "ix_contact_tags_tag_id" in _index_names(engine, "contact_tags")
+    assert "ix_note_tags_tag_id" in _index_names(engine, "note_tags")
+    assert "ix_contact_notes_note_id" in _index_names(engine, "contact_notes")
+
+def test_ensure_indexes_skips_unique_index_with_duplicates():
+    engine = _create_legacy_database()
+    with engine.begin() as connection:
+        _ = connection.execute(insert(Contact), [
+            {"contact_id": 1, "name": "John Doe", "date_of_birth": None},
+            {"contact_id": 2, "name": "Jane Doe", "date_of_birth": None},
+        ])
+        _ = connection.execute(insert(Phone), [
+            {"contact_id": 1, "phone_number": "0001112223"},
+            {"contact_id": 2, "phone_number": "0001112223"},
+        ])
+
+    skipped = ensure_indexes(engine)
+
+    assert skipped == ["ix_phones_phone_number"]
+    assert "ix_phones_phone_number" not in _index_names(engine, "phones")
+    assert "ix_contacts_name" in _index_names(engine, "contacts")
+
+def test_ensure_indexes_recreates_index_declared_with_other_columns():
+    engine = create_engine("sqlite:///:memory:")
+    Base.metadata.create_all(engine)
+    with engine.begin() as connection:
+        # Single-column index of an older version, declared composite under the same name later
+        _ = connection.execute(text("DROP INDEX ix_note_tags_tag_id"))
+        _ = connection.execute(text("CREATE INDEX ix_note_tags_tag_id ON note_tags (tag_id)"))
+
+    skipped = ensure_indexes(engine)
+
+    columns = {str(index["name"]): index["column_names"] for index in inspect(engine).get_indexes("note_tags")}
+    assert skipped == []
+    assert columns["ix_note_tags_tag_id"] == ["tag_id", "note_id"]
+
+def test_ensure_schema_is_repeatable():
+    engine = create_engine("sqlite:///:memory:")
+    ensure_schema(engine)
+    ensure_schema(engine)
+
+    assert "ix_tags_label" in _index_names(engine, "tags")
+
+def test_ensure_schema_adds_birthday_ordinal_to_existing_contacts():
+    engine = create_engine("sqlite:///:memory:")
+    with engine.begin() as connection:
+        _ = connection.execute(text(
+            "CREATE TABLE contacts (contact_id INTEGER NOT NULL PRIMARY KEY, name VARCHAR(64) NOT NULL, date_of_birth DATE)"
+        ))
+        _ = connection.execute(text("INSERT INTO contacts VALUES (1, 'John Doe', '1990-02-29')"))
+
+    ensure_schema(engine)
+
+    with engine.connect() as connection:
+        ordinal = connection.execute(text("SELECT birthday_ordinal FROM contacts")).scalar_one()
+    assert ordinal == 229
+    assert "ix_contacts_birthday_ordinal" in _index_names(engine, "contacts")
+
+def test_ensure_schema_stamps_the_schema_version():
+    engine = create_engine("sqlite:///:memory:")
+
+    ensure_schema(engine)
+
+    assert read_schema_version(engine) == schema_version()
+
+def test_ensure_schema_skips_checks_for_a_stamped_database():
+    engine = create_engine("sqlite:///:memory:")
+    ensure_schema(engine)
+    with engine.begin() as connection:
+        _ = connection.execute(text("DROP INDEX ix_tags_label"))
+
+    ensure_schema(engine)
+    assert "ix_tags_label" not in _index_names(engine, "tags")
+
+    with engine.begin() as connection:
+        _ = connection.execute(text("PRAGMA user_version = 0"))
+    ensure_schema(engine)
+    assert "ix_tags_label" in _index_names(engine, "tags")
+
+def test_ensure_schema_does_not_stamp_when_an_index_was_skipped():
+    engine = _create_legacy_database()
+    with engine.begin() as connection:
+        _ = connection.execute(insert(Contact), [
+            {"contact_id": 1, "name": "John Doe", "date_of_birth": None},
+            {"contact_id": 2, "name": "Jane Doe", "date_of_birth": None},
+        ])
+        _ = connection.execute(insert(Phone), [
+            {"contact_id": 1, "phone_number": "0001112223"},
+            {"contact_id": 2, "phone_number": "0001112223"},
+        ])
+
+    ensure_schema(engine)
+
+    assert read_schema_version(engine) == 0
@@ -0,0 +1,38 @@
+import pytest
+from sqlalchemy import create_engine, text
+from data.contact_commands import ContactCommands, CreateContact
+from data.schema import ensure_schema
+from data.sqlite_profile import apply_profile, get_profile, profiles
+from data.tag_commands import AddTag
+
+
+def test_profile_pragmas_are_applied_to_connections(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / "contacts.db"}")
+    apply_profile(engine, profiles["durable"])
+
+    with engine.connect() as connection:
+        assert connection.execute(text("PRAGMA journal_mode")).scalar_one() == "wal"
+        assert connection.execute(text("PRAGMA synchronous")).scalar_one() == 2
+        assert connection.execute(text("PRAGMA foreign_keys")).scalar_one() == 1
+        assert connection.execute(text("PRAGMA busy_timeout")).scalar_one() == 5000
+    engine.dispose()
+
+def test_delete_contact_with_foreign_keys_enforced(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / "contacts.db"}")
+    apply_profile(engine, get_profile("fast"))
+    ensure_schema(engine)
+    commands = ContactCommands(engine)
+    contact = commands.add_contact(CreateContact(name="John Doe", phone_number="0001112223", date_of_birth=None))
+    _ = commands.add_tag_to_contact(contact.contact_id, AddTag(label="work"))
+
+    commands.delete_contact(contact.contact_id)
+
+    with engine.connect() as connection:
+        assert connection.execute(text("SELECT count(*) FROM phones")).scalar_one() == 0
+    engine.dispose()
+
+def test_get_profile_defaults_to_balanced():
+    assert get_profile(None) == profiles["balanced"]
+    assert get_profile(" Fast ") == profiles["fast"]
+    with pytest.raises(ValueError):
+        _ = get_profile("reckless")
@@ -0,0 +1,21 @@
+import os
+import pytest
+from benchmarks.startup import modes, profile_imports
+
+
+@pytest.mark.parametrize("mode", modes, ids=lambda mode: mode.name)
+def test_mode_starts_without_its_deferred_packages(mode, tmp_path):
+    env = {**os.environ, "Magic_DB_PATH": str(tmp_path)}
+
+    packages = profile_imports(mode.module, env).packages()
+
+    assert mode.module.partition(".")[0] in packages
+    assert [package for package in mode.deferred if package in packages] == []
+
+def test_database_module_opens_the_database_on_first_use(tmp_path):
+    env = {**os.environ, "Magic_DB_PATH": str(tmp_path)}
+
+    packages = profile_imports("data.database", env).packages()
+
+    assert "sqlalchemy" not in packages
+    assert not (tmp_path / "contacts.db").exists()